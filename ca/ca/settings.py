@@ -199,8 +199,10 @@ CSRF_COOKIE_SECURE = True
 # Celery configuration
 CELERY_BEAT_SCHEDULE = {
     "cache-crls": {
+        # Attempt to regenerate CRLs every hour. CRLs are only regenerated if certificates were revoked or
+        # they expire in the near future.
         "task": "django_ca.tasks.cache_crls",
-        "schedule": 86100,
+        "schedule": 3600,
     },
     "generate-ocsp-keys": {
         # Attempt to regenerate OCSP responder certificates every hour. Certificates are only regenerated if
@@ -96,7 +96,13 @@ def load_settings_from_environment() -> Iterator[Tuple[str, Any]]:
 
         if key == "ALLOWED_HOSTS":
             yield key, value.split()
-        elif key in ("CA_USE_CELERY", "CA_ENABLE_ACME", "CA_ENABLE_REST_API", "ENABLE_ADMIN"):
+        elif key in (
+            "CA_USE_CELERY",
+            "CA_USE_ASYNC_VIEWS",
+            "CA_ENABLE_ACME",
+            "CA_ENABLE_REST_API",
+            "ENABLE_ADMIN",
+        ):
             yield key, parse_bool(value)
         else:
             yield key, value
@@ -31,5 +31,5 @@ class DjangoCAConfig(AppConfig):
     verbose_name = _("Certificate Authority")
 
     def ready(self) -> None:
-        # pylint: disable-next=import-outside-toplevel  # that's how checks work
-        from django_ca import checks  # NOQA: F401  # import already registers the checks
+        # pylint: disable-next=import-outside-toplevel  # that's how checks and signal receivers work
+        from django_ca import checks, receivers  # NOQA: F401  # import already registers checks/receivers
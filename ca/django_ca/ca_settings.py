@@ -292,7 +292,26 @@ if CA_DEFAULT_PROFILE not in CA_PROFILES:
 
 CA_DEFAULT_ENCODING: Encoding = getattr(settings, "CA_DEFAULT_ENCODING", Encoding.PEM)
 CA_NOTIFICATION_DAYS = getattr(settings, "CA_NOTIFICATION_DAYS", [14, 7, 3, 1])
+CA_CRL_CACHE_CHUNK_SIZE: Optional[int] = getattr(settings, "CA_CRL_CACHE_CHUNK_SIZE", 512 * 1024)
+if CA_CRL_CACHE_CHUNK_SIZE is not None and (
+    not isinstance(CA_CRL_CACHE_CHUNK_SIZE, int) or CA_CRL_CACHE_CHUNK_SIZE < 1
+):
+    raise ImproperlyConfigured("CA_CRL_CACHE_CHUNK_SIZE must be None or a positive int.")
 CA_CRL_PROFILES: Dict[str, Dict[str, Any]] = getattr(settings, "CA_CRL_PROFILES", _CA_CRL_PROFILES)
+CA_CRL_PARTITIONS: int = int(getattr(settings, "CA_CRL_PARTITIONS", 0))
+CA_CRL_REGENERATE_ON_REVOKE: Optional[int] = getattr(settings, "CA_CRL_REGENERATE_ON_REVOKE", None)
+if CA_CRL_REGENERATE_ON_REVOKE is not None and (
+    not isinstance(CA_CRL_REGENERATE_ON_REVOKE, int) or CA_CRL_REGENERATE_ON_REVOKE < 0
+):
+    raise ImproperlyConfigured("CA_CRL_REGENERATE_ON_REVOKE must be None or a non-negative int.")
+CA_USABLE_CACHE_TIMEOUT: Optional[int] = getattr(settings, "CA_USABLE_CACHE_TIMEOUT", None)
+if CA_USABLE_CACHE_TIMEOUT is not None and (
+    not isinstance(CA_USABLE_CACHE_TIMEOUT, int) or CA_USABLE_CACHE_TIMEOUT < 1
+):
+    raise ImproperlyConfigured("CA_USABLE_CACHE_TIMEOUT must be None or a positive int.")
+CA_CRL_STORAGE_ALIAS: Optional[str] = getattr(settings, "CA_CRL_STORAGE_ALIAS", None)
+if CA_CRL_STORAGE_ALIAS is not None and CA_CRL_STORAGE_ALIAS not in settings.STORAGES:
+    raise ImproperlyConfigured(f"{CA_CRL_STORAGE_ALIAS}: CA_CRL_STORAGE_ALIAS is not configured in STORAGES.")
 
 # Load and process CA_PASSWORDS
 CA_PASSWORDS: Dict[str, bytes] = getattr(settings, "CA_PASSWORDS", {})
@@ -371,6 +390,7 @@ CA_FILE_STORAGE_KWARGS = getattr(
 )
 
 CA_ENABLE_REST_API: bool = getattr(settings, "CA_ENABLE_REST_API", False)
+CA_USE_ASYNC_VIEWS: bool = getattr(settings, "CA_USE_ASYNC_VIEWS", False)
 
 # CA_OCSP_RESPONDER_CERTIFICATE_RENEWAL was added in 1.26.0
 CA_OCSP_RESPONDER_CERTIFICATE_RENEWAL: Union[timedelta] = getattr(
@@ -21,6 +21,11 @@ from typing import Any, List, Optional
 from django.apps import AppConfig
 from django.conf import settings
 from django.core import checks
+from django.core.cache import cache
+
+from django_ca import ca_settings
+from django_ca.models import CertificateAuthority
+from django_ca.utils import get_crl_cache_key, parse_encoding
 
 # List of cache backends that do not share the data between multiple worker processes
 _UNSUPPORTED_BACKENDS = (
@@ -29,6 +34,12 @@ _UNSUPPORTED_BACKENDS = (
     "django.core.cache.backends.dummy.DummyCache",
 )
 
+# Maximum size of a single item for cache backends that have a (low) default limit
+_CACHE_ITEM_LIMITS = {
+    "django.core.cache.backends.memcached.PyMemcacheCache": 1024 * 1024,
+    "django.core.cache.backends.memcached.PyLibMCCache": 1024 * 1024,
+}
+
 
 # TYPE NOTE: django-stubs does not type-hint the decorator
 @checks.register(checks.Tags.caches, deploy=True)  # type: ignore[type-var]
@@ -58,3 +69,52 @@ def check_cache(app_configs: Optional[List[AppConfig]], **kwargs: Any) -> List[c
             )
         )
     return errors
+
+
+# TYPE NOTE: django-stubs does not type-hint the decorator
+@checks.register(checks.Tags.caches, checks.Tags.database)  # type: ignore[type-var]
+def check_crl_cache_size(
+    app_configs: Optional[List[AppConfig]], databases: Optional[List[str]] = None, **kwargs: Any
+) -> List[checks.CheckMessage]:
+    """Issue a warning if CRLs are (or may become) larger than what the cache backend can store."""
+    if app_configs is not None and not [config for config in app_configs if config.name == "django_ca"]:
+        return []
+
+    config = settings.CACHES.get("default", {})
+    limit = _CACHE_ITEM_LIMITS.get(config.get("BACKEND", ""))
+    if limit is None:
+        return []
+
+    chunk_size = ca_settings.CA_CRL_CACHE_CHUNK_SIZE
+    if chunk_size is None or chunk_size > limit:
+        return [
+            checks.Warning(
+                f"CA_CRL_CACHE_CHUNK_SIZE is larger than the item size limit of the cache ({limit} bytes), "
+                "larger CRLs cannot be cached.",
+                hint=f"Set CA_CRL_CACHE_CHUNK_SIZE to a value below {limit}.",
+                id="django-ca.caches.W002",
+            )
+        ]
+
+    # Checks tagged as "database" must only access the database if requested (manage.py check --database)
+    if not databases:
+        return []
+
+    errors: List[checks.CheckMessage] = []
+    for ca in CertificateAuthority.objects.usable():
+        for profile in ca_settings.CA_CRL_PROFILES.values():
+            for encoding in profile.get("encodings", ["DER"]):
+                cache_key = get_crl_cache_key(ca.serial, parse_encoding(encoding), scope=profile.get("scope"))
+                cached = cache.get(cache_key)
+                if not isinstance(cached, dict) or cached["size"] <= limit:
+                    continue
+
+                errors.append(
+                    checks.Warning(
+                        f"{ca.serial}: CRL is larger than the item size limit of the cache "
+                        f"({cached['size']} > {limit} bytes) and is stored in {cached['chunks']} chunks.",
+                        hint="Use partitioned CRLs (see CA_CRL_PARTITIONS) to reduce the size of CRLs.",
+                        id="django-ca.caches.W003",
+                    )
+                )
+    return errors
@@ -347,6 +347,15 @@ HASH_ALGORITHM_TYPES: "MappingProxyType[HashAlgorithms, Type[AllowedHashTypes]]"
     {v: k for k, v in HASH_ALGORITHM_NAMES.items()}
 )
 
+#: Hash algorithms that may be used to identify certificates in OCSP requests and responses.
+OCSP_HASH_ALGORITHMS: Tuple[Type[hashes.HashAlgorithm], ...] = (
+    hashes.SHA1,
+    hashes.SHA224,
+    hashes.SHA256,
+    hashes.SHA384,
+    hashes.SHA512,
+)
+
 #: Map of `kwargs` for :py:class:`~cg:cryptography.x509.KeyUsage` to names in RFC 5280.
 KEY_USAGE_NAMES: "MappingProxyType[KeyUsages, str]" = MappingProxyType(
     {
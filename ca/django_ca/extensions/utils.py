@@ -92,18 +92,25 @@ def signed_certificate_timestamp_values(sct: SignedCertificateTimestamp) -> Tupl
     return entry_type, sct.version.name, bytes_to_hex(sct.log_id), sct.timestamp.isoformat(" ")
 
 
+def get_signer_formatting_context(signer_serial: int) -> Dict[str, Union[int, str]]:
+    """Get the context for formatting extensions that only depends on the signing certificate authority."""
+    signer_serial_hex = int_to_hex(signer_serial)
+    return {
+        "SIGNER_SERIAL": signer_serial,
+        "SIGNER_SERIAL_HEX": signer_serial_hex,
+        "SIGNER_SERIAL_HEX_COLONS": add_colons(signer_serial_hex),
+        "CA_ISSUER_PATH": reverse("django_ca:issuer", kwargs={"serial": signer_serial_hex}).lstrip("/"),
+    }
+
+
 def get_formatting_context(serial: int, signer_serial: int) -> Dict[str, Union[int, str]]:
     """Get the context for formatting extensions."""
     hex_serial = int_to_hex(serial)
-    signer_serial_hex = int_to_hex(signer_serial)
     return {
         "SERIAL": serial,
         "SERIAL_HEX": hex_serial,
         "SERIAL_HEX_COLONS": add_colons(hex_serial),
-        "SIGNER_SERIAL": signer_serial,
-        "SIGNER_SERIAL_HEX": signer_serial_hex,
-        "SIGNER_SERIAL_HEX_COLONS": add_colons(signer_serial_hex),
-        "CA_ISSUER_PATH": reverse("django_ca:issuer", kwargs={"serial": signer_serial_hex}).lstrip("/"),
+        **get_signer_formatting_context(signer_serial),
     }
 
 
@@ -114,6 +121,10 @@ def format_general_name(name: x509.GeneralName, context: Dict[str, Union[str, in
     return name
 
 
+def _is_crl_partition_name(name: x509.GeneralName) -> bool:
+    return isinstance(name, x509.UniformResourceIdentifier) and "{CRL_PARTITION}" in name.value
+
+
 def format_extensions(extensions: ExtensionMapping, context: Dict[str, Union[str, int]]) -> None:
     """Format extensions based on the given context."""
     if ExtensionOID.AUTHORITY_INFORMATION_ACCESS in extensions:
@@ -148,7 +159,14 @@ def format_extensions(extensions: ExtensionMapping, context: Dict[str, Union[str
             if distribution_point.full_name is None:
                 distribution_points.append(distribution_point)
             else:
-                names = [format_general_name(name, context) for name in distribution_point.full_name]
+                # Names pointing to partitioned CRLs are dropped if CRL partitions are disabled.
+                names = [
+                    format_general_name(name, context)
+                    for name in distribution_point.full_name
+                    if "CRL_PARTITION" in context or not _is_crl_partition_name(name)
+                ]
+                if not names:
+                    continue
                 distribution_points.append(
                     x509.DistributionPoint(
                         full_name=names,
@@ -158,8 +176,11 @@ def format_extensions(extensions: ExtensionMapping, context: Dict[str, Union[str
                     )
                 )
 
-        extensions[ExtensionOID.CRL_DISTRIBUTION_POINTS] = x509.Extension(
-            oid=ExtensionOID.CRL_DISTRIBUTION_POINTS,
-            critical=crl_distribution_points.critical,
-            value=x509.CRLDistributionPoints(distribution_points),
-        )
+        if distribution_points:
+            extensions[ExtensionOID.CRL_DISTRIBUTION_POINTS] = x509.Extension(
+                oid=ExtensionOID.CRL_DISTRIBUTION_POINTS,
+                critical=crl_distribution_points.critical,
+                value=x509.CRLDistributionPoints(distribution_points),
+            )
+        else:
+            del extensions[ExtensionOID.CRL_DISTRIBUTION_POINTS]
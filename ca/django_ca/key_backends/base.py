@@ -15,9 +15,10 @@
 
 import abc
 import typing
+from contextlib import contextmanager
 from datetime import datetime
 from threading import local
-from typing import Any, Dict, Iterator, List, Optional, Tuple, Type
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Type
 
 from pydantic import BaseModel
 
@@ -34,6 +35,7 @@ from django.utils.module_loading import import_string
 
 from django_ca import ca_settings
 from django_ca.typehints import AllowedHashTypes, ArgumentGroup, ParsableKeyType
+from django_ca.utils import get_cert_builder
 
 if typing.TYPE_CHECKING:
     from django_ca.models import CertificateAuthority
@@ -46,6 +48,27 @@ UsePrivateKeyOptionsTypeVar = typing.TypeVar("UsePrivateKeyOptionsTypeVar", boun
 StorePrivateKeyOptionsTypeVar = typing.TypeVar("StorePrivateKeyOptionsTypeVar", bound=BaseModel)
 
 
+class CertificateParameters(typing.NamedTuple):
+    """Parameters for a single certificate passed to :py:func:`KeyBackend.sign_certificates`."""
+
+    public_key: CertificateIssuerPublicKeyTypes
+    serial: int
+    issuer: x509.Name
+    subject: x509.Name
+    expires: datetime
+    extensions: List[x509.Extension[x509.ExtensionType]]
+
+    def get_builder(self) -> x509.CertificateBuilder:
+        """Get a certificate builder with all values of this certificate."""
+        builder = get_cert_builder(self.expires, serial=self.serial)
+        builder = builder.public_key(self.public_key)
+        builder = builder.issuer_name(self.issuer)
+        builder = builder.subject_name(self.subject)
+        for extension in self.extensions:
+            builder = builder.add_extension(extension.value, critical=extension.critical)
+        return builder
+
+
 class KeyBackend(
     typing.Generic[
         CreatePrivateKeyOptionsTypeVar, StorePrivateKeyOptionsTypeVar, UsePrivateKeyOptionsTypeVar
@@ -265,6 +288,35 @@ class KeyBackend(
     ) -> x509.Certificate:
         """Sign a certificate."""
 
+    def sign_certificates(
+        self,
+        ca: "CertificateAuthority",
+        use_private_key_options: UsePrivateKeyOptionsTypeVar,
+        algorithm: Optional[AllowedHashTypes],
+        certificates: Sequence[CertificateParameters],
+    ) -> List[x509.Certificate]:
+        """Sign multiple certificates at once.
+
+        The default implementation calls :py:func:`~django_ca.key_backends.base.KeyBackend.sign_certificate`
+        for every certificate while :py:func:`~django_ca.key_backends.base.KeyBackend.reuse_private_key` is
+        active. Backends can override this method if signing many certificates at once is more efficient.
+        """
+        with self.reuse_private_key(ca, use_private_key_options):
+            return [
+                self.sign_certificate(
+                    ca,
+                    use_private_key_options,
+                    public_key=params.public_key,
+                    serial=params.serial,
+                    algorithm=algorithm,
+                    issuer=params.issuer,
+                    subject=params.subject,
+                    expires=params.expires,
+                    extensions=params.extensions,
+                )
+                for params in certificates
+            ]
+
     @abc.abstractmethod
     def sign_certificate_revocation_list(
         self,
@@ -275,6 +327,19 @@ class KeyBackend(
     ) -> x509.CertificateRevocationList:
         """Sign a certificate revocation list request."""
 
+    @contextmanager
+    def reuse_private_key(
+        self,
+        ca: "CertificateAuthority",  # pylint: disable=unused-argument
+        use_private_key_options: UsePrivateKeyOptionsTypeVar,  # pylint: disable=unused-argument
+    ) -> Iterator[None]:
+        """Context manager to reuse the private key for multiple signing operations.
+
+        Backends where loading the private key is expensive can override this method to load the private key
+        only once while the context manager is active. The default implementation does nothing.
+        """
+        yield
+
     def get_ocsp_key_size(
         self,
         ca: "CertificateAuthority",  # pylint: disable=unused-argument
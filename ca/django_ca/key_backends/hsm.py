@@ -0,0 +1,509 @@
+# This file is part of django-ca (https://github.com/mathiasertl/django-ca).
+#
+# django-ca is free software: you can redistribute it and/or modify it under the terms of the GNU General
+# Public License as published by the Free Software Foundation, either version 3 of the License, or (at your
+# option) any later version.
+#
+# django-ca is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License
+# for more details.
+#
+# You should have received a copy of the GNU General Public License along with django-ca. If not, see
+# <http://www.gnu.org/licenses/>.
+
+"""Key backend using a Hardware Security Module (HSM) via PKCS#11."""
+
+import queue
+import typing
+from contextlib import contextmanager
+from datetime import datetime
+from threading import BoundedSemaphore, Lock
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import pkcs11
+from pkcs11 import Attribute, KeyType, Mechanism, ObjectClass
+from pkcs11.exceptions import (
+    DeviceError,
+    DeviceRemoved,
+    NoSuchKey,
+    PKCS11Error,
+    SessionClosed,
+    SessionHandleInvalid,
+    TokenNotPresent,
+    UserAlreadyLoggedIn,
+    UserNotLoggedIn,
+)
+from pkcs11.util.ec import (
+    decode_ec_private_key,
+    encode_ec_public_key,
+    encode_ecdsa_signature,
+    encode_named_curve_parameters,
+)
+from pkcs11.util.rsa import decode_rsa_private_key
+from pydantic import BaseModel, ConfigDict, model_validator
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from cryptography.hazmat.primitives.asymmetric.types import (
+    CertificateIssuerPrivateKeyTypes,
+    CertificateIssuerPublicKeyTypes,
+)
+from cryptography.hazmat.primitives.serialization import Encoding, PrivateFormat
+
+from django.core.management import CommandParser  # type: ignore[attr-defined]  # false positive
+
+from django_ca import ca_settings
+from django_ca.key_backends.base import CertificateParameters, KeyBackend
+from django_ca.management.base import add_elliptic_curve, add_key_size
+from django_ca.pydantic.type_aliases import PrivateKeySize
+from django_ca.typehints import AllowedHashTypes, ArgumentGroup, ParsableKeyType
+from django_ca.utils import (
+    get_cert_builder,
+    sign_certificate_builder,
+    sign_certificate_builders,
+    sign_certificate_revocation_list_builder,
+)
+
+if typing.TYPE_CHECKING:
+    from django_ca.models import CertificateAuthority
+
+#: Mechanisms used for signing with RSA keys, by name of the hash algorithm.
+_RSA_MECHANISMS = {
+    "sha224": Mechanism.SHA224_RSA_PKCS,
+    "sha256": Mechanism.SHA256_RSA_PKCS,
+    "sha384": Mechanism.SHA384_RSA_PKCS,
+    "sha512": Mechanism.SHA512_RSA_PKCS,
+}
+
+#: Attributes for private keys created or stored in the HSM, so that they can never leave the HSM.
+_PRIVATE_KEY_TEMPLATE = {Attribute.SENSITIVE: True, Attribute.EXTRACTABLE: False}
+
+#: Errors after which a session is no longer used.
+_SESSION_ERRORS = (
+    DeviceError,
+    DeviceRemoved,
+    SessionClosed,
+    SessionHandleInvalid,
+    TokenNotPresent,
+    UserNotLoggedIn,
+)
+
+
+class CreatePrivateKeyOptions(BaseModel):
+    """Options for initializing private keys."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    key_type: ParsableKeyType
+    key_label: Optional[str]
+    key_size: Optional[PrivateKeySize] = None
+    elliptic_curve: Optional[ec.EllipticCurve] = None
+
+    @model_validator(mode="after")
+    def validate_key_type(self) -> "CreatePrivateKeyOptions":
+        """Validate the key type and set the default key size or elliptic curve."""
+        if self.key_type not in ("RSA", "EC"):
+            raise ValueError(f"{self.key_type}: Only RSA and EC keys are supported.")
+        if self.key_type == "RSA" and self.key_size is None:
+            self.key_size = ca_settings.CA_DEFAULT_KEY_SIZE
+        elif self.key_type != "RSA" and self.key_size is not None:
+            raise ValueError(f"Key size is not supported for {self.key_type} keys.")
+        if self.key_type == "EC" and self.elliptic_curve is None:
+            self.elliptic_curve = ca_settings.CA_DEFAULT_ELLIPTIC_CURVE()
+        elif self.key_type != "EC" and self.elliptic_curve is not None:
+            raise ValueError(f"Elliptic curves are not supported for {self.key_type} keys.")
+        return self
+
+
+class StorePrivateKeyOptions(BaseModel):
+    """Options for storing a private key."""
+
+    # NOTE: we set frozen here to prevent accidental coding mistakes. Models should be immutable.
+    model_config = ConfigDict(frozen=True)
+
+    key_label: Optional[str]
+
+
+class UsePrivateKeyOptions(BaseModel):
+    """Options for using a private key.
+
+    The PIN used for logging in is configured in the settings, so no options are required.
+    """
+
+    # NOTE: we set frozen here to prevent accidental coding mistakes. Models should be immutable.
+    model_config = ConfigDict(frozen=True)
+
+
+class _PooledSession:
+    """A logged-in session together with the handles of private keys already looked up in this session."""
+
+    def __init__(self, session: pkcs11.Session) -> None:
+        self.session = session
+        self.keys: Dict[str, pkcs11.PrivateKey] = {}
+
+    def get_private_key(self, key_label: str) -> pkcs11.PrivateKey:
+        """Get the private key with the given label, looking it up only once per session."""
+        if key_label not in self.keys:
+            self.keys[key_label] = self.session.get_key(object_class=ObjectClass.PRIVATE_KEY, label=key_label)
+        return self.keys[key_label]
+
+
+class _SessionPool:
+    """A pool of logged-in sessions for a token.
+
+    At most `size` sessions are opened. Sessions stay open (and logged in) after use and are only discarded
+    if an operation in the session indicated that the session is no longer usable. Note that the login state
+    is shared by all sessions, so closing a session may log out all other sessions as well.
+    """
+
+    def __init__(self, library_path: str, token: str, user_pin: str, size: int) -> None:
+        self.library_path = library_path
+        self.token = token
+        self.user_pin = user_pin
+        self._idle: "queue.LifoQueue[_PooledSession]" = queue.LifoQueue()
+        self._semaphore = BoundedSemaphore(size)
+
+    def _open(self) -> _PooledSession:
+        token = pkcs11.lib(self.library_path).get_token(token_label=self.token)
+        try:
+            session = token.open(rw=True, user_pin=self.user_pin)
+        except UserAlreadyLoggedIn:
+            # The login state is shared by all sessions of an application.
+            session = token.open(rw=True)
+        return _PooledSession(session)
+
+    @contextmanager
+    def session(self) -> Iterator[_PooledSession]:
+        """Context manager to borrow a session from the pool."""
+        with self._semaphore:
+            try:
+                pooled_session = self._idle.get_nowait()
+            except queue.Empty:
+                pooled_session = self._open()
+
+            try:
+                yield pooled_session
+            except _SESSION_ERRORS:
+                try:
+                    pooled_session.session.close()
+                except PKCS11Error:  # pragma: no cover  # the session is likely already closed
+                    pass
+                raise
+            except BaseException:
+                self._idle.put(pooled_session)
+                raise
+            self._idle.put(pooled_session)
+
+
+#: Per-process session pools, by library path and token label.
+_SESSION_POOLS: Dict[Tuple[str, str], _SessionPool] = {}
+_SESSION_POOLS_LOCK = Lock()
+
+
+class HSMBackend(KeyBackend[CreatePrivateKeyOptions, StorePrivateKeyOptions, UsePrivateKeyOptions]):
+    """A key backend storing private keys in a Hardware Security Module (HSM) using PKCS#11.
+
+    This backend requires `python-pkcs11 <https://python-pkcs11.readthedocs.io/>`_ and supports RSA and
+    elliptic curve keys. RSA keys can only be used with SHA-2 hash algorithms. Private keys are created (or
+    imported) in the HSM and never leave it. The backend takes the following options:
+
+    * ``library_path``: Path to the PKCS#11 library of your HSM (e.g.
+      ``/usr/lib/softhsm/libsofthsm2.so`` for SoftHSM).
+    * ``token``: The label of the token to use.
+    * ``user_pin``: The PIN used for logging in to the token.
+    * ``session_pool_size`` (optional, default: ``4``): The maximum number of sessions opened per process.
+
+    Sessions are logged in once and kept open for subsequent signing operations, as are the handles of
+    private keys that were already used in a session. Sessions are opened when a private key is first used,
+    so a process that forks (e.g. Celery or uWSGI workers) should not use this backend before forking.
+
+    .. versionadded:: 1.28.0
+    """
+
+    name = "hsm"
+    title = "Store private keys in a Hardware Security Module (HSM)"
+    description = "Private keys are created or imported in an HSM using PKCS#11 and never leave the HSM."
+    use_model = UsePrivateKeyOptions
+
+    # Backend options
+    library_path: str
+    token: str
+    user_pin: str
+    session_pool_size: int
+
+    def __init__(
+        self, alias: str, library_path: str, token: str, user_pin: str, session_pool_size: int = 4
+    ) -> None:
+        if not isinstance(session_pool_size, int) or session_pool_size < 1:
+            raise ValueError(f"{alias}: {session_pool_size}: session_pool_size must be a positive int.")
+        super().__init__(
+            alias,
+            library_path=library_path,
+            token=token,
+            user_pin=user_pin,
+            session_pool_size=session_pool_size,
+        )
+
+    def __eq__(self, other: Any) -> bool:
+        return (
+            isinstance(other, HSMBackend)
+            and self.library_path == other.library_path
+            and self.token == other.token
+        )
+
+    @property
+    def _session_pool(self) -> _SessionPool:
+        with _SESSION_POOLS_LOCK:
+            pool_key = (self.library_path, self.token)
+            if pool_key not in _SESSION_POOLS:
+                _SESSION_POOLS[pool_key] = _SessionPool(
+                    self.library_path, self.token, self.user_pin, self.session_pool_size
+                )
+            return _SESSION_POOLS[pool_key]
+
+    def _add_key_label_argument(self, group: ArgumentGroup) -> None:
+        group.add_argument(
+            f"--{self.argparse_prefix}key-label",
+            metavar="LABEL",
+            help="Label of the private key in the HSM (default: the serial of the certificate authority).",
+        )
+
+    def _get_key_label(self, ca: "CertificateAuthority", key_label: Optional[str]) -> str:
+        if key_label is None:
+            key_label = ca.serial.replace(":", "")
+
+        with self._session_pool.session() as pooled_session:
+            try:
+                pooled_session.session.get_key(object_class=ObjectClass.PRIVATE_KEY, label=key_label)
+            except NoSuchKey:
+                return key_label
+        raise ValueError(f"{key_label}: Private key with this label already exists.")
+
+    def add_create_private_key_arguments(self, group: ArgumentGroup) -> None:
+        self._add_key_label_argument(group)
+        add_key_size(group, prefix=self.argparse_prefix)
+        add_elliptic_curve(group, prefix=self.argparse_prefix)
+
+    def add_use_parent_private_key_arguments(self, group: ArgumentGroup) -> None:
+        pass
+
+    def add_store_private_key_arguments(self, group: ArgumentGroup) -> None:
+        self._add_key_label_argument(group)
+
+    def add_use_private_key_group(self, parser: CommandParser) -> Optional[ArgumentGroup]:
+        return None  # The PIN is configured in the settings, so no arguments are required.
+
+    def add_use_private_key_arguments(self, group: ArgumentGroup) -> None:
+        pass
+
+    def get_create_private_key_options(
+        self, key_type: ParsableKeyType, options: Dict[str, Any]
+    ) -> CreatePrivateKeyOptions:
+        return CreatePrivateKeyOptions(
+            key_type=key_type,
+            key_label=options[f"{self.options_prefix}key_label"],
+            key_size=options[f"{self.options_prefix}key_size"],
+            elliptic_curve=options[f"{self.options_prefix}elliptic_curve"],
+        )
+
+    def get_store_private_key_options(self, options: Dict[str, Any]) -> StorePrivateKeyOptions:
+        return StorePrivateKeyOptions(key_label=options[f"{self.options_prefix}key_label"])
+
+    def get_use_private_key_options(
+        self, ca: Optional["CertificateAuthority"], options: Dict[str, Any]
+    ) -> UsePrivateKeyOptions:
+        return UsePrivateKeyOptions()
+
+    def get_use_parent_private_key_options(
+        self, ca: "CertificateAuthority", options: Dict[str, Any]
+    ) -> UsePrivateKeyOptions:
+        return UsePrivateKeyOptions()
+
+    def create_private_key(
+        self, ca: "CertificateAuthority", key_type: ParsableKeyType, options: CreatePrivateKeyOptions
+    ) -> Tuple[CertificateIssuerPublicKeyTypes, UsePrivateKeyOptions]:
+        key_label = self._get_key_label(ca, options.key_label)
+
+        with self._session_pool.session() as pooled_session:
+            session = pooled_session.session
+            if options.key_type == "RSA":
+                public, _private = session.generate_keypair(
+                    KeyType.RSA, options.key_size, label=key_label, private_template=_PRIVATE_KEY_TEMPLATE
+                )
+                public_key: CertificateIssuerPublicKeyTypes = rsa.RSAPublicNumbers(
+                    e=int.from_bytes(public[Attribute.PUBLIC_EXPONENT], "big"),
+                    n=int.from_bytes(public[Attribute.MODULUS], "big"),
+                ).public_key()
+            else:
+                curve = typing.cast(ec.EllipticCurve, options.elliptic_curve)  # set by model validator
+                parameters = session.create_domain_parameters(
+                    KeyType.EC,
+                    {Attribute.EC_PARAMS: encode_named_curve_parameters(_get_curve_oid(curve))},
+                    local=True,
+                )
+                public, _private = parameters.generate_keypair(
+                    label=key_label, private_template=_PRIVATE_KEY_TEMPLATE
+                )
+                public_key = typing.cast(
+                    CertificateIssuerPublicKeyTypes,
+                    serialization.load_der_public_key(encode_ec_public_key(public)),
+                )
+
+        ca.key_backend_options = {"key_label": key_label}
+        ca.evict_usable_cache()
+        return public_key, UsePrivateKeyOptions()
+
+    def store_private_key(
+        self,
+        ca: "CertificateAuthority",
+        key: CertificateIssuerPrivateKeyTypes,
+        options: StorePrivateKeyOptions,
+    ) -> None:
+        key_label = self._get_key_label(ca, options.key_label)
+
+        der = key.private_bytes(Encoding.DER, PrivateFormat.TraditionalOpenSSL, serialization.NoEncryption())
+        if isinstance(key, rsa.RSAPrivateKey):
+            attributes = decode_rsa_private_key(der)
+        elif isinstance(key, ec.EllipticCurvePrivateKey):
+            attributes = decode_ec_private_key(der)
+        else:
+            raise ValueError("Only RSA and EC keys are supported.")
+
+        attributes.update(_PRIVATE_KEY_TEMPLATE)
+        attributes.update({Attribute.TOKEN: True, Attribute.LABEL: key_label, Attribute.SIGN: True})
+        with self._session_pool.session() as pooled_session:
+            pooled_session.session.create_object(attributes)
+
+        ca.key_backend_options = {"key_label": key_label}
+        ca.evict_usable_cache()
+
+    def is_usable(
+        self, ca: "CertificateAuthority", use_private_key_options: Optional[UsePrivateKeyOptions] = None
+    ) -> bool:
+        try:
+            self.check_usable(ca, use_private_key_options or UsePrivateKeyOptions())
+            return True
+        except Exception:  # pylint: disable=broad-exception-caught  # want to always return bool
+            return False
+
+    def check_usable(self, ca: "CertificateAuthority", use_private_key_options: UsePrivateKeyOptions) -> None:
+        if not ca.key_backend_options or not ca.key_backend_options.get("key_label"):
+            raise ValueError(f"{ca.key_backend_options}: Key label not configured in database.")
+
+        key_label = ca.key_backend_options["key_label"]
+        try:
+            with self._private_key(ca):
+                pass
+        except NoSuchKey as ex:
+            raise ValueError(f"{key_label}: Private key not found in HSM.") from ex
+        except PKCS11Error as ex:
+            raise ValueError(f"{key_label}: {ex.__class__.__name__}") from ex
+
+    @contextmanager
+    def _private_key(self, ca: "CertificateAuthority") -> Iterator[pkcs11.PrivateKey]:
+        """Context manager to use the private key of `ca` in a pooled session."""
+        with self._session_pool.session() as pooled_session:
+            yield pooled_session.get_private_key(ca.key_backend_options["key_label"])
+
+    def _sign(
+        self, private_key: pkcs11.PrivateKey, data: bytes, algorithm: Optional[AllowedHashTypes]
+    ) -> bytes:
+        """Sign `data` with the given private key in the HSM."""
+        if algorithm is None:  # pragma: no cover  # only used for Ed448/Ed25519, which are not supported
+            raise ValueError("Signing without a hash algorithm is not supported.")
+
+        if private_key.key_type == KeyType.RSA:
+            mechanism = _RSA_MECHANISMS.get(algorithm.name)
+            if mechanism is None:
+                raise ValueError(f"{algorithm.name}: Hash algorithm is not supported for RSA keys.")
+            return private_key.sign(data, mechanism=mechanism)  # type: ignore[no-any-return]
+
+        digest = hashes.Hash(algorithm)
+        digest.update(data)
+        signature = private_key.sign(digest.finalize(), mechanism=Mechanism.ECDSA)
+        return encode_ecdsa_signature(signature)  # type: ignore[no-any-return]
+
+    def sign_certificate(
+        self,
+        ca: "CertificateAuthority",
+        use_private_key_options: UsePrivateKeyOptions,
+        public_key: CertificateIssuerPublicKeyTypes,
+        serial: int,
+        algorithm: Optional[AllowedHashTypes],
+        issuer: x509.Name,
+        subject: x509.Name,
+        expires: datetime,
+        extensions: List[x509.Extension[x509.ExtensionType]],
+    ) -> x509.Certificate:
+        builder = get_cert_builder(expires, serial=serial)
+        builder = builder.public_key(public_key)
+        builder = builder.issuer_name(issuer)
+        builder = builder.subject_name(subject)
+        for extension in extensions:
+            builder = builder.add_extension(extension.value, critical=extension.critical)
+
+        # The CA has no certificate yet only if it signs its own (self-signed) certificate.
+        signer_public_key = ca.pub.loaded.public_key() if ca.pub else public_key
+        with self._private_key(ca) as private_key:
+            return sign_certificate_builder(
+                builder, signer_public_key, algorithm, lambda data: self._sign(private_key, data, algorithm)
+            )
+
+    def sign_certificates(
+        self,
+        ca: "CertificateAuthority",
+        use_private_key_options: UsePrivateKeyOptions,
+        algorithm: Optional[AllowedHashTypes],
+        certificates: Sequence[CertificateParameters],
+    ) -> List[x509.Certificate]:
+        builders = [params.get_builder() for params in certificates]
+        with self._private_key(ca) as private_key:  # all certificates are signed in the same session
+            return sign_certificate_builders(
+                builders,
+                ca.pub.loaded.public_key(),
+                algorithm,
+                lambda data: [self._sign(private_key, value, algorithm) for value in data],
+            )
+
+    def sign_certificate_revocation_list(
+        self,
+        ca: "CertificateAuthority",
+        use_private_key_options: UsePrivateKeyOptions,
+        builder: x509.CertificateRevocationListBuilder,
+        algorithm: Optional[AllowedHashTypes],
+    ) -> x509.CertificateRevocationList:
+        with self._private_key(ca) as private_key:
+            return sign_certificate_revocation_list_builder(
+                builder,
+                ca.pub.loaded.public_key(),
+                algorithm,
+                lambda data: self._sign(private_key, data, algorithm),
+            )
+
+    def get_ocsp_key_size(
+        self, ca: "CertificateAuthority", use_private_key_options: UsePrivateKeyOptions
+    ) -> int:
+        """Get the default key size for OCSP keys. This is only called for RSA or DSA keys."""
+        public_key = ca.pub.loaded.public_key()
+        if not isinstance(public_key, rsa.RSAPublicKey):
+            raise ValueError("This function should only be called with RSA/DSA CAs.")
+        return public_key.key_size
+
+    def get_ocsp_key_elliptic_curve(
+        self, ca: "CertificateAuthority", use_private_key_options: UsePrivateKeyOptions
+    ) -> ec.EllipticCurve:
+        """Get the default elliptic curve for OCSP keys. This is only called for elliptic curve keys."""
+        public_key = ca.pub.loaded.public_key()
+        if not isinstance(public_key, ec.EllipticCurvePublicKey):
+            raise ValueError("This function should only be called with EllipticCurve-based CAs.")
+        return public_key.curve
+
+
+def _get_curve_oid(curve: ec.EllipticCurve) -> str:
+    """Get the dotted string of the OID of the given elliptic curve."""
+    for name in dir(ec.EllipticCurveOID):
+        oid = getattr(ec.EllipticCurveOID, name)
+        if isinstance(oid, x509.ObjectIdentifier) and ec.get_curve_for_oid(oid).name == curve.name:
+            return oid.dotted_string
+    raise ValueError(f"{curve.name}: Unsupported elliptic curve.")  # pragma: no cover
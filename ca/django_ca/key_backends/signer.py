@@ -0,0 +1,468 @@
+# This file is part of django-ca (https://github.com/mathiasertl/django-ca).
+#
+# django-ca is free software: you can redistribute it and/or modify it under the terms of the GNU General
+# Public License as published by the Free Software Foundation, either version 3 of the License, or (at your
+# option) any later version.
+#
+# django-ca is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License
+# for more details.
+#
+# You should have received a copy of the GNU General Public License along with django-ca. If not, see
+# <http://www.gnu.org/licenses/>.
+
+"""Key backend delegating signing operations to a signer daemon listening on a Unix socket.
+
+Messages exchanged with the daemon are framed as a four byte (network byte order) length followed by the
+message itself. A message consists of a single byte identifying the operation (or the status of a response),
+followed by any number of fields, each prefixed with its four byte length. A single request may sign
+multiple items of data with the same private key.
+
+The daemon is not a generic signing oracle: Private keys are identified only by the serial of the certificate
+authority and loaded from a fixed location in the storage, and the daemon only signs data that parses as a
+TBSCertificate or TBSCertList structure.
+"""
+
+import hashlib
+import logging
+import re
+import socket
+import struct
+import typing
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type, Union
+
+import asn1crypto.crl
+import asn1crypto.x509
+from cryptography import x509
+from cryptography.hazmat.primitives.asymmetric import dsa, ec, padding, rsa
+from cryptography.hazmat.primitives.asymmetric.types import (
+    CertificateIssuerPrivateKeyTypes,
+    CertificateIssuerPublicKeyTypes,
+)
+
+from django.core.files.storage import storages
+
+from django_ca import constants
+from django_ca.key_backends.base import CertificateParameters
+from django_ca.key_backends.storages import (
+    CreatePrivateKeyOptions,
+    StoragesBackend,
+    StorePrivateKeyOptions,
+    UsePrivateKeyOptions,
+)
+from django_ca.typehints import AllowedHashTypes, ArgumentGroup, ParsableKeyType
+from django_ca.utils import (
+    get_cert_builder,
+    sign_certificate_builder,
+    sign_certificate_builders,
+    sign_certificate_revocation_list_builder,
+)
+
+if typing.TYPE_CHECKING:
+    from django_ca.models import CertificateAuthority
+
+log = logging.getLogger(__name__)
+
+_LENGTH = struct.Struct("!I")
+
+#: Maximum size of a single message. The largest messages are TBSCertList structures of very large CRLs.
+MAX_MESSAGE_SIZE = 64 * 1024 * 1024
+
+# Operations (requests) and statuses (responses)
+OP_SIGN = b"S"
+OP_SIGN_CRL = b"R"
+OP_CHECK = b"C"
+STATUS_OK = b"O"
+STATUS_ERROR = b"E"
+
+# Serials of certificate authorities as used in file names (a serial has at most 20 bytes)
+_SERIAL_RE = re.compile(r"^[0-9A-F]{1,40}$")
+
+# ASN.1 structure that data must parse as for each operation, and the fields that are parsed to validate it
+_TBS_SPECS: Dict[
+    bytes, Tuple[Type[Union[asn1crypto.x509.TbsCertificate, asn1crypto.crl.TbsCertList]], Tuple[str, ...]]
+] = {
+    OP_SIGN: (
+        asn1crypto.x509.TbsCertificate,
+        ("serial_number", "signature", "issuer", "validity", "subject", "subject_public_key_info"),
+    ),
+    OP_SIGN_CRL: (asn1crypto.crl.TbsCertList, ("signature", "issuer", "this_update")),
+}
+
+
+def send_message(sock: socket.socket, op: bytes, *fields: bytes) -> None:
+    """Send a message with the given operation (or status) and fields."""
+    payload = op + b"".join(_LENGTH.pack(len(field)) + field for field in fields)
+    sock.sendall(_LENGTH.pack(len(payload)) + payload)
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+    chunks: List[bytes] = []
+    while size > 0:
+        chunk = sock.recv(min(size, 65536))
+        if not chunk:
+            raise ConnectionError("Connection closed before the message was received.")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def recv_message(sock: socket.socket) -> Tuple[bytes, List[bytes]]:
+    """Receive a message, returns a tuple of the operation (or status) and the list of fields."""
+    (size,) = _LENGTH.unpack(_recv_exactly(sock, _LENGTH.size))
+    if size < 1 or size > MAX_MESSAGE_SIZE:
+        raise ValueError(f"{size}: Invalid message size.")
+    payload = _recv_exactly(sock, size)
+
+    fields: List[bytes] = []
+    offset = 1
+    while offset < size:
+        if offset + _LENGTH.size > size:
+            raise ValueError("Truncated field in message.")
+        (length,) = _LENGTH.unpack_from(payload, offset)
+        offset += _LENGTH.size
+        if offset + length > size:
+            raise ValueError("Truncated field in message.")
+        fields.append(payload[offset : offset + length])
+        offset += length
+    return payload[:1], fields
+
+
+def sign_data(
+    key: CertificateIssuerPrivateKeyTypes, data: bytes, algorithm: Optional[AllowedHashTypes]
+) -> bytes:
+    """Sign `data` with `key` the same way cryptography does when signing certificates and CRLs."""
+    if isinstance(key, rsa.RSAPrivateKey):
+        return key.sign(data, padding.PKCS1v15(), typing.cast(AllowedHashTypes, algorithm))
+    if isinstance(key, ec.EllipticCurvePrivateKey):
+        return key.sign(data, ec.ECDSA(typing.cast(AllowedHashTypes, algorithm)))
+    if isinstance(key, dsa.DSAPrivateKey):
+        return key.sign(data, typing.cast(AllowedHashTypes, algorithm))
+    return key.sign(data)  # Ed25519 and Ed448 keys do not use a hash algorithm
+
+
+def validate_tbs(op: bytes, data: bytes) -> None:
+    """Validate that `data` is a TBSCertificate (for `OP_SIGN`) or TBSCertList (for `OP_SIGN_CRL`).
+
+    .. NOTE:: Only the top-level fields are parsed, as fully parsing the TBSCertList of large CRLs is slow.
+    """
+    spec, fields = _TBS_SPECS[op]
+    try:
+        tbs = spec.load(data, strict=True)
+        for field in fields:
+            _value = tbs[field].native
+    except (ValueError, TypeError) as ex:
+        raise ValueError(f"Data is not a valid {spec.__name__} structure.") from ex
+
+
+class SignerDaemonWorker:
+    """A worker of the signer daemon, handling connections on a listening Unix socket.
+
+    Private keys are loaded from the key directory of the given backend and kept in memory for the lifetime
+    of the worker.
+    """
+
+    def __init__(self, backend: "SignerBackend") -> None:
+        self.backend = backend
+        self.keys: Dict[Tuple[str, Optional[str]], CertificateIssuerPrivateKeyTypes] = {}
+
+    def get_key(self, serial: str, password: Optional[bytes]) -> CertificateIssuerPrivateKeyTypes:
+        """Get the private key of the certificate authority with `serial`, loading it if necessary."""
+        path = self.backend.get_key_path(serial)
+        password_digest = None if password is None else hashlib.sha256(password).hexdigest()
+        if (path, password_digest) not in self.keys:
+            self.keys[(path, password_digest)] = self.backend.load_private_key(path, password)
+        return self.keys[(path, password_digest)]
+
+    def handle_request(self, op: bytes, fields: List[bytes]) -> List[bytes]:
+        """Handle a single request, returns the fields of the response."""
+        if not ((op in _TBS_SPECS and len(fields) >= 4) or (op == OP_CHECK and len(fields) == 2)):
+            raise ValueError(f"{op!r}: Invalid request.")
+
+        key = self.get_key(fields[0].decode("ascii"), fields[1] or None)
+        if op == OP_CHECK:
+            return []
+
+        algorithm: Optional[AllowedHashTypes] = None
+        if fields[2]:
+            algorithm_name = typing.cast(constants.HashAlgorithms, fields[2].decode("utf-8"))
+            algorithm = constants.HASH_ALGORITHM_TYPES[algorithm_name]()
+
+        for data in fields[3:]:
+            validate_tbs(op, data)
+        return [sign_data(key, data, algorithm) for data in fields[3:]]
+
+    def handle_connection(self, conn: socket.socket) -> None:
+        """Handle a single connection."""
+        try:
+            op, fields = recv_message(conn)
+            response = self.handle_request(op, fields)
+        except Exception as ex:  # pylint: disable=broad-exception-caught  # errors are sent to the client
+            log.warning("Could not handle request: %s", ex)
+            send_message(conn, STATUS_ERROR, str(ex).encode("utf-8"))
+        else:
+            send_message(conn, STATUS_OK, *response)
+
+    def serve(self, sock: socket.socket) -> None:
+        """Accept and handle connections on `sock` until the socket is shut down."""
+        while True:
+            try:
+                conn, _address = sock.accept()
+            except OSError:  # the listening socket was shut down
+                return
+            with conn:
+                # Clients that stop sending (or reading) data must not block the worker indefinitely.
+                conn.settimeout(self.backend.timeout)
+                try:
+                    self.handle_connection(conn)
+                except OSError as ex:  # the client went away
+                    log.warning("Error handling connection: %s", ex)
+
+
+class SignerBackend(StoragesBackend):
+    """A key backend that delegates signing to a signer daemon listening on a Unix socket.
+
+    Private keys are stored like with the :py:class:`~django_ca.key_backends.storages.StoragesBackend`, but
+    they are only ever loaded by the signer daemon started with :command:`manage.py signer_daemon`. Web
+    servers and Celery workers send the data to be signed to the daemon, so private keys never live in their
+    memory. The daemon runs a pool of worker processes, so signing throughput scales independently of the
+    number of web server processes.
+
+    The backend takes the following options:
+
+    * ``storage_alias``: The storage system where private keys are stored, just like for the
+      :py:class:`~django_ca.key_backends.storages.StoragesBackend`.
+    * ``socket_path``: The path of the Unix socket of the signer daemon.
+    * ``timeout`` (optional, default: ``10``): Timeout in seconds for operations on the socket. The signer
+      daemon uses the same timeout for connections from clients.
+    * ``key_path`` (optional, default: ``"ca"``): The directory (in the storage system) where private keys are
+      stored.
+
+    Private keys are always stored as ``{key_path}/{serial}.key``, where ``serial`` is the serial of the
+    certificate authority without colons. The daemon only loads keys from this location, clients can only
+    refer to a key by the serial of the certificate authority. The daemon also only signs data that is a
+    TBSCertificate or TBSCertList structure.
+
+    The signer daemon must be able to access the storage system, other processes need access only when keys
+    are created or imported. Passwords (either passed on the command line or configured in
+    :ref:`settings-ca-passwords`) are sent to the daemon with every request.
+
+    .. versionadded:: 1.28.0
+    """
+
+    name = "signer"
+    title = "Sign certificates and CRLs using a signer daemon"
+    description = (
+        "Private keys are stored using the Django file storage API, but they are loaded only by a signer "
+        "daemon that signs data on behalf of other processes."
+    )
+
+    # Backend options
+    socket_path: str
+    timeout: float
+    key_path: str
+
+    def __init__(
+        self, alias: str, storage_alias: str, socket_path: str, timeout: float = 10, key_path: str = "ca"
+    ) -> None:
+        if not isinstance(timeout, (int, float)) or timeout <= 0:
+            raise ValueError(f"{alias}: {timeout}: timeout must be a positive number.")
+        super().__init__(alias, storage_alias)
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.key_path = key_path
+
+    def __eq__(self, other: Any) -> bool:
+        return (
+            isinstance(other, SignerBackend)
+            and self.storage_alias == other.storage_alias
+            and self.socket_path == other.socket_path
+            and self.key_path == other.key_path
+        )
+
+    def get_key_path(self, serial: str) -> str:
+        """Get the path of the private key of the certificate authority with the given `serial`."""
+        safe_serial = serial.replace(":", "")
+        if not _SERIAL_RE.match(safe_serial):
+            raise ValueError(f"{serial}: Invalid serial.")
+        return str(Path(self.key_path) / f"{safe_serial}.key")
+
+    def _add_path_argument(self, group: ArgumentGroup) -> None:
+        # Keys are always stored in the directory configured by the key_path option.
+        pass
+
+    def get_create_private_key_options(
+        self, key_type: ParsableKeyType, options: Dict[str, Any]
+    ) -> CreatePrivateKeyOptions:
+        return CreatePrivateKeyOptions(
+            key_type=key_type,
+            password=options[f"{self.options_prefix}password"],
+            path=Path(self.key_path),
+            key_size=options[f"{self.options_prefix}key_size"],
+            elliptic_curve=options[f"{self.options_prefix}elliptic_curve"],
+        )
+
+    def get_store_private_key_options(self, options: Dict[str, Any]) -> StorePrivateKeyOptions:
+        password = options[f"{self.options_prefix}password"]
+        return StorePrivateKeyOptions(password=password, path=Path(self.key_path))
+
+    def _check_key_path(self, ca: "CertificateAuthority", path: Path) -> None:
+        """Make sure that the key will be stored where the signer daemon loads it from.
+
+        The storage system would choose a different name if a file with the same name already exists.
+        """
+        if path != Path(self.key_path):
+            raise ValueError(f"{path}: Private keys must be stored in {self.key_path}.")
+        key_path = self.get_key_path(ca.serial)
+        if storages[self.storage_alias].exists(key_path):
+            raise ValueError(f"{key_path}: Private key already exists.")
+
+    def create_private_key(
+        self, ca: "CertificateAuthority", key_type: ParsableKeyType, options: CreatePrivateKeyOptions
+    ) -> Tuple[CertificateIssuerPublicKeyTypes, UsePrivateKeyOptions]:
+        self._check_key_path(ca, options.path)
+        return super().create_private_key(ca, key_type, options)
+
+    def store_private_key(
+        self,
+        ca: "CertificateAuthority",
+        key: CertificateIssuerPrivateKeyTypes,
+        options: StorePrivateKeyOptions,
+    ) -> None:
+        self._check_key_path(ca, options.path)
+        super().store_private_key(ca, key, options)
+
+    def _request(self, op: bytes, *fields: bytes) -> List[bytes]:
+        """Send a request to the signer daemon and return the fields of the response."""
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            send_message(sock, op, *fields)
+            status, response = recv_message(sock)
+
+        if status != STATUS_OK:
+            message = response[0].decode("utf-8") if response else "Unknown error."
+            raise ValueError(f"{self.socket_path}: {message}")
+        return response
+
+    def _key_fields(
+        self, ca: "CertificateAuthority", use_private_key_options: UsePrivateKeyOptions
+    ) -> List[bytes]:
+        return [ca.serial.replace(":", "").encode("ascii"), use_private_key_options.password or b""]
+
+    def _sign(
+        self,
+        op: bytes,
+        ca: "CertificateAuthority",
+        use_private_key_options: UsePrivateKeyOptions,
+        data: List[bytes],
+        algorithm: Optional[AllowedHashTypes],
+    ) -> List[bytes]:
+        """Sign all items in `data` (TBSCertificate or TBSCertList structures) using the signer daemon."""
+        algorithm_name = b""
+        if algorithm is not None:
+            algorithm_name = constants.HASH_ALGORITHM_NAMES[type(algorithm)].encode("utf-8")
+        fields = self._key_fields(ca, use_private_key_options)
+        return self._request(op, *fields, algorithm_name, *data)
+
+    def is_usable(
+        self, ca: "CertificateAuthority", use_private_key_options: Optional[UsePrivateKeyOptions] = None
+    ) -> bool:
+        if not ca.key_backend_options or not ca.key_backend_options.get("path"):
+            return False
+
+        # If options are not passed, we return True if the file exists.
+        if not use_private_key_options:
+            return storages[self.storage_alias].exists(self.get_key_path(ca.serial))
+
+        try:
+            self.check_usable(ca, use_private_key_options)
+            return True
+        except Exception:  # pylint: disable=broad-exception-caught  # want to always return bool
+            return False
+
+    def check_usable(self, ca: "CertificateAuthority", use_private_key_options: UsePrivateKeyOptions) -> None:
+        if not ca.key_backend_options or not ca.key_backend_options.get("path"):
+            raise ValueError(f"{ca.key_backend_options}: Path not configured in database.")
+
+        try:
+            self._request(OP_CHECK, *self._key_fields(ca, use_private_key_options))
+        except OSError as ex:
+            raise ValueError(f"{self.socket_path}: Could not connect to signer daemon: {ex}") from ex
+
+    def sign_certificate(
+        self,
+        ca: "CertificateAuthority",
+        use_private_key_options: UsePrivateKeyOptions,
+        public_key: CertificateIssuerPublicKeyTypes,
+        serial: int,
+        algorithm: Optional[AllowedHashTypes],
+        issuer: x509.Name,
+        subject: x509.Name,
+        expires: datetime,
+        extensions: List[x509.Extension[x509.ExtensionType]],
+    ) -> x509.Certificate:
+        builder = get_cert_builder(expires, serial=serial)
+        builder = builder.public_key(public_key)
+        builder = builder.issuer_name(issuer)
+        builder = builder.subject_name(subject)
+        for extension in extensions:
+            builder = builder.add_extension(extension.value, critical=extension.critical)
+
+        # The CA has no certificate yet only if it signs its own (self-signed) certificate.
+        signer_public_key = ca.pub.loaded.public_key() if ca.pub else public_key
+        return sign_certificate_builder(
+            builder,
+            signer_public_key,
+            algorithm,
+            lambda data: self._sign(OP_SIGN, ca, use_private_key_options, [data], algorithm)[0],
+        )
+
+    def sign_certificates(
+        self,
+        ca: "CertificateAuthority",
+        use_private_key_options: UsePrivateKeyOptions,
+        algorithm: Optional[AllowedHashTypes],
+        certificates: Sequence[CertificateParameters],
+    ) -> List[x509.Certificate]:
+        # All certificates are signed with a single request to the signer daemon.
+        return sign_certificate_builders(
+            [params.get_builder() for params in certificates],
+            ca.pub.loaded.public_key(),
+            algorithm,
+            lambda data: self._sign(OP_SIGN, ca, use_private_key_options, data, algorithm),
+        )
+
+    def sign_certificate_revocation_list(
+        self,
+        ca: "CertificateAuthority",
+        use_private_key_options: UsePrivateKeyOptions,
+        builder: x509.CertificateRevocationListBuilder,
+        algorithm: Optional[AllowedHashTypes],
+    ) -> x509.CertificateRevocationList:
+        return sign_certificate_revocation_list_builder(
+            builder,
+            ca.pub.loaded.public_key(),
+            algorithm,
+            lambda data: self._sign(OP_SIGN_CRL, ca, use_private_key_options, [data], algorithm)[0],
+        )
+
+    def get_ocsp_key_size(
+        self, ca: "CertificateAuthority", use_private_key_options: UsePrivateKeyOptions
+    ) -> int:
+        """Get the default key size for OCSP keys. This is only called for RSA or DSA keys."""
+        public_key = ca.pub.loaded.public_key()
+        if not isinstance(public_key, (rsa.RSAPublicKey, dsa.DSAPublicKey)):
+            raise ValueError("This function should only be called with RSA/DSA CAs.")
+        return public_key.key_size
+
+    def get_ocsp_key_elliptic_curve(
+        self, ca: "CertificateAuthority", use_private_key_options: UsePrivateKeyOptions
+    ) -> ec.EllipticCurve:
+        """Get the default elliptic curve for OCSP keys. This is only called for elliptic curve keys."""
+        public_key = ca.pub.loaded.public_key()
+        if not isinstance(public_key, ec.EllipticCurvePublicKey):
+            raise ValueError("This function should only be called with EllipticCurve-based CAs.")
+        return public_key.curve
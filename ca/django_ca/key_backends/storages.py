@@ -13,10 +13,14 @@
 
 """Storages."""
 
+import hashlib
+import time
 import typing
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from threading import Lock, local
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
 
 from pydantic import BaseModel, ConfigDict, field_validator, model_validator
 from pydantic_core.core_schema import ValidationInfo
@@ -40,7 +44,7 @@ from django.core.files.base import ContentFile
 from django.core.files.storage import storages
 
 from django_ca import ca_settings, constants
-from django_ca.key_backends.base import KeyBackend
+from django_ca.key_backends.base import CertificateParameters, KeyBackend
 from django_ca.management.actions import PasswordAction
 from django_ca.management.base import add_elliptic_curve, add_key_size
 from django_ca.pydantic.type_aliases import PrivateKeySize
@@ -50,6 +54,12 @@ from django_ca.utils import generate_private_key, get_cert_builder
 if typing.TYPE_CHECKING:
     from django_ca.models import CertificateAuthority
 
+#: Per-process cache of loaded private keys, used if ``key_cache_timeout`` is set. Keys are tuples of the
+#: storage alias, serial of the CA, path and the SHA-256 digest of the password, values are tuples of the
+#: (monotonic) time when the entry expires and the private key.
+_KEY_CACHE: Dict[Tuple[str, str, str, Optional[str]], Tuple[float, CertificateIssuerPrivateKeyTypes]] = {}
+_KEY_CACHE_LOCK = Lock()
+
 
 class CreatePrivateKeyOptions(BaseModel):
     """Options for initializing private keys."""
@@ -135,6 +145,16 @@ class StoragesBackend(KeyBackend[CreatePrivateKeyOptions, StorePrivateKeyOptions
        .. literalinclude:: /include/config/settings_default_ca_key_backends.yaml
           :language: YAML
 
+    The optional ``key_cache_timeout`` option enables a per-process cache of loaded (and decrypted) private
+    keys. Keys are kept in memory for the given number of seconds, so that signing certificates and CRLs
+    does not require reading and decrypting the private key every time. Keys are removed from the cache when
+    a new private key is stored for a certificate authority, or explicitly with
+    :py:func:`~django_ca.key_backends.storages.StoragesBackend.evict_cached_keys`.
+
+    .. versionchanged:: 1.28.0
+
+       The ``key_cache_timeout`` option was added.
+
     .. seealso::
 
        * `STORAGES setting <https://docs.djangoproject.com/en/5.0/ref/settings/#std-setting-STORAGES>`_
@@ -151,11 +171,17 @@ class StoragesBackend(KeyBackend[CreatePrivateKeyOptions, StorePrivateKeyOptions
 
     # Backend options
     storage_alias: str
+    key_cache_timeout: Optional[int]
 
-    def __init__(self, alias: str, storage_alias: str) -> None:
+    def __init__(self, alias: str, storage_alias: str, key_cache_timeout: Optional[int] = None) -> None:
         if storage_alias not in settings.STORAGES:
             raise ValueError(f"{alias}: {storage_alias}: Storage alias is not configured.")
-        super().__init__(alias, storage_alias=storage_alias)
+        if key_cache_timeout is not None and (
+            not isinstance(key_cache_timeout, int) or key_cache_timeout < 1
+        ):
+            raise ValueError(f"{alias}: {key_cache_timeout}: key_cache_timeout must be a positive int.")
+        super().__init__(alias, storage_alias=storage_alias, key_cache_timeout=key_cache_timeout)
+        self._reused_keys = local()
 
     def __eq__(self, other: Any) -> bool:
         return isinstance(other, StoragesBackend) and self.storage_alias == other.storage_alias
@@ -259,6 +285,8 @@ class StoragesBackend(KeyBackend[CreatePrivateKeyOptions, StorePrivateKeyOptions
 
         # Update model instance
         ca.key_backend_options = {"path": path}
+        ca.evict_usable_cache()
+        self.evict_cached_keys(ca)
 
         use_private_key_options = UsePrivateKeyOptions.model_validate(
             {"password": options.password}, context={"ca": ca}
@@ -288,23 +316,46 @@ class StoragesBackend(KeyBackend[CreatePrivateKeyOptions, StorePrivateKeyOptions
 
         # Update model instance
         ca.key_backend_options = {"path": path}
+        ca.evict_usable_cache()
+        self.evict_cached_keys(ca)
 
-    def get_key(
+    def evict_cached_keys(self, ca: Optional["CertificateAuthority"] = None) -> None:
+        """Remove private keys loaded by this backend from the per-process key cache.
+
+        If `ca` is given, only the keys of the given certificate authority are removed.
+        """
+        with _KEY_CACHE_LOCK:
+            for cache_key in list(_KEY_CACHE):
+                if cache_key[0] == self.storage_alias and (ca is None or cache_key[1] == ca.serial):
+                    del _KEY_CACHE[cache_key]
+
+    @contextmanager
+    def reuse_private_key(
         self, ca: "CertificateAuthority", use_private_key_options: UsePrivateKeyOptions
-    ) -> CertificateIssuerPrivateKeyTypes:
-        """The CAs private key as private key."""
-        storage = storages[self.storage_alias]
-        path = ca.key_backend_options["path"]
+    ) -> Iterator[None]:
+        """Context manager to load (and decrypt) private keys only once while it is active.
+
+        Loaded keys are only available in the current thread and are discarded when the context manager exits.
+        """
+        if getattr(self._reused_keys, "keys", None) is not None:  # nested invocation
+            yield
+            return
+
+        self._reused_keys.keys = {}
+        try:
+            yield
+        finally:
+            self._reused_keys.keys = None
 
+    def load_private_key(self, path: str, password: Optional[bytes]) -> CertificateIssuerPrivateKeyTypes:
+        """Load (and decrypt) the private key stored at `path` in the storage system."""
         # Load encoded private key data from the filesystem
-        stream = storage.open(path, mode="rb")
+        stream = storages[self.storage_alias].open(path, mode="rb")
         try:
             key_data: bytes = stream.read()
         finally:
             stream.close()
 
-        password = use_private_key_options.password
-
         try:
             key = typing.cast(  # type validated below
                 CertificateIssuerPrivateKeyTypes, load_der_private_key(key_data, password)
@@ -320,7 +371,42 @@ class StoragesBackend(KeyBackend[CreatePrivateKeyOptions, StorePrivateKeyOptions
 
         if not isinstance(key, constants.PRIVATE_KEY_TYPES):  # pragma: no cover
             raise ValueError("Private key of this type is not supported.")
+        return key
 
+    def get_key(
+        self, ca: "CertificateAuthority", use_private_key_options: UsePrivateKeyOptions
+    ) -> CertificateIssuerPrivateKeyTypes:
+        """The CAs private key as private key."""
+        path = ca.key_backend_options["path"]
+        password = use_private_key_options.password
+
+        reused_keys: Optional[Dict[Tuple[str, Optional[bytes]], CertificateIssuerPrivateKeyTypes]] = getattr(
+            self._reused_keys, "keys", None
+        )
+        if reused_keys is not None and (path, password) in reused_keys:
+            return reused_keys[(path, password)]
+
+        password_digest = None if password is None else hashlib.sha256(password).hexdigest()
+        cache_key = (self.storage_alias, ca.serial, path, password_digest)
+        if self.key_cache_timeout is not None:
+            with _KEY_CACHE_LOCK:
+                cached = _KEY_CACHE.get(cache_key)
+                if cached is not None:
+                    if cached[0] > time.monotonic():
+                        return cached[1]
+                    del _KEY_CACHE[cache_key]  # Do not keep expired keys in memory
+
+        key = self.load_private_key(path, password)
+        if reused_keys is not None:
+            reused_keys[(path, password)] = key
+        if self.key_cache_timeout is not None:
+            now = time.monotonic()
+            with _KEY_CACHE_LOCK:
+                # Remove other expired entries, as they might never be looked up again
+                expired = [entry for entry, (expires, _key) in _KEY_CACHE.items() if expires <= now]
+                for entry in expired:
+                    del _KEY_CACHE[entry]
+                _KEY_CACHE[cache_key] = (now + self.key_cache_timeout, key)
         return key
 
     def is_usable(
@@ -387,6 +473,16 @@ class StoragesBackend(KeyBackend[CreatePrivateKeyOptions, StorePrivateKeyOptions
             builder = builder.add_extension(extension.value, critical=extension.critical)
         return builder.sign(private_key=self.get_key(ca, use_private_key_options), algorithm=algorithm)
 
+    def sign_certificates(
+        self,
+        ca: "CertificateAuthority",
+        use_private_key_options: UsePrivateKeyOptions,
+        algorithm: Optional[AllowedHashTypes],
+        certificates: Sequence[CertificateParameters],
+    ) -> List[x509.Certificate]:
+        key = self.get_key(ca, use_private_key_options)
+        return [params.get_builder().sign(private_key=key, algorithm=algorithm) for params in certificates]
+
     def sign_certificate_revocation_list(
         self,
         ca: "CertificateAuthority",
@@ -19,6 +19,9 @@
 import argparse
 from typing import Any, List
 
+from django.core.management.base import CommandError
+
+from django_ca import ca_settings
 from django_ca.management.base import BaseCommand
 from django_ca.tasks import cache_crls, run_task
 
@@ -34,6 +37,26 @@ class Command(BaseCommand):
             nargs="*",
             help="Generate CRLs for the given CAs. If omitted, generate CRLs for all CAs.",
         )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            default=False,
+            help="Regenerate CRLs even if no certificates were revoked since they were last generated.",
+        )
+        parser.add_argument(
+            "-j",
+            "--jobs",
+            type=int,
+            default=1,
+            metavar="N",
+            help="Generate CRLs for N certificate authorities in parallel (default: %(default)s). Ignored if "
+            "Celery is used.",
+        )
+
+    def handle(self, serial: List[str], force: bool, jobs: int, **options: Any) -> None:
+        if jobs < 1:
+            raise CommandError(f"{jobs}: Number of jobs must be at least 1.")
 
-    def handle(self, serial: List[str], **options: Any) -> None:
-        run_task(cache_crls, serial)
+        errors = run_task(cache_crls, serial, force=force, jobs=jobs)
+        if ca_settings.CA_USE_CELERY is False and errors:
+            raise CommandError(f"Could not cache CRLs for {', '.join(errors)}.")
@@ -0,0 +1,75 @@
+# This file is part of django-ca (https://github.com/mathiasertl/django-ca).
+#
+# django-ca is free software: you can redistribute it and/or modify it under the terms of the GNU General
+# Public License as published by the Free Software Foundation, either version 3 of the License, or (at your
+# option) any later version.
+#
+# django-ca is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License
+# for more details.
+#
+# You should have received a copy of the GNU General Public License along with django-ca. If not, see
+# <http://www.gnu.org/licenses/>.
+
+"""Management command to write a revocation snapshot to stdout or a file.
+
+.. seealso:: https://docs.djangoproject.com/en/dev/howto/custom-management-commands/
+"""
+
+import json
+import os
+import tempfile
+from typing import Any, List
+
+from django.core.management.base import CommandError, CommandParser
+
+from django_ca.management.base import BaseCommand
+from django_ca.models import CertificateAuthority
+from django_ca.snapshot import create_snapshot
+from django_ca.utils import add_colons
+
+
+class Command(BaseCommand):
+    """Implement :command:`manage.py dump_snapshot`."""
+
+    help = (
+        "Write a snapshot of the revocation status of all certificates for a standalone OCSP/CRL responder."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "path", nargs="?", default="-", help='Path for the output file. Use "-" for stdout.'
+        )
+        parser.add_argument(
+            "--ca",
+            dest="serials",
+            metavar="SERIAL",
+            action="append",
+            default=[],
+            help="Only include the given CA (may be given multiple times). By default, all CAs are included.",
+        )
+
+    def handle(self, path: str, serials: List[str], **options: Any) -> None:
+        cas = CertificateAuthority.objects.order_by("valid_from")
+        if serials:
+            serials = [serial.replace(":", "").strip().upper() for serial in serials]
+            cas = cas.filter(serial__in=serials)
+            unknown = sorted(set(serials) - {ca.serial for ca in cas})
+            if unknown:
+                raise CommandError(f"{', '.join(add_colons(serial) for serial in unknown)}: Unknown CA.")
+
+        data = json.dumps(create_snapshot(cas), separators=(",", ":"))
+
+        if path == "-":
+            self.stdout.write(data)
+            return
+
+        # Write to a temporary file first, so that responders never load a partially written snapshot.
+        directory = os.path.dirname(os.path.abspath(path))
+        try:
+            with tempfile.NamedTemporaryFile("w", dir=directory, delete=False) as stream:
+                stream.write(data)
+            os.chmod(stream.name, 0o600)  # snapshot contains private keys of OCSP responders
+            os.replace(stream.name, path)
+        except OSError as ex:
+            raise CommandError(ex) from ex
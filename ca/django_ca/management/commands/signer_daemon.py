@@ -0,0 +1,137 @@
+# This file is part of django-ca (https://github.com/mathiasertl/django-ca).
+#
+# django-ca is free software: you can redistribute it and/or modify it under the terms of the GNU General
+# Public License as published by the Free Software Foundation, either version 3 of the License, or (at your
+# option) any later version.
+#
+# django-ca is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License
+# for more details.
+#
+# You should have received a copy of the GNU General Public License along with django-ca. If not, see
+# <http://www.gnu.org/licenses/>.
+
+"""Management command to run the signer daemon used by the signer key backend.
+
+.. seealso:: https://docs.djangoproject.com/en/dev/howto/custom-management-commands/
+"""
+
+import argparse
+import multiprocessing
+import os
+import socket
+import stat
+from typing import Any, List, Optional
+
+from django.core.management.base import CommandError
+
+from django_ca import ca_settings
+from django_ca.key_backends import key_backends
+from django_ca.key_backends.signer import SignerBackend, SignerDaemonWorker
+from django_ca.management.base import BaseCommand
+
+
+def _serve(backend: SignerBackend, sock: socket.socket) -> None:  # pragma: no cover  # runs in a subprocess
+    SignerDaemonWorker(backend).serve(sock)
+
+
+def _remove_stale_socket(path: str) -> None:
+    """Remove a socket left over from a previous run, if no daemon is listening on it anymore."""
+    try:
+        mode = os.lstat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise CommandError(f"{path}: File exists and is not a socket.")
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(path)
+        except ConnectionRefusedError:  # nobody is listening, so the socket is stale
+            os.unlink(path)
+            return
+    raise CommandError(f"{path}: Another signer daemon is listening on this socket.")
+
+
+class Command(BaseCommand):
+    """Implement the :command:`manage.py signer_daemon` command."""
+
+    help = "Run the signer daemon that signs certificates and CRLs for the signer key backend."
+
+    def add_arguments(self, parser: argparse.ArgumentParser) -> None:
+        parser.add_argument(
+            "--key-backend",
+            metavar="ALIAS",
+            help="Alias of the key backend to run the daemon for (default: the only configured signer key "
+            "backend).",
+        )
+        parser.add_argument(
+            "-w",
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            metavar="N",
+            help="Number of worker processes (default: %(default)s).",
+        )
+        parser.add_argument(
+            "--mode",
+            type=lambda value: int(value, 8),
+            default=0o660,
+            help="File mode of the socket in octal notation (default: 660).",
+        )
+
+    def get_backend(self, alias: Optional[str]) -> SignerBackend:
+        """Get the signer key backend to run the daemon for."""
+        if alias is None:
+            aliases = [
+                name
+                for name, config in ca_settings.CA_KEY_BACKENDS.items()
+                if config["BACKEND"] == f"{SignerBackend.__module__}.{SignerBackend.__name__}"
+            ]
+            if len(aliases) != 1:
+                raise CommandError("Please select a signer key backend with --key-backend.")
+            alias = aliases[0]
+
+        if alias not in ca_settings.CA_KEY_BACKENDS:
+            raise CommandError(f"{alias}: Key backend is not configured.")
+        backend = key_backends[alias]
+        if not isinstance(backend, SignerBackend):
+            raise CommandError(f"{alias}: Key backend is not a signer key backend.")
+        return backend
+
+    def handle(self, key_backend: Optional[str], workers: int, mode: int, **options: Any) -> None:
+        if workers < 1:
+            raise CommandError(f"{workers}: Number of workers must be at least 1.")
+        backend = self.get_backend(key_backend)
+
+        _remove_stale_socket(backend.socket_path)
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            # Set the umask so that the socket is created with the right mode, so no other user can connect
+            # to the socket before its mode is changed.
+            umask = os.umask(0o777 & ~mode)
+            try:
+                sock.bind(backend.socket_path)
+            finally:
+                os.umask(umask)
+            os.chmod(backend.socket_path, mode)
+            sock.listen()
+
+            # Workers are forked, so they inherit the listening socket and accept connections themselves.
+            context = multiprocessing.get_context("fork")
+            processes: List[multiprocessing.process.BaseProcess] = []
+            for _i in range(workers):
+                process = context.Process(target=_serve, args=(backend, sock), daemon=True)
+                process.start()
+                processes.append(process)
+
+            self.stdout.write(f"Listening on {backend.socket_path} with {workers} worker processes.")
+            try:
+                for process in processes:
+                    process.join()
+            except KeyboardInterrupt:  # pragma: no cover
+                pass
+            finally:
+                for process in processes:
+                    process.terminate()
+                os.unlink(backend.socket_path)
@@ -14,6 +14,7 @@
 """Django model managers."""
 
 import typing
+from datetime import datetime
 from typing import Any, Dict, Generic, Iterable, List, Optional, TypeVar, Union
 
 from pydantic import BaseModel
@@ -21,7 +22,7 @@ from pydantic import BaseModel
 from cryptography import x509
 from cryptography.x509.oid import AuthorityInformationAccessOID, ExtensionOID
 
-from django.db import models
+from django.db import models, transaction
 from django.urls import reverse
 
 from django_ca import ca_settings, constants
@@ -50,6 +51,7 @@ if typing.TYPE_CHECKING:
         AcmeOrder,
         Certificate,
         CertificateAuthority,
+        CertificateRevocationListCounter,
     )
     from django_ca.querysets import (
         AcmeAccountQuerySet,
@@ -65,12 +67,15 @@ if typing.TYPE_CHECKING:
     AcmeOrderManagerBase = models.Manager[AcmeOrder]
     CertificateAuthorityManagerBase = models.Manager[CertificateAuthority]
     CertificateManagerBase = models.Manager[Certificate]
+    CertificateRevocationListCounterManagerBase = models.Manager[CertificateRevocationListCounter]
 
     QuerySetTypeVar = TypeVar("QuerySetTypeVar", CertificateAuthorityQuerySet, CertificateQuerySet)
 else:
     AcmeAccountManagerBase = AcmeAuthorizationManagerBase = AcmeCertificateManagerBase = (
         AcmeChallengeManagerBase
-    ) = AcmeOrderManagerBase = CertificateAuthorityManagerBase = CertificateManagerBase = models.Manager
+    ) = AcmeOrderManagerBase = CertificateAuthorityManagerBase = CertificateManagerBase = (
+        CertificateRevocationListCounterManagerBase
+    ) = models.Manager
     QuerySetTypeVar = TypeVar("QuerySetTypeVar")
 
 
@@ -642,6 +647,35 @@ class CertificateManager(
         return obj
 
 
+class CertificateRevocationListCounterManager(CertificateRevocationListCounterManagerBase):
+    """Model manager for :py:class:`~django_ca.models.CertificateRevocationListCounter`."""
+
+    def increment(self, ca: "CertificateAuthority", counter: str) -> int:
+        """Get the CRL number for the next CRL and atomically increment the counter.
+
+        The counter row is locked until the end of the transaction, so concurrent CRL generation never hands
+        out the same CRL number twice.
+        """
+        with transaction.atomic():
+            self.get_or_create(ca=ca, counter=counter)
+            crl_counter = self.select_for_update().get(ca=ca, counter=counter)
+            number = crl_counter.number
+            crl_counter.number = number + 1
+            crl_counter.save(update_fields=["number"])
+
+        return number
+
+    def set_base(self, ca: "CertificateAuthority", counter: str, number: int, last_update: datetime) -> None:
+        """Store the published complete CRL with the given CRL number as base for delta CRLs.
+
+        The base is never set to a CRL that is older than the current base, e.g. if complete CRLs are
+        published concurrently.
+        """
+        self.filter(
+            models.Q(base_number__isnull=True) | models.Q(base_number__lt=number), ca=ca, counter=counter
+        ).update(base_number=number, base_last_update=last_update)
+
+
 class AcmeAccountManager(AcmeAccountManagerBase):
     """Model manager for :py:class:`~django_ca.models.AcmeAccount`."""
 
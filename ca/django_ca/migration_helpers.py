@@ -17,12 +17,17 @@ This module collects functions that are used in data migrations. The functions a
 that they are tested properly.
 """
 
+import json
 import typing
-from typing import List, Optional
+from datetime import datetime, timezone as tz
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from cryptography import x509
 from cryptography.x509.oid import AuthorityInformationAccessOID, ExtensionOID
 
+from django.conf import settings
+from django.utils import timezone
+
 from django_ca.utils import format_general_name, parse_general_name, split_str
 
 
@@ -199,3 +204,53 @@ class Migration0040Helper:
         ]
         if issuer_descriptions:
             ca.issuer_url = issuer_descriptions[0].access_location.value
+
+
+class Migration0047Helper:
+    """Helper for migration 0047."""
+
+    @staticmethod
+    def crl_number_to_counters(crl_number: str) -> Dict[str, Dict[str, Any]]:
+        """Get values for CRL counters from the JSON-encoded `crl_number` field.
+
+        >>> Migration0047Helper.crl_number_to_counters('{"scope": {"user": 3}}')
+        {'user': {'number': 3, 'base_number': None, 'base_last_update': None}}
+        """
+        data = json.loads(crl_number or "{}")
+        base_crls = data.get("base", {})
+        counters: Dict[str, Dict[str, Any]] = {}
+        for counter, number in data.get("scope", {}).items():
+            base_number = base_last_update = None
+            if counter in base_crls:
+                base_number = base_crls[counter]["number"]
+                base_last_update = datetime.fromisoformat(base_crls[counter]["last_update"])
+                if settings.USE_TZ is False:
+                    base_last_update = timezone.make_naive(base_last_update, timezone=tz.utc)
+
+            counters[counter] = {
+                "number": int(number),
+                "base_number": base_number,
+                "base_last_update": base_last_update,
+            }
+        return counters
+
+    @staticmethod
+    def counters_to_crl_number(
+        counters: Iterable[Tuple[str, int, Optional[int], Optional[datetime]]],
+    ) -> str:
+        """Get the value for the `crl_number` field from CRL counters (backwards migration).
+
+        >>> Migration0047Helper.counters_to_crl_number([("user", 3, None, None)])
+        '{"scope": {"user": 3}}'
+        """
+        data: Dict[str, Dict[str, Any]] = {"scope": {}}
+        for counter, number, base_number, base_last_update in counters:
+            data["scope"][counter] = number
+            if base_number is not None and base_last_update is not None:
+                if timezone.is_naive(base_last_update):
+                    base_last_update = timezone.make_aware(base_last_update, timezone=tz.utc)
+                data.setdefault("base", {})[counter] = {
+                    "number": base_number,
+                    "last_update": base_last_update.isoformat(),
+                }
+        return json.dumps(data)
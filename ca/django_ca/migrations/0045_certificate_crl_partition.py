@@ -0,0 +1,18 @@
+# Generated by Django 5.0.3 on 2026-10-16 23:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_ca', '0044_remove_certificateauthority_private_key_path'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='certificate',
+            name='crl_partition',
+            field=models.PositiveIntegerField(blank=True, editable=False, help_text='The CRL partition this certificate was assigned to.', null=True),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.0.3 on 2026-10-16 23:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_ca', '0045_certificate_crl_partition'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CertificateRevocationListCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('counter', models.CharField(max_length=64)),
+                ('number', models.PositiveIntegerField(default=0, help_text='CRL number of the next CRL.')),
+                ('base_number', models.PositiveIntegerField(blank=True, help_text='CRL number of the last complete CRL.', null=True)),
+                ('base_last_update', models.DateTimeField(blank=True, help_text='When the last complete CRL was generated.', null=True)),
+                ('ca', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='crl_counters', to='django_ca.certificateauthority')),
+            ],
+            options={
+                'unique_together': {('ca', 'counter')},
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+# This file is part of django-ca (https://github.com/mathiasertl/django-ca).
+#
+# django-ca is free software: you can redistribute it and/or modify it under the terms of the GNU General
+# Public License as published by the Free Software Foundation, either version 3 of the License, or (at your
+# option) any later version.
+#
+# django-ca is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License
+# for more details.
+#
+# You should have received a copy of the GNU General Public License along with django-ca. If not, see
+# <http://www.gnu.org/licenses/>.
+#
+# Generated by Django 5.0.3 on 2026-10-16 23:32
+
+"""Data migration of the ``crl_number`` field to the CertificateRevocationListCounter model."""
+
+import typing
+
+from django.db import migrations
+
+from django_ca.migration_helpers import Migration0047Helper as Helper
+
+if typing.TYPE_CHECKING:
+    from django.db.backends.base.schema import BaseDatabaseSchemaEditor
+    from django.db.migrations.state import StateApps
+
+
+def crl_number_to_counters(apps: "StateApps", schema_editor: "BaseDatabaseSchemaEditor") -> None:
+    """Create CRL counters from the ``crl_number`` field (forward migration)."""
+    CertificateAuthority = apps.get_model("django_ca", "CertificateAuthority")
+    CertificateRevocationListCounter = apps.get_model("django_ca", "CertificateRevocationListCounter")
+    for ca in CertificateAuthority.objects.all():
+        for counter, values in Helper.crl_number_to_counters(ca.crl_number).items():
+            CertificateRevocationListCounter.objects.create(ca=ca, counter=counter, **values)
+
+
+def counters_to_crl_number(apps: "StateApps", schema_editor: "BaseDatabaseSchemaEditor") -> None:
+    """Store CRL counters in the ``crl_number`` field (backwards migration)."""
+    CertificateAuthority = apps.get_model("django_ca", "CertificateAuthority")
+    for ca in CertificateAuthority.objects.all():
+        counters = ca.crl_counters.values_list("counter", "number", "base_number", "base_last_update")
+        ca.crl_number = Helper.counters_to_crl_number(counters)
+        ca.save()
+
+
+class Migration(migrations.Migration):  # noqa: D101
+    dependencies = [  # noqa: RUF012
+        ("django_ca", "0046_certificaterevocationlistcounter"),
+    ]
+
+    operations = [  # noqa: RUF012
+        migrations.RunPython(crl_number_to_counters, counters_to_crl_number),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.3 on 2026-10-16 23:33
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_ca', '0047_auto_20261016_2332'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='certificateauthority',
+            name='crl_number',
+        ),
+    ]
@@ -22,11 +22,13 @@ import json
 import logging
 import random
 import re
+import time
 import typing
 from collections import OrderedDict
 from copy import deepcopy
 from datetime import datetime, timedelta, timezone as tz
-from typing import Dict, Iterable, List, Optional, Tuple, Union
+from threading import Lock
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 import josepy as jose
 from acme import challenges, messages
@@ -43,8 +45,10 @@ from django.conf import settings
 from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.core.files.base import ContentFile
+from django.core.files.storage import storages
 from django.core.validators import MinValueValidator, URLValidator
 from django.db import models
+from django.db.models import Count, Max
 from django.http import HttpRequest
 from django.urls import reverse
 from django.utils import timezone
@@ -55,9 +59,11 @@ from django.utils.translation import gettext_lazy as _
 from django_ca import ca_settings, constants
 from django_ca.acme.constants import BASE64_URL_ALPHABET, IdentifierType, Status
 from django_ca.constants import REVOCATION_REASONS, ReasonFlags
-from django_ca.deprecation import not_valid_after, not_valid_before
+from django_ca.deprecation import crl_last_update, not_valid_after, not_valid_before
 from django_ca.extensions import get_extension_name
+from django_ca.extensions.utils import format_general_name, get_signer_formatting_context
 from django_ca.key_backends import KeyBackend, key_backends
+from django_ca.key_backends.base import CertificateParameters
 from django_ca.managers import (
     AcmeAccountManager,
     AcmeAuthorizationManager,
@@ -66,6 +72,7 @@ from django_ca.managers import (
     AcmeOrderManager,
     CertificateAuthorityManager,
     CertificateManager,
+    CertificateRevocationListCounterManager,
 )
 from django_ca.modelfields import (
     AuthorityInformationAccessField,
@@ -93,11 +100,20 @@ from django_ca.utils import (
     bytes_to_hex,
     generate_private_key,
     get_crl_cache_key,
+    get_crl_fingerprint_cache_key,
+    get_crl_from_cache,
+    get_crl_partition,
+    get_crl_published_cache_key,
+    get_crl_storage_path,
+    get_crl_validity,
     get_storage,
     int_to_hex,
     parse_encoding,
     parse_expires,
+    parse_general_name,
     read_file,
+    replace_file,
+    set_crl_in_cache,
     validate_private_key_parameters,
     validate_public_key_parameters,
 )
@@ -107,6 +123,19 @@ if typing.TYPE_CHECKING:
 
 log = logging.getLogger(__name__)
 
+#: Number of database rows fetched at once when generating CRLs.
+CRL_CHUNK_SIZE = 2000
+
+#: Per-process cache of :py:func:`~django_ca.models.CertificateAuthority.is_usable` results. Keys are tuples
+#: of the key backend alias, the serial, the key backend options and a digest of the options used for loading
+#: the private key, values are tuples of the (monotonic) time when the entry expires and the result.
+_USABLE_CACHE: Dict[Tuple[str, str, str, Optional[str]], Tuple[float, bool]] = {}
+_USABLE_CACHE_LOCK = Lock()
+
+#: Cached CRLs are regenerated by :py:func:`~django_ca.models.CertificateAuthority.cache_crls` even if no
+#: revocations changed once less than this fraction of their validity is left.
+CRL_REFRESH_FRACTION = 0.25
+
 
 def acme_slug() -> str:
     """Default function to get an ACME conforming slug."""
@@ -147,6 +176,34 @@ def json_validator(value: Union[str, bytes, bytearray]) -> None:
         raise ValidationError(_("Must be valid JSON: %(message)s") % {"message": str(e)}) from e
 
 
+def get_revoked_certificate(
+    serial_number: int, revoked_date: Optional[datetime], reason: str, compromised: Optional[datetime]
+) -> x509.RevokedCertificate:
+    """Get a :py:class:`~cg:cryptography.x509.RevokedCertificate` for CRLs from raw field values.
+
+    This function is used to build CRL entries without having to load model instances.
+    """
+    if revoked_date is None:
+        raise ValueError("Certificate has no revocation date")
+
+    builder = x509.RevokedCertificateBuilder().serial_number(serial_number).revocation_date(revoked_date)
+
+    # RFC 5270, 5.3.1: "reason code CRL entry extension SHOULD be absent instead of using the unspecified (0)
+    # reasonCode value"
+    if reason and reason != ReasonFlags.unspecified.name:
+        builder = builder.add_extension(x509.CRLReason(x509.ReasonFlags[reason]), critical=False)
+
+    if compromised is not None:
+        if timezone.is_aware(compromised):
+            # convert datetime object to UTC and make it naive
+            compromised = timezone.make_naive(compromised, tz.utc)
+
+        # RFC 5280, 5.3.2 says that this extension MUST be non-critical
+        builder = builder.add_extension(x509.InvalidityDate(compromised), critical=False)
+
+    return builder.build()
+
+
 def pem_validator(value: str) -> None:
     """Validator that ensures a value is a valid PEM public certificate."""
     if not value.startswith("-----BEGIN PUBLIC KEY-----\n"):
@@ -413,28 +470,11 @@ class X509CertMixin(DjangoCAModel):
         """
         if self.revoked is False:
             raise ValueError("Certificate is not revoked.")
-        if self.revoked_date is None:
-            raise ValueError("Certificate has no revocation date")
 
-        revoked_cert = (
-            x509.RevokedCertificateBuilder()
-            .serial_number(self.pub.loaded.serial_number)
-            .revocation_date(self.revoked_date)
+        return get_revoked_certificate(
+            self.pub.loaded.serial_number, self.revoked_date, self.revoked_reason, self.compromised
         )
 
-        reason = self.get_revocation_reason()
-        if reason != x509.ReasonFlags.unspecified and reason is not None:
-            # RFC 5270, 5.3.1: "reason code CRL entry extension SHOULD be absent instead of using the
-            # unspecified (0) reasonCode value"
-            revoked_cert = revoked_cert.add_extension(x509.CRLReason(reason), critical=False)
-
-        compromised = self.get_compromised_time()
-        if compromised:
-            # RFC 5280, 5.3.2 says that this extension MUST be non-critical
-            revoked_cert = revoked_cert.add_extension(x509.InvalidityDate(compromised), critical=False)
-
-        return revoked_cert.build()
-
     def revoke(
         self, reason: ReasonFlags = ReasonFlags.unspecified, compromised: Optional[datetime] = None
     ) -> None:
@@ -495,13 +535,6 @@ class CertificateAuthority(X509CertMixin):
     key_backend_options = models.JSONField(default=dict, blank=True, help_text=_("Key backend options"))
 
     # various details used when signing certs
-    crl_number = models.TextField(
-        default='{"scope": {}}',
-        blank=True,
-        verbose_name=_("CRL Number"),
-        validators=[json_validator],
-        help_text=_("Data structure to store the CRL number (see RFC 5280, 5.2.3) depending on the scope."),
-    )
     sign_authority_information_access = AuthorityInformationAccessField(
         constants.EXTENSION_NAMES[ExtensionOID.AUTHORITY_INFORMATION_ACCESS],
         null=True,
@@ -599,6 +632,18 @@ class CertificateAuthority(X509CertMixin):
     def __str__(self) -> str:
         return self.name
 
+    def update_certificate(self, value: x509.Certificate) -> None:
+        """Update this instance with data from a :py:class:`cg:cryptography.x509.Certificate`.
+
+        In addition to the fields populated by the base class, this function also removes cached
+        :py:func:`~django_ca.models.CertificateAuthority.is_usable` results for the old and the new serial.
+        """
+        old_serial = self.serial
+        super().update_certificate(value)
+        if old_serial:
+            self.evict_usable_cache(old_serial)
+        self.evict_usable_cache()
+
     @property
     def key_backend(self) -> KeyBackend[BaseModel, BaseModel, BaseModel]:
         """The key backend that can be used to use the private key."""
@@ -606,13 +651,67 @@ class CertificateAuthority(X509CertMixin):
             self._key_backend = key_backends[self.key_backend_alias]
         return self._key_backend
 
+    def _get_usable_cache_key(self, options: Optional[BaseModel]) -> Tuple[str, str, str, Optional[str]]:
+        options_digest = None
+        if options is not None:
+            options_digest = hashlib.sha256(repr(options.model_dump()).encode("utf-8")).hexdigest()
+        key_backend_options = json.dumps(self.key_backend_options, sort_keys=True)
+        return self.key_backend_alias, self.serial, key_backend_options, options_digest
+
+    def _get_cached_usable(self, cache_key: Tuple[str, str, str, Optional[str]]) -> Optional[bool]:
+        with _USABLE_CACHE_LOCK:
+            cached = _USABLE_CACHE.get(cache_key)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+        return None
+
+    def _set_cached_usable(self, cache_key: Tuple[str, str, str, Optional[str]], usable: bool) -> None:
+        now = time.monotonic()
+        with _USABLE_CACHE_LOCK:
+            for key in [key for key, (expires, _usable) in _USABLE_CACHE.items() if expires <= now]:
+                del _USABLE_CACHE[key]
+            timeout = typing.cast(int, ca_settings.CA_USABLE_CACHE_TIMEOUT)  # checked by the caller
+            _USABLE_CACHE[cache_key] = (now + timeout, usable)
+
+    def evict_usable_cache(self, serial: Optional[str] = None) -> None:
+        """Remove cached :py:func:`~django_ca.models.CertificateAuthority.is_usable` results of this CA.
+
+        Key backends call this function whenever they store new key backend options for a CA. If `serial` is
+        given, results cached for this serial are removed instead.
+        """
+        if serial is None:
+            serial = self.serial
+        with _USABLE_CACHE_LOCK:
+            for key in [key for key in _USABLE_CACHE if key[1] == serial]:
+                del _USABLE_CACHE[key]
+
     def is_usable(self, options: Optional[BaseModel] = None) -> bool:
-        """Shortcut determining if the certificate authority can be used for signing."""
-        return self.key_backend.is_usable(self, options)
+        """Shortcut determining if the certificate authority can be used for signing.
+
+        Results are cached for :ref:`settings-ca-usable-cache-timeout` seconds. Cached results are not used if
+        `key_backend_options` changes.
+        """
+        if ca_settings.CA_USABLE_CACHE_TIMEOUT is None:
+            return self.key_backend.is_usable(self, options)
+
+        cache_key = self._get_usable_cache_key(options)
+        usable = self._get_cached_usable(cache_key)
+        if usable is None:
+            usable = self.key_backend.is_usable(self, options)
+            self._set_cached_usable(cache_key, usable)
+        return usable
 
     def check_usable(self, options: BaseModel) -> None:
         """Shortcut determining if the key is usable and raise ValueError otherwise."""
-        return self.key_backend.check_usable(self, options)
+        if ca_settings.CA_USABLE_CACHE_TIMEOUT is None:
+            return self.key_backend.check_usable(self, options)
+
+        cache_key = self._get_usable_cache_key(options)
+        if self._get_cached_usable(cache_key) is True:
+            return None
+        self.key_backend.check_usable(self, options)
+        self._set_cached_usable(cache_key, True)
+        return None
 
     @property
     def key_type(self) -> ParsableKeyType:
@@ -639,47 +738,273 @@ class CertificateAuthority(X509CertMixin):
         data = read_file(f"ocsp/{self.serial}.pem")
         return x509.load_pem_x509_certificate(data)
 
-    def cache_crls(self, key_backend_options: BaseModel) -> None:
+    def cache_crls(
+        self,
+        key_backend_options: BaseModel,
+        scopes: Optional[Iterable[Optional[str]]] = None,
+        force: bool = False,
+    ) -> None:
         """Function to cache all CRLs for this CA.
 
+        If `scopes` is given, only CRLs of profiles with one of the given scopes are cached.
+
+        CRLs are only regenerated if the revoked certificates they contain (see
+        :py:func:`~django_ca.models.CertificateAuthority.get_crl_fingerprint`) or the profile changed, or if
+        the cached CRL is about to expire. If a profile configures delta CRLs, new revocations only cause the
+        delta CRL to be regenerated, while the complete CRL is kept until it is about to expire. Pass
+        ``force=True`` to always regenerate all CRLs.
+
         .. versionchanged:: 1.25.0
 
            Support for passing a custom hash algorithm to this function was removed.
         """
-        for config in deepcopy(ca_settings.CA_CRL_PROFILES).values():
-            # create a copy of the overrides with the serials sanitized so that the user can use a
-            # case-insensitive string and can have colons (":").
-            overrides = {k.replace(":", "").upper(): v for k, v in config.get("OVERRIDES", {}).items()}
-            ca_override = overrides.get(self.serial, {})
-
-            if ca_override.get("skip"):
-                continue
-
-            expires = ca_override.get("expires", config.get("expires", 86400))
-            scope = ca_override.get("scope", config.get("scope"))
-            full_name = ca_override.get("full_name", config.get("full_name"))
-            relative_name = ca_override.get("relative_name", config.get("relative_name"))
-            encodings = ca_override.get("encodings", config.get("encodings", ["DER"]))
-            crl = self.get_crl(
-                key_backend_options=key_backend_options,
-                expires=expires,
-                algorithm=self.algorithm,
-                scope=scope,
-                full_name=full_name,
-                relative_name=relative_name,
+        if scopes is not None:
+            scopes = set(scopes)
+
+        now = datetime.now(tz=tz.utc)
+        if settings.USE_TZ is False:
+            now = now.replace(tzinfo=None)
+
+        # Load the private key only once for all CRLs
+        with self.key_backend.reuse_private_key(self, key_backend_options):
+            for config in deepcopy(ca_settings.CA_CRL_PROFILES).values():
+                # create a copy of the overrides with the serials sanitized so that the user can use a
+                # case-insensitive string and can have colons (":").
+                overrides = {k.replace(":", "").upper(): v for k, v in config.get("OVERRIDES", {}).items()}
+                ca_override = overrides.get(self.serial, {})
+
+                if ca_override.get("skip"):
+                    continue
+
+                expires = ca_override.get("expires", config.get("expires", 86400))
+                scope = ca_override.get("scope", config.get("scope"))
+                if scopes is not None and scope not in scopes:
+                    continue
+
+                full_name = ca_override.get("full_name", config.get("full_name"))
+                relative_name = ca_override.get("relative_name", config.get("relative_name"))
+                encodings = ca_override.get("encodings", config.get("encodings", ["DER"]))
+                delta_config = ca_override.get("delta", config.get("delta"))
+
+                delta_full_name = None
+                if delta_config:
+                    if "full_name" in delta_config:
+                        delta_full_name = [parse_general_name(name) for name in delta_config["full_name"]]
+                    else:
+                        delta_full_name = self._get_default_delta_full_name(scope)
+
+                # The configuration is part of the fingerprint, so that changes are picked up immediately.
+                profile_config = [
+                    config,
+                    ca_override,
+                    self.sign_crl_distribution_points,
+                    ca_settings.CA_DEFAULT_HOSTNAME,
+                ]
+                profile_digest = hashlib.sha256(
+                    json.dumps(profile_config, sort_keys=True, default=str).encode()
+                ).hexdigest()
+                fingerprint = f"{self.get_crl_fingerprint(scope, now)}:{profile_digest}"
+
+                # If delta CRLs are configured, new revocations are published via the delta CRL, so the
+                # complete CRL is only regenerated if the profile changed or it is about to expire.
+                base_fingerprint = profile_digest if delta_config else fingerprint
+                regenerated = force or self._crl_changed(base_fingerprint, encodings, expires, scope)
+                if regenerated:
+                    crl = self.get_crl(
+                        key_backend_options=key_backend_options,
+                        expires=expires,
+                        algorithm=self.algorithm,
+                        scope=scope,
+                        full_name=full_name,
+                        relative_name=relative_name,
+                        delta_full_name=delta_full_name,
+                    )
+                    self._cache_crl(crl, encodings, expires, scope, fingerprint=base_fingerprint)
+                    self._set_delta_crl_base(crl, scope or "all")
+
+                if delta_config:
+                    delta_expires = delta_config.get("expires", 3600)
+
+                    # Delta CRLs contain all certificates revoked since the last complete CRL, so they are
+                    # regenerated if revocations changed and together with the complete CRL.
+                    if regenerated or self._crl_changed(
+                        fingerprint, encodings, delta_expires, scope, delta=True
+                    ):
+                        delta_crl = self.get_crl(
+                            key_backend_options=key_backend_options,
+                            expires=delta_expires,
+                            algorithm=self.algorithm,
+                            scope=scope,
+                            full_name=full_name,
+                            relative_name=relative_name,
+                            delta=True,
+                        )
+                        self._cache_crl(
+                            delta_crl, encodings, delta_expires, scope, delta=True, fingerprint=fingerprint
+                        )
+
+                # Generate one CRL per partition if certificates are assigned to a CRL partition
+                if scope == "user" and self.get_crl_partition_full_name(full_name) is not None:
+                    for partition in self.get_crl_partitions(now):
+                        partition_fingerprint = (
+                            f"{self.get_crl_fingerprint(scope, now, partition=partition)}:{profile_digest}"
+                        )
+                        if not force and not self._crl_changed(
+                            partition_fingerprint, encodings, expires, scope, partition=partition
+                        ):
+                            continue
+
+                        partition_crl = self.get_crl(
+                            key_backend_options=key_backend_options,
+                            expires=expires,
+                            algorithm=self.algorithm,
+                            scope=scope,
+                            full_name=full_name,
+                            partition=partition,
+                        )
+                        self._cache_crl(
+                            partition_crl,
+                            encodings,
+                            expires,
+                            scope,
+                            partition=partition,
+                            fingerprint=partition_fingerprint,
+                        )
+                        self._set_delta_crl_base(partition_crl, f"{scope}_{partition}")
+
+    def _set_delta_crl_base(self, crl: x509.CertificateRevocationList, counter: str) -> None:
+        """Use a complete CRL that was just published as base for delta CRLs.
+
+        Only published CRLs are used as base, as delta CRLs must only reference CRLs that relying parties
+        can actually retrieve.
+        """
+        crl_number = crl.extensions.get_extension_for_class(x509.CRLNumber).value.crl_number
+        last_update = crl_last_update(crl)
+        if settings.USE_TZ is False:
+            last_update = timezone.make_naive(last_update, timezone=tz.utc)
+        CertificateRevocationListCounter.objects.set_base(self, counter, crl_number, last_update)
+
+    def _crl_changed(
+        self,
+        fingerprint: str,
+        encodings: Iterable[str],
+        expires: int,
+        scope: Optional[str],
+        delta: bool = False,
+        partition: Optional[int] = None,
+    ) -> bool:
+        """Check if a cached CRL has to be regenerated, because it changed or is about to expire."""
+        fingerprint_cache_key = get_crl_fingerprint_cache_key(
+            self.serial, scope=scope, delta=delta, partition=partition
+        )
+        if cache.get(fingerprint_cache_key) != fingerprint:
+            return True
+
+        cache_keys = [
+            get_crl_cache_key(
+                self.serial, parse_encoding(encoding), scope=scope, delta=delta, partition=partition
+            )
+            for encoding in encodings
+        ]
+        cached_crls = [get_crl_from_cache(cache_key) for cache_key in cache_keys]
+        if None in cached_crls:
+            return True
+
+        # All encodings are cached together, so it is sufficient to check the validity of one of them.
+        _last_update, next_update = get_crl_validity(cached_crls[0])  # type: ignore[arg-type]
+        if next_update is None:  # pragma: no cover  # CRLs created by django-ca always have a nextUpdate
+            return True
+        remaining = next_update - datetime.now(tz=tz.utc)
+        return remaining < timedelta(seconds=expires * CRL_REFRESH_FRACTION)
+
+    def _cache_crl(
+        self,
+        crl: x509.CertificateRevocationList,
+        encodings: Iterable[str],
+        expires: int,
+        scope: Optional[str],
+        delta: bool = False,
+        partition: Optional[int] = None,
+        fingerprint: Optional[str] = None,
+    ) -> None:
+        for encoding in encodings:
+            encoding = parse_encoding(encoding)
+            cache_key = get_crl_cache_key(
+                self.serial, encoding, scope=scope, delta=delta, partition=partition
             )
 
-            for encoding in encodings:
-                encoding = parse_encoding(encoding)
-                cache_key = get_crl_cache_key(self.serial, encoding, scope=scope)
+            if expires >= 600:  # pragma: no branch
+                # for longer expiries we subtract a random value so that regular CRL regeneration is
+                # distributed a bit
+                expires = expires - random.randint(1, 5) * 60
 
-                if expires >= 600:  # pragma: no branch
-                    # for longer expiries we subtract a random value so that regular CRL regeneration is
-                    # distributed a bit
-                    expires = expires - random.randint(1, 5) * 60
+            encoded_crl = crl.public_bytes(encoding)
+            set_crl_in_cache(cache_key, encoded_crl, expires)
 
-                encoded_crl = crl.public_bytes(encoding)
-                cache.set(cache_key, encoded_crl, expires)
+            # Publish the CRL so that it can be served by a web server (see CA_CRL_STORAGE_ALIAS)
+            if ca_settings.CA_CRL_STORAGE_ALIAS is not None:
+                storage_path = get_crl_storage_path(
+                    self.serial, encoding, scope=scope, delta=delta, partition=partition
+                )
+                replace_file(storages[ca_settings.CA_CRL_STORAGE_ALIAS], storage_path, encoded_crl)
+
+                # Views only let the web server send the published CRL while this key is present.
+                _last_update, next_update = get_crl_validity(encoded_crl)
+                cache.set(get_crl_published_cache_key(cache_key), next_update, expires)
+
+        if fingerprint is not None:
+            fingerprint_cache_key = get_crl_fingerprint_cache_key(
+                self.serial, scope=scope, delta=delta, partition=partition
+            )
+            cache.set(fingerprint_cache_key, fingerprint, expires)
+
+    def get_crl_partition_full_name(
+        self, full_name: Optional[Iterable[x509.GeneralName]] = None
+    ) -> Optional[List[x509.GeneralName]]:
+        """Get the full name for partitioned CRLs.
+
+        If `full_name` is not given, the full names from ``sign_crl_distribution_points`` are used. Returns
+        ``None`` if no name contains the ``{CRL_PARTITION}`` placeholder, as CRLs for different partitions
+        would then not be distinguishable.
+        """
+        if full_name is None:
+            full_name = []
+            if self.sign_crl_distribution_points is not None:
+                for dpoint in self.sign_crl_distribution_points.value:
+                    full_name += dpoint.full_name or []
+
+        names = list(full_name)
+        for name in names:
+            if isinstance(name, x509.UniformResourceIdentifier) and "{CRL_PARTITION}" in name.value:
+                return names
+        return None
+
+    def get_crl_partitions(self, now: Optional[datetime] = None) -> List[int]:
+        """Get the CRL partitions that CRLs have to be generated for.
+
+        This includes all partitions configured by :ref:`CA_CRL_PARTITIONS <settings-ca-crl-partitions>`, but
+        also any other partition that (not yet expired) certificates were assigned to when a different number
+        of partitions was configured, as the URL of the partition CRL is included in these certificates.
+        """
+        if now is None:
+            now = timezone.now()
+        partitions = set(range(ca_settings.CA_CRL_PARTITIONS))
+        retired_partitions = (
+            self.certificate_set.filter(expires__gt=now, crl_partition__gte=ca_settings.CA_CRL_PARTITIONS)
+            .order_by()
+            .values_list("crl_partition", flat=True)
+            .distinct()
+        )
+        partitions.update(retired_partitions)
+        return sorted(partitions)
+
+    def _get_default_delta_full_name(self, scope: Optional[str]) -> Optional[List[x509.GeneralName]]:
+        """Get the default URL where delta CRLs can be retrieved (requires CA_DEFAULT_HOSTNAME)."""
+        if not ca_settings.CA_DEFAULT_HOSTNAME or scope not in ("ca", "user"):
+            return None
+        url_name = "django_ca:ca-delta-crl" if scope == "ca" else "django_ca:delta-crl"
+        crl_path = reverse(url_name, kwargs={"serial": self.serial})
+        return [x509.UniformResourceIdentifier(f"http://{ca_settings.CA_DEFAULT_HOSTNAME}{crl_path}")]
 
     @property
     def extensions_for_certificate(
@@ -735,6 +1060,59 @@ class CertificateAuthority(X509CertMixin):
         password : str or bytes, optional
             Password for loading the private key of the CA, if any.
         """
+        algorithm, expires = self._get_sign_defaults(algorithm, expires)
+        params = self._get_certificate_parameters(csr, subject, algorithm, expires, extensions, password)
+        signed_cert = self.key_backend.sign_certificate(
+            self,
+            key_backend_options,
+            params.public_key,
+            serial=params.serial,
+            algorithm=algorithm,
+            issuer=params.issuer,
+            subject=params.subject,
+            expires=params.expires,
+            extensions=params.extensions,
+        )
+
+        post_sign_cert.send(sender=self.__class__, ca=self, cert=signed_cert)
+
+        return signed_cert
+
+    def sign_many(
+        self,
+        key_backend_options: BaseModel,
+        requests: Iterable[
+            Tuple[
+                x509.CertificateSigningRequest,
+                x509.Name,
+                Optional[Iterable[x509.Extension[x509.ExtensionType]]],
+            ]
+        ],
+        algorithm: Optional[AllowedHashTypes] = None,
+        expires: Optional[datetime] = None,
+        password: Optional[Union[str, bytes]] = None,
+    ) -> List[x509.Certificate]:
+        """Create multiple signed certificates at once.
+
+        This function works like :py:func:`~django_ca.models.CertificateAuthority.sign`, but `requests` is
+        a list of tuples of the CSR, the subject and the extensions of every certificate. The private key is
+        only loaded once, and key backends may sign all certificates with a single operation.
+        """
+        algorithm, expires = self._get_sign_defaults(algorithm, expires)
+        certificates = [
+            self._get_certificate_parameters(csr, subject, algorithm, expires, extensions, password)
+            for csr, subject, extensions in requests
+        ]
+        signed_certs = self.key_backend.sign_certificates(self, key_backend_options, algorithm, certificates)
+
+        for signed_cert in signed_certs:
+            post_sign_cert.send(sender=self.__class__, ca=self, cert=signed_cert)
+
+        return signed_certs
+
+    def _get_sign_defaults(
+        self, algorithm: Optional[AllowedHashTypes], expires: Optional[datetime]
+    ) -> Tuple[Optional[AllowedHashTypes], datetime]:
         if algorithm is None:
             algorithm = self.algorithm
 
@@ -744,6 +1122,18 @@ class CertificateAuthority(X509CertMixin):
         if expires is None:
             expires = timezone.now() + ca_settings.CA_DEFAULT_EXPIRES
             expires = expires.replace(second=0, microsecond=0)
+        return algorithm, expires
+
+    def _get_certificate_parameters(
+        self,
+        csr: x509.CertificateSigningRequest,
+        subject: x509.Name,
+        algorithm: Optional[AllowedHashTypes],
+        expires: datetime,
+        extensions: Optional[Iterable[x509.Extension[x509.ExtensionType]]],
+        password: Optional[Union[str, bytes]],
+    ) -> CertificateParameters:
+        """Get parameters for signing a certificate, adding required extensions if not provided."""
         if extensions is None:
             extensions = []
 
@@ -791,22 +1181,15 @@ class CertificateAuthority(X509CertMixin):
             password=password,
         )
 
-        signed_cert = self.key_backend.sign_certificate(
-            self,
-            key_backend_options,
-            public_key,
+        return CertificateParameters(
+            public_key=public_key,
             serial=x509.random_serial_number(),
-            algorithm=algorithm,
             issuer=self.subject,
             subject=subject,
             expires=expires,
             extensions=extensions,
         )
 
-        post_sign_cert.send(sender=self.__class__, ca=self, cert=signed_cert)
-
-        return signed_cert
-
     def generate_ocsp_key(  # pylint: disable=too-many-locals  # noqa: PLR0912
         self,
         key_backend_options: BaseModel,
@@ -1011,7 +1394,77 @@ class CertificateAuthority(X509CertMixin):
             return itertools.chain(ca_qs, cert_qs)
         raise ValueError('scope must be either None, "ca", "user" or "attribute"')
 
-    def get_crl(
+    def _get_crl_querysets(
+        self, scope: Optional[str], now: datetime, partition: Optional[int]
+    ) -> List[Union[CertificateAuthorityQuerySet, CertificateQuerySet]]:
+        """Get querysets of the revoked certificates included in a CRL with the given scope."""
+        if scope not in (None, "ca", "user", "attribute"):
+            raise ValueError('scope must be either None, "ca", "user" or "attribute"')
+
+        # NOTE: The "attribute" scope is not really supported and never contains any certificates.
+        querysets: List[Union[CertificateAuthorityQuerySet, CertificateQuerySet]] = []
+        if scope in ("ca", None) and partition is None:
+            querysets.append(self.children.filter(expires__gt=now).revoked())
+        if scope in ("user", None):
+            cert_qs = self.certificate_set.filter(expires__gt=now).revoked()
+            if partition is not None:
+                cert_qs = cert_qs.filter(crl_partition=partition)
+            querysets.append(cert_qs)
+        return querysets
+
+    def get_crl_fingerprint(
+        self, scope: Optional[str], now: datetime, partition: Optional[int] = None
+    ) -> str:
+        """Get a fingerprint of the revoked certificates included in a CRL with the given scope.
+
+        The fingerprint consists of the number of revoked certificates and the most recent revocation date.
+        It changes whenever a certificate is revoked or an expired certificate is no longer included, and is
+        computed in the database without loading any rows.
+        """
+        parts: List[str] = []
+        for queryset in self._get_crl_querysets(scope, now, partition):
+            aggregate = queryset.aggregate(count=Count("pk"), last_revoked=Max("revoked_date"))
+            parts += [str(aggregate["count"]), str(aggregate["last_revoked"])]
+        return ":".join(parts)
+
+    def get_crl_revocations(
+        self,
+        scope: typing.Literal[None, "ca", "user", "attribute"],
+        now: datetime,
+        since: Optional[datetime] = None,
+        partition: Optional[int] = None,
+    ) -> Iterator[x509.RevokedCertificate]:
+        """Get CRL entries for all revoked certificates in the given scope.
+
+        Unlike :py:func:`~django_ca.models.CertificateAuthority.get_crl_certs`, this method does not load any
+        model instances, but only the fields required for the CRL, and the database rows are streamed. If
+        `since` is given, only certificates revoked since then are returned (used for delta CRLs). If
+        `partition` is given, only certificates in the given CRL partition are returned (certificate
+        authorities are never assigned to a partition).
+        """
+        for queryset in self._get_crl_querysets(scope, now, partition):
+            if since is not None:
+                queryset = queryset.filter(revoked_date__gte=since)
+            rows = queryset.values_list("serial", "revoked_date", "revoked_reason", "compromised")
+            for serial, revoked_date, reason, compromised in rows.iterator(chunk_size=CRL_CHUNK_SIZE):
+                yield get_revoked_certificate(int(serial, 16), revoked_date, reason, compromised)
+
+    def get_last_complete_crl(self, counter: str) -> Optional[Tuple[int, datetime]]:
+        """Get the CRL number and the ``thisUpdate`` timestamp of the last complete CRL for `counter`.
+
+        Returns ``None`` if no complete CRL was generated yet. See
+        :py:func:`~django_ca.models.CertificateAuthority.get_crl` for the meaning of `counter`.
+        """
+        crl_counter = self.crl_counters.filter(counter=counter).first()
+        if crl_counter is None or crl_counter.base_number is None or crl_counter.base_last_update is None:
+            return None
+
+        last_update = crl_counter.base_last_update
+        if timezone.is_naive(last_update):
+            last_update = timezone.make_aware(last_update, timezone=tz.utc)
+        return crl_counter.base_number, last_update
+
+    def get_crl(  # noqa: PLR0912,PLR0913,PLR0915
         self,
         key_backend_options: BaseModel,
         expires: int = 86400,
@@ -1021,6 +1474,9 @@ class CertificateAuthority(X509CertMixin):
         full_name: Optional[Iterable[x509.GeneralName]] = None,
         relative_name: Optional[x509.RelativeDistinguishedName] = None,
         include_issuing_distribution_point: Optional[bool] = None,
+        delta: bool = False,
+        delta_full_name: Optional[Iterable[x509.GeneralName]] = None,
+        partition: Optional[int] = None,
     ) -> x509.CertificateRevocationList:
         """Generate a Certificate Revocation List (CRL).
 
@@ -1055,6 +1511,20 @@ class CertificateAuthority(X509CertMixin):
         include_issuing_distribution_point: bool, optional
             Force the inclusion/exclusion of the IssuingDistributionPoint extension. By default, the inclusion
             is automatically determined.
+        delta : bool, optional
+            Generate a delta CRL (see RFC 5280, 5.2.4) that contains only certificates revoked since the last
+            complete CRL with the same counter was published by
+            :py:func:`~django_ca.models.CertificateAuthority.cache_crls`. Complete and delta CRLs share the
+            same sequence of CRL numbers. Raises ``ValueError`` if no complete CRL was published yet.
+        delta_full_name : list of :py:class:`~cg:cryptography.x509.GeneralName`, optional
+            Where to retrieve delta CRLs. If passed, complete CRLs will include the Freshest CRL extension
+            with the given names. This parameter is ignored for delta CRLs.
+        partition : int, optional
+            Generate a CRL that only contains certificates in the given CRL partition (see
+            :ref:`CA_CRL_PARTITIONS <settings-ca-crl-partitions>`). The scope must be ``"user"`` and the full
+            name (either passed via `full_name` or from ``sign_crl_distribution_points``) must contain the
+            ``{CRL_PARTITION}`` placeholder, so that every partition has a different Issuing Distribution
+            Point.
 
         Returns
         -------
@@ -1071,13 +1541,18 @@ class CertificateAuthority(X509CertMixin):
         if algorithm is None:
             algorithm = self.algorithm
 
-        builder = x509.CertificateRevocationListBuilder()
-        builder = builder.issuer_name(self.pub.loaded.subject)
-        builder = builder.last_update(now_naive)
-        builder = builder.next_update(now_naive + timedelta(seconds=expires))
-
         parsed_full_name = None
-        if full_name is not None:
+        if partition is not None:
+            if scope != "user":
+                raise ValueError('Partitioned CRLs can only be generated for the "user" scope.')
+            partition_full_name = self.get_crl_partition_full_name(full_name)
+            if partition_full_name is None:
+                raise ValueError("Partitioned CRLs require a full name that contains {CRL_PARTITION}.")
+
+            context = get_signer_formatting_context(self.pub.loaded.serial_number)
+            context["CRL_PARTITION"] = partition
+            parsed_full_name = [format_general_name(name, context) for name in partition_full_name]
+        elif full_name is not None:
             parsed_full_name = full_name
 
         # CRLs for root CAs with scope "ca" (or no scope - this includes CAs) do not set a full_name in the
@@ -1098,10 +1573,14 @@ class CertificateAuthority(X509CertMixin):
                 x509.UniformResourceIdentifier(f"http://{ca_settings.CA_DEFAULT_HOSTNAME}{crl_path}")
             ]
         elif scope in ("user", None) and self.sign_crl_distribution_points:
+            # Names with the {CRL_PARTITION} placeholder point to partition CRLs, not to the complete CRL.
             full_names = []
             for dpoint in self.sign_crl_distribution_points.value:
-                if dpoint.full_name:
-                    full_names += dpoint.full_name
+                for name in dpoint.full_name or []:
+                    if not (
+                        isinstance(name, x509.UniformResourceIdentifier) and "{CRL_PARTITION}" in name.value
+                    ):
+                        full_names.append(name)
             if full_names:
                 parsed_full_name = full_names
 
@@ -1119,13 +1598,37 @@ class CertificateAuthority(X509CertMixin):
             # sorry, nothing we support right now
             only_contains_attribute_certs = True
 
+        if counter is None:
+            counter = scope or "all"
+            if partition is not None:
+                counter = f"{counter}_{partition}"
+        # Delta CRLs contain all certificates revoked since the last complete CRL was generated.
+        since = base_crl_number = None
+        if delta is True:
+            last_complete_crl = self.get_last_complete_crl(counter)
+            if last_complete_crl is None:
+                raise ValueError("Cannot generate a delta CRL before a complete CRL was published.")
+            base_crl_number, since = last_complete_crl
+
         if settings.USE_TZ is True:
-            crl_certificates = self.get_crl_certs(scope, now)
+            revoked_certificates = list(
+                self.get_crl_revocations(scope, now, since=since, partition=partition)
+            )
         else:
-            crl_certificates = self.get_crl_certs(scope, now_naive)
+            if since is not None:
+                since = since.replace(tzinfo=None)
+            revoked_certificates = list(
+                self.get_crl_revocations(scope, now_naive, since=since, partition=partition)
+            )
 
-        for cert in crl_certificates:
-            builder = builder.add_revoked_certificate(cert.get_revocation())
+        # NOTE: Revoked certificates are passed to the constructor, as add_revoked_certificate() copies the
+        # list of all previously added certificates, making CRL assembly quadratic in the number of entries.
+        builder = x509.CertificateRevocationListBuilder(
+            issuer_name=self.pub.loaded.subject,
+            last_update=now_naive,
+            next_update=now_naive + timedelta(seconds=expires),
+            revoked_certificates=revoked_certificates,
+        )
 
         # Validate that the user has selected a usable algorithm
         validate_public_key_parameters(self.key_type, algorithm)
@@ -1158,21 +1661,28 @@ class CertificateAuthority(X509CertMixin):
         aki = self.get_authority_key_identifier()
         builder = builder.add_extension(aki, critical=False)
 
-        # Add the CRLNumber extension (RFC 5280, 5.2.3)
-        if counter is None:
-            counter = scope or "all"
-        crl_number_data = json.loads(self.crl_number)
-        crl_number = int(crl_number_data["scope"].get(counter, 0))
-        builder = builder.add_extension(x509.CRLNumber(crl_number=crl_number), critical=False)
-
         # Get the backend.
         if self.is_usable(options=key_backend_options) is False:
             raise ValueError("Backend cannot be used for signing by this process.")
 
-        # increase crl_number for the given scope and save
-        crl_number_data["scope"][counter] = crl_number + 1
-        self.crl_number = json.dumps(crl_number_data)
-        self.save()
+        # Add the CRLNumber extension (RFC 5280, 5.2.3)
+        crl_number = CertificateRevocationListCounter.objects.increment(self, counter)
+        builder = builder.add_extension(x509.CRLNumber(crl_number=crl_number), critical=False)
+
+        if base_crl_number is not None:
+            # RFC 5280, 5.2.4: The Delta CRL Indicator extension MUST be critical
+            delta_crl_indicator = x509.DeltaCRLIndicator(crl_number=base_crl_number)
+            builder = builder.add_extension(delta_crl_indicator, critical=True)
+        elif delta_full_name is not None:
+            # RFC 5280, 5.2.6: The Freshest CRL extension MUST be non-critical
+            freshest_crl = x509.FreshestCRL(
+                [
+                    x509.DistributionPoint(
+                        full_name=list(delta_full_name), relative_name=None, reasons=None, crl_issuer=None
+                    )
+                ]
+            )
+            builder = builder.add_extension(freshest_crl, critical=False)
 
         return self.key_backend.sign_certificate_revocation_list(
             ca=self, use_private_key_options=key_backend_options, builder=builder, algorithm=algorithm
@@ -1275,6 +1785,13 @@ class Certificate(X509CertMixin):
         default=False, help_text=_("If this certificate was automatically generated.")
     )
 
+    crl_partition = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text=_("The CRL partition this certificate was assigned to."),
+    )
+
     class Meta:
         permissions = (
             ("revoke_certificate", "Can revoke a certificate"),
@@ -1284,6 +1801,15 @@ class Certificate(X509CertMixin):
     def __str__(self) -> str:
         return self.cn
 
+    def update_certificate(self, value: x509.Certificate) -> None:
+        """Update this instance with data from a :py:class:`cg:cryptography.x509.Certificate`.
+
+        In addition to the fields populated by the base class, this function also assigns the certificate to
+        a CRL partition (see :ref:`CA_CRL_PARTITIONS <settings-ca-crl-partitions>`).
+        """
+        super().update_certificate(value)
+        self.crl_partition = get_crl_partition(value.serial_number)
+
     @property
     def bundle(self) -> List[X509CertMixin]:
         """The complete certificate bundle. This includes all CAs as well as the certificates itself."""
@@ -1295,6 +1821,28 @@ class Certificate(X509CertMixin):
         return self.ca.root
 
 
+class CertificateRevocationListCounter(models.Model):
+    """The CRL number (see RFC 5280, 5.2.3) for a certificate authority and a counter (usually the scope)."""
+
+    objects: CertificateRevocationListCounterManager = CertificateRevocationListCounterManager()
+
+    ca = models.ForeignKey(CertificateAuthority, on_delete=models.CASCADE, related_name="crl_counters")
+    counter = models.CharField(max_length=64)
+    number = models.PositiveIntegerField(default=0, help_text=_("CRL number of the next CRL."))
+    base_number = models.PositiveIntegerField(
+        null=True, blank=True, help_text=_("CRL number of the last complete CRL.")
+    )
+    base_last_update = models.DateTimeField(
+        null=True, blank=True, help_text=_("When the last complete CRL was generated.")
+    )
+
+    class Meta:
+        unique_together = (("ca", "counter"),)
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.counter}: {self.number}"
+
+
 class CertificateOrder(DjangoCAModel):
     """An order for a certificate that is issued asynchronously (usually via the API)."""
 
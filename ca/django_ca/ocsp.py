@@ -0,0 +1,589 @@
+# This file is part of django-ca (https://github.com/mathiasertl/django-ca).
+#
+# django-ca is free software: you can redistribute it and/or modify it under the terms of the GNU General
+# Public License as published by the Free Software Foundation, either version 3 of the License, or (at your
+# option) any later version.
+#
+# django-ca is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License
+# for more details.
+#
+# You should have received a copy of the GNU General Public License along with django-ca. If not, see
+# <http://www.gnu.org/licenses/>.
+
+"""Functions for creating OCSP responses, used by the OCSP views and Celery tasks.
+
+Responses are assembled with :py:mod:`asn1crypto`, using precomputed hashes of the issuer, so that creating a
+response never requires loading the requested certificate.
+
+Models are only imported where required, so that this module can also be used without a configured Django
+project (see :py:mod:`django_ca.snapshot`).
+"""
+
+import functools
+import hashlib
+import logging
+import math
+import time
+import typing
+import uuid
+from datetime import datetime, timedelta, timezone as tz
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from asn1crypto import core as asn1_core, ocsp as asn1_ocsp, x509 as asn1_x509
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import dsa, ec, ed448, ed25519, padding, rsa
+from cryptography.hazmat.primitives.asymmetric.types import CertificateIssuerPrivateKeyTypes
+from cryptography.hazmat.primitives.serialization import Encoding
+from cryptography.x509 import OCSPNonce
+from cryptography.x509.oid import OCSPExtensionOID, SignatureAlgorithmOID
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from django_ca import constants
+
+if typing.TYPE_CHECKING:
+    from django.db.models import QuerySet
+
+    from django_ca.models import CertificateAuthority
+
+log = logging.getLogger(__name__)
+
+#: Fields of :py:class:`~django_ca.models.X509CertMixin` required to create an OCSP response.
+CERTIFICATE_STATUS_FIELDS = ("revoked", "revoked_date", "revoked_reason", "compromised")
+
+#: Hash algorithms for which issuer hashes are computed in advance, as they are used by most clients.
+PRECOMPUTED_ISSUER_HASH_ALGORITHMS = (hashes.SHA1, hashes.SHA256)
+
+#: Per-process cache of issuer hashes. The key is the DER encoded certificate of the certificate authority,
+#: the value maps the name of the hash algorithm to a tuple of the issuer name hash and the issuer key hash.
+_issuer_hashes: Dict[bytes, Dict[str, Tuple[bytes, bytes]]] = {}
+
+_SIGNATURE_ALGORITHM_OIDS: "Mapping[Tuple[str, str], x509.ObjectIdentifier]" = {
+    ("RSA", "sha224"): SignatureAlgorithmOID.RSA_WITH_SHA224,
+    ("RSA", "sha256"): SignatureAlgorithmOID.RSA_WITH_SHA256,
+    ("RSA", "sha384"): SignatureAlgorithmOID.RSA_WITH_SHA384,
+    ("RSA", "sha512"): SignatureAlgorithmOID.RSA_WITH_SHA512,
+    ("RSA", "sha3-224"): SignatureAlgorithmOID.RSA_WITH_SHA3_224,
+    ("RSA", "sha3-256"): SignatureAlgorithmOID.RSA_WITH_SHA3_256,
+    ("RSA", "sha3-384"): SignatureAlgorithmOID.RSA_WITH_SHA3_384,
+    ("RSA", "sha3-512"): SignatureAlgorithmOID.RSA_WITH_SHA3_512,
+    ("DSA", "sha224"): SignatureAlgorithmOID.DSA_WITH_SHA224,
+    ("DSA", "sha256"): SignatureAlgorithmOID.DSA_WITH_SHA256,
+    ("DSA", "sha384"): SignatureAlgorithmOID.DSA_WITH_SHA384,
+    ("DSA", "sha512"): SignatureAlgorithmOID.DSA_WITH_SHA512,
+    ("EC", "sha224"): SignatureAlgorithmOID.ECDSA_WITH_SHA224,
+    ("EC", "sha256"): SignatureAlgorithmOID.ECDSA_WITH_SHA256,
+    ("EC", "sha384"): SignatureAlgorithmOID.ECDSA_WITH_SHA384,
+    ("EC", "sha512"): SignatureAlgorithmOID.ECDSA_WITH_SHA512,
+    ("EC", "sha3-224"): SignatureAlgorithmOID.ECDSA_WITH_SHA3_224,
+    ("EC", "sha3-256"): SignatureAlgorithmOID.ECDSA_WITH_SHA3_256,
+    ("EC", "sha3-384"): SignatureAlgorithmOID.ECDSA_WITH_SHA3_384,
+    ("EC", "sha3-512"): SignatureAlgorithmOID.ECDSA_WITH_SHA3_512,
+}
+
+
+class CertificateID(typing.NamedTuple):
+    """A certificate identifier (``CertID``) as included in an OCSP request."""
+
+    algorithm: hashes.HashAlgorithm
+    issuer_name_hash: bytes
+    issuer_key_hash: bytes
+    serial_number: int
+
+
+def load_ocsp_request(data: bytes) -> Tuple[List[CertificateID], Optional[x509.Extension[OCSPNonce]]]:
+    """Load a DER encoded OCSP request and return the requested certificates and the nonce (if any).
+
+    Unlike :py:func:`~cg:cryptography.x509.ocsp.load_der_ocsp_request`, this function supports requests
+    for multiple certificates. The function raises ``ValueError`` if the request cannot be parsed, uses an
+    unsupported hash algorithm or contains a critical extension other than the nonce.
+    """
+    try:
+        # Access the native value so that the whole request is parsed here
+        tbs_request = asn1_ocsp.OCSPRequest.load(data, strict=True)["tbs_request"].native
+    except (TypeError, ValueError) as ex:
+        raise ValueError(f"error parsing asn1 value: {ex}") from ex
+
+    hash_algorithms = {
+        algorithm.name: algorithm for algorithm in (a() for a in constants.OCSP_HASH_ALGORITHMS)
+    }
+    cert_ids = []
+    for request in tbs_request["request_list"]:
+        for extension in request["single_request_extensions"] or []:
+            if extension["critical"]:
+                raise ValueError(f"{extension['extn_id']}: Unsupported critical extension in OCSP request.")
+
+        cert_id = request["req_cert"]
+        algorithm_name = cert_id["hash_algorithm"]["algorithm"]
+        if algorithm_name not in hash_algorithms:
+            raise ValueError(f"{algorithm_name}: Unsupported hash algorithm in OCSP request.")
+
+        cert_ids.append(
+            CertificateID(
+                algorithm=hash_algorithms[algorithm_name],
+                issuer_name_hash=cert_id["issuer_name_hash"],
+                issuer_key_hash=cert_id["issuer_key_hash"],
+                serial_number=cert_id["serial_number"],
+            )
+        )
+    if not cert_ids:
+        raise ValueError("OCSP request does not contain any requests.")
+
+    nonce = None
+    for extension in tbs_request["request_extensions"] or []:
+        if extension["extn_id"] == "nonce":
+            nonce = x509.Extension(
+                oid=OCSPExtensionOID.NONCE,
+                critical=extension["critical"],
+                value=OCSPNonce(extension["extn_value"]),
+            )
+        elif extension["critical"]:
+            raise ValueError(f"{extension['extn_id']}: Unsupported critical extension in OCSP request.")
+
+    return cert_ids, nonce
+
+
+def _digest(algorithm: hashes.HashAlgorithm, data: bytes) -> bytes:
+    digest = hashes.Hash(algorithm)
+    digest.update(data)
+    return digest.finalize()
+
+
+def compute_issuer_hashes(certificate: bytes, algorithm: hashes.HashAlgorithm) -> Tuple[bytes, bytes]:
+    """Compute the issuer name hash and issuer key hash for the DER encoded `certificate` of an issuer."""
+    tbs_certificate = asn1_x509.Certificate.load(certificate)["tbs_certificate"]
+    subject = tbs_certificate["subject"].dump()
+    public_key = tbs_certificate["subject_public_key_info"]["public_key"].contents[1:]  # skip unused bits
+    return _digest(algorithm, subject), _digest(algorithm, public_key)
+
+
+def get_issuer_hashes(ca: "CertificateAuthority", algorithm: hashes.HashAlgorithm) -> Tuple[bytes, bytes]:
+    """Get the issuer name hash and issuer key hash identifying `ca` in OCSP requests and responses.
+
+    Hashes are computed only once per process. Hashes for the algorithms in
+    :py:attr:`~django_ca.ocsp.PRECOMPUTED_ISSUER_HASH_ALGORITHMS` are computed when hashes are requested for
+    a certificate authority for the first time.
+    """
+    issuer_hashes = _issuer_hashes.get(ca.pub.der)
+    if issuer_hashes is None:
+        issuer_hashes = _issuer_hashes[ca.pub.der] = {}
+        for precomputed_algorithm in PRECOMPUTED_ISSUER_HASH_ALGORITHMS:
+            get_issuer_hashes(ca, precomputed_algorithm())
+
+    if algorithm.name not in issuer_hashes:
+        issuer_hashes[algorithm.name] = compute_issuer_hashes(ca.pub.der, algorithm)
+
+    return issuer_hashes[algorithm.name]
+
+
+class IssuerIndex:
+    """In-memory index of all certificate authorities by the issuer hashes used in OCSP requests.
+
+    The index allows a single OCSP responder to determine the certificate authority from the request itself,
+    without any database queries. It is rebuilt whenever a certificate authority is saved or deleted. Since
+    every process keeps its own index, the version of the index is stored in the cache, so that all
+    processes notice the change.
+
+    Hashes for hash algorithms other than those in
+    :py:attr:`~django_ca.ocsp.PRECOMPUTED_ISSUER_HASH_ALGORITHMS` are added to the index when they are first
+    requested. If multiple certificate authorities have the same subject and public key, the certificate
+    authority that became valid last is used.
+    """
+
+    version_cache_key = "ocsp_issuer_index_version"
+
+    def __init__(self) -> None:
+        self.version: Optional[str] = None
+        self.cas: List["CertificateAuthority"] = []
+        self.hashes: Dict[str, Dict[Tuple[bytes, bytes], "CertificateAuthority"]] = {}
+
+    def _get_hashes(
+        self, cas: Sequence["CertificateAuthority"], algorithm: hashes.HashAlgorithm
+    ) -> Dict[Tuple[bytes, bytes], "CertificateAuthority"]:
+        # CAs are ordered by valid_from, so that the CA that became valid last takes precedence
+        return {get_issuer_hashes(ca, algorithm): ca for ca in cas}
+
+    def get(self, cert_id: CertificateID) -> Optional["CertificateAuthority"]:
+        """Get the certificate authority that issued the certificate identified by `cert_id`.
+
+        Returns ``None`` if no certificate authority matches the issuer hashes.
+        """
+        version = cache.get(self.version_cache_key)
+        if version is None:
+            version = self.invalidate()
+        if version != self.version:
+            self.rebuild(version)
+
+        hashes_by_algorithm = self.hashes
+        index = hashes_by_algorithm.get(cert_id.algorithm.name)
+        if index is None:
+            index = self._get_hashes(self.cas, cert_id.algorithm)
+            hashes_by_algorithm[cert_id.algorithm.name] = index
+        return index.get((cert_id.issuer_name_hash, cert_id.issuer_key_hash))
+
+    def invalidate(self) -> str:
+        """Invalidate the index in all processes and return the new version."""
+        version = uuid.uuid4().hex
+        cache.set(self.version_cache_key, version, None)
+        return version
+
+    def rebuild(self, version: str) -> None:
+        """Rebuild the index from the database."""
+        from django_ca.models import CertificateAuthority  # pylint: disable=import-outside-toplevel
+
+        # The new index is built locally and then swapped in, so that concurrent lookups (in other threads)
+        # always see a complete index. CAs are assigned first, so that hashes for other algorithms are never
+        # added from an outdated list of CAs.
+        cas = list(CertificateAuthority.objects.order_by("valid_from"))
+        hashes_by_algorithm = {
+            algorithm.name: self._get_hashes(cas, algorithm)
+            for algorithm in (algorithm_type() for algorithm_type in PRECOMPUTED_ISSUER_HASH_ALGORITHMS)
+        }
+        self.cas = cas
+        self.hashes = hashes_by_algorithm
+        self.version = version
+
+
+#: The index of certificate authorities used in this process.
+issuer_index = IssuerIndex()
+
+
+class SerialFilter:
+    """A Bloom filter of certificate serials.
+
+    The filter never reports that a serial is missing if it was added, but it may report (with a probability
+    of about `false_positive_rate`) that a serial was added even if it was not. The false positive rate
+    increases if more serials are added than the filter was created with (see `is_saturated`).
+    """
+
+    def __init__(self, serials: Sequence[str], false_positive_rate: float = 0.01) -> None:
+        count = max(len(serials), 1)
+        self.capacity = count
+        self.count = 0
+        self.size = max(int(-count * math.log(false_positive_rate) / math.log(2) ** 2), 8)
+        self.hash_count = max(round(self.size / count * math.log(2)), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+        for serial in serials:
+            self.add(serial)
+
+    def _get_positions(self, serial: str) -> Iterator[int]:
+        digest = hashlib.sha256(serial.encode("ascii")).digest()
+        first, second = int.from_bytes(digest[:8], "big"), int.from_bytes(digest[8:16], "big") | 1
+        return ((first + i * second) % self.size for i in range(self.hash_count))
+
+    def add(self, serial: str) -> None:
+        """Add `serial` to the filter."""
+        for position in self._get_positions(serial):
+            self.bits[position // 8] |= 1 << (position % 8)
+        self.count += 1
+
+    @property
+    def is_saturated(self) -> bool:
+        """True if twice as many serials were added as the filter was created with."""
+        return self.count > 2 * self.capacity
+
+    def __contains__(self, serial: str) -> bool:
+        positions = self._get_positions(serial)
+        return all(self.bits[position // 8] & (1 << (position % 8)) for position in positions)
+
+
+class KnownSerials:
+    """In-memory filters of the serials known to each certificate authority.
+
+    OCSP requests for serials that are not in the filter are answered with the status "unknown" without any
+    database queries. Filters are built when they are first used. Afterwards, only serials of certificates
+    created since the filter was last updated are added to it:
+
+    * When a certificate is issued, the version of the filter for the certificate authority is changed in the
+      cache, so that all processes sharing the cache update the filter the next time it is used.
+    * If a serial is not found in the filter, the filter is updated if it was not updated during the last
+      `refresh_interval` seconds. This way, new certificates are also found if the cache is not shared
+      between processes or if certificates were created without sending signals (e.g. with ``bulk_create()``).
+
+    Filters are not updated when certificates are deleted, as the status of serials found in the filter is
+    always retrieved from the database.
+    """
+
+    version_cache_key = "ocsp_known_serials_{serial}_{scope}"
+
+    refresh_interval = 5
+    """Minimum time in seconds between updates of a filter caused by serials that are not in the filter."""
+
+    created_overlap = timedelta(minutes=5)
+    """Certificates created up to this long before the last update are retrieved again when updating a
+    filter, so that certificates of transactions that were committed late are not missed."""
+
+    def __init__(self) -> None:
+        # Maps the CA serial and the scope to the version, the filter, the (database) time of the last update
+        # and the (monotonic) time of the last update.
+        self.filters: Dict[Tuple[str, str], Tuple[Optional[str], SerialFilter, datetime, float]] = {}
+
+    def _update(
+        self, ca_serial: str, scope: str, queryset: "QuerySet[Any]", version: Optional[str]
+    ) -> SerialFilter:
+        updated = timezone.now()
+        cached = self.filters.get((ca_serial, scope))
+        if cached is None or cached[1].is_saturated:
+            serial_filter = SerialFilter(list(queryset.values_list("serial", flat=True)))
+        else:
+            serial_filter, last_updated = cached[1], cached[2]
+            new_serials = queryset.filter(created__gte=last_updated - self.created_overlap)
+            for serial in new_serials.values_list("serial", flat=True):
+                if serial not in serial_filter:
+                    serial_filter.add(serial)
+
+        self.filters[(ca_serial, scope)] = (version, serial_filter, updated, time.monotonic())
+        return serial_filter
+
+    def filter(
+        self, ca_serial: str, scope: str, queryset: "QuerySet[Any]", serials: Sequence[str]
+    ) -> List[str]:
+        """Get the serials from `serials` that are in the filter for the certificate authority and scope.
+
+        `scope` is ``"cert"`` for certificates and ``"ca"`` for child certificate authorities, `queryset`
+        is used to retrieve serials if the filter has to be built or updated.
+        """
+        version = cache.get(self.version_cache_key.format(serial=ca_serial, scope=scope))
+        cached = self.filters.get((ca_serial, scope))
+        if cached is None or cached[0] != version:
+            serial_filter = self._update(ca_serial, scope, queryset, version)
+        else:
+            serial_filter = cached[1]
+
+        known = [serial for serial in serials if serial in serial_filter]
+        if len(known) < len(serials):
+            refreshed = self.filters[(ca_serial, scope)][3]
+            if time.monotonic() - refreshed >= self.refresh_interval:
+                serial_filter = self._update(ca_serial, scope, queryset, version)
+                known = [serial for serial in serials if serial in serial_filter]
+        return known
+
+    def invalidate(self, ca_serial: str, scope: str) -> str:
+        """Make all processes sharing the cache update the filter, returns the new version."""
+        version = uuid.uuid4().hex
+        cache.set(self.version_cache_key.format(serial=ca_serial, scope=scope), version, None)
+        return version
+
+
+#: Filters of the serials known to certificate authorities used in this process.
+known_serials = KnownSerials()
+
+
+def load_responder_key(data: bytes) -> CertificateIssuerPrivateKeyTypes:
+    """Load the unencrypted private key (in DER or PEM format) used for signing OCSP responses."""
+    try:
+        loaded_key = serialization.load_der_private_key(data, None)
+    except ValueError:
+        try:
+            loaded_key = serialization.load_pem_private_key(data, None)
+        except ValueError as ex:
+            raise ValueError("Could not decrypt private key.") from ex
+
+    # Check that the private key is of a supported type
+    if not isinstance(loaded_key, constants.PRIVATE_KEY_TYPES):
+        log.error("%s: Unsupported private key type.", type(loaded_key))
+        raise ValueError(f"{type(loaded_key)}: Unsupported private key type.")
+
+    return loaded_key  # type: ignore[return-value]  # mypy not smart enough for above isinstance() check
+
+
+@functools.lru_cache(maxsize=128)
+def _get_responder_info(responder_cert: x509.Certificate) -> Tuple[bytes, asn1_x509.Certificate]:
+    """Get the key hash (used as responder ID) and the parsed responder certificate."""
+    loaded = asn1_x509.Certificate.load(responder_cert.public_bytes(Encoding.DER))
+    return loaded.public_key.sha1, loaded
+
+
+def _get_signature_algorithm(
+    responder_key: CertificateIssuerPrivateKeyTypes, algorithm: Optional[hashes.HashAlgorithm]
+) -> x509.ObjectIdentifier:
+    if isinstance(responder_key, ed25519.Ed25519PrivateKey):
+        return SignatureAlgorithmOID.ED25519
+    if isinstance(responder_key, ed448.Ed448PrivateKey):
+        return SignatureAlgorithmOID.ED448
+    if algorithm is None:  # pragma: no cover  # only Ed448/Ed25519 certificates have no hash algorithm
+        raise ValueError(f"{type(responder_key)}: Signature hash algorithm is required for this key type.")
+
+    if isinstance(responder_key, rsa.RSAPrivateKey):
+        key_type = "RSA"
+    elif isinstance(responder_key, dsa.DSAPrivateKey):
+        key_type = "DSA"
+    else:
+        key_type = "EC"
+    return _SIGNATURE_ALGORITHM_OIDS[(key_type, algorithm.name)]
+
+
+def _sign(
+    responder_key: CertificateIssuerPrivateKeyTypes, data: bytes, algorithm: Optional[hashes.HashAlgorithm]
+) -> bytes:
+    if isinstance(responder_key, (ed25519.Ed25519PrivateKey, ed448.Ed448PrivateKey)):
+        return responder_key.sign(data)
+
+    algorithm = typing.cast(hashes.HashAlgorithm, algorithm)  # already verified by _get_signature_algorithm()
+    if isinstance(responder_key, rsa.RSAPrivateKey):
+        return responder_key.sign(data, padding.PKCS1v15(), algorithm)
+    if isinstance(responder_key, dsa.DSAPrivateKey):
+        return responder_key.sign(data, algorithm)
+    return responder_key.sign(data, ec.ECDSA(algorithm))
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=tz.utc)
+    return value.astimezone(tz.utc).replace(microsecond=0)
+
+
+def get_single_response(
+    ca: "CertificateAuthority",
+    serial: int,
+    algorithm: hashes.HashAlgorithm,
+    status: Optional[Mapping[str, Any]],
+    now: datetime,
+    expires: datetime,
+) -> asn1_ocsp.SingleResponse:
+    """Get a single response for the certificate with the given `serial`.
+
+    The `status` is a mapping with the fields named in :py:attr:`~django_ca.ocsp.CERTIFICATE_STATUS_FIELDS`,
+    usually retrieved using ``.values()`` on a queryset, or ``None`` if the certificate is not known to the
+    certificate authority (the response then has the status "unknown"). The `algorithm` is the hash algorithm
+    used to identify the certificate. It must be the same as in the request, or "openssl ocsp" won't be able
+    to determine the status (verified: NOT the hash algorithm of the requested certificate).
+    """
+    issuer_hashes = get_issuer_hashes(ca, algorithm)
+    return build_single_response(issuer_hashes, serial, algorithm, status, now, expires)
+
+
+def build_single_response(
+    issuer_hashes: Tuple[bytes, bytes],
+    serial: int,
+    algorithm: hashes.HashAlgorithm,
+    status: Optional[Mapping[str, Any]],
+    now: datetime,
+    expires: datetime,
+) -> asn1_ocsp.SingleResponse:
+    """Build a single response from the issuer name hash and issuer key hash given in `issuer_hashes`.
+
+    This function is used by :py:func:`~django_ca.ocsp.get_single_response` and does not require a
+    :py:class:`~django_ca.models.CertificateAuthority` instance.
+    """
+    issuer_name_hash, issuer_key_hash = issuer_hashes
+    single_extensions = []
+
+    if status is None:
+        cert_status = asn1_ocsp.CertStatus(name="unknown", value=asn1_core.Null())
+    elif status["revoked"]:
+        if status["revoked_date"] is None:
+            raise ValueError("Inconsistent model state: revoked=True and revoked_date=None.")
+
+        revoked_info = {"revocation_time": _as_utc(status["revoked_date"])}
+        if status["revoked_reason"]:
+            revoked_info["revocation_reason"] = status["revoked_reason"]
+        cert_status = asn1_ocsp.CertStatus(name="revoked", value=revoked_info)
+
+        if status["compromised"] is not None:
+            single_extensions.append(
+                {
+                    "extn_id": "invalidity_date",
+                    "critical": False,
+                    "extn_value": _as_utc(status["compromised"]),
+                }
+            )
+    else:
+        cert_status = asn1_ocsp.CertStatus(name="good", value=asn1_core.Null())
+
+    single_response = asn1_ocsp.SingleResponse(
+        {
+            "cert_id": {
+                "hash_algorithm": {"algorithm": algorithm.name, "parameters": asn1_core.Null()},
+                "issuer_name_hash": issuer_name_hash,
+                "issuer_key_hash": issuer_key_hash,
+                "serial_number": serial,
+            },
+            "cert_status": cert_status,
+            "this_update": _as_utc(now),
+            "next_update": _as_utc(expires),
+        }
+    )
+    if single_extensions:
+        single_response["single_extensions"] = single_extensions
+    return single_response
+
+
+def get_ocsp_response_validity(data: bytes) -> Optional[Tuple[datetime, datetime]]:
+    """Get the time when a DER encoded OCSP response was last updated and when it expires.
+
+    The function returns the latest ``thisUpdate`` and the earliest ``nextUpdate`` of all single responses.
+    ``None`` is returned if the response may not be cached by HTTP caches (see `RFC 5019`_, section 6),
+    because it was not successful, includes a nonce or does not have a ``nextUpdate``.
+    """
+    response = asn1_ocsp.OCSPResponse.load(data)
+    if response["response_status"].native != "successful" or response.nonce_value is not None:
+        return None
+
+    single_responses = response.basic_ocsp_response["tbs_response_data"]["responses"]
+    next_updates = [single_response["next_update"].native for single_response in single_responses]
+    if not next_updates or None in next_updates:
+        return None
+
+    this_update = max(single_response["this_update"].native for single_response in single_responses)
+    return this_update, min(next_updates)
+
+
+def sign_ocsp_response(
+    responses: Sequence[asn1_ocsp.SingleResponse],
+    responder_key: CertificateIssuerPrivateKeyTypes,
+    responder_cert: x509.Certificate,
+    now: datetime,
+    nonce: Optional[x509.Extension[OCSPNonce]] = None,
+) -> bytes:
+    """Create a signed OCSP response with the given single `responses` and return it as DER.
+
+    Single responses are created with :py:func:`~django_ca.ocsp.get_single_response`. All responses are
+    signed at once, no matter how many certificates were included in the request.
+    """
+    responder_key_hash, loaded_responder_cert = _get_responder_info(responder_cert)
+
+    response_data = asn1_ocsp.ResponseData(
+        {
+            "responder_id": asn1_ocsp.ResponderId(name="by_key", value=responder_key_hash),
+            "produced_at": _as_utc(now),
+            "responses": list(responses),
+        }
+    )
+
+    # Add OCSP nonce if present
+    if nonce is not None:
+        response_data["response_extensions"] = [
+            {"extn_id": "nonce", "critical": nonce.critical, "extn_value": nonce.value.nonce}
+        ]
+
+    # The hash algorithm may be different from the signature hash algorithm of the responder certificate,
+    # but must be None for Ed448/Ed25519 certificates. Since delegate certificates are ephemeral anyway,
+    # configuring the hash algorithm is not supported, instead the user is expected to generate new keys
+    # with a different private key type or hash algorithm if desired.
+    signature_hash_algorithm = responder_cert.signature_hash_algorithm
+    signature_algorithm = _get_signature_algorithm(responder_key, signature_hash_algorithm)
+    signature = _sign(responder_key, response_data.dump(), signature_hash_algorithm)
+    signature_algorithm_identifier: Dict[str, Any] = {"algorithm": signature_algorithm.dotted_string}
+    if isinstance(responder_key, rsa.RSAPrivateKey):
+        signature_algorithm_identifier["parameters"] = asn1_core.Null()
+
+    basic_response = asn1_ocsp.BasicOCSPResponse(
+        {
+            "tbs_response_data": response_data,
+            "signature_algorithm": signature_algorithm_identifier,
+            "signature": signature,
+            # Add the responder/delegate certificate to the response
+            "certs": [loaded_responder_cert],
+        }
+    )
+    response = asn1_ocsp.OCSPResponse(
+        {
+            "response_status": "successful",
+            "response_bytes": {"response_type": "basic_ocsp_response", "response": basic_response},
+        }
+    )
+    return typing.cast(bytes, response.dump())
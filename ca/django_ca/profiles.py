@@ -44,7 +44,7 @@ from django_ca.typehints import (
     SerializedProfile,
     SerializedPydanticName,
 )
-from django_ca.utils import merge_x509_names, parse_expires, x509_name
+from django_ca.utils import get_crl_partition, merge_x509_names, parse_expires, x509_name
 
 if typing.TYPE_CHECKING:
     from django_ca.models import CertificateAuthority
@@ -369,6 +369,11 @@ class Profile:
         kwargs = {"serial": context["SIGNER_SERIAL_HEX"]}
         context["OCSP_PATH"] = reverse("django_ca:ocsp-cert-post", kwargs=kwargs).lstrip("/")
         context["CRL_PATH"] = reverse("django_ca:crl", kwargs=kwargs).lstrip("/")
+
+        # Certificates are assigned to a CRL partition based on their serial (see CA_CRL_PARTITIONS)
+        partition = get_crl_partition(serial)
+        if partition is not None:
+            context["CRL_PARTITION"] = partition
         return context
 
     def get_expires(self, expires: Expires) -> datetime:
@@ -0,0 +1,163 @@
+# This file is part of django-ca (https://github.com/mathiasertl/django-ca).
+#
+# django-ca is free software: you can redistribute it and/or modify it under the terms of the GNU General
+# Public License as published by the Free Software Foundation, either version 3 of the License, or (at your
+# option) any later version.
+#
+# django-ca is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License
+# for more details.
+#
+# You should have received a copy of the GNU General Public License along with django-ca. If not, see
+# <http://www.gnu.org/licenses/>.
+
+"""Signal receivers used internally by django-ca.
+
+.. seealso:: https://docs.djangoproject.com/en/dev/topics/signals/
+"""
+
+from typing import Any, List, Optional, Type, Union
+
+from cryptography.hazmat.primitives.serialization import Encoding
+
+from django.core.cache import cache
+from django.core.files.storage import storages
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from django_ca import ca_settings, constants
+from django_ca.models import Certificate, CertificateAuthority
+from django_ca.ocsp import issuer_index, known_serials
+from django_ca.signals import post_revoke_cert
+from django_ca.tasks import cache_crl
+from django_ca.utils import (
+    get_crl_cache_key,
+    get_crl_published_cache_key,
+    get_crl_regeneration_cache_key,
+    get_crl_storage_path,
+    get_ocsp_response_cache_key,
+)
+
+
+def _get_ocsp_cache_keys(cert: Union[Certificate, CertificateAuthority]) -> List[str]:
+    """Get the cache keys of cached OCSP data for `cert`."""
+    if isinstance(cert, CertificateAuthority):
+        if cert.parent is None:  # root CAs are not included in any OCSP responses
+            return []
+        ca_serial, scope = cert.parent.serial, "ca"
+    else:
+        ca_serial, scope = cert.ca.serial, "cert"
+
+    return [
+        get_ocsp_response_cache_key(ca_serial, cert.serial, algorithm(), scope)
+        for algorithm in constants.OCSP_HASH_ALGORITHMS
+    ]
+
+
+@receiver(post_revoke_cert)
+def invalidate_ocsp_responses(
+    sender: Type[Union[Certificate, CertificateAuthority]],
+    cert: Union[Certificate, CertificateAuthority],
+    **kwargs: Any,
+) -> None:
+    """Remove cached OCSP responses for a certificate that was just revoked."""
+    cache.delete_many(_get_ocsp_cache_keys(cert))
+
+
+def _delete_crls(cache_keys: List[str], storage_paths: List[str]) -> None:
+    """Delete cached CRLs and CRLs published to the storage configured by ``CA_CRL_STORAGE_ALIAS``."""
+    cache.delete_many(cache_keys)
+    if ca_settings.CA_CRL_STORAGE_ALIAS is not None:
+        storage = storages[ca_settings.CA_CRL_STORAGE_ALIAS]
+        for path in storage_paths:
+            storage.delete(path)
+
+
+@receiver(post_revoke_cert)
+def regenerate_crls(
+    sender: Type[Union[Certificate, CertificateAuthority]],
+    cert: Union[Certificate, CertificateAuthority],
+    **kwargs: Any,
+) -> None:
+    """Schedule regeneration of the CRLs that include a certificate that was just revoked.
+
+    Only CRLs of the issuing certificate authority with a matching scope are regenerated. Further revocations
+    within the debounce window configured by ``CA_CRL_REGENERATE_ON_REVOKE`` do not schedule another
+    regeneration. If Celery is not used, the cached and published CRLs are removed instead, so that they are
+    regenerated by the next request.
+    """
+    debounce = ca_settings.CA_CRL_REGENERATE_ON_REVOKE
+    if debounce is None:
+        return
+
+    if isinstance(cert, CertificateAuthority):
+        if cert.parent is None:  # root CAs are not included in any CRL
+            return
+        serial, scopes = cert.parent.serial, ["ca", None]
+        partitions: List[Optional[int]] = [None]
+    else:
+        serial, scopes = cert.ca.serial, ["user", None]
+        partitions = [None, cert.crl_partition] if cert.crl_partition is not None else [None]
+
+    if ca_settings.CA_USE_CELERY is False:
+        crls = [
+            (encoding, scope, delta, partition)
+            for encoding in (Encoding.DER, Encoding.PEM)
+            for scope in scopes
+            for delta in (False, True)
+            for partition in partitions
+        ]
+        cache_keys = [
+            get_crl_cache_key(serial, encoding, scope=scope, delta=delta, partition=partition)
+            for encoding, scope, delta, partition in crls
+        ]
+        cache_keys += [get_crl_published_cache_key(cache_key) for cache_key in cache_keys]
+        storage_paths = [
+            get_crl_storage_path(serial, encoding, scope=scope, delta=delta, partition=partition)
+            for encoding, scope, delta, partition in crls
+        ]
+        transaction.on_commit(lambda: _delete_crls(cache_keys, storage_paths))
+        return
+
+    # Skip scopes where a regeneration is already scheduled
+    scopes = [
+        scope for scope in scopes if cache.add(get_crl_regeneration_cache_key(serial, scope), True, debounce)
+    ]
+    if scopes:
+        args = (serial, {"password": None})
+        transaction.on_commit(lambda: cache_crl.apply_async(args, {"scopes": scopes}, countdown=debounce))
+
+
+@receiver(post_save, sender=Certificate)
+@receiver(post_save, sender=CertificateAuthority)
+def invalidate_known_serials(
+    sender: Type[Union[Certificate, CertificateAuthority]],
+    instance: Union[Certificate, CertificateAuthority],
+    created: bool,
+    **kwargs: Any,
+) -> None:
+    """Make all processes add a new certificate to the filter of serials known to its issuer.
+
+    The filter is invalidated immediately and again when the transaction is committed, so that no process
+    updates the filter only before the new certificate is visible.
+    """
+    if created is False:
+        return
+
+    if isinstance(instance, CertificateAuthority):
+        if instance.parent is None:  # root CAs are not included in any OCSP responses
+            return
+        ca_serial, scope = instance.parent.serial, "ca"
+    else:
+        ca_serial, scope = instance.ca.serial, "cert"
+
+    known_serials.invalidate(ca_serial, scope)
+    transaction.on_commit(lambda: known_serials.invalidate(ca_serial, scope))
+
+
+@receiver(post_save, sender=CertificateAuthority)
+@receiver(post_delete, sender=CertificateAuthority)
+def invalidate_issuer_index(sender: Type[CertificateAuthority], **kwargs: Any) -> None:
+    """Invalidate the index used by the unified OCSP responder whenever a certificate authority changes."""
+    issuer_index.invalidate()
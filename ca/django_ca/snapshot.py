@@ -0,0 +1,510 @@
+# This file is part of django-ca (https://github.com/mathiasertl/django-ca).
+#
+# django-ca is free software: you can redistribute it and/or modify it under the terms of the GNU General
+# Public License as published by the Free Software Foundation, either version 3 of the License, or (at your
+# option) any later version.
+#
+# django-ca is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License
+# for more details.
+#
+# You should have received a copy of the GNU General Public License along with django-ca. If not, see
+# <http://www.gnu.org/licenses/>.
+
+"""Serve OCSP responses and CRLs from an exported revocation snapshot.
+
+A snapshot is a JSON document created by :command:`manage.py dump_snapshot`. It contains the revocation
+status of all certificates, the issuer hashes, the OCSP responder key and certificate and the latest cached
+CRLs (including delta CRLs and partitioned CRLs) of certificate authorities.
+:py:class:`~django_ca.snapshot.SnapshotResponder` is a minimal WSGI/ASGI application that serves OCSP
+responses and CRLs from such a snapshot. It does not require a database, a configured Django project or any
+other part of django-ca, so it can run on any number of nodes.
+
+The responder uses the same URL paths as django-ca itself (without the ``/django_ca/`` prefix, unless
+configured with `prefix`). The snapshot file is reloaded automatically when it changes, so it can be updated
+by atomically replacing the file.
+"""
+
+import base64
+import binascii
+import hashlib
+import itertools
+import json
+import logging
+import os
+import re
+import typing
+from datetime import datetime, timedelta, timezone as tz
+from http import HTTPStatus
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric.types import CertificateIssuerPrivateKeyTypes
+from cryptography.hazmat.primitives.serialization import Encoding
+from cryptography.x509 import ocsp
+
+from django.utils.http import http_date, quote_etag
+
+from django_ca.ocsp import (
+    PRECOMPUTED_ISSUER_HASH_ALGORITHMS,
+    CertificateID,
+    build_single_response,
+    compute_issuer_hashes,
+    get_ocsp_response_validity,
+    load_ocsp_request,
+    sign_ocsp_response,
+)
+
+if typing.TYPE_CHECKING:
+    from django_ca.models import CertificateAuthority
+
+log = logging.getLogger(__name__)
+
+#: Version of the snapshot format. Snapshots with a different version cannot be loaded.
+SNAPSHOT_VERSION = 1
+
+#: Scopes of CRLs included in a snapshot.
+CRL_SCOPES = ("user", "ca")
+
+_OCSP_PATH_RE = re.compile(r"^ocsp/(?:(?P<serial>[0-9A-F:]+)/)?(?P<scope>cert|ca)/(?P<data>[a-zA-Z0-9=+/]*)$")
+_CRL_PATH_RE = re.compile(
+    r"^crl/(?P<scope>ca/)?(?P<serial>[0-9A-F:]+)/(?:(?P<delta>delta/)|partition/(?P<partition>[0-9]+)/)?$"
+)
+_CRL_CONTENT_TYPES = {"DER": "application/pkix-crl", "PEM": "text/plain"}
+
+#: Type for a response of the responder: The HTTP status, a list of headers and the body.
+ResponseType = Tuple[int, List[Tuple[str, str]], bytes]
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii")
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    if value is None:
+        return None
+    return value.isoformat()
+
+
+def _parse_datetime(value: Optional[str]) -> Optional[datetime]:
+    if value is None:
+        return None
+    return datetime.fromisoformat(value)
+
+
+def _get_crl_name(scope: str, delta: bool = False, partition: Optional[int] = None) -> str:
+    """Get the name of a CRL in a snapshot (e.g. ``"user"``, ``"delta_user"`` or ``"user_0"``)."""
+    if partition is not None:
+        scope = f"{scope}_{partition}"
+    if delta is True:
+        return f"delta_{scope}"
+    return scope
+
+
+def _get_revocation_records(queryset: Any) -> Dict[str, Any]:
+    # NOTE: Only serials of certificates are stored for certificates that are not revoked
+    good: List[str] = []
+    revoked: Dict[str, List[Optional[str]]] = {}
+    statuses = queryset.values_list("serial", "revoked", "revoked_date", "revoked_reason", "compromised")
+    for serial, is_revoked, revoked_date, revoked_reason, compromised in statuses.iterator():
+        if is_revoked:
+            revoked[serial] = [_isoformat(revoked_date), revoked_reason, _isoformat(compromised)]
+        else:
+            good.append(serial)
+    return {"good": good, "revoked": revoked}
+
+
+def create_snapshot(cas: Iterable["CertificateAuthority"]) -> Dict[str, Any]:
+    """Create a revocation snapshot for the given certificate authorities.
+
+    The snapshot includes all certificates (and child certificate authorities) that are not yet expired,
+    the OCSP responder key and certificate created by :py:func:`~django_ca.tasks.generate_ocsp_key` and all
+    CRLs currently in the cache (see :py:func:`~django_ca.tasks.cache_crls`).
+
+    .. WARNING:: The snapshot contains the private keys of the OCSP responder certificates.
+    """
+    # pylint: disable=import-outside-toplevel  # this module must be importable without Django settings
+    from django_ca.utils import (
+        get_crl_cache_key,
+        get_crl_from_cache,
+        get_crl_validity,
+        parse_encoding,
+        read_file,
+    )
+
+    now = datetime.now(tz=tz.utc)
+    snapshot: Dict[str, Any] = {"version": SNAPSHOT_VERSION, "created": now.isoformat(), "cas": {}}
+
+    for ca in cas:
+        ca_data: Dict[str, Any] = {
+            "certificate": _b64encode(ca.pub.der),
+            "issuer_hashes": {},
+            "ocsp_response_validity": ca.ocsp_response_validity,
+            "responder": None,
+            "certificates": _get_revocation_records(ca.certificate_set.filter(expires__gt=now)),
+            "children": _get_revocation_records(ca.children.filter(expires__gt=now)),
+            "crls": {},
+        }
+
+        for algorithm_class in PRECOMPUTED_ISSUER_HASH_ALGORITHMS:
+            algorithm = algorithm_class()
+            issuer_name_hash, issuer_key_hash = compute_issuer_hashes(ca.pub.der, algorithm)
+            ca_data["issuer_hashes"][algorithm.name] = [issuer_name_hash.hex(), issuer_key_hash.hex()]
+
+        safe_serial = ca.serial.replace(":", "")
+        try:
+            ca_data["responder"] = {
+                "key": _b64encode(read_file(f"ocsp/{safe_serial}.key")),
+                "certificate": _b64encode(ca.ocsp_responder_certificate.public_bytes(Encoding.DER)),
+            }
+        except FileNotFoundError:
+            log.warning("%s: CA has no OCSP responder key, OCSP is not available.", ca.serial)
+
+        for scope in CRL_SCOPES:
+            # Delta CRLs and partitioned CRLs are included if they are cached, just like complete CRLs.
+            variants: List[Tuple[bool, Optional[int]]] = [(False, None), (True, None)]
+            if scope == "user":
+                variants += [(False, partition) for partition in ca.get_crl_partitions(now)]
+
+            for (delta, partition), encoding_name in itertools.product(variants, _CRL_CONTENT_TYPES):
+                cache_key = get_crl_cache_key(
+                    ca.serial, parse_encoding(encoding_name), scope=scope, delta=delta, partition=partition
+                )
+                crl = get_crl_from_cache(cache_key)
+                if crl is None:
+                    continue
+
+                this_update, next_update = get_crl_validity(crl)
+                crl_name = _get_crl_name(scope, delta=delta, partition=partition)
+                ca_data["crls"].setdefault(crl_name, {})[encoding_name] = {
+                    "data": _b64encode(crl),
+                    "this_update": _isoformat(this_update),
+                    "next_update": _isoformat(next_update),
+                }
+
+        snapshot["cas"][ca.serial] = ca_data
+
+    return snapshot
+
+
+class SnapshotCertificateAuthority:
+    """A certificate authority as loaded from a snapshot."""
+
+    def __init__(self, serial: str, data: Dict[str, Any]) -> None:
+        self.serial = serial
+        self.certificate = base64.b64decode(data["certificate"])
+        self.ocsp_response_validity: int = data["ocsp_response_validity"]
+        self.issuer_hashes: Dict[str, Tuple[bytes, bytes]] = {
+            name: (bytes.fromhex(name_hash), bytes.fromhex(key_hash))
+            for name, (name_hash, key_hash) in data["issuer_hashes"].items()
+        }
+        self.records = {
+            scope: {"good": set(records["good"]), "revoked": records["revoked"]}
+            for scope, records in (("cert", data["certificates"]), ("ca", data["children"]))
+        }
+        self.crls: Dict[str, Dict[str, Dict[str, Any]]] = data["crls"]
+
+        self.responder: Optional[Tuple[CertificateIssuerPrivateKeyTypes, x509.Certificate]] = None
+        if data["responder"] is not None:
+            responder_key = serialization.load_der_private_key(
+                base64.b64decode(data["responder"]["key"]), None
+            )
+            responder_cert = x509.load_der_x509_certificate(
+                base64.b64decode(data["responder"]["certificate"])
+            )
+            self.responder = (typing.cast(CertificateIssuerPrivateKeyTypes, responder_key), responder_cert)
+
+    def get_issuer_hashes(self, algorithm: hashes.HashAlgorithm) -> Tuple[bytes, bytes]:
+        """Get the issuer name hash and issuer key hash, computing them if not included in the snapshot."""
+        if algorithm.name not in self.issuer_hashes:
+            self.issuer_hashes[algorithm.name] = compute_issuer_hashes(self.certificate, algorithm)
+        return self.issuer_hashes[algorithm.name]
+
+    def get_status(self, scope: str, serial: str) -> Optional[Dict[str, Any]]:
+        """Get the status of a certificate as used by :py:func:`~django_ca.ocsp.build_single_response`.
+
+        ``None`` is returned if the certificate is not included in the snapshot, so that the response has the
+        status "unknown".
+        """
+        records = self.records[scope]
+        revoked = records["revoked"].get(serial)
+        if revoked is not None:
+            revoked_date, revoked_reason, compromised = revoked
+            return {
+                "revoked": True,
+                "revoked_date": _parse_datetime(revoked_date),
+                "revoked_reason": revoked_reason,
+                "compromised": _parse_datetime(compromised),
+            }
+        if serial in records["good"]:
+            return {"revoked": False, "revoked_date": None, "revoked_reason": "", "compromised": None}
+        return None
+
+
+class Snapshot:
+    """A revocation snapshot loaded from a file created by :command:`manage.py dump_snapshot`."""
+
+    def __init__(self, data: Dict[str, Any]) -> None:
+        if data.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"{data.get('version')}: Unsupported snapshot version.")
+
+        self.created = datetime.fromisoformat(data["created"])
+        self.cas = {serial: SnapshotCertificateAuthority(serial, ca) for serial, ca in data["cas"].items()}
+
+    @classmethod
+    def load(cls, path: str) -> "Snapshot":
+        """Load a snapshot from the file at `path`."""
+        with open(path, "rb") as stream:
+            return cls(json.load(stream))
+
+    def get_ca(self, cert_id: CertificateID) -> Optional[SnapshotCertificateAuthority]:
+        """Get the certificate authority that issued the certificate identified by `cert_id`."""
+        issuer_hashes = (cert_id.issuer_name_hash, cert_id.issuer_key_hash)
+        for ca in self.cas.values():
+            if ca.get_issuer_hashes(cert_id.algorithm) == issuer_hashes:
+                return ca
+        return None
+
+
+class SnapshotResponder:
+    """WSGI/ASGI application serving OCSP responses and CRLs from a snapshot.
+
+    Use an instance as WSGI application and the :py:meth:`~django_ca.snapshot.SnapshotResponder.asgi` method
+    as ASGI application::
+
+        from django_ca.snapshot import SnapshotResponder
+
+        responder = SnapshotResponder("/var/lib/django-ca/snapshot.json")
+        application = responder  # WSGI
+        application = responder.asgi  # ASGI
+
+    The `prefix` is stripped from the request path, set it to ``"django_ca/"`` if the responder is not
+    mounted at a different location by the web server.
+
+    OCSP responses are valid from the time the snapshot was created for the OCSP response validity of the
+    certificate authority, as certificates may have been revoked since. Once the snapshot is older than
+    `max_age` seconds (by default, the OCSP response validity of the certificate authority), OCSP requests are
+    answered with the "tryLater" status.
+    """
+
+    def __init__(self, path: str, prefix: str = "", max_age: Optional[int] = None) -> None:
+        self.path = path
+        self.prefix = prefix.strip("/")
+        self.max_age = max_age
+        self._mtime: Optional[float] = None
+        self._snapshot: Optional[Snapshot] = None
+
+    @property
+    def snapshot(self) -> Snapshot:
+        """The currently loaded snapshot, reloaded if the file was modified."""
+        mtime = os.stat(self.path).st_mtime
+        if self._snapshot is None or mtime != self._mtime:
+            self._snapshot = Snapshot.load(self.path)
+            self._mtime = mtime
+        return self._snapshot
+
+    def _ocsp_response(self, data: bytes, ocsp_scope: str, serial: Optional[str]) -> bytes:
+        try:
+            cert_ids, nonce = load_ocsp_request(data)
+        except ValueError as ex:
+            log.exception(ex)
+            return _unsuccessful_ocsp_response(ocsp.OCSPResponseStatus.MALFORMED_REQUEST)
+
+        snapshot = self.snapshot
+        if serial is None:
+            cas = {snapshot.get_ca(cert_id) for cert_id in cert_ids}
+            ca = cas.pop() if len(cas) == 1 else None
+        else:
+            ca = snapshot.cas.get(serial)
+        if ca is None or ca.responder is None:
+            if serial is None:
+                serial = ", ".join(sorted({cert_id.issuer_key_hash.hex() for cert_id in cert_ids}))
+            log.error("%s: Certificate Authority could not be found.", serial)
+            return _unsuccessful_ocsp_response()
+
+        now = datetime.now(tz=tz.utc)
+        max_age = ca.ocsp_response_validity if self.max_age is None else self.max_age
+        if now - snapshot.created >= timedelta(seconds=max_age):
+            log.error("%s: Snapshot is outdated, cannot create OCSP responses.", snapshot.created.isoformat())
+            return _unsuccessful_ocsp_response(ocsp.OCSPResponseStatus.TRY_LATER)
+
+        # Responses are only valid for the certificate status at the time the snapshot was created
+        this_update = snapshot.created
+        expires = this_update + timedelta(seconds=ca.ocsp_response_validity)
+        responses = []
+        for cert_id in cert_ids:
+            cert_serial = f"{cert_id.serial_number:X}"
+            status = ca.get_status(ocsp_scope, cert_serial)
+            if status is None:
+                log.debug("%s: OCSP request for unknown %s received.", cert_serial, ocsp_scope)
+
+            issuer_hashes = ca.get_issuer_hashes(cert_id.algorithm)
+            responses.append(
+                build_single_response(
+                    issuer_hashes, cert_id.serial_number, cert_id.algorithm, status, this_update, expires
+                )
+            )
+
+        responder_key, responder_cert = ca.responder
+        return sign_ocsp_response(responses, responder_key, responder_cert, now, nonce=nonce)
+
+    def _crl_response(
+        self, environ_headers: Dict[str, str], query_string: str, **kwargs: Optional[str]
+    ) -> ResponseType:
+        encoding = parse_qs(query_string).get("encoding", ["DER"])[-1].upper()
+        partition = None if kwargs["partition"] is None else int(kwargs["partition"])
+        crl_name = _get_crl_name(
+            "ca" if kwargs["scope"] else "user", delta=kwargs["delta"] is not None, partition=partition
+        )
+        ca = self.snapshot.cas.get(typing.cast(str, kwargs["serial"]).replace(":", ""))
+        if ca is None or encoding not in ca.crls.get(crl_name, {}):
+            return HTTPStatus.NOT_FOUND, [], b""
+
+        crl = ca.crls[crl_name][encoding]
+        content = base64.b64decode(crl["data"])
+        this_update = typing.cast(datetime, _parse_datetime(crl["this_update"]))
+        headers = [("Content-Type", _CRL_CONTENT_TYPES[encoding])]
+        return _add_caching_headers(
+            environ_headers, HTTPStatus.OK, headers, content, this_update, _parse_datetime(crl["next_update"])
+        )
+
+    def respond(  # noqa: PLR0911  # pylint: disable=too-many-return-statements
+        self, method: str, path: str, query_string: str, headers: Dict[str, str], body: bytes
+    ) -> ResponseType:
+        """Get the response for a request, independent of WSGI or ASGI.
+
+        `headers` are the request headers, with lower-case names.
+        """
+        path = path.lstrip("/")
+        if self.prefix:
+            if not path.startswith(f"{self.prefix}/"):
+                return HTTPStatus.NOT_FOUND, [], b""
+            path = path[len(self.prefix) + 1 :]
+
+        if match := _CRL_PATH_RE.match(path):
+            if method != "GET":
+                return HTTPStatus.METHOD_NOT_ALLOWED, [("Allow", "GET")], b""
+            return self._crl_response(headers, query_string, **match.groupdict())
+
+        match = _OCSP_PATH_RE.match(path)
+        if match is None:
+            return HTTPStatus.NOT_FOUND, [], b""
+
+        data = match.group("data")
+        serial = match.group("serial")
+        if serial is not None:
+            serial = serial.replace(":", "")
+
+        ocsp_headers = [("Content-Type", "application/ocsp-response")]
+        if method == "POST" and not data:
+            return HTTPStatus.OK, ocsp_headers, self._ocsp_response(body, match.group("scope"), serial)
+        if method != "GET" or not data:
+            return HTTPStatus.METHOD_NOT_ALLOWED, [("Allow", "POST" if not data else "GET")], b""
+
+        try:
+            decoded_data = base64.b64decode(data)
+        except binascii.Error:
+            return (
+                HTTPStatus.OK,
+                ocsp_headers,
+                _unsuccessful_ocsp_response(ocsp.OCSPResponseStatus.MALFORMED_REQUEST),
+            )
+
+        content = self._ocsp_response(decoded_data, match.group("scope"), serial)
+
+        # Only responses to GET requests may be cached by HTTP caches (RFC 5019, section 5)
+        validity = get_ocsp_response_validity(content)
+        if validity is None:
+            return HTTPStatus.OK, ocsp_headers, content
+        return _add_caching_headers(headers, HTTPStatus.OK, ocsp_headers, content, *validity)
+
+    def __call__(self, environ: Dict[str, Any], start_response: typing.Callable[..., Any]) -> Iterable[bytes]:
+        headers = {
+            key[5:].replace("_", "-").lower(): value
+            for key, value in environ.items()
+            if key.startswith("HTTP_")
+        }
+        try:
+            length = int(environ.get("CONTENT_LENGTH") or 0)
+        except ValueError:
+            length = 0
+        body = environ["wsgi.input"].read(length) if length > 0 else b""
+
+        status, response_headers, content = self.respond(
+            environ["REQUEST_METHOD"],
+            environ.get("PATH_INFO", ""),
+            environ.get("QUERY_STRING", ""),
+            headers,
+            body,
+        )
+        response_headers.append(("Content-Length", str(len(content))))
+        start_response(f"{status.value} {status.phrase}", response_headers)
+        return [content]
+
+    async def asgi(
+        self,
+        scope: Dict[str, Any],
+        receive: typing.Callable[[], typing.Awaitable[Dict[str, Any]]],
+        send: typing.Callable[[Dict[str, Any]], typing.Awaitable[None]],
+    ) -> None:
+        """ASGI application serving OCSP responses and CRLs."""
+        if scope["type"] != "http":  # pragma: no cover  # lifespan events etc. are not supported
+            return
+
+        body = b""
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+        headers = {
+            name.decode("latin-1").lower(): value.decode("latin-1") for name, value in scope["headers"]
+        }
+        status, response_headers, content = self.respond(
+            scope["method"], scope["path"], scope["query_string"].decode("latin-1"), headers, body
+        )
+        response_headers.append(("Content-Length", str(len(content))))
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status.value,
+                "headers": [
+                    (name.lower().encode("latin-1"), value.encode("latin-1"))
+                    for name, value in response_headers
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": content})
+
+
+def _unsuccessful_ocsp_response(
+    status: ocsp.OCSPResponseStatus = ocsp.OCSPResponseStatus.INTERNAL_ERROR,
+) -> bytes:
+    return ocsp.OCSPResponseBuilder.build_unsuccessful(status).public_bytes(Encoding.DER)
+
+
+def _add_caching_headers(
+    request_headers: Dict[str, str],
+    status: HTTPStatus,
+    headers: List[Tuple[str, str]],
+    content: bytes,
+    last_modified: datetime,
+    expires: Optional[datetime],
+) -> ResponseType:
+    """Add HTTP caching headers, as done by the views for OCSP responses and CRLs."""
+    etag = quote_etag(hashlib.sha256(content).hexdigest())
+    headers += [("ETag", etag), ("Last-Modified", http_date(last_modified.timestamp()))]
+    if expires is not None:  # pragma: no branch  # CRLs created by django-ca always have a nextUpdate
+        max_age = max(int((expires - datetime.now(tz=tz.utc)).total_seconds()), 0)
+        headers += [
+            ("Expires", http_date(expires.timestamp())),
+            ("Cache-Control", f"public, max-age={max_age}, no-transform, must-revalidate"),
+        ]
+
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return HTTPStatus.NOT_MODIFIED, headers, b""
+    return status, headers, content
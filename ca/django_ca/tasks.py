@@ -18,6 +18,7 @@
 
 import logging
 import typing
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone as tz
 from http import HTTPStatus
 from typing import Any, Dict, Iterable, List, Optional, Tuple
@@ -28,7 +29,9 @@ from cryptography import x509
 from cryptography.hazmat.primitives.asymmetric import ec
 from cryptography.x509.oid import ExtensionOID
 
-from django.db import transaction
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models import QuerySet
 from django.utils import timezone
 
 from django_ca import ca_settings, constants
@@ -43,6 +46,12 @@ from django_ca.models import (
     CertificateAuthority,
     CertificateOrder,
 )
+from django_ca.ocsp import (
+    CERTIFICATE_STATUS_FIELDS,
+    get_single_response,
+    load_responder_key,
+    sign_ocsp_response,
+)
 from django_ca.profiles import profiles
 from django_ca.pydantic.messages import SignCertificateMessage
 from django_ca.typehints import (
@@ -53,7 +62,12 @@ from django_ca.typehints import (
     SerializedPydanticExtension,
     SerializedPydanticName,
 )
-from django_ca.utils import parse_general_name
+from django_ca.utils import (
+    get_crl_regeneration_cache_key,
+    get_ocsp_response_cache_key,
+    parse_general_name,
+    read_file,
+)
 
 log = logging.getLogger(__name__)
 
@@ -84,18 +98,50 @@ def run_task(task: "Proxy[FuncTypeVar]", *args: Any, **kwargs: Any) -> Any:
 
 
 @shared_task
-def cache_crl(serial: str, key_backend_options: Dict[str, Any]) -> None:
-    """Task to cache the CRL for a given CA."""
+def cache_crl(
+    serial: str,
+    key_backend_options: Dict[str, Any],
+    scopes: Optional[List[Optional[str]]] = None,
+    force: bool = False,
+) -> None:
+    """Task to cache the CRL for a given CA.
+
+    If `scopes` is given, only CRLs with the given scopes are cached. This is used when CRLs are regenerated
+    after a certificate was revoked (see :ref:`CA_CRL_REGENERATE_ON_REVOKE
+    <settings-ca-crl-regenerate-on-revoke>`). Unless `force` is ``True``, CRLs are only regenerated if
+    they changed or are about to expire.
+    """
+    if scopes is not None:
+        # Revocations from now on have to schedule another regeneration
+        cache.delete_many([get_crl_regeneration_cache_key(serial, scope) for scope in scopes])
+
     ca = CertificateAuthority.objects.get(serial=serial)
     key_backend_options_model = ca.key_backend.use_model.model_validate(
         key_backend_options, context={"ca": ca}
     )
-    ca.cache_crls(key_backend_options_model)
+    ca.cache_crls(key_backend_options_model, scopes=scopes, force=force)
+
+
+def _cache_crl_in_thread(serial: str, force: bool) -> None:
+    """Cache the CRLs for a CA in a thread of the thread pool used by :py:func:`cache_crls`."""
+    try:
+        cache_crl(serial, {"password": None}, force=force)
+    finally:
+        connections.close_all()  # every thread has its own database connections
 
 
 @shared_task
-def cache_crls(serials: Optional[Iterable[str]] = None) -> None:
-    """Task to cache the CRLs for all CAs."""
+def cache_crls(serials: Optional[Iterable[str]] = None, force: bool = False, jobs: int = 1) -> List[str]:
+    """Task to cache the CRLs for all CAs.
+
+    If Celery is used, a separate task is scheduled for every certificate authority and `jobs` is ignored.
+    Otherwise, CRLs are generated in a pool of `jobs` threads. An error for one certificate authority is
+    logged and does not affect any other certificate authority.
+
+    Without Celery, the task returns the serials of all certificate authorities where CRLs could not be
+    cached. With Celery, the task always returns an empty list, as errors only occur in the scheduled tasks
+    and are reported by Celery like for any other failed task.
+    """
     if serials is None:  # pragma: no cover; just to make mypy happy
         serials = []
 
@@ -104,9 +150,29 @@ def cache_crls(serials: Optional[Iterable[str]] = None) -> None:
             Iterable[str], CertificateAuthority.objects.usable().values_list("serial", flat=True)
         )
 
-    for serial in serials:
-        # TODO: ability for task to pass options for each
-        run_task(cache_crl, serial, {"password": None})
+    if ca_settings.CA_USE_CELERY is True:
+        # Do not wait for the results of scheduled tasks, as this would block a Celery worker.
+        for serial in serials:
+            run_task(cache_crl, serial, {"password": None}, force=force)
+        return []
+
+    errors: Dict[str, Exception] = {}
+    if jobs > 1:
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            futures = {serial: executor.submit(_cache_crl_in_thread, serial, force) for serial in serials}
+        for serial, future in futures.items():
+            if (exception := future.exception()) is not None:
+                errors[serial] = exception
+    else:
+        for serial in serials:
+            try:
+                cache_crl(serial, {"password": None}, force=force)
+            except Exception as ex:  # pylint: disable=broad-exception-caught  # errors are logged below
+                errors[serial] = ex
+
+    for serial, exception in errors.items():
+        log.error("%s: Could not cache CRLs: %s", serial, exception)
+    return list(errors)
 
 
 @shared_task
@@ -174,6 +240,89 @@ def generate_ocsp_keys(**kwargs: Any) -> List[Optional[Tuple[str, str, int]]]:
     return keys
 
 
+@shared_task
+def generate_ocsp_responses(
+    serial: str, algorithms: Iterable[str] = ("sha1", "sha256"), chunk_size: int = 1000
+) -> int:
+    """Task to sign OCSP responses for all currently valid certificates of the CA named by `serial`.
+
+    Responses are signed with the key generated by :py:func:`~django_ca.tasks.generate_ocsp_key` and stored
+    in the cache, where :py:class:`~django_ca.views.GenericOCSPView` serves them for requests without a nonce
+    (see :rfc:`5019`). Responses are generated for every hash algorithm named in `algorithms`, as clients
+    identify the certificate using a hash algorithm of their choice. Certificates are read from the database
+    in chunks of `chunk_size` certificates using a server-side cursor, so large CAs do not have to be loaded
+    into memory at once.
+
+    The task returns the number of responses generated. Since cached responses are valid for half the
+    OCSP response validity of the CA, the task should be scheduled to run more often than that.
+    """
+    ca: CertificateAuthority = CertificateAuthority.objects.get(serial=serial)
+    hash_algorithms = {
+        algorithm.name: algorithm for algorithm in (a() for a in constants.OCSP_HASH_ALGORITHMS)
+    }
+    parsed_algorithms = [hash_algorithms[name] for name in algorithms]
+
+    safe_serial = ca.serial.replace(":", "")
+    responder_key = load_responder_key(read_file(f"ocsp/{safe_serial}.key"))
+    responder_cert = ca.ocsp_responder_certificate
+
+    now = datetime.now(tz=tz.utc)
+    expires = now + timedelta(seconds=ca.ocsp_response_validity)
+    timeout = int(ca.ocsp_response_validity / 2)
+
+    querysets: List[Tuple[str, "QuerySet[Any]"]] = [
+        ("cert", ca.certificate_set.filter(expires__gt=now, valid_from__lt=now)),
+        ("ca", ca.children.filter(expires__gt=now, valid_from__lt=now)),
+    ]
+
+    count = 0
+    for scope, queryset in querysets:
+        responses: Dict[str, Tuple[int, bytes]] = {}
+        unrevoked: Dict[str, List[str]] = {}  # cache keys of "good" responses by serial
+        statuses = queryset.values("serial", *CERTIFICATE_STATUS_FIELDS)
+        for status in statuses.iterator(chunk_size=chunk_size):
+            for algorithm in parsed_algorithms:
+                cache_key = get_ocsp_response_cache_key(ca.serial, status["serial"], algorithm, scope)
+                single_response = get_single_response(
+                    ca, int(status["serial"], 16), algorithm, status, now, expires
+                )
+                encoded_response = sign_ocsp_response([single_response], responder_key, responder_cert, now)
+                responses[cache_key] = (responder_cert.serial_number, encoded_response)
+                if status["revoked"] is False:
+                    unrevoked.setdefault(status["serial"], []).append(cache_key)
+
+            if len(responses) >= chunk_size:
+                count += _set_ocsp_responses(queryset, responses, unrevoked, timeout)
+                responses, unrevoked = {}, {}
+
+        count += _set_ocsp_responses(queryset, responses, unrevoked, timeout)
+
+    return count
+
+
+def _set_ocsp_responses(
+    queryset: "QuerySet[Any]",
+    responses: Dict[str, Tuple[int, bytes]],
+    unrevoked: Dict[str, List[str]],
+    timeout: int,
+) -> int:
+    """Store signed OCSP responses in the cache, return the number of responses stored.
+
+    A certificate might be revoked after its status was read. Revoking a certificate removes cached responses
+    only after updating the database, so the status is checked again *after* storing responses, and responses
+    for certificates that were revoked in the meantime are removed again.
+    """
+    if not responses:
+        return 0
+    cache.set_many(responses, timeout)
+
+    revoked = queryset.filter(serial__in=list(unrevoked), revoked=True).values_list("serial", flat=True)
+    stale_keys = [cache_key for serial in revoked for cache_key in unrevoked[serial]]
+    if stale_keys:
+        cache.delete_many(stale_keys)
+    return len(responses) - len(stale_keys)
+
+
 @shared_task
 @transaction.atomic
 def sign_certificate(
@@ -18,7 +18,7 @@ import re
 import typing
 from contextlib import contextmanager
 from datetime import datetime, timedelta, timezone as tz
-from typing import AnyStr, Iterable, Iterator, List, Optional, Tuple, Type, Union
+from typing import AnyStr, Dict, Iterable, Iterator, List, Optional, Tuple, Type, Union
 from unittest.mock import Mock
 
 from cryptography import x509
@@ -75,7 +75,7 @@ def assert_ca_properties(
     acme_enabled: bool = False,
     acme_profile: Optional[str] = None,
     acme_requires_contact: bool = True,
-    crl_number: str = '{"scope": {}}',
+    crl_numbers: Optional[Dict[str, int]] = None,
     password: Optional[bytes] = None,
 ) -> None:
     """Assert some basic properties of a CA."""
@@ -87,7 +87,7 @@ def assert_ca_properties(
     assert ca.name == name
     assert ca.enabled is True
     assert ca.parent == parent
-    assert ca.crl_number == crl_number
+    assert dict(ca.crl_counters.values_list("counter", "number")) == (crl_numbers or {})
 
     # Test ACME properties
     assert ca.acme_enabled is acme_enabled
@@ -24,7 +24,7 @@ import pytest
 from pytest_django.fixtures import SettingsWrapper
 
 from django_ca.models import Certificate, CertificateAuthority
-from django_ca.tests.base.assertions import assert_crl
+from django_ca.tests.base.assertions import assert_command_error, assert_crl
 from django_ca.tests.base.constants import CERT_DATA, TIMESTAMPS
 from django_ca.tests.base.utils import cmd, get_idp, idp_full_name, uri
 from django_ca.utils import get_crl_cache_key
@@ -111,3 +111,34 @@ def test_with_serial_with_empty_crl(usable_ca: CertificateAuthority) -> None:
     assert stdout == ""
     assert stderr == ""
     assert_crl_by_ca(usable_ca)
+
+
+def test_force(usable_root: CertificateAuthority) -> None:
+    """Test forcing regeneration of unchanged CRLs."""
+    key = get_crl_cache_key(usable_root.serial, Encoding.DER, "user")
+    cmd("cache_crls", usable_root.serial)
+    crl = cache.get(key)
+
+    cmd("cache_crls", usable_root.serial)
+    assert cache.get(key) == crl  # CRL did not change, so it was not regenerated
+
+    stdout, stderr = cmd("cache_crls", usable_root.serial, force=True)
+    assert stdout == ""
+    assert stderr == ""
+    assert cache.get(key) != crl
+
+
+def test_with_error(
+    settings: SettingsWrapper, usable_root: CertificateAuthority, usable_pwd: CertificateAuthority
+) -> None:
+    """Test that errors for a CA are reported after generating CRLs for all other CAs."""
+    settings.CA_PASSWORDS = {}
+    with assert_command_error(rf"^Could not cache CRLs for {usable_pwd.serial}\.$"):
+        cmd("cache_crls", usable_pwd.serial, usable_root.serial)
+    assert cache.get(get_crl_cache_key(usable_root.serial, Encoding.DER, "user")) is not None
+
+
+def test_invalid_jobs(usable_root: CertificateAuthority) -> None:
+    """Test passing an invalid number of jobs."""
+    with assert_command_error(r"^0: Number of jobs must be at least 1\.$"):
+        cmd("cache_crls", usable_root.serial, jobs=0)
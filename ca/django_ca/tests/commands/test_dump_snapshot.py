@@ -0,0 +1,64 @@
+# This file is part of django-ca (https://github.com/mathiasertl/django-ca).
+#
+# django-ca is free software: you can redistribute it and/or modify it under the terms of the GNU General
+# Public License as published by the Free Software Foundation, either version 3 of the License, or (at your
+# option) any later version.
+#
+# django-ca is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License
+# for more details.
+#
+# You should have received a copy of the GNU General Public License along with django-ca. If not, see
+# <http://www.gnu.org/licenses/>.
+
+"""Test the dump_snapshot management command."""
+
+import json
+import os
+import stat
+from pathlib import Path
+
+import pytest
+
+from django_ca.models import CertificateAuthority
+from django_ca.tests.base.assertions import assert_command_error
+from django_ca.tests.base.constants import TIMESTAMPS
+from django_ca.tests.base.utils import cmd
+
+pytestmark = [pytest.mark.freeze_time(TIMESTAMPS["everything_valid"])]
+
+
+def test_stdout(root: CertificateAuthority, child: CertificateAuthority) -> None:
+    """Test writing a snapshot of all CAs to stdout."""
+    stdout, stderr = cmd("dump_snapshot")
+    assert stderr == ""
+    snapshot = json.loads(stdout)
+    assert snapshot["version"] == 1
+    assert list(snapshot["cas"]) == [root.serial, child.serial]
+    assert snapshot["cas"][root.serial]["children"]["good"] == [child.serial]
+
+
+def test_file(tmp_path: Path, root: CertificateAuthority, child: CertificateAuthority) -> None:
+    """Test writing a snapshot of a single CA to a file."""
+    path = tmp_path / "snapshot.json"
+    stdout, stderr = cmd("dump_snapshot", str(path), serials=[child.serial])
+    assert stdout == ""
+    assert stderr == ""
+
+    with open(path, encoding="utf-8") as stream:
+        snapshot = json.load(stream)
+    assert list(snapshot["cas"]) == [child.serial]
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    assert os.listdir(tmp_path) == ["snapshot.json"]  # temporary file was renamed
+
+
+def test_unknown_ca(root: CertificateAuthority) -> None:
+    """Test passing an unknown CA."""
+    with assert_command_error(r"^AB:CD, EF: Unknown CA\.$"):
+        cmd("dump_snapshot", serials=[root.serial, "AB:CD", "EF"])
+
+
+def test_unwritable_path(tmp_path: Path, root: CertificateAuthority) -> None:
+    """Test writing to a directory that does not exist."""
+    with assert_command_error(r"No such file or directory"):
+        cmd("dump_snapshot", str(tmp_path / "foo" / "snapshot.json"))
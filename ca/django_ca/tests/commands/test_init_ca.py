@@ -171,7 +171,7 @@ def test_basic(
 ) -> None:
     """Basic tests for the command."""
     ca = init_ca_e2e(ca_name, rfc4514_subject, "--subject-format=rfc4514")
-    assert_ca_properties(ca, ca_name, crl_number='{"scope": {"user": 1, "ca": 1}}')
+    assert_ca_properties(ca, ca_name, crl_numbers={"user": 1, "ca": 1})
     assert_certificate(ca, subject)
 
     # test the private key
@@ -0,0 +1,132 @@
+# This file is part of django-ca (https://github.com/mathiasertl/django-ca).
+#
+# django-ca is free software: you can redistribute it and/or modify it under the terms of the GNU General
+# Public License as published by the Free Software Foundation, either version 3 of the License, or (at your
+# option) any later version.
+#
+# django-ca is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License
+# for more details.
+#
+# You should have received a copy of the GNU General Public License along with django-ca. If not, see
+# <http://www.gnu.org/licenses/>.
+
+"""Test the signer_daemon management command."""
+
+import os
+import socket
+import stat
+import tempfile
+from typing import Iterator, List
+from unittest import mock
+
+import pytest
+from pytest_django.fixtures import SettingsWrapper
+
+from django_ca import ca_settings
+from django_ca.key_backends import key_backends
+from django_ca.tests.base.assertions import assert_command_error
+from django_ca.tests.base.utils import cmd
+
+SIGNER_BACKEND = "django_ca.key_backends.signer.SignerBackend"
+
+
+@pytest.fixture()
+def socket_path(settings: SettingsWrapper) -> Iterator[str]:
+    """Fixture to configure a signer key backend, returns the path to the socket."""
+    # NOTE: Do not use tmp_path, as paths of Unix sockets are limited to 108 characters.
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "signer.sock")
+        settings.CA_KEY_BACKENDS = {
+            ca_settings.CA_DEFAULT_KEY_BACKEND: {
+                "BACKEND": "django_ca.key_backends.storages.StoragesBackend",
+                "OPTIONS": {"storage_alias": "django-ca"},
+            },
+            "signer": {
+                "BACKEND": SIGNER_BACKEND,
+                "OPTIONS": {"storage_alias": "django-ca", "socket_path": path},
+            },
+        }
+        key_backends._reset()  # pylint: disable=protected-access
+        yield path
+        key_backends._reset()  # pylint: disable=protected-access
+
+
+def test_daemon(socket_path: str) -> None:
+    """Test running the daemon (without actually starting worker processes)."""
+    # Create a stale socket (nobody is listening on it) that is removed by the daemon
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.bind(socket_path)
+
+    modes: List[int] = []
+    bind_modes: List[int] = []
+
+    def join(process: object) -> None:
+        modes.append(stat.S_IMODE(os.stat(socket_path).st_mode))
+
+    def bind(sock: socket.socket, address: str) -> None:
+        original_bind(sock, address)
+        bind_modes.append(stat.S_IMODE(os.stat(address).st_mode))
+
+    original_bind = socket.socket.bind
+    umask = os.umask(0o022)
+    try:
+        with mock.patch("multiprocessing.context.ForkProcess.start", autospec=True) as start_mock, mock.patch(
+            "multiprocessing.context.ForkProcess.join", autospec=True, side_effect=join
+        ), mock.patch("multiprocessing.context.ForkProcess.terminate", autospec=True), mock.patch.object(
+            socket.socket, "bind", bind
+        ):
+            stdout, stderr = cmd("signer_daemon", workers=2, mode=0o640)
+    finally:
+        restored_umask = os.umask(umask)
+
+    assert restored_umask == 0o022
+
+    assert stdout == f"Listening on {socket_path} with 2 worker processes.\n"
+    assert stderr == ""
+    assert start_mock.call_count == 2
+    assert bind_modes == [0o640]  # socket was created with the right mode, not changed afterwards
+    assert modes == [0o640, 0o640]
+    assert not os.path.exists(socket_path)
+
+
+def test_socket_path_is_not_a_socket(socket_path: str) -> None:
+    """Test that the daemon does not remove a regular file at the socket path."""
+    with open(socket_path, "w", encoding="utf-8"):
+        pass
+
+    with assert_command_error(rf"^{socket_path}: File exists and is not a socket\.$"):
+        cmd("signer_daemon")
+    assert os.path.isfile(socket_path)
+
+
+def test_daemon_is_running(socket_path: str) -> None:
+    """Test that the daemon does not remove the socket of a daemon that is still running."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.bind(socket_path)
+        sock.listen()
+
+        with assert_command_error(rf"^{socket_path}: Another signer daemon is listening on this socket\.$"):
+            cmd("signer_daemon")
+        assert stat.S_ISSOCK(os.stat(socket_path).st_mode)
+
+
+def test_invalid_workers(socket_path: str) -> None:
+    """Test passing an invalid number of workers."""
+    with assert_command_error(r"^0: Number of workers must be at least 1\.$"):
+        cmd("signer_daemon", workers=0)
+
+
+def test_invalid_key_backend(socket_path: str) -> None:
+    """Test passing key backends that cannot be used."""
+    with assert_command_error(r"^wrong: Key backend is not configured\.$"):
+        cmd("signer_daemon", key_backend="wrong")
+    default = ca_settings.CA_DEFAULT_KEY_BACKEND
+    with assert_command_error(rf"^{default}: Key backend is not a signer key backend\.$"):
+        cmd("signer_daemon", key_backend=ca_settings.CA_DEFAULT_KEY_BACKEND)
+
+
+def test_no_signer_backend() -> None:
+    """Test running the daemon if no signer key backend is configured."""
+    with assert_command_error(r"^Please select a signer key backend with --key-backend\.$"):
+        cmd("signer_daemon")
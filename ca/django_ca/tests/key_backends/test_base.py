@@ -13,9 +13,9 @@
 
 """Test key backend base class."""
 
-from datetime import datetime
+from datetime import datetime, timezone as tz
 from typing import Any, Dict, List, Optional, Tuple
-from unittest.mock import patch
+from unittest.mock import call, patch
 
 from pydantic import BaseModel
 
@@ -24,12 +24,14 @@ from cryptography.hazmat.primitives.asymmetric.types import (
     CertificateIssuerPrivateKeyTypes,
     CertificateIssuerPublicKeyTypes,
 )
+from cryptography.x509.oid import NameOID
 
 import pytest
 from pytest_django.fixtures import SettingsWrapper
 
 from django_ca import ca_settings
 from django_ca.key_backends import KeyBackend, key_backends
+from django_ca.key_backends.base import CertificateParameters
 from django_ca.models import CertificateAuthority
 from django_ca.tests.base.assertions import assert_improperly_configured
 from django_ca.typehints import AllowedHashTypes, ArgumentGroup, ParsableKeyType
@@ -204,3 +206,32 @@ def test_key_backend_overwritten_methods(settings: SettingsWrapper, root: Certif
     assert isinstance(
         backend.get_ocsp_key_elliptic_curve(root, DummyModel()), ca_settings.CA_DEFAULT_ELLIPTIC_CURVE
     )
+
+
+def test_sign_certificates(root: CertificateAuthority) -> None:
+    """Test the default implementation of sign_certificates()."""
+    backend = DummyBackend(alias="test")
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "example.com")])
+    expires = datetime.now(tz=tz.utc)
+    public_key = root.pub.loaded.public_key()
+    certificates = [
+        CertificateParameters(public_key, serial, root.subject, name, expires, []) for serial in (1, 2)
+    ]
+
+    with patch.object(DummyBackend, "sign_certificate", autospec=True, side_effect=["a", "b"]) as sign_mock:
+        assert backend.sign_certificates(root, DummyModel(), root.algorithm, certificates) == ["a", "b"]
+    assert sign_mock.call_args_list == [
+        call(
+            backend,
+            root,
+            DummyModel(),
+            public_key=public_key,
+            serial=serial,
+            algorithm=root.algorithm,
+            issuer=root.subject,
+            subject=name,
+            expires=expires,
+            extensions=[],
+        )
+        for serial in (1, 2)
+    ]
@@ -0,0 +1,345 @@
+# This file is part of django-ca (https://github.com/mathiasertl/django-ca).
+#
+# django-ca is free software: you can redistribute it and/or modify it under the terms of the GNU General
+# Public License as published by the Free Software Foundation, either version 3 of the License, or (at your
+# option) any later version.
+#
+# django-ca is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License
+# for more details.
+#
+# You should have received a copy of the GNU General Public License along with django-ca. If not, see
+# <http://www.gnu.org/licenses/>.
+
+"""Test the HSMBackend backend using SoftHSM.
+
+Tests are skipped if python-pkcs11 or SoftHSM is not installed. Set ``PKCS11_LIBRARY_PATH`` if the SoftHSM
+library is not installed at the default location.
+"""
+
+import os
+import shutil
+import subprocess
+from datetime import datetime, timedelta, timezone as tz
+from pathlib import Path
+from typing import Iterator
+from unittest import mock
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from cryptography.hazmat.primitives.asymmetric.types import (
+    CertificateIssuerPrivateKeyTypes,
+    CertificateIssuerPublicKeyTypes,
+)
+from cryptography.x509.oid import NameOID
+
+from django.core.management.base import CommandParser
+
+import pytest
+
+from django_ca.key_backends.base import CertificateParameters
+from django_ca.models import CertificateAuthority
+
+pytest.importorskip("pkcs11")
+
+# pylint: disable=wrong-import-position  # python-pkcs11 is an optional dependency
+from pkcs11.exceptions import DeviceError, SessionClosed  # noqa: E402
+
+from django_ca.key_backends.hsm import (  # noqa: E402
+    _SESSION_POOLS,
+    CreatePrivateKeyOptions,
+    HSMBackend,
+    StorePrivateKeyOptions,
+    UsePrivateKeyOptions,
+    _PooledSession,
+    _SessionPool,
+)
+
+# pylint: enable=wrong-import-position
+
+TOKEN = "django-ca"
+PIN = "1234"
+NAME = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "hsm.example.com")])
+
+
+@pytest.fixture(scope="session")
+def softhsm_library(tmp_path_factory: pytest.TempPathFactory) -> Iterator[str]:
+    """Fixture to initialize a SoftHSM token, returns the path to the PKCS#11 library."""
+    library_path = os.environ.get("PKCS11_LIBRARY_PATH", "/usr/lib/softhsm/libsofthsm2.so")
+    softhsm2_util = shutil.which("softhsm2-util")
+    if softhsm2_util is None or not os.path.exists(library_path):  # pragma: no cover
+        pytest.skip("SoftHSM is not installed.")
+
+    softhsm_dir = tmp_path_factory.mktemp("softhsm")
+    token_dir = softhsm_dir / "tokens"
+    token_dir.mkdir()
+    config_path = softhsm_dir / "softhsm2.conf"
+    config_path.write_text(f"directories.tokendir = {token_dir}\n")
+
+    init_token = [softhsm2_util, "--init-token", "--free", "--label", TOKEN, "--pin", PIN, "--so-pin", PIN]
+    with mock.patch.dict(os.environ, {"SOFTHSM2_CONF": str(config_path)}):
+        subprocess.run(init_token, check=True, capture_output=True)
+        yield library_path
+
+
+@pytest.fixture()
+def hsm_backend(softhsm_library: str) -> Iterator[HSMBackend]:
+    """Fixture for a HSMBackend with a clean session pool."""
+    _SESSION_POOLS.clear()
+    yield HSMBackend("hsm", softhsm_library, TOKEN, PIN)
+    _SESSION_POOLS.clear()
+
+
+def hsm_ca(serial: str) -> CertificateAuthority:
+    """Get an (unsaved) certificate authority using the HSM backend."""
+    return CertificateAuthority(name=f"hsm-{serial}", serial=serial, key_backend_alias="hsm")
+
+
+def sign_certificate(
+    backend: HSMBackend, ca: CertificateAuthority, public_key: CertificateIssuerPublicKeyTypes
+) -> x509.Certificate:
+    """Sign a self-signed certificate for `public_key`."""
+    return backend.sign_certificate(
+        ca,
+        UsePrivateKeyOptions(),
+        public_key,
+        x509.random_serial_number(),
+        hashes.SHA256(),
+        NAME,
+        NAME,
+        datetime.now(tz=tz.utc) + timedelta(days=1),
+        [],
+    )
+
+
+@pytest.mark.parametrize(
+    "key_type,key_size,elliptic_curve,public_key_type",
+    (("RSA", 2048, None, rsa.RSAPublicKey), ("EC", None, ec.SECP384R1(), ec.EllipticCurvePublicKey)),
+)
+def test_create_private_key_and_sign(
+    hsm_backend: HSMBackend,
+    key_type: str,
+    key_size: int,
+    elliptic_curve: ec.EllipticCurve,
+    public_key_type: type,
+) -> None:
+    """Test creating a private key in the HSM and signing a certificate and a CRL with it."""
+    ca = hsm_ca(f"{key_type}01")
+    options = CreatePrivateKeyOptions(
+        key_type=key_type, key_label=None, key_size=key_size, elliptic_curve=elliptic_curve
+    )
+    public_key, use_options = hsm_backend.create_private_key(ca, key_type, options)  # type: ignore[arg-type]
+    assert isinstance(public_key, public_key_type)
+    assert use_options == UsePrivateKeyOptions()
+    assert ca.key_backend_options == {"key_label": f"{key_type}01"}
+    assert hsm_backend.is_usable(ca) is True
+
+    certificate = sign_certificate(hsm_backend, ca, public_key)
+    assert certificate.public_key() == public_key
+    certificate.verify_directly_issued_by(certificate)
+    ca.update_certificate(certificate)
+
+    now = datetime.now(tz=tz.utc)
+    builder = x509.CertificateRevocationListBuilder().issuer_name(NAME)
+    builder = builder.last_update(now).next_update(now + timedelta(days=1))
+    crl = hsm_backend.sign_certificate_revocation_list(ca, UsePrivateKeyOptions(), builder, hashes.SHA256())
+    assert crl.is_signature_valid(public_key)  # type: ignore[arg-type]
+
+
+def test_sign_with_unsupported_algorithm(hsm_backend: HSMBackend) -> None:
+    """Test signing with a hash algorithm that is not supported for RSA keys."""
+    ca = hsm_ca("SHA3RSA01")
+    options = CreatePrivateKeyOptions(key_type="RSA", key_label=None, key_size=2048)
+    public_key, _use_options = hsm_backend.create_private_key(ca, "RSA", options)
+    with pytest.raises(ValueError, match=r"^sha3-256: Hash algorithm is not supported for RSA keys\.$"):
+        hsm_backend.sign_certificate(
+            ca,
+            UsePrivateKeyOptions(),
+            public_key,
+            x509.random_serial_number(),
+            hashes.SHA3_256(),
+            NAME,
+            NAME,
+            datetime.now(tz=tz.utc) + timedelta(days=1),
+            [],
+        )
+
+    # The session is still usable
+    assert hsm_backend._session_pool._idle.qsize() == 1  # pylint: disable=protected-access
+    sign_certificate(hsm_backend, ca, public_key)
+
+
+def test_create_private_key_with_existing_label(hsm_backend: HSMBackend) -> None:
+    """Test that a private key is not created if a key with the same label already exists."""
+    options = CreatePrivateKeyOptions(key_type="EC", key_label="duplicate")
+    hsm_backend.create_private_key(hsm_ca("DUP01"), "EC", options)
+    with pytest.raises(ValueError, match=r"^duplicate: Private key with this label already exists\.$"):
+        hsm_backend.create_private_key(hsm_ca("DUP02"), "EC", options)
+
+
+def test_create_private_key_with_unsupported_key_type() -> None:
+    """Test that only RSA and EC keys are supported."""
+    with pytest.raises(ValueError, match=r"Ed25519: Only RSA and EC keys are supported\."):
+        CreatePrivateKeyOptions(key_type="Ed25519", key_label=None)
+
+
+@pytest.mark.parametrize(
+    "serial,private_key",
+    (
+        ("STORERSA", rsa.generate_private_key(public_exponent=65537, key_size=2048)),
+        ("STOREEC", ec.generate_private_key(ec.SECP256R1())),
+    ),
+)
+def test_store_private_key(
+    hsm_backend: HSMBackend, serial: str, private_key: CertificateIssuerPrivateKeyTypes
+) -> None:
+    """Test importing a private key into the HSM."""
+    ca = hsm_ca(serial)
+    hsm_backend.store_private_key(ca, private_key, StorePrivateKeyOptions(key_label=None))
+    assert ca.key_backend_options == {"key_label": serial}
+
+    certificate = sign_certificate(hsm_backend, ca, private_key.public_key())
+    certificate.verify_directly_issued_by(certificate)
+
+
+def test_store_private_key_with_unsupported_key_type(hsm_backend: HSMBackend) -> None:
+    """Test importing a private key of an unsupported type."""
+    ca = hsm_ca("STOREED25519")
+    key = ed25519.Ed25519PrivateKey.generate()
+    with pytest.raises(ValueError, match=r"^Only RSA and EC keys are supported\.$"):
+        hsm_backend.store_private_key(ca, key, StorePrivateKeyOptions(key_label=None))
+
+
+def test_session_pool(hsm_backend: HSMBackend) -> None:
+    """Test that sessions and key handles are reused for multiple signing operations."""
+    ca = hsm_ca("POOL01")
+    options = CreatePrivateKeyOptions(key_type="EC", key_label=None)
+    with mock.patch.object(_SessionPool, "_open", autospec=True, side_effect=_SessionPool._open) as open_mock:
+        public_key, _use_options = hsm_backend.create_private_key(ca, "EC", options)
+        for _i in range(3):
+            sign_certificate(hsm_backend, ca, public_key)
+    assert open_mock.call_count == 1
+
+    pool = _SESSION_POOLS[(hsm_backend.library_path, TOKEN)]
+    pooled_session = pool._idle.get_nowait()  # pylint: disable=protected-access
+    assert list(pooled_session.keys) == ["POOL01"]
+
+
+def test_sign_certificates(hsm_backend: HSMBackend) -> None:
+    """Test signing multiple certificates in the same session."""
+    ca = hsm_ca("MANY01")
+    options = CreatePrivateKeyOptions(key_type="EC", key_label=None)
+    public_key, _use_options = hsm_backend.create_private_key(ca, "EC", options)
+    ca.update_certificate(sign_certificate(hsm_backend, ca, public_key))
+
+    expires = datetime.now(tz=tz.utc) + timedelta(days=1)
+    certificates = [CertificateParameters(public_key, serial, NAME, NAME, expires, []) for serial in (1, 2)]
+    signed = hsm_backend.sign_certificates(ca, UsePrivateKeyOptions(), hashes.SHA256(), certificates)
+    assert [certificate.serial_number for certificate in signed] == [1, 2]
+    for certificate in signed:
+        certificate.verify_directly_issued_by(ca.pub.loaded)
+
+
+def test_check_usable(hsm_backend: HSMBackend) -> None:
+    """Test check_usable() and is_usable() with invalid configurations."""
+    ca = hsm_ca("USABLE01")
+    with pytest.raises(ValueError, match=r"^{}: Key label not configured in database\.$"):
+        hsm_backend.check_usable(ca, UsePrivateKeyOptions())
+    assert hsm_backend.is_usable(ca) is False
+
+    ca.key_backend_options = {"key_label": "missing"}
+    with pytest.raises(ValueError, match=r"^missing: Private key not found in HSM\.$"):
+        hsm_backend.check_usable(ca, UsePrivateKeyOptions())
+    assert hsm_backend.is_usable(ca) is False
+
+
+@pytest.mark.parametrize("session_pool_size", (0, "4"))
+def test_invalid_session_pool_size(session_pool_size: int) -> None:
+    """Test configuring an invalid session pool size."""
+    with pytest.raises(ValueError, match=r"session_pool_size must be a positive int\.$"):
+        HSMBackend("hsm", str(Path("/invalid")), TOKEN, PIN, session_pool_size=session_pool_size)
+
+
+def test_concurrent_sessions(hsm_backend: HSMBackend) -> None:
+    """Test borrowing multiple sessions at once, the second session shares the login of the first."""
+    pool = hsm_backend._session_pool  # pylint: disable=protected-access
+    with pool.session() as first, pool.session() as second:
+        assert first is not second
+    assert pool._idle.qsize() == 2  # pylint: disable=protected-access
+
+
+def test_session_error(hsm_backend: HSMBackend) -> None:
+    """Test that sessions are discarded after an error that indicates that they are no longer usable."""
+    ca = hsm_ca("ERROR01")
+    options = CreatePrivateKeyOptions(key_type="EC", key_label=None)
+    public_key, _use_options = hsm_backend.create_private_key(ca, "EC", options)
+    pool = hsm_backend._session_pool  # pylint: disable=protected-access
+    assert pool._idle.qsize() == 1  # pylint: disable=protected-access
+
+    with mock.patch.object(HSMBackend, "_sign", autospec=True, side_effect=SessionClosed()):
+        with pytest.raises(SessionClosed):
+            sign_certificate(hsm_backend, ca, public_key)
+    assert pool._idle.qsize() == 0  # pylint: disable=protected-access
+
+    # A new session is opened for the next operation
+    sign_certificate(hsm_backend, ca, public_key)
+    assert pool._idle.qsize() == 1  # pylint: disable=protected-access
+
+
+def test_check_usable_with_pkcs11_error(hsm_backend: HSMBackend) -> None:
+    """Test check_usable() if the HSM returns an error."""
+    ca = hsm_ca("USABLE02")
+    ca.key_backend_options = {"key_label": "error"}
+    with mock.patch.object(_PooledSession, "get_private_key", autospec=True, side_effect=DeviceError()):
+        with pytest.raises(ValueError, match=r"^error: DeviceError$"):
+            hsm_backend.check_usable(ca, UsePrivateKeyOptions())
+
+
+def test_options(hsm_backend: HSMBackend) -> None:
+    """Test adding command-line arguments and loading options from them."""
+    parser = CommandParser()
+    assert hsm_backend.add_use_private_key_group(parser) is None
+    group = parser.add_argument_group()
+    hsm_backend.add_create_private_key_arguments(group)
+    hsm_backend.add_use_parent_private_key_arguments(group)
+    hsm_backend.add_use_private_key_arguments(group)
+    options = vars(parser.parse_args(["--hsm-key-label", "label", "--hsm-key-size", "4096"]))
+    assert hsm_backend.get_create_private_key_options("RSA", options) == CreatePrivateKeyOptions(
+        key_type="RSA", key_label="label", key_size=4096
+    )
+
+    parser = CommandParser()
+    hsm_backend.add_store_private_key_arguments(parser.add_argument_group())
+    options = vars(parser.parse_args(["--hsm-key-label", "label"]))
+    assert hsm_backend.get_store_private_key_options(options) == StorePrivateKeyOptions(key_label="label")
+
+    assert hsm_backend.get_use_private_key_options(None, {}) == UsePrivateKeyOptions()
+    assert hsm_backend.get_use_parent_private_key_options(hsm_ca("OPTS01"), {}) == UsePrivateKeyOptions()
+
+
+def test_get_ocsp_key_parameters(
+    hsm_backend: HSMBackend, root: CertificateAuthority, usable_ec: CertificateAuthority
+) -> None:
+    """Test getting the key size or elliptic curve for OCSP keys."""
+    options = UsePrivateKeyOptions()
+    rsa_public_key = root.pub.loaded.public_key()
+    ec_public_key = usable_ec.pub.loaded.public_key()
+    assert isinstance(rsa_public_key, rsa.RSAPublicKey)
+    assert isinstance(ec_public_key, ec.EllipticCurvePublicKey)
+    assert hsm_backend.get_ocsp_key_size(root, options) == rsa_public_key.key_size
+    assert hsm_backend.get_ocsp_key_elliptic_curve(usable_ec, options).name == ec_public_key.curve.name
+
+    with pytest.raises(ValueError, match=r"^This function should only be called with RSA/DSA CAs\.$"):
+        hsm_backend.get_ocsp_key_size(usable_ec, options)
+    with pytest.raises(ValueError, match=r"only be called with EllipticCurve-based CAs\.$"):
+        hsm_backend.get_ocsp_key_elliptic_curve(root, options)
+
+
+def test_eq() -> None:
+    """Test equality."""
+    library_path = "/usr/lib/softhsm/libsofthsm2.so"
+    backend = HSMBackend("hsm", library_path, TOKEN, PIN)
+    assert backend == HSMBackend("other", library_path, TOKEN, "other-pin")
+    assert backend != HSMBackend("hsm", library_path, "other-token", PIN)
+    assert backend != HSMBackend("hsm", "/other/library.so", TOKEN, PIN)
@@ -0,0 +1,329 @@
+# This file is part of django-ca (https://github.com/mathiasertl/django-ca).
+#
+# django-ca is free software: you can redistribute it and/or modify it under the terms of the GNU General
+# Public License as published by the Free Software Foundation, either version 3 of the License, or (at your
+# option) any later version.
+#
+# django-ca is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License
+# for more details.
+#
+# You should have received a copy of the GNU General Public License along with django-ca. If not, see
+# <http://www.gnu.org/licenses/>.
+
+"""Test the SignerBackend backend with a signer daemon worker running in a thread."""
+
+import os
+import re
+import socket
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone as tz
+from pathlib import Path
+from threading import Thread
+from typing import Iterator, Tuple
+from unittest import mock
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+from django.core.files.storage import storages
+
+import pytest
+from _pytest.fixtures import SubRequest
+
+from django_ca.key_backends.base import CertificateParameters
+from django_ca.key_backends.signer import (
+    OP_CHECK,
+    OP_SIGN,
+    OP_SIGN_CRL,
+    STATUS_ERROR,
+    STATUS_OK,
+    SignerBackend,
+    SignerDaemonWorker,
+    recv_message,
+    send_message,
+)
+from django_ca.key_backends.storages import (
+    CreatePrivateKeyOptions,
+    StorePrivateKeyOptions,
+    UsePrivateKeyOptions,
+)
+from django_ca.models import CertificateAuthority
+from django_ca.tests.base.constants import CERT_DATA
+
+NAME = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "signer.example.com")])
+
+
+def store_key(backend: SignerBackend, ca: CertificateAuthority) -> None:
+    """Copy the private key of `ca` to where the signer daemon loads it from."""
+    storage = storages[backend.storage_alias]
+    with storage.open(ca.key_backend_options["path"], "rb") as stream:
+        storage.save(backend.get_key_path(ca.serial), stream)
+
+
+@contextmanager
+def run_signer_daemon(**kwargs: float) -> Iterator[SignerBackend]:
+    """Run a signer daemon worker in a thread, yields the SignerBackend connecting to it."""
+    # NOTE: Do not use tmp_path, as paths of Unix sockets are limited to 108 characters.
+    with tempfile.TemporaryDirectory() as tmpdir:
+        backend = SignerBackend("signer", "django-ca", os.path.join(tmpdir, "signer.sock"), **kwargs)
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.bind(backend.socket_path)
+            sock.listen()
+            thread = Thread(target=SignerDaemonWorker(backend).serve, args=(sock,), daemon=True)
+            thread.start()
+            yield backend
+            sock.shutdown(socket.SHUT_RDWR)
+            thread.join()
+
+
+@pytest.fixture()
+def signer_backend() -> Iterator[SignerBackend]:
+    """Fixture for a SignerBackend with a signer daemon worker running in a thread."""
+    with run_signer_daemon() as backend:
+        yield backend
+
+
+@pytest.fixture(params=("root", "pwd", "ec", "dsa", "ed25519", "ed448"))
+def signer_ca(
+    request: SubRequest, signer_backend: SignerBackend
+) -> Tuple[CertificateAuthority, UsePrivateKeyOptions]:
+    """Parametrized fixture for usable CAs of all key types and options for using their private key."""
+    ca: CertificateAuthority = request.getfixturevalue(f"usable_{request.param}")
+    store_key(signer_backend, ca)
+    return ca, UsePrivateKeyOptions(password=CERT_DATA[request.param].get("password"))
+
+
+def request(backend: SignerBackend, op: bytes, *fields: bytes) -> bytes:
+    """Send a raw request to the signer daemon, return the error message."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(backend.socket_path)
+        send_message(sock, op, *fields)
+        status, response = recv_message(sock)
+    assert status == STATUS_ERROR
+    return response[0]
+
+
+def test_sign_certificate(
+    signer_backend: SignerBackend, signer_ca: Tuple[CertificateAuthority, UsePrivateKeyOptions]
+) -> None:
+    """Test signing a certificate and a CRL."""
+    ca, options = signer_ca
+    public_key = ca.pub.loaded.public_key()
+    expires = datetime.now(tz=tz.utc) + timedelta(days=1)
+    certificate = signer_backend.sign_certificate(
+        ca,
+        options,
+        public_key,
+        x509.random_serial_number(),
+        ca.algorithm,
+        ca.pub.loaded.subject,
+        NAME,
+        expires,
+        [],
+    )
+    certificate.verify_directly_issued_by(ca.pub.loaded)
+
+    now = datetime.now(tz=tz.utc)
+    builder = x509.CertificateRevocationListBuilder().issuer_name(ca.pub.loaded.subject)
+    builder = builder.last_update(now).next_update(now + timedelta(days=1))
+    crl = signer_backend.sign_certificate_revocation_list(ca, options, builder, ca.algorithm)
+    assert crl.is_signature_valid(public_key)  # type: ignore[arg-type]
+
+
+def test_sign_certificates(signer_backend: SignerBackend, usable_ec: CertificateAuthority) -> None:
+    """Test signing multiple certificates with a single request."""
+    store_key(signer_backend, usable_ec)
+    options = UsePrivateKeyOptions(password=None)
+    expires = datetime.now(tz=tz.utc) + timedelta(days=1)
+    public_key = usable_ec.pub.loaded.public_key()
+    certificates = [
+        CertificateParameters(public_key, serial, usable_ec.pub.loaded.subject, NAME, expires, [])
+        for serial in (1, 2, 3)
+    ]
+    with mock.patch.object(
+        SignerBackend, "_request", autospec=True, side_effect=SignerBackend._request
+    ) as request_mock:
+        signed = signer_backend.sign_certificates(usable_ec, options, usable_ec.algorithm, certificates)
+    request_mock.assert_called_once()
+
+    assert [certificate.serial_number for certificate in signed] == [1, 2, 3]
+    for certificate in signed:
+        certificate.verify_directly_issued_by(usable_ec.pub.loaded)
+
+
+def test_sign_certificate_with_bad_password(
+    signer_backend: SignerBackend, usable_pwd: CertificateAuthority
+) -> None:
+    """Test signing a certificate with a bad password."""
+    store_key(signer_backend, usable_pwd)
+    public_key = usable_pwd.pub.loaded.public_key()
+    expires = datetime.now(tz=tz.utc) + timedelta(days=1)
+    with pytest.raises(ValueError, match=r": Could not decrypt private key - bad password\?$"):
+        signer_backend.sign_certificate(
+            usable_pwd,
+            UsePrivateKeyOptions(password=b"wrong"),
+            public_key,
+            x509.random_serial_number(),
+            usable_pwd.algorithm,
+            NAME,
+            NAME,
+            expires,
+            [],
+        )
+
+
+def test_check_usable(signer_backend: SignerBackend, usable_pwd: CertificateAuthority) -> None:
+    """Test check_usable() and is_usable()."""
+    password = CERT_DATA["pwd"]["password"]
+    key_path = signer_backend.get_key_path(usable_pwd.serial)
+
+    # The key is not yet stored where the signer daemon loads it from
+    with pytest.raises(ValueError, match=re.escape(key_path)):
+        signer_backend.check_usable(usable_pwd, UsePrivateKeyOptions(password=password))
+    assert signer_backend.is_usable(usable_pwd) is False
+
+    store_key(signer_backend, usable_pwd)
+    signer_backend.check_usable(usable_pwd, UsePrivateKeyOptions(password=password))
+    assert signer_backend.is_usable(usable_pwd) is True
+    assert signer_backend.is_usable(usable_pwd, UsePrivateKeyOptions(password=password)) is True
+    assert signer_backend.is_usable(usable_pwd, UsePrivateKeyOptions(password=None)) is False
+
+    usable_pwd.key_backend_options = {}
+    with pytest.raises(ValueError, match=r"^{}: Path not configured in database\.$"):
+        signer_backend.check_usable(usable_pwd, UsePrivateKeyOptions(password=password))
+    assert signer_backend.is_usable(usable_pwd) is False
+
+
+def test_check_usable_without_daemon(usable_root: CertificateAuthority) -> None:
+    """Test check_usable() if the signer daemon is not running."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        backend = SignerBackend("signer", "django-ca", os.path.join(tmpdir, "signer.sock"))
+        with pytest.raises(ValueError, match=r": Could not connect to signer daemon: "):
+            backend.check_usable(usable_root, UsePrivateKeyOptions(password=None))
+        assert backend.is_usable(usable_root, UsePrivateKeyOptions(password=None)) is False
+
+
+def test_keys_are_loaded_once(signer_backend: SignerBackend, usable_root: CertificateAuthority) -> None:
+    """Test that the daemon worker loads private keys only once."""
+    store_key(signer_backend, usable_root)
+    options = UsePrivateKeyOptions(password=None)
+    with mock.patch.object(
+        SignerBackend, "load_private_key", autospec=True, side_effect=SignerBackend.load_private_key
+    ) as load_mock:
+        for _i in range(3):
+            signer_backend.check_usable(usable_root, options)
+    load_mock.assert_called_once()
+
+
+def test_invalid_requests(signer_backend: SignerBackend, usable_root: CertificateAuthority) -> None:
+    """Test sending invalid requests to the signer daemon."""
+    store_key(signer_backend, usable_root)
+    serial = usable_root.serial.replace(":", "").encode("ascii")
+    tbs_certificate = usable_root.pub.loaded.tbs_certificate_bytes
+    assert request(signer_backend, b"X", serial, b"") == b"b'X': Invalid request."
+    assert request(signer_backend, OP_CHECK, serial) == b"b'C': Invalid request."
+    assert request(signer_backend, OP_SIGN, serial, b"", b"SHA-256") == b"b'S': Invalid request."
+    assert request(signer_backend, OP_SIGN, serial, b"", b"MD5", tbs_certificate) == b"'MD5'"
+
+
+@pytest.mark.parametrize("serial", (b"../root", b"/etc/passwd", b"root.key", b"", b"ab", b"1" * 41))
+def test_invalid_serial(signer_backend: SignerBackend, serial: bytes) -> None:
+    """Test that the signer daemon only loads private keys by (valid) serial."""
+    assert request(signer_backend, OP_CHECK, serial, b"") == serial + b": Invalid serial."
+
+
+def test_sign_arbitrary_data(signer_backend: SignerBackend, usable_root: CertificateAuthority) -> None:
+    """Test that the signer daemon refuses to sign data that is not a TBSCertificate/TBSCertList."""
+    store_key(signer_backend, usable_root)
+    serial = usable_root.serial.replace(":", "").encode("ascii")
+    tbs_certificate = usable_root.pub.loaded.tbs_certificate_bytes
+    now = datetime.now(tz=tz.utc)
+    builder = x509.CertificateRevocationListBuilder().issuer_name(NAME).last_update(now).next_update(now)
+    tbs_cert_list = builder.sign(ec.generate_private_key(ec.SECP256R1()), hashes.SHA256()).tbs_certlist_bytes
+
+    invalid_certificate = b"Data is not a valid TbsCertificate structure."
+    invalid_cert_list = b"Data is not a valid TbsCertList structure."
+    assert request(signer_backend, OP_SIGN, serial, b"", b"SHA-256", b"data") == invalid_certificate
+    assert request(signer_backend, OP_SIGN, serial, b"", b"SHA-256", tbs_certificate + b"\x00") == (
+        invalid_certificate
+    )
+    assert request(signer_backend, OP_SIGN, serial, b"", b"SHA-256", tbs_cert_list) == invalid_certificate
+    assert request(signer_backend, OP_SIGN_CRL, serial, b"", b"SHA-256", tbs_certificate) == (
+        invalid_cert_list
+    )
+
+
+def test_truncated_message(signer_backend: SignerBackend) -> None:
+    """Test sending a message with a truncated field."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(signer_backend.socket_path)
+        sock.sendall(b"\x00\x00\x00\x03C\x00\x00")
+        status, response = recv_message(sock)
+    assert status == STATUS_ERROR
+    assert response == [b"Truncated field in message."]
+
+
+def test_stalled_client(usable_root: CertificateAuthority) -> None:
+    """Test that a client that does not send a request does not block the worker."""
+    with run_signer_daemon(timeout=0.1) as backend, socket.socket(
+        socket.AF_UNIX, socket.SOCK_STREAM
+    ) as stalled:
+        store_key(backend, usable_root)
+        stalled.connect(backend.socket_path)
+
+        # The only worker handles the next request once the connection of the stalled client timed out.
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(5)
+            sock.connect(backend.socket_path)
+            send_message(sock, OP_CHECK, usable_root.serial.encode("ascii"), b"")
+            assert recv_message(sock) == (STATUS_OK, [])
+
+
+@pytest.mark.parametrize("timeout", (0, -1, "10"))
+def test_invalid_timeout(timeout: float) -> None:
+    """Test configuring an invalid timeout."""
+    with pytest.raises(ValueError, match=rf"^signer: {timeout}: timeout must be a positive number\.$"):
+        SignerBackend("signer", "django-ca", "/invalid.sock", timeout=timeout)
+
+
+def test_store_private_key(signer_backend: SignerBackend, usable_root: CertificateAuthority) -> None:
+    """Test that private keys are always stored where the signer daemon loads them from."""
+    key_path = signer_backend.get_key_path(usable_root.serial)
+    options = signer_backend.get_store_private_key_options({"signer_password": None, "signer_path": "x"})
+    assert options == StorePrivateKeyOptions(password=None, path=Path("ca"))
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    signer_backend.store_private_key(usable_root, key, options)
+    assert usable_root.key_backend_options == {"path": key_path}
+
+    # Storing a key again would store it under a different name, so it is an error
+    with pytest.raises(ValueError, match=rf"^{re.escape(key_path)}: Private key already exists\.$"):
+        signer_backend.store_private_key(usable_root, key, options)
+    options = StorePrivateKeyOptions(password=None, path=Path("other"))
+    with pytest.raises(ValueError, match=r"^other: Private keys must be stored in ca\.$"):
+        signer_backend.store_private_key(usable_root, key, options)
+
+
+def test_create_private_key(signer_backend: SignerBackend, usable_root: CertificateAuthority) -> None:
+    """Test creating a private key."""
+    options = signer_backend.get_create_private_key_options(
+        "EC", {"signer_password": None, "signer_key_size": None, "signer_elliptic_curve": None}
+    )
+    assert options == CreatePrivateKeyOptions(
+        key_type="EC", password=None, path=Path("ca"), elliptic_curve=options.elliptic_curve
+    )
+
+    signer_backend.create_private_key(usable_root, "EC", options)
+    assert usable_root.key_backend_options == {"path": signer_backend.get_key_path(usable_root.serial)}
+
+
+def test_eq() -> None:
+    """Test equality."""
+    backend = SignerBackend("signer", "django-ca", "/run/signer.sock")
+    assert backend == SignerBackend("other", "django-ca", "/run/signer.sock")
+    assert backend != SignerBackend("signer", "django-ca", "/run/other.sock")
+    assert backend != SignerBackend("signer", "django-ca", "/run/signer.sock", key_path="other")
@@ -13,12 +13,25 @@
 
 """Test the StoragesBackend backend."""
 
+import time
+from pathlib import Path
+from typing import Iterator
+from unittest import mock
+
+from cryptography.hazmat.primitives.serialization import load_der_private_key
+
 import pytest
 from pytest_django.fixtures import SettingsWrapper
 
 from django_ca import ca_settings
 from django_ca.key_backends import key_backends
-from django_ca.key_backends.storages import StoragesBackend, UsePrivateKeyOptions
+from django_ca.key_backends.base import KeyBackends
+from django_ca.key_backends.storages import (
+    _KEY_CACHE,
+    StoragesBackend,
+    StorePrivateKeyOptions,
+    UsePrivateKeyOptions,
+)
 from django_ca.models import CertificateAuthority
 
 
@@ -38,6 +51,31 @@ def test_invalid_storages_alias(settings: SettingsWrapper) -> None:
         key_backends[ca_settings.CA_DEFAULT_KEY_BACKEND]
 
 
+@pytest.fixture()
+def key_cache_backend(
+    settings: SettingsWrapper, clean_key_backends: KeyBackends
+) -> Iterator[StoragesBackend]:
+    """Fixture for a StoragesBackend with the per-process key cache enabled."""
+    settings.CA_KEY_BACKENDS = {
+        ca_settings.CA_DEFAULT_KEY_BACKEND: {
+            "BACKEND": "django_ca.key_backends.storages.StoragesBackend",
+            "OPTIONS": {"storage_alias": "django-ca", "key_cache_timeout": 60},
+        },
+    }
+    backend = key_backends[ca_settings.CA_DEFAULT_KEY_BACKEND]
+    assert isinstance(backend, StoragesBackend)
+    yield backend
+    backend.evict_cached_keys()
+
+
+@pytest.mark.parametrize("timeout", (0, -1, "60"))
+def test_invalid_key_cache_timeout(settings: SettingsWrapper, timeout: int) -> None:
+    """Test configuring an invalid key cache timeout."""
+    settings.STORAGES = {"foo-alias": {"BACKEND": "django.core.files.storage.FileSystemStorage"}}
+    with pytest.raises(ValueError, match=rf"^foo: {timeout}: key_cache_timeout must be a positive int\.$"):
+        StoragesBackend("foo", "foo-alias", key_cache_timeout=timeout)
+
+
 def test_eq(settings: SettingsWrapper) -> None:
     """Test equality."""
     settings.STORAGES = {
@@ -78,3 +116,80 @@ def test_get_ocsp_key_elliptic_curve_invalid_key_type(usable_root: CertificateAu
         key_backends[ca_settings.CA_DEFAULT_KEY_BACKEND].get_ocsp_key_elliptic_curve(
             usable_root, UsePrivateKeyOptions(password=None)
         )
+
+
+def test_reuse_private_key(usable_root: CertificateAuthority) -> None:
+    """Test that private keys are loaded only once in reuse_private_key()."""
+    backend = key_backends[ca_settings.CA_DEFAULT_KEY_BACKEND]
+    options = UsePrivateKeyOptions(password=None)
+    load_path = "django_ca.key_backends.storages.load_der_private_key"
+    with mock.patch(load_path, autospec=True, side_effect=load_der_private_key) as load_mock:
+        with backend.reuse_private_key(usable_root, options):
+            with backend.reuse_private_key(usable_root, options):  # nested invocations have no effect
+                key = backend.get_key(usable_root, options)  # type: ignore[attr-defined]
+            assert backend.get_key(usable_root, options) is key  # type: ignore[attr-defined]
+        assert load_mock.call_count == 1
+
+        # Key is loaded again once the context manager has exited
+        assert backend.get_key(usable_root, options) is not key  # type: ignore[attr-defined]
+        assert load_mock.call_count == 2
+
+
+def test_key_cache(key_cache_backend: StoragesBackend, usable_root: CertificateAuthority) -> None:
+    """Test the per-process key cache."""
+    options = UsePrivateKeyOptions(password=None)
+    load_path = "django_ca.key_backends.storages.load_der_private_key"
+    with mock.patch(load_path, autospec=True, side_effect=load_der_private_key) as load_mock:
+        key = key_cache_backend.get_key(usable_root, options)
+        assert key_cache_backend.get_key(usable_root, options) is key
+        assert load_mock.call_count == 1
+
+        # Key is loaded again once the cache entry has expired
+        with mock.patch("time.monotonic", return_value=time.monotonic() + 61):
+            key = key_cache_backend.get_key(usable_root, options)
+        assert load_mock.call_count == 2
+        assert key_cache_backend.get_key(usable_root, options) is key
+        assert load_mock.call_count == 2
+
+
+def test_key_cache_removes_expired_entries(
+    key_cache_backend: StoragesBackend, usable_root: CertificateAuthority, usable_child: CertificateAuthority
+) -> None:
+    """Test that expired entries are removed from the per-process key cache."""
+    options = UsePrivateKeyOptions(password=None)
+    key_cache_backend.get_key(usable_root, options)
+    key_cache_backend.get_key(usable_child, options)
+    assert len(_KEY_CACHE) == 2
+
+    # An expired entry is removed when it is looked up, other expired entries when a new key is cached
+    with mock.patch("time.monotonic", return_value=time.monotonic() + 61):
+        key = key_cache_backend.get_key(usable_root, options)
+    assert list(_KEY_CACHE.values()) == [(mock.ANY, key)]
+
+
+def test_evict_cached_keys(
+    key_cache_backend: StoragesBackend, usable_root: CertificateAuthority, usable_child: CertificateAuthority
+) -> None:
+    """Test explicitly evicting keys from the per-process key cache."""
+    options = UsePrivateKeyOptions(password=None)
+    root_key = key_cache_backend.get_key(usable_root, options)
+    child_key = key_cache_backend.get_key(usable_child, options)
+
+    key_cache_backend.evict_cached_keys(usable_root)
+    assert key_cache_backend.get_key(usable_root, options) is not root_key
+    assert key_cache_backend.get_key(usable_child, options) is child_key
+
+    key_cache_backend.evict_cached_keys()
+    assert key_cache_backend.get_key(usable_child, options) is not child_key
+
+
+def test_key_cache_with_stored_private_key(
+    key_cache_backend: StoragesBackend, usable_root: CertificateAuthority
+) -> None:
+    """Test that cached keys are evicted when a new private key is stored."""
+    options = UsePrivateKeyOptions(password=None)
+    key = key_cache_backend.get_key(usable_root, options)
+    key_cache_backend.store_private_key(
+        usable_root, key, StorePrivateKeyOptions(path=Path("stored"), password=None)
+    )
+    assert key_cache_backend.get_key(usable_root, options) is not key
@@ -13,12 +13,23 @@
 
 """Test django-ca system checks."""
 
+from typing import Any, ContextManager
+from unittest import mock
+
 from django.apps import apps
+from django.conf import settings
 from django.core import checks
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from freezegun import freeze_time
 
-from django_ca.checks import check_cache
+from django_ca.checks import check_cache, check_crl_cache_size
+from django_ca.tests.base.constants import TIMESTAMPS
 from django_ca.tests.base.mixins import TestCaseMixin
+from django_ca.utils import get_crl_cache_key
+
+MEMCACHED = {"default": {"BACKEND": "django.core.cache.backends.memcached.PyMemcacheCache"}}
 
 
 class SystemChecksTestCase(TestCaseMixin, TestCase):
@@ -77,3 +88,62 @@ class SystemChecksTestCase(TestCaseMixin, TestCase):
         with self.settings(CACHES=setting):
             errors = check_cache([app_config])
         self.assertEqual(errors, [])
+
+
+@freeze_time(TIMESTAMPS["everything_valid"])
+@override_settings(CA_CRL_PROFILES={"user": {"scope": "user"}})
+class CRLCacheSizeChecksTestCase(TestCaseMixin, TestCase):
+    """Test checks for the size of cached CRLs."""
+
+    load_cas = ("root",)
+
+    def item_limit(self) -> ContextManager[Any]:
+        """Pretend that the cache backend used in tests has the same item size limit as memcached."""
+        backend = settings.CACHES["default"]["BACKEND"]
+        return mock.patch.dict("django_ca.checks._CACHE_ITEM_LIMITS", {backend: 1024 * 1024})
+
+    def test_no_item_limit(self) -> None:
+        """Test that no checks are run if the cache has no item size limit."""
+        with self.settings(CA_CRL_CACHE_CHUNK_SIZE=None):
+            self.assertEqual(check_crl_cache_size(None, databases=["default"]), [])
+
+    def test_chunk_size_too_large(self) -> None:
+        """Test a warning if the chunk size is larger than the item size limit of the cache."""
+        expected = checks.Warning(
+            f"CA_CRL_CACHE_CHUNK_SIZE is larger than the item size limit of the cache ({1024 * 1024} bytes), "
+            "larger CRLs cannot be cached.",
+            hint=f"Set CA_CRL_CACHE_CHUNK_SIZE to a value below {1024 * 1024}.",
+            id="django-ca.caches.W002",
+        )
+        with self.settings(CACHES=MEMCACHED, CA_CRL_CACHE_CHUNK_SIZE=None):
+            self.assertEqual(check_crl_cache_size(None), [expected])
+        with self.settings(CACHES=MEMCACHED, CA_CRL_CACHE_CHUNK_SIZE=2 * 1024 * 1024):
+            self.assertEqual(check_crl_cache_size(None), [expected])
+
+    def test_large_crl(self) -> None:
+        """Test a warning if a cached CRL is larger than the item size limit of the cache."""
+        cache_key = get_crl_cache_key(self.ca.serial, scope="user")
+        cache.set(cache_key, {"chunks": 3, "size": 1200000, "sha256": "abc"})
+        expected = checks.Warning(
+            f"{self.ca.serial}: CRL is larger than the item size limit of the cache "
+            f"(1200000 > {1024 * 1024} bytes) and is stored in 3 chunks.",
+            hint="Use partitioned CRLs (see CA_CRL_PARTITIONS) to reduce the size of CRLs.",
+            id="django-ca.caches.W003",
+        )
+
+        # Pretend that the cache backend used in tests has an item size limit
+        with self.item_limit():
+            self.assertEqual(check_crl_cache_size(None), [])  # database is not checked by default
+            self.assertEqual(check_crl_cache_size(None, databases=["default"]), [expected])
+
+    def test_small_crl(self) -> None:
+        """Test that there is no warning for CRLs stored as a single item."""
+        cache.set(get_crl_cache_key(self.ca.serial, scope="user"), b"foo")
+        with self.item_limit():
+            self.assertEqual(check_crl_cache_size(None, databases=["default"]), [])
+
+    def test_django_ca_not_checked(self) -> None:
+        """Test that no checks are run if django_ca is not checked."""
+        app_config = apps.get_app_config("auth")
+        with self.settings(CACHES=MEMCACHED, CA_CRL_CACHE_CHUNK_SIZE=None):
+            self.assertEqual(check_crl_cache_size([app_config]), [])
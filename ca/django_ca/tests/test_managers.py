@@ -536,6 +536,55 @@ def test_create_cert(usable_root: CertificateAuthority, subject: x509.Name) -> N
     assert_extensions(cert, list(profile.extensions.values()))  # type: ignore[arg-type]
 
 
+@pytest.mark.freeze_time(TIMESTAMPS["everything_valid"])
+def test_create_cert_with_crl_partitions(
+    settings: SettingsWrapper, usable_root: CertificateAuthority, subject: x509.Name
+) -> None:
+    """Test that certificates are assigned to a CRL partition with a partition-specific CRL URL."""
+    csr = CERT_DATA["root-cert"]["csr"]["parsed"]
+    cert = Certificate.objects.create_cert(usable_root, key_backend_options, csr, subject=subject)
+    assert cert.crl_partition is None
+
+    settings.CA_CRL_PARTITIONS = 4
+    usable_root.sign_crl_distribution_points = crl_distribution_points(
+        distribution_point([uri("http://example.com/{SIGNER_SERIAL_HEX}/{CRL_PARTITION}/")])
+    )
+    usable_root.save()
+    for _ in range(3):
+        cert = Certificate.objects.create_cert(usable_root, key_backend_options, csr, subject=subject)
+        partition = cert.pub.loaded.serial_number % 4
+        assert cert.crl_partition == partition
+        assert cert.extensions[ExtensionOID.CRL_DISTRIBUTION_POINTS] == crl_distribution_points(
+            distribution_point([uri(f"http://example.com/{usable_root.serial}/{partition}/")])
+        )
+
+
+@pytest.mark.freeze_time(TIMESTAMPS["everything_valid"])
+def test_create_cert_with_crl_partitions_disabled(
+    settings: SettingsWrapper, usable_root: CertificateAuthority, subject: x509.Name
+) -> None:
+    """Test that names pointing to partitioned CRLs are dropped if CRL partitions are disabled."""
+    settings.CA_CRL_PARTITIONS = 0
+    csr = CERT_DATA["root-cert"]["csr"]["parsed"]
+    usable_root.sign_crl_distribution_points = crl_distribution_points(
+        distribution_point([uri("http://example.com/{CRL_PARTITION}/"), uri("http://example.com/crl/")])
+    )
+    usable_root.save()
+    cert = Certificate.objects.create_cert(usable_root, key_backend_options, csr, subject=subject)
+    assert cert.crl_partition is None
+    assert cert.extensions[ExtensionOID.CRL_DISTRIBUTION_POINTS] == crl_distribution_points(
+        distribution_point([uri("http://example.com/crl/")])
+    )
+
+    # If no name remains, the extension is not added at all
+    usable_root.sign_crl_distribution_points = crl_distribution_points(
+        distribution_point([uri("http://example.com/{CRL_PARTITION}/")])
+    )
+    usable_root.save()
+    cert = Certificate.objects.create_cert(usable_root, key_backend_options, csr, subject=subject)
+    assert ExtensionOID.CRL_DISTRIBUTION_POINTS not in cert.extensions
+
+
 @pytest.mark.freeze_time(TIMESTAMPS["everything_valid"])
 def test_create_cert_cryptography_extensions(usable_root: CertificateAuthority, subject: x509.Name) -> None:
     """Test passing readable extensions."""
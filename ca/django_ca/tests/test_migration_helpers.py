@@ -13,16 +13,19 @@
 
 """Test migration helpers."""
 
+import json
+from datetime import datetime, timezone as tz
 from typing import List, Optional
 
 from cryptography import x509
 from cryptography.x509.oid import AuthorityInformationAccessOID, ExtensionOID, NameOID
 
 import pytest
+from pytest_django.fixtures import SettingsWrapper
 
-from django_ca.migration_helpers import Migration0040Helper
+from django_ca.migration_helpers import Migration0040Helper, Migration0047Helper
 from django_ca.models import CertificateAuthority
-from django_ca.tests.base.utils import distribution_point, dns, rdn, uri
+from django_ca.tests.base.utils import distribution_point, dns, doctest_module, rdn, uri
 
 
 @pytest.mark.parametrize(
@@ -302,3 +305,46 @@ def test_0040_empty_backwards_migration_for_0040(root: CertificateAuthority) ->
     assert root.ocsp_url == ""  # type: ignore[attr-defined]  # what we're testing
     assert root.issuer_url == ""  # type: ignore[attr-defined]  # what we're testing
     assert root.issuer_alt_name == ""  # type: ignore[attr-defined]  # what we're testing
+
+
+def test_0047_crl_number_to_counters() -> None:
+    """Test converting the JSON-encoded `crl_number` field to CRL counters."""
+    assert Migration0047Helper.crl_number_to_counters("") == {}
+    assert Migration0047Helper.crl_number_to_counters('{"scope": {}}') == {}
+
+    last_update = datetime(2024, 1, 1, tzinfo=tz.utc)
+    crl_number = json.dumps(
+        {
+            "scope": {"user": 3, "ca": 1},
+            "base": {"user": {"number": 2, "last_update": last_update.isoformat()}},
+        }
+    )
+    expected = {
+        "user": {"number": 3, "base_number": 2, "base_last_update": last_update},
+        "ca": {"number": 1, "base_number": None, "base_last_update": None},
+    }
+    assert Migration0047Helper.crl_number_to_counters(crl_number) == expected
+
+    # Round trip
+    counters = [(key, *values.values()) for key, values in expected.items()]
+    assert Migration0047Helper.counters_to_crl_number(counters) == crl_number  # type: ignore[arg-type]
+
+
+def test_0047_crl_number_to_counters_without_timezone_support(settings: SettingsWrapper) -> None:
+    """Test converting the `crl_number` field with timezone support disabled."""
+    settings.USE_TZ = False
+    last_update = datetime(2024, 1, 1)
+    crl_number = json.dumps(
+        {"scope": {"user": 3}, "base": {"user": {"number": 2, "last_update": "2024-01-01T00:00:00+00:00"}}}
+    )
+    counters = Migration0047Helper.crl_number_to_counters(crl_number)
+    assert counters == {"user": {"number": 3, "base_number": 2, "base_last_update": last_update}}
+
+    # Naive timestamps are converted back to UTC
+    assert Migration0047Helper.counters_to_crl_number([("user", 3, 2, last_update)]) == crl_number
+
+
+def test_doctests() -> None:
+    """Load doctests."""
+    failures, _tests = doctest_module("django_ca.migration_helpers")
+    assert failures == 0, f"{failures} doctests failed, see above for output."
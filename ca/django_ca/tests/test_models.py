@@ -16,10 +16,10 @@
 # pylint: disable=redefined-outer-name  # requested pytest fixtures show up this way.
 
 import json
-import re
 import typing
 from contextlib import contextmanager
 from datetime import datetime, timedelta, timezone as tz
+from pathlib import Path
 from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Type, Union
 from unittest import mock
 
@@ -37,6 +37,7 @@ from cryptography.x509.oid import CertificatePoliciesOID, ExtensionOID, NameOID
 from django.conf import settings
 from django.core.cache import cache
 from django.core.exceptions import ValidationError
+from django.core.files.storage import storages
 from django.db import connection, transaction
 from django.db.utils import IntegrityError
 from django.test import RequestFactory, TestCase, override_settings
@@ -45,13 +46,15 @@ from django.utils import timezone
 
 import pytest
 from freezegun import freeze_time
+from pytest_django.fixtures import SettingsWrapper
 
 from django_ca import ca_settings
 from django_ca.constants import ReasonFlags
 from django_ca.deprecation import not_valid_after, not_valid_before
-from django_ca.key_backends.storages import UsePrivateKeyOptions
+from django_ca.key_backends.storages import StoragesBackend, StorePrivateKeyOptions, UsePrivateKeyOptions
 from django_ca.modelfields import LazyCertificate, LazyCertificateSigningRequest
 from django_ca.models import (
+    _USABLE_CACHE,
     AcmeAccount,
     AcmeAuthorization,
     AcmeCertificate,
@@ -61,6 +64,8 @@ from django_ca.models import (
     CertificateAuthority,
     Watcher,
     X509CertMixin,
+    get_revoked_certificate,
+    json_validator,
 )
 from django_ca.pydantic.extensions import CertificatePoliciesModel
 from django_ca.tests.base.constants import CERT_DATA, CERT_PEM_REGEX, TIMESTAMPS
@@ -79,7 +84,13 @@ from django_ca.tests.base.utils import (
     uri,
 )
 from django_ca.typehints import PolicyQualifier
-from django_ca.utils import get_crl_cache_key, get_storage
+from django_ca.utils import (
+    get_crl_cache_key,
+    get_crl_published_cache_key,
+    get_crl_storage_path,
+    get_crl_validity,
+    get_storage,
+)
 
 ChallengeTypeVar = typing.TypeVar("ChallengeTypeVar", bound=challenges.KeyAuthorizationChallenge)
 key_backend_options = UsePrivateKeyOptions(password=None)
@@ -402,14 +413,223 @@ class CertificateAuthorityTests(TestCaseMixin, X509CertMixinTestCaseMixin, TestC
 
     def test_validate_json(self) -> None:
         """Test the json validator."""
-        # Validation works if we're not revoked
-        self.ca.full_clean()
+        json_validator('{"scope": {}}')
 
-        self.ca.crl_number = "{"
         # Note: we do not use self.assertValidationError, b/c the JSON message might be system dependent
-        with self.assertRaises(ValidationError) as exc_cm:
-            self.ca.full_clean()
-        self.assertTrue(re.match("Must be valid JSON: ", exc_cm.exception.message_dict["crl_number"][0]))
+        with self.assertRaisesRegex(ValidationError, "Must be valid JSON: "):
+            json_validator("{")
+
+    @override_tmpcadir()
+    @freeze_time(TIMESTAMPS["everything_valid"])
+    def test_crl_counter(self) -> None:
+        """Test that CRL numbers are stored in a separate table without saving the certificate authority."""
+        ca = self.cas["root"]
+        self.assertFalse(ca.crl_counters.exists())
+
+        with mock.patch.object(CertificateAuthority, "save") as save_mock:
+            ca.get_crl(key_backend_options, scope="user")
+            ca.get_crl(key_backend_options, scope="user")
+            ca.get_crl(key_backend_options, scope="ca")
+        save_mock.assert_not_called()
+
+        self.assertEqual(dict(ca.crl_counters.values_list("counter", "number")), {"user": 2, "ca": 1})
+
+        # Counters for other certificate authorities are independent
+        child = self.cas["child"]
+        crl = child.get_crl(key_backend_options, scope="user")
+        self.assertEqual(crl.extensions.get_extension_for_class(x509.CRLNumber).value.crl_number, 0)
+
+    @freeze_time(TIMESTAMPS["everything_valid"])
+    def test_get_crl_revocations(self) -> None:
+        """Test getting CRL entries without loading model instances."""
+        ca = self.cas["root"]
+        now = timezone.now()
+        cert = self.certs["root-cert"]
+        child = self.cas["child"]
+        cert.revoke(ReasonFlags.key_compromise, compromised=now - timedelta(days=1))
+        child.revoke()
+
+        def entries(
+            revocations: Iterable[x509.RevokedCertificate],
+        ) -> List[Tuple[int, datetime, List[x509.Extension[x509.ExtensionType]]]]:
+            return [(rev.serial_number, rev.revocation_date_utc, list(rev.extensions)) for rev in revocations]
+
+        expected_cert = entries([cert.get_revocation()])
+        expected_child = entries([child.get_revocation()])
+
+        with self.assertNumQueries(1):
+            self.assertEqual(entries(ca.get_crl_revocations("user", now)), expected_cert)
+        with self.assertNumQueries(1):
+            self.assertEqual(entries(ca.get_crl_revocations("ca", now)), expected_child)
+        with self.assertNumQueries(2):
+            self.assertEqual(entries(ca.get_crl_revocations(None, now)), expected_child + expected_cert)
+        with self.assertNumQueries(0):
+            self.assertEqual(entries(ca.get_crl_revocations("attribute", now)), [])
+
+        # Expired certificates are not included
+        self.assertEqual(entries(ca.get_crl_revocations(None, cert.expires)), expected_child)
+
+        # Naive timestamps (with USE_TZ=False) are also supported
+        compromised = datetime(2020, 1, 1)
+        revocation = get_revoked_certificate(1, compromised, ReasonFlags.unspecified.name, compromised)
+        invalidity_date = revocation.extensions.get_extension_for_class(x509.InvalidityDate)
+        self.assertEqual(invalidity_date.value.invalidity_date, compromised)
+
+        # Entries are identical to the ones from model instances
+        for scope in ("ca", "user", "attribute", None):
+            revocations = [cert.get_revocation() for cert in ca.get_crl_certs(scope, now)]
+            self.assertEqual(entries(ca.get_crl_revocations(scope, now)), entries(revocations))
+
+        with self.assertRaisesRegex(ValueError, r'^scope must be either None, "ca", "user" or "attribute"$'):
+            list(ca.get_crl_revocations("foobar", now))  # type: ignore[arg-type]
+        with self.assertRaisesRegex(ValueError, r'^scope must be either None, "ca", "user" or "attribute"$'):
+            ca.get_crl_certs("foobar", now)  # type: ignore[arg-type]
+
+    @override_tmpcadir()
+    def test_delta_crl(self) -> None:
+        """Test generating delta CRLs."""
+        ca = self.cas["root"]
+        cert = self.certs["root-cert"]
+        idp = get_idp(full_name=idp_full_name(ca), only_contains_user_certs=True)
+        delta_full_name = [uri("http://localhost/delta/")]
+
+        with freeze_time(TIMESTAMPS["everything_valid"]) as frozen_time:
+            self.assertIsNone(ca.get_last_complete_crl("user"))
+            with self.assertRaisesRegex(
+                ValueError, r"^Cannot generate a delta CRL before a complete CRL was published\.$"
+            ):
+                ca.get_crl(key_backend_options, scope="user", delta=True)
+
+            # Complete CRLs include the FreshestCRL extension
+            crl = ca.get_crl(key_backend_options, scope="user", delta_full_name=delta_full_name)
+            freshest_crl = x509.Extension(
+                oid=ExtensionOID.FRESHEST_CRL,
+                critical=False,
+                value=x509.FreshestCRL([distribution_point(delta_full_name)]),
+            )
+            self.assertCRL(
+                crl.public_bytes(Encoding.PEM),
+                idp=idp,
+                signer=ca,
+                algorithm=ca.algorithm,
+                extensions=[freshest_crl],
+            )
+
+            # Only published CRLs are used as base for delta CRLs
+            self.assertIsNone(ca.get_last_complete_crl("user"))
+            with self.assertRaisesRegex(
+                ValueError, r"^Cannot generate a delta CRL before a complete CRL was published\.$"
+            ):
+                ca.get_crl(key_backend_options, scope="user", delta=True)
+            ca._set_delta_crl_base(crl, "user")  # pylint: disable=protected-access
+            self.assertEqual(ca.get_last_complete_crl("user"), (0, datetime.now(tz=tz.utc)))
+
+            frozen_time.tick(timedelta(minutes=10))
+            cert.revoke()
+
+            # Delta CRL has the next CRL number, references the complete CRL and includes the new revocation
+            delta_crl_indicator = x509.Extension(
+                oid=ExtensionOID.DELTA_CRL_INDICATOR, critical=True, value=x509.DeltaCRLIndicator(0)
+            )
+            crl = ca.get_crl(key_backend_options, scope="user", delta=True, delta_full_name=delta_full_name)
+            self.assertCRL(
+                crl.public_bytes(Encoding.PEM),
+                expected=[cert],
+                idp=idp,
+                crl_number=1,
+                signer=ca,
+                algorithm=ca.algorithm,
+                extensions=[delta_crl_indicator],
+            )
+
+            # Generating a delta CRL does not update the reference to the last complete CRL
+            self.assertEqual(ca.get_last_complete_crl("user")[0], 0)  # type: ignore[index]
+
+            # A new complete CRL includes the revocation, a delta CRL after that does not
+            frozen_time.tick(timedelta(minutes=10))
+            crl = ca.get_crl(key_backend_options, scope="user")
+            self.assertEqual([entry.serial_number for entry in crl], [cert.pub.loaded.serial_number])
+            self.assertEqual(crl.extensions.get_extension_for_class(x509.CRLNumber).value.crl_number, 2)
+            ca._set_delta_crl_base(crl, "user")  # pylint: disable=protected-access
+            frozen_time.tick(timedelta(minutes=10))
+            delta_crl_indicator = x509.Extension(
+                oid=ExtensionOID.DELTA_CRL_INDICATOR, critical=True, value=x509.DeltaCRLIndicator(2)
+            )
+            crl = ca.get_crl(key_backend_options, scope="user", delta=True)
+            self.assertCRL(
+                crl.public_bytes(Encoding.PEM),
+                idp=idp,
+                crl_number=3,
+                signer=ca,
+                algorithm=ca.algorithm,
+                extensions=[delta_crl_indicator],
+            )
+
+    @override_settings(USE_TZ=False)
+    def test_delta_crl_without_timezone_support(self) -> None:
+        """Test generating delta CRLs without timezone support."""
+        # otherwise we get TZ warnings for preloaded objects
+        self.cas["root"].refresh_from_db()
+        self.certs["root-cert"].refresh_from_db()
+
+        self.test_delta_crl()
+
+    @override_tmpcadir(CA_CRL_PARTITIONS=2)
+    @freeze_time(TIMESTAMPS["everything_valid"])
+    def test_partitioned_crl(self) -> None:
+        """Test generating CRLs for a CRL partition."""
+        ca = self.cas["root"]
+        cert = self.certs["root-cert"]
+        cert.crl_partition = 1
+        cert.save()
+        cert.revoke()
+
+        # The full name must contain a placeholder for the partition
+        self.assertIsNone(ca.get_crl_partition_full_name())
+        self.assertIsNone(ca.get_crl_partition_full_name([uri("http://example.com")]))
+        sign_crl_distribution_points = ca.sign_crl_distribution_points
+        ca.sign_crl_distribution_points = None
+        self.assertIsNone(ca.get_crl_partition_full_name())
+        ca.sign_crl_distribution_points = sign_crl_distribution_points
+        msg = r"^Partitioned CRLs require a full name that contains {CRL_PARTITION}\.$"
+        with self.assertRaisesRegex(ValueError, msg):
+            ca.get_crl(key_backend_options, scope="user", partition=1)
+        with self.assertRaisesRegex(
+            ValueError, r'^Partitioned CRLs can only be generated for the "user" scope\.$'
+        ):
+            ca.get_crl(key_backend_options, scope="ca", partition=1)
+
+        ca.sign_crl_distribution_points = crl_distribution_points(
+            distribution_point([uri("http://example.com/{SIGNER_SERIAL_HEX}/{CRL_PARTITION}/")])
+        )
+        ca.save()
+
+        for partition, expected in [(0, []), (1, [cert])]:
+            idp = get_idp(
+                full_name=[uri(f"http://example.com/{ca.serial}/{partition}/")], only_contains_user_certs=True
+            )
+            crl = ca.get_crl(key_backend_options, scope="user", partition=partition)
+            self.assertCRL(
+                crl.public_bytes(Encoding.PEM), expected=expected, idp=idp, signer=ca, algorithm=ca.algorithm
+            )
+
+        # Every partition has its own CRL number
+        crl = ca.get_crl(key_backend_options, scope="user", partition=1)
+        self.assertEqual(crl.extensions.get_extension_for_class(x509.CRLNumber).value.crl_number, 1)
+
+        # An explicitly passed full name is also formatted
+        crl = ca.get_crl(
+            key_backend_options,
+            scope="user",
+            partition=1,
+            full_name=[uri("http://crl.example.com/{CRL_PARTITION}.crl")],
+        )
+        idp = crl.extensions.get_extension_for_class(x509.IssuingDistributionPoint).value
+        self.assertEqual(idp.full_name, [uri("http://crl.example.com/1.crl")])
+
+        # The complete CRL still contains all certificates
+        crl = ca.get_crl(key_backend_options, scope="user")
+        self.assertEqual([entry.serial_number for entry in crl], [cert.pub.loaded.serial_number])
 
     def test_crl_invalid_scope(self) -> None:
         """Try getting a CRL with an invalid scope."""
@@ -482,9 +702,15 @@ class CertificateAuthorityTests(TestCaseMixin, X509CertMixinTestCaseMixin, TestC
                 pem_ca_crl, idp=ca_idp, crl_number=0, encoding=Encoding.PEM, signer=ca, algorithm=ca.algorithm
             )
 
-            # cache again - which will force triggering a new computation
+            # cache again - CRLs are not regenerated, as nothing changed
             with self.settings(CA_CRL_PROFILES=crl_profiles):
                 ca.cache_crls(ca_private_key_options)
+            self.assertEqual(cache.get(der_user_key), der_user_crl)
+            self.assertEqual(cache.get(der_ca_key), der_ca_crl)
+
+            # cache again - which will force triggering a new computation
+            with self.settings(CA_CRL_PROFILES=crl_profiles):
+                ca.cache_crls(ca_private_key_options, force=True)
 
             # Get CRLs from cache - we have a new CRLNumber
             der_user_crl = cache.get(der_user_key)
@@ -542,6 +768,230 @@ class CertificateAuthorityTests(TestCaseMixin, X509CertMixinTestCaseMixin, TestC
             self.assertIsNone(cache.get(der_user_key))
             self.assertIsNone(cache.get(pem_user_key))
 
+    @override_tmpcadir(CA_DEFAULT_HOSTNAME="example.com")
+    @freeze_time(TIMESTAMPS["everything_valid"])
+    def test_cache_crls_with_delta(self) -> None:
+        """Test caching of delta CRLs."""
+        ca = self.cas["root"]
+        crl_profiles = self.crl_profiles
+        crl_profiles["user"]["delta"] = {"expires": 1800}
+        crl_profiles["ca"]["OVERRIDES"][ca.serial]["delta"] = {"full_name": ["http://delta.example.com"]}
+
+        with self.settings(CA_CRL_PROFILES=crl_profiles):
+            ca.cache_crls(key_backend_options)
+
+        # Complete CRLs point to the delta CRLs
+        user_crl = x509.load_der_x509_crl(cache.get(get_crl_cache_key(ca.serial, Encoding.DER, "user")))
+        ca_crl = x509.load_der_x509_crl(cache.get(get_crl_cache_key(ca.serial, Encoding.DER, "ca")))
+        delta_path = reverse("django_ca:delta-crl", kwargs={"serial": ca.serial})
+        self.assertEqual(
+            user_crl.extensions.get_extension_for_class(x509.FreshestCRL).value,
+            x509.FreshestCRL([distribution_point([uri(f"http://example.com{delta_path}")])]),
+        )
+        self.assertEqual(
+            ca_crl.extensions.get_extension_for_class(x509.FreshestCRL).value,
+            x509.FreshestCRL([distribution_point([uri("http://delta.example.com")])]),
+        )
+
+        delta_user_crl = cache.get(get_crl_cache_key(ca.serial, Encoding.DER, "user", delta=True))
+        self.assertCRL(
+            delta_user_crl,
+            idp=get_idp(full_name=idp_full_name(ca), only_contains_user_certs=True),
+            expires=1800,
+            crl_number=1,
+            encoding=Encoding.DER,
+            signer=ca,
+            algorithm=ca.algorithm,
+            extensions=[
+                x509.Extension(
+                    oid=ExtensionOID.DELTA_CRL_INDICATOR, critical=True, value=x509.DeltaCRLIndicator(0)
+                )
+            ],
+        )
+        delta_ca_crl = x509.load_der_x509_crl(
+            cache.get(get_crl_cache_key(ca.serial, Encoding.DER, "ca", delta=True))
+        )
+        self.assertEqual(
+            delta_ca_crl.extensions.get_extension_for_class(x509.DeltaCRLIndicator).value,
+            x509.DeltaCRLIndicator(0),
+        )
+
+        # The default delta CRL URL requires the default hostname, and only works for CA or user scope
+        with self.settings(CA_DEFAULT_HOSTNAME=None):
+            self.assertIsNone(ca._get_default_delta_full_name("user"))  # pylint: disable=protected-access
+        self.assertIsNone(ca._get_default_delta_full_name(None))  # pylint: disable=protected-access
+        ca_delta_path = reverse("django_ca:ca-delta-crl", kwargs={"serial": ca.serial})
+        self.assertEqual(
+            ca._get_default_delta_full_name("ca"),  # pylint: disable=protected-access
+            [uri(f"http://example.com{ca_delta_path}")],
+        )
+
+    @override_tmpcadir()
+    def test_cache_crls_with_delta_after_revocation(self) -> None:
+        """Test that revoking a certificate only regenerates the delta CRL."""
+        ca = self.cas["root"]
+        cert = self.certs["root-cert"]
+        crl_profiles = self.crl_profiles
+        crl_profiles["user"]["delta"] = {"expires": 1800}
+        cache_key = get_crl_cache_key(ca.serial, Encoding.DER, "user")
+        delta_cache_key = get_crl_cache_key(ca.serial, Encoding.DER, "user", delta=True)
+
+        with self.settings(CA_CRL_PROFILES=crl_profiles), freeze_time(TIMESTAMPS["everything_valid"]):
+            ca.cache_crls(key_backend_options)
+        base_crl = cache.get(cache_key)
+
+        with self.settings(CA_CRL_PROFILES=crl_profiles), freeze_time(
+            TIMESTAMPS["everything_valid"] + timedelta(minutes=5)
+        ):
+            cert.revoke()
+            ca.cache_crls(key_backend_options)
+
+        # The complete CRL was not regenerated and does not contain the certificate
+        self.assertEqual(cache.get(cache_key), base_crl)
+        crl = x509.load_der_x509_crl(base_crl)
+        self.assertEqual(crl.extensions.get_extension_for_class(x509.CRLNumber).value.crl_number, 0)
+        self.assertEqual(len(crl), 0)
+
+        # The delta CRL refers to the cached complete CRL and contains the newly revoked certificate
+        delta_crl = x509.load_der_x509_crl(cache.get(delta_cache_key))
+        self.assertEqual(
+            delta_crl.extensions.get_extension_for_class(x509.DeltaCRLIndicator).value,
+            x509.DeltaCRLIndicator(0),
+        )
+        self.assertEqual(delta_crl.extensions.get_extension_for_class(x509.CRLNumber).value.crl_number, 2)
+        self.assertEqual([entry.serial_number for entry in delta_crl], [cert.pub.loaded.serial_number])
+
+    @override_tmpcadir(CA_CRL_PARTITIONS=2)
+    @freeze_time(TIMESTAMPS["everything_valid"])
+    def test_cache_crls_with_partitions(self) -> None:
+        """Test caching of partitioned CRLs."""
+        ca = self.cas["root"]
+        partition_key = get_crl_cache_key(ca.serial, Encoding.DER, "user", partition=0)
+
+        # Partitioned CRLs are not generated if the CA does not use partition-specific CRL URLs
+        with self.settings(CA_CRL_PROFILES=self.crl_profiles):
+            ca.cache_crls(key_backend_options)
+        self.assertIsNone(cache.get(partition_key))
+
+        ca.sign_crl_distribution_points = crl_distribution_points(
+            distribution_point([uri("http://example.com/{CRL_PARTITION}/")])
+        )
+        ca.save()
+        with self.settings(CA_CRL_PROFILES=self.crl_profiles):
+            ca.cache_crls(key_backend_options)
+
+        for partition in range(2):
+            crl = cache.get(get_crl_cache_key(ca.serial, Encoding.DER, "user", partition=partition))
+            self.assertCRL(
+                crl,
+                idp=get_idp(
+                    full_name=[uri(f"http://example.com/{partition}/")], only_contains_user_certs=True
+                ),
+                encoding=Encoding.DER,
+                signer=ca,
+                algorithm=ca.algorithm,
+            )
+        self.assertIsNone(cache.get(get_crl_cache_key(ca.serial, Encoding.DER, "ca", partition=0)))
+        self.assertIsNone(cache.get(get_crl_cache_key(ca.serial, Encoding.DER, "user", partition=2)))
+
+        # The complete CRL does not use the partition-specific URL in its IssuingDistributionPoint
+        self.assertCRL(
+            cache.get(get_crl_cache_key(ca.serial, Encoding.DER, "user")),
+            idp=get_idp(only_contains_user_certs=True),
+            encoding=Encoding.DER,
+            signer=ca,
+            algorithm=ca.algorithm,
+        )
+
+    @override_tmpcadir(CA_CRL_PARTITIONS=2)
+    @freeze_time(TIMESTAMPS["everything_valid"])
+    def test_cache_crls_with_changed_partitions(self) -> None:
+        """Test that CRLs are still generated for partitions of certificates if the number is reduced."""
+        ca = self.cas["root"]
+        cert = self.certs["root-cert"]
+        ca.sign_crl_distribution_points = crl_distribution_points(
+            distribution_point([uri("http://example.com/{CRL_PARTITION}/")])
+        )
+        ca.save()
+
+        # Certificate was assigned to a partition when more partitions were configured
+        cert.crl_partition = 3
+        cert.save()
+        cert.revoke()
+        self.assertEqual(ca.get_crl_partitions(), [0, 1, 3])
+
+        with self.settings(CA_CRL_PROFILES=self.crl_profiles):
+            ca.cache_crls(key_backend_options)
+
+        self.assertCRL(
+            cache.get(get_crl_cache_key(ca.serial, Encoding.DER, "user", partition=3)),
+            expected=[cert],
+            idp=get_idp(full_name=[uri("http://example.com/3/")], only_contains_user_certs=True),
+            encoding=Encoding.DER,
+            signer=ca,
+            algorithm=ca.algorithm,
+        )
+        self.assertIsNone(cache.get(get_crl_cache_key(ca.serial, Encoding.DER, "user", partition=2)))
+
+        # Once the certificate expired, the partition is no longer used
+        with freeze_time(cert.expires + timedelta(seconds=1)):
+            self.assertEqual(ca.get_crl_partitions(), [0, 1])
+
+    @override_tmpcadir()
+    @freeze_time(TIMESTAMPS["everything_valid"])
+    def test_cache_crls_with_storage(self) -> None:
+        """Test publishing CRLs to a storage."""
+        ca = self.cas["root"]
+        crl_profiles = self.crl_profiles
+        crl_profiles["user"]["encodings"] = ["DER", "PEM"]
+        crl_storages = {**settings.STORAGES, "crl": {"BACKEND": "django.core.files.storage.InMemoryStorage"}}
+
+        with self.settings(CA_CRL_PROFILES=crl_profiles, STORAGES=crl_storages, CA_CRL_STORAGE_ALIAS="crl"):
+            ca.cache_crls(key_backend_options)
+
+            storage = storages["crl"]
+            for encoding, scope in ((Encoding.DER, "user"), (Encoding.PEM, "user"), (Encoding.DER, "ca")):
+                cache_key = get_crl_cache_key(ca.serial, encoding, scope)
+                with storage.open(get_crl_storage_path(ca.serial, encoding, scope=scope)) as stream:
+                    self.assertEqual(stream.read(), cache.get(cache_key))
+
+                # The nextUpdate of the published CRL is cached, so that views know it is up to date
+                _last_update, next_update = get_crl_validity(cache.get(cache_key))
+                self.assertEqual(cache.get(get_crl_published_cache_key(cache_key)), next_update)
+
+    @override_tmpcadir()
+    def test_cache_crls_unchanged(self) -> None:
+        """Test that CRLs are only regenerated if revocations changed or they are about to expire."""
+        ca = self.cas["root"]
+        cache_key = get_crl_cache_key(ca.serial, Encoding.DER, "user")
+
+        def crl_number() -> int:
+            crl = x509.load_der_x509_crl(cache.get(cache_key))
+            return crl.extensions.get_extension_for_class(x509.CRLNumber).value.crl_number
+
+        with self.settings(CA_CRL_PROFILES=self.crl_profiles), freeze_time(TIMESTAMPS["everything_valid"]):
+            ca.cache_crls(key_backend_options)
+            ca.cache_crls(key_backend_options)
+            self.assertEqual(crl_number(), 0)
+
+            # Revoking a certificate changes the fingerprint of the user CRL
+            self.certs["root-cert"].revoke()
+            ca.cache_crls(key_backend_options)
+            self.assertEqual(crl_number(), 1)
+            self.assertEqual(len(x509.load_der_x509_crl(cache.get(cache_key))), 1)
+
+        # CRLs are also regenerated if they are about to expire
+        with self.settings(CA_CRL_PROFILES=self.crl_profiles), freeze_time(
+            TIMESTAMPS["everything_valid"] + timedelta(hours=12)
+        ):
+            ca.cache_crls(key_backend_options)
+            self.assertEqual(crl_number(), 1)
+        with self.settings(CA_CRL_PROFILES=self.crl_profiles), freeze_time(
+            TIMESTAMPS["everything_valid"] + timedelta(hours=19)
+        ):
+            ca.cache_crls(key_backend_options)
+            self.assertEqual(crl_number(), 2)
+
     @override_tmpcadir()
     def test_cache_crls_algorithm(self) -> None:
         """Test passing an explicit hash algorithm."""
@@ -653,6 +1103,110 @@ class CertificateAuthorityTests(TestCaseMixin, X509CertMixinTestCaseMixin, TestC
             self.assertNotEqual(cert_renewed.serial, cert.serial)
 
 
+@pytest.fixture()
+def usable_cache(settings: SettingsWrapper) -> Iterator[Dict[Any, Tuple[float, bool]]]:
+    """Fixture to enable caching results of CertificateAuthority.is_usable()."""
+    settings.CA_USABLE_CACHE_TIMEOUT = 60
+    _USABLE_CACHE.clear()
+    yield _USABLE_CACHE
+    _USABLE_CACHE.clear()
+
+
+def test_is_usable_with_cache(
+    usable_cache: Dict[Any, Tuple[float, bool]], usable_root: CertificateAuthority
+) -> None:
+    """Test that results of is_usable() are cached."""
+    with mock.patch.object(StoragesBackend, "is_usable", autospec=True, return_value=True) as is_usable_mock:
+        assert usable_root.is_usable(key_backend_options) is True
+        assert usable_root.is_usable(key_backend_options) is True
+        assert is_usable_mock.call_count == 1
+
+        # Different options (or none at all) are cached separately
+        assert usable_root.is_usable() is True
+        assert usable_root.is_usable(UsePrivateKeyOptions(password=b"foobar")) is True
+        assert is_usable_mock.call_count == 3
+
+        # Changing key backend options invalidates the cache
+        usable_root.key_backend_options = {"path": "other.key"}
+        assert usable_root.is_usable(key_backend_options) is True
+        assert is_usable_mock.call_count == 4
+
+        # Expired entries are not used
+        for cache_key, (_expires, usable) in list(usable_cache.items()):
+            usable_cache[cache_key] = (0, usable)
+        assert usable_root.is_usable(key_backend_options) is True
+        assert is_usable_mock.call_count == 5
+
+
+def test_check_usable_with_cache(
+    usable_cache: Dict[Any, Tuple[float, bool]], usable_root: CertificateAuthority
+) -> None:
+    """Test that successful calls to check_usable() are cached."""
+    with mock.patch.object(StoragesBackend, "check_usable", autospec=True) as check_usable_mock:
+        usable_root.check_usable(key_backend_options)
+        usable_root.check_usable(key_backend_options)
+    check_usable_mock.assert_called_once()
+
+    with mock.patch.object(StoragesBackend, "is_usable", autospec=True) as is_usable_mock:
+        assert usable_root.is_usable(key_backend_options) is True
+    is_usable_mock.assert_not_called()
+
+    # Errors are not cached
+    options = UsePrivateKeyOptions(password=b"wrong")
+    with mock.patch.object(
+        StoragesBackend, "check_usable", autospec=True, side_effect=ValueError("error")
+    ) as check_usable_mock:
+        for _i in range(2):
+            with pytest.raises(ValueError, match=r"^error$"):
+                usable_root.check_usable(options)
+    assert check_usable_mock.call_count == 2
+
+
+def test_usable_cache_invalidation(
+    usable_cache: Dict[Any, Tuple[float, bool]], usable_root: CertificateAuthority
+) -> None:
+    """Test that cached results are removed when the certificate or the private key of a CA changes."""
+    other_cache_key = ("default", "AB:CD", "{}", None)
+    usable_cache[other_cache_key] = (float("inf"), True)
+
+    with mock.patch.object(StoragesBackend, "is_usable", autospec=True, return_value=True) as is_usable_mock:
+        assert usable_root.is_usable(key_backend_options) is True
+        assert usable_root.is_usable(key_backend_options) is True
+        assert is_usable_mock.call_count == 1
+
+        # Updating the certificate removes cached results
+        usable_root.update_certificate(usable_root.pub.loaded)
+        assert usable_root.is_usable(key_backend_options) is True
+        assert is_usable_mock.call_count == 2
+
+        # Storing a new private key removes cached results, even if the key backend options do not change
+        key_backend_options_before = {"path": f"ca/{usable_root.serial.replace(':', '')}.key"}
+        usable_root.key_backend_options = key_backend_options_before
+        assert usable_root.is_usable(key_backend_options) is True
+        assert is_usable_mock.call_count == 3
+        usable_root.key_backend.store_private_key(
+            usable_root,
+            ec.generate_private_key(ec.SECP256R1()),
+            StorePrivateKeyOptions(path=Path("ca"), password=None),
+        )
+        assert usable_root.key_backend_options == key_backend_options_before
+        assert usable_root.is_usable(key_backend_options) is True
+        assert is_usable_mock.call_count == 4
+
+    # Results for other CAs are not removed
+    assert usable_cache[other_cache_key] == (float("inf"), True)
+
+
+def test_is_usable_without_cache(usable_root: CertificateAuthority) -> None:
+    """Test that results of is_usable() are not cached by default."""
+    assert ca_settings.CA_USABLE_CACHE_TIMEOUT is None
+    with mock.patch.object(StoragesBackend, "is_usable", autospec=True, return_value=True) as is_usable_mock:
+        assert usable_root.is_usable(key_backend_options) is True
+        assert usable_root.is_usable(key_backend_options) is True
+    assert is_usable_mock.call_count == 2
+    assert not _USABLE_CACHE
+
+
 def test_empty_extensions_for_certificate(root: CertificateAuthority) -> None:
     """Test extensions_for_certificate property when no values are set."""
     root.sign_certificate_policies = None
@@ -961,6 +1515,32 @@ class CertificateAuthoritySignTests(TestCaseMixin, X509CertMixinTestCaseMixin, T
         with self.assertSignCertSignals(pre=False, post=False), self.assertRaisesRegex(ValueError, msg):
             self.ca.sign(key_backend_options, csr, subject=subject, extensions=[basic_constraints(ca=True)])
 
+    @override_tmpcadir()
+    @freeze_time(TIMESTAMPS["everything_valid"])
+    def test_sign_many(self) -> None:
+        """Test signing multiple certificates at once."""
+        subjects = [
+            x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, f"{i}.example.com")]) for i in range(3)
+        ]
+        requests = [(self.csr, subject, None) for subject in subjects]
+        requests[2] = (self.csr, subjects[2], [basic_constraints(critical=False)])
+
+        with self.assertSignCertSignals() as (pre, post), mock.patch.object(
+            StoragesBackend, "load_private_key", autospec=True, side_effect=StoragesBackend.load_private_key
+        ) as load_mock:
+            certs = self.ca.sign_many(key_backend_options, requests)
+        self.assertEqual(pre.call_count, 3)
+        self.assertEqual(post.call_count, 3)
+        load_mock.assert_called_once()
+
+        self.assertEqual([cert.subject for cert in certs], subjects)
+        self.assertEqual(len({cert.serial_number for cert in certs}), 3)
+        for cert in certs:
+            self.assertBasicCert(cert)
+            cert.verify_directly_issued_by(self.ca.pub.loaded)
+        bc_ext = certs[2].extensions.get_extension_for_class(x509.BasicConstraints)
+        self.assertEqual(bc_ext, basic_constraints(critical=False))
+
 
 class CertificateTests(TestCaseMixin, X509CertMixinTestCaseMixin, TestCase):
     """Test :py:class:`django_ca.models.Certificate`."""
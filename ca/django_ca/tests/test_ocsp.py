@@ -0,0 +1,384 @@
+# This file is part of django-ca (https://github.com/mathiasertl/django-ca).
+#
+# django-ca is free software: you can redistribute it and/or modify it under the terms of the GNU General
+# Public License as published by the Free Software Foundation, either version 3 of the License, or (at your
+# option) any later version.
+#
+# django-ca is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License
+# for more details.
+#
+# You should have received a copy of the GNU General Public License along with django-ca. If not, see
+# <http://www.gnu.org/licenses/>.
+
+"""Test functions for creating OCSP responses."""
+
+from datetime import datetime, timedelta, timezone as tz
+from typing import List, Optional, Tuple, Type
+from unittest import mock
+
+from asn1crypto import ocsp as asn1_ocsp
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.serialization import Encoding
+from cryptography.x509 import ocsp
+from cryptography.x509.oid import OCSPExtensionOID
+
+import pytest
+from pytest_django import DjangoAssertNumQueries
+
+from django_ca.models import Certificate, CertificateAuthority
+from django_ca.ocsp import (
+    CertificateID,
+    IssuerIndex,
+    KnownSerials,
+    SerialFilter,
+    get_issuer_hashes,
+    get_ocsp_response_validity,
+    get_single_response,
+    load_ocsp_request,
+)
+
+NOW = datetime(2024, 4, 1, 12, 30, 15, 123456, tzinfo=tz.utc)
+
+
+def _request_with_extension(
+    ca: CertificateAuthority, cert: x509.Certificate, critical: bool
+) -> asn1_ocsp.OCSPRequest:
+    builder = ocsp.OCSPRequestBuilder().add_certificate(cert, ca.pub.loaded, hashes.SHA1())
+    request = asn1_ocsp.OCSPRequest.load(builder.build().public_bytes(Encoding.DER))
+    request["tbs_request"]["request_extensions"] = [
+        {"extn_id": "1.2.3", "critical": critical, "extn_value": b"foo"}
+    ]
+    return request
+
+
+def _cert_id(ca: CertificateAuthority, algorithm: hashes.HashAlgorithm) -> CertificateID:
+    issuer_name_hash, issuer_key_hash = get_issuer_hashes(ca, algorithm)
+    return CertificateID(algorithm, issuer_name_hash, issuer_key_hash, 123)
+
+
+@pytest.mark.parametrize("algorithm", (hashes.SHA1, hashes.SHA256, hashes.SHA512))
+def test_get_issuer_hashes(
+    root: CertificateAuthority, root_cert_pub: x509.Certificate, algorithm: Type[hashes.HashAlgorithm]
+) -> None:
+    """Test that issuer hashes match the hashes generated by cryptography."""
+    request = ocsp.OCSPRequestBuilder().add_certificate(root_cert_pub, root.pub.loaded, algorithm()).build()
+    expected = (request.issuer_name_hash, request.issuer_key_hash)
+    assert get_issuer_hashes(root, algorithm()) == expected
+    assert get_issuer_hashes(root, algorithm()) == expected  # test cached value
+
+
+def test_get_single_response(root: CertificateAuthority) -> None:
+    """Test a single response for a valid certificate."""
+    status = {"revoked": False, "revoked_date": None, "revoked_reason": "", "compromised": None}
+    response = get_single_response(root, 123, hashes.SHA256(), status, NOW, NOW + timedelta(hours=1))
+    assert response["cert_id"]["serial_number"].native == 123
+    assert response["cert_id"]["hash_algorithm"]["algorithm"].native == "sha256"
+    assert response["cert_status"].name == "good"
+    assert response["this_update"].native == NOW.replace(microsecond=0)
+    assert response["next_update"].native == NOW.replace(microsecond=0) + timedelta(hours=1)
+    assert response["single_extensions"].native is None
+
+
+def test_get_single_response_with_revoked_certificate(root: CertificateAuthority) -> None:
+    """Test a single response for a revoked certificate with a naive revocation date and no reason."""
+    revoked_date = datetime(2024, 3, 1, 10, 0, 0, 12)
+    status = {"revoked": True, "revoked_date": revoked_date, "revoked_reason": "", "compromised": None}
+    response = get_single_response(root, 123, hashes.SHA256(), status, NOW, NOW)
+    assert response["cert_status"].name == "revoked"
+    assert response["cert_status"].native == {
+        "revocation_time": revoked_date.replace(microsecond=0, tzinfo=tz.utc),
+        "revocation_reason": None,
+    }
+
+
+def test_get_single_response_with_compromised_certificate(root: CertificateAuthority) -> None:
+    """Test a single response for a compromised certificate."""
+    status = {
+        "revoked": True,
+        "revoked_date": NOW,
+        "revoked_reason": "key_compromise",
+        "compromised": NOW - timedelta(days=1),
+    }
+    response = get_single_response(root, 123, hashes.SHA256(), status, NOW, NOW)
+    assert response["cert_status"].native == {
+        "revocation_time": NOW.replace(microsecond=0),
+        "revocation_reason": "key_compromise",
+    }
+    assert response["single_extensions"].native == [
+        {
+            "extn_id": "invalidity_date",
+            "critical": False,
+            "extn_value": NOW.replace(microsecond=0) - timedelta(days=1),
+        }
+    ]
+
+
+def test_get_single_response_with_unknown_certificate(root: CertificateAuthority) -> None:
+    """Test a single response for a certificate that was not issued by the certificate authority."""
+    response = get_single_response(root, 123, hashes.SHA256(), None, NOW, NOW + timedelta(hours=1))
+    assert response["cert_id"]["serial_number"].native == 123
+    assert response["cert_status"].name == "unknown"
+    assert response["single_extensions"].native is None
+
+
+def test_get_single_response_with_inconsistent_status(root: CertificateAuthority) -> None:
+    """Test a single response for a revoked certificate with no revocation date."""
+    status = {"revoked": True, "revoked_date": None, "revoked_reason": "", "compromised": None}
+    with pytest.raises(ValueError, match=r"^Inconsistent model state: revoked=True and revoked_date=None\.$"):
+        get_single_response(root, 123, hashes.SHA256(), status, NOW, NOW)
+
+
+def test_load_ocsp_request(root: CertificateAuthority, root_cert_pub: x509.Certificate) -> None:
+    """Test loading a request with a nonce."""
+    builder = ocsp.OCSPRequestBuilder().add_certificate(root_cert_pub, root.pub.loaded, hashes.SHA256())
+    request = builder.add_extension(x509.OCSPNonce(b"foo"), critical=True).build()
+    issuer_name_hash, issuer_key_hash = get_issuer_hashes(root, hashes.SHA256())
+
+    cert_ids, nonce = load_ocsp_request(request.public_bytes(Encoding.DER))
+    assert len(cert_ids) == 1
+    assert isinstance(cert_ids[0].algorithm, hashes.SHA256)
+    assert cert_ids[0].issuer_name_hash == issuer_name_hash
+    assert cert_ids[0].issuer_key_hash == issuer_key_hash
+    assert cert_ids[0].serial_number == root_cert_pub.serial_number
+    assert nonce == x509.Extension(oid=OCSPExtensionOID.NONCE, critical=True, value=x509.OCSPNonce(b"foo"))
+
+
+def test_load_ocsp_request_with_non_critical_extension(
+    root: CertificateAuthority, root_cert_pub: x509.Certificate
+) -> None:
+    """Test that unknown non-critical extensions are ignored."""
+    request = _request_with_extension(root, root_cert_pub, critical=False)
+    request["tbs_request"]["request_list"][0]["single_request_extensions"] = [
+        {"extn_id": "1.2.3", "critical": False, "extn_value": b"foo"}
+    ]
+    cert_ids, nonce = load_ocsp_request(request.dump(force=True))
+    assert len(cert_ids) == 1
+    assert nonce is None
+
+
+def test_load_ocsp_request_with_critical_extension(
+    root: CertificateAuthority, root_cert_pub: x509.Certificate
+) -> None:
+    """Test that unknown critical extensions are rejected."""
+    request = _request_with_extension(root, root_cert_pub, critical=True)
+    with pytest.raises(ValueError, match=r"^1\.2\.3: Unsupported critical extension in OCSP request\.$"):
+        load_ocsp_request(request.dump())
+
+
+def test_load_ocsp_request_with_critical_single_request_extension(
+    root: CertificateAuthority, root_cert_pub: x509.Certificate
+) -> None:
+    """Test that unknown critical extensions in single requests are rejected."""
+    request = _request_with_extension(root, root_cert_pub, critical=False)
+    request["tbs_request"]["request_list"][0]["single_request_extensions"] = [
+        {"extn_id": "1.2.3", "critical": True, "extn_value": b"foo"}
+    ]
+    with pytest.raises(ValueError, match=r"^1\.2\.3: Unsupported critical extension in OCSP request\.$"):
+        load_ocsp_request(request.dump(force=True))
+
+
+def test_load_ocsp_request_with_unsupported_hash_algorithm(
+    root: CertificateAuthority, root_cert_pub: x509.Certificate
+) -> None:
+    """Test that unsupported hash algorithms are rejected."""
+    request = _request_with_extension(root, root_cert_pub, critical=False)
+    request["tbs_request"]["request_list"][0]["req_cert"]["hash_algorithm"] = {"algorithm": "md5"}
+    with pytest.raises(ValueError, match=r"^md5: Unsupported hash algorithm in OCSP request\.$"):
+        load_ocsp_request(request.dump(force=True))
+
+
+def test_load_ocsp_request_with_no_requests() -> None:
+    """Test that requests without any certificates are rejected."""
+    request = asn1_ocsp.OCSPRequest({"tbs_request": {"request_list": []}})
+    with pytest.raises(ValueError, match=r"^OCSP request does not contain any requests\.$"):
+        load_ocsp_request(request.dump())
+
+
+def test_load_ocsp_request_with_invalid_data() -> None:
+    """Test loading invalid data."""
+    with pytest.raises(ValueError, match=r"^error parsing asn1 value: "):
+        load_ocsp_request(b"foobar")
+
+
+@pytest.mark.parametrize("algorithm", (hashes.SHA1, hashes.SHA256, hashes.SHA512))
+def test_issuer_index(
+    root: CertificateAuthority, child: CertificateAuthority, algorithm: Type[hashes.HashAlgorithm]
+) -> None:
+    """Test looking up certificate authorities in the issuer index."""
+    index = IssuerIndex()
+    assert index.get(_cert_id(root, algorithm())) == root
+    assert index.get(_cert_id(child, algorithm())) == child
+    assert algorithm().name in index.hashes
+
+
+def test_issuer_index_with_unknown_issuer(root: CertificateAuthority) -> None:
+    """Test looking up hashes that do not match any certificate authority."""
+    index = IssuerIndex()
+    assert index.get(CertificateID(hashes.SHA1(), b"foo", b"bar", 123)) is None
+    assert index.get(_cert_id(root, hashes.SHA1())._replace(issuer_name_hash=b"foo")) is None
+
+
+def test_issuer_index_rebuild(
+    django_assert_num_queries: DjangoAssertNumQueries, root: CertificateAuthority, child: CertificateAuthority
+) -> None:
+    """Test that the index is rebuilt when the version in the cache changes."""
+    index = IssuerIndex()
+    child_cert_id = _cert_id(child, hashes.SHA256())
+    assert index.get(child_cert_id) == child
+    version = index.version
+
+    # Index is not rebuilt while the version stays the same
+    with django_assert_num_queries(0):
+        assert index.get(child_cert_id) == child
+    assert index.version == version
+
+    # Deleting a certificate authority invalidates the index
+    child.delete()
+    assert index.get(child_cert_id) is None
+    assert index.get(_cert_id(root, hashes.SHA256())) == root
+    assert index.version != version
+
+
+def test_issuer_index_lookup_during_rebuild(root: CertificateAuthority, child: CertificateAuthority) -> None:
+    """Test that lookups while the index is rebuilt (in another thread) still use the previous index."""
+    index = IssuerIndex()
+    root_cert_id = _cert_id(root, hashes.SHA256())
+    assert index.get(root_cert_id) == root
+    lookups: List[Optional[CertificateAuthority]] = []
+
+    def get_hashes(ca: CertificateAuthority, algorithm: hashes.HashAlgorithm) -> Tuple[bytes, bytes]:
+        sha256_index = index.hashes.get("sha256", {})
+        lookups.append(sha256_index.get((root_cert_id.issuer_name_hash, root_cert_id.issuer_key_hash)))
+        return get_issuer_hashes(ca, algorithm)
+
+    with mock.patch("django_ca.ocsp.get_issuer_hashes", autospec=True, side_effect=get_hashes):
+        index.rebuild("new-version")
+    assert lookups == [root] * len(lookups)
+    assert len(lookups) == 4  # two CAs for two precomputed hash algorithms
+    assert index.get(root_cert_id) == root
+
+
+def test_issuer_index_invalidated_on_save(root: CertificateAuthority) -> None:
+    """Test that saving a certificate authority invalidates the index."""
+    index = IssuerIndex()
+    assert index.get(_cert_id(root, hashes.SHA256())) == root
+    version = index.version
+
+    root.save()
+    assert index.get(_cert_id(root, hashes.SHA256())) == root
+    assert index.version != version
+
+
+def test_serial_filter() -> None:
+    """Test the Bloom filter for serials."""
+    serials = [f"{serial:X}" for serial in range(1000)]
+    serial_filter = SerialFilter(serials)
+    assert all(serial in serial_filter for serial in serials)
+
+    # With a false positive rate of 1%, about 100 of 10000 other serials are found in the filter
+    false_positives = [serial for serial in range(1000, 11000) if f"{serial:X}" in serial_filter]
+    assert len(false_positives) < 200
+
+    assert "AB" not in SerialFilter([])
+    assert serial_filter.is_saturated is False
+
+
+def test_known_serials(
+    django_assert_num_queries: DjangoAssertNumQueries, root: CertificateAuthority, root_cert: Certificate
+) -> None:
+    """Test that filters are built once and then updated incrementally."""
+    known_serials = KnownSerials()
+    queryset = Certificate.objects.filter(ca=root)
+    with django_assert_num_queries(1):
+        assert known_serials.filter(root.serial, "cert", queryset, [root_cert.serial]) == [root_cert.serial]
+
+    # Unknown serials do not cause a database query, as the filter was just updated
+    with django_assert_num_queries(0):
+        assert known_serials.filter(root.serial, "cert", queryset, [root_cert.serial, "AB"]) == [
+            root_cert.serial
+        ]
+
+    # Issuing a new certificate updates the filter (the new certificate is retrieved with a single query)
+    root_cert.pk = None
+    root_cert.serial = "ABC123"
+    root_cert.save()
+    with django_assert_num_queries(1):
+        assert known_serials.filter(root.serial, "cert", queryset, ["ABC123"]) == ["ABC123"]
+
+    # Certificates created without signals are found once the refresh interval has passed
+    root_cert.pk = None
+    root_cert.serial = "DEF456"
+    Certificate.objects.bulk_create([root_cert])
+    with django_assert_num_queries(0):
+        assert known_serials.filter(root.serial, "cert", queryset, ["DEF456"]) == []
+    with mock.patch.object(KnownSerials, "refresh_interval", 0), django_assert_num_queries(1):
+        assert known_serials.filter(root.serial, "cert", queryset, ["DEF456"]) == ["DEF456"]
+
+
+def test_known_serials_with_saturated_filter(
+    django_assert_num_queries: DjangoAssertNumQueries, root: CertificateAuthority, root_cert: Certificate
+) -> None:
+    """Test that saturated filters are rebuilt."""
+    known_serials = KnownSerials()
+    queryset = Certificate.objects.filter(ca=root)
+    known_serials.filter(root.serial, "cert", queryset, [root_cert.serial])
+    serial_filter = known_serials.filters[(root.serial, "cert")][1]
+    for serial in range(3):
+        serial_filter.add(f"{serial:X}")
+    assert serial_filter.is_saturated is True
+
+    known_serials.invalidate(root.serial, "cert")
+    with django_assert_num_queries(1):
+        assert known_serials.filter(root.serial, "cert", queryset, [root_cert.serial]) == [root_cert.serial]
+    assert known_serials.filters[(root.serial, "cert")][1] is not serial_filter
+    assert known_serials.filters[(root.serial, "cert")][1].is_saturated is False
+
+
+def _unsigned_ocsp_response(*responses: asn1_ocsp.SingleResponse, nonce: bool = False) -> bytes:
+    response_data = asn1_ocsp.ResponseData(
+        {"responder_id": {"by_key": b"foo"}, "produced_at": NOW, "responses": list(responses)}
+    )
+    if nonce is True:
+        response_data["response_extensions"] = [{"extn_id": "nonce", "extn_value": b"foo"}]
+    basic_response = {
+        "tbs_response_data": response_data,
+        "signature_algorithm": {"algorithm": "sha256_rsa"},
+        "signature": b"foo",
+    }
+    response = asn1_ocsp.OCSPResponse(
+        {
+            "response_status": "successful",
+            "response_bytes": {"response_type": "basic_ocsp_response", "response": basic_response},
+        }
+    )
+    return response.dump()  # type: ignore[no-any-return]
+
+
+def test_get_ocsp_response_validity(root: CertificateAuthority) -> None:
+    """Test getting the validity of an OCSP response."""
+    status = {"revoked": False, "revoked_date": None, "revoked_reason": "", "compromised": None}
+    now = NOW.replace(microsecond=0)
+    first = get_single_response(root, 1, hashes.SHA256(), status, now, now + timedelta(hours=2))
+    second = get_single_response(
+        root, 2, hashes.SHA256(), status, now - timedelta(hours=1), now + timedelta(hours=1)
+    )
+    assert get_ocsp_response_validity(_unsigned_ocsp_response(first)) == (now, now + timedelta(hours=2))
+    assert get_ocsp_response_validity(_unsigned_ocsp_response(first, second)) == (
+        now,
+        now + timedelta(hours=1),
+    )
+
+
+def test_get_ocsp_response_validity_with_uncacheable_response(root: CertificateAuthority) -> None:
+    """Test getting the validity of OCSP responses that may not be cached."""
+    status = {"revoked": False, "revoked_date": None, "revoked_reason": "", "compromised": None}
+    response = get_single_response(root, 1, hashes.SHA256(), status, NOW, NOW + timedelta(hours=1))
+    assert get_ocsp_response_validity(_unsigned_ocsp_response(response, nonce=True)) is None
+
+    unsuccessful = ocsp.OCSPResponseBuilder.build_unsuccessful(ocsp.OCSPResponseStatus.INTERNAL_ERROR)
+    assert get_ocsp_response_validity(unsuccessful.public_bytes(Encoding.DER)) is None
+
+    del response["next_update"]
+    assert get_ocsp_response_validity(_unsigned_ocsp_response(response)) is None
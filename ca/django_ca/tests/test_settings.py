@@ -453,6 +453,13 @@ class ImproperlyConfiguredTestCase(TestCaseMixin, TestCase):
             with self.settings(CA_DEFAULT_EXPIRES=timedelta(days=-3)):
                 pass
 
+    def test_usable_cache_timeout(self) -> None:
+        """Test invalid ``CA_USABLE_CACHE_TIMEOUT``."""
+        for value in (0, "10"):
+            msg = r"^CA_USABLE_CACHE_TIMEOUT must be None or a positive int\.$"
+            with assert_improperly_configured(msg), self.settings(CA_USABLE_CACHE_TIMEOUT=value):
+                pass
+
     def test_use_celery(self) -> None:
         """Test that CA_USE_CELERY=True and a missing Celery installation throws an error."""
         # Setting sys.modules['celery'] (modules cache) to None will cause the next import of that module
@@ -0,0 +1,423 @@
+# This file is part of django-ca (https://github.com/mathiasertl/django-ca).
+#
+# django-ca is free software: you can redistribute it and/or modify it under the terms of the GNU General
+# Public License as published by the Free Software Foundation, either version 3 of the License, or (at your
+# option) any later version.
+#
+# django-ca is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License
+# for more details.
+#
+# You should have received a copy of the GNU General Public License along with django-ca. If not, see
+# <http://www.gnu.org/licenses/>.
+
+"""Test the standalone OCSP/CRL responder serving revocation snapshots."""
+
+import asyncio
+import base64
+import io
+import json
+import os
+from datetime import datetime, timedelta
+from http import HTTPStatus
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Type
+from wsgiref.util import setup_testing_defaults
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.serialization import Encoding
+from cryptography.x509 import ocsp
+
+from django.core.cache import cache
+
+import pytest
+from freezegun import freeze_time
+from pytest_django.fixtures import SettingsWrapper
+
+from django_ca.key_backends.storages import UsePrivateKeyOptions
+from django_ca.models import Certificate, CertificateAuthority
+from django_ca.ocsp import get_ocsp_response_validity
+from django_ca.snapshot import Snapshot, SnapshotResponder, create_snapshot
+from django_ca.tests.base.constants import TIMESTAMPS
+from django_ca.tests.base.utils import crl_distribution_points, distribution_point, uri
+
+pytestmark = [pytest.mark.freeze_time(TIMESTAMPS["everything_valid"])]
+
+key_backend_options = UsePrivateKeyOptions(password=None)
+
+
+def _ocsp_request(
+    cert: x509.Certificate, issuer: x509.Certificate, algorithm: Type[hashes.HashAlgorithm] = hashes.SHA256
+) -> bytes:
+    builder = ocsp.OCSPRequestBuilder().add_certificate(cert, issuer, algorithm())
+    return builder.build().public_bytes(Encoding.DER)
+
+
+def _call(
+    responder: SnapshotResponder, path: str, method: str = "GET", body: bytes = b"", **environ: str
+) -> Tuple[str, Dict[str, str], bytes]:
+    """Call the WSGI application and return the status, headers and body."""
+    wsgi_environ: Dict[str, Any] = {
+        "REQUEST_METHOD": method,
+        "PATH_INFO": path,
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.input": io.BytesIO(body),
+        **environ,
+    }
+    setup_testing_defaults(wsgi_environ)
+    response: Dict[str, Any] = {}
+
+    def start_response(status: str, headers: List[Tuple[str, str]]) -> None:
+        response["status"] = status
+        response["headers"] = dict(headers)
+
+    content = b"".join(responder(wsgi_environ, start_response))
+    return response["status"], response["headers"], content
+
+
+@pytest.fixture()
+def snapshot_path(
+    tmp_path: Path, usable_root: CertificateAuthority, root_cert: Certificate, child: CertificateAuthority
+) -> Path:
+    """Fixture for a snapshot with a revoked certificate and cached CRLs."""
+    usable_root.generate_ocsp_key(key_backend_options)
+    usable_root.cache_crls(key_backend_options)
+    root_cert.revoke()
+
+    path = tmp_path / "snapshot.json"
+    with open(path, "w", encoding="utf-8") as stream:
+        json.dump(create_snapshot([usable_root]), stream)
+    return path
+
+
+def test_create_snapshot(usable_root: CertificateAuthority, root_cert: Certificate) -> None:
+    """Test creating a snapshot."""
+    usable_root.generate_ocsp_key(key_backend_options)
+    usable_root.cache_crls(key_backend_options)
+    root_cert.revoke(compromised=TIMESTAMPS["everything_valid"])
+    root_cert.refresh_from_db()
+
+    snapshot = create_snapshot([usable_root])
+    assert snapshot["version"] == 1
+    ca_data = snapshot["cas"][usable_root.serial]
+    assert base64.b64decode(ca_data["certificate"]) == usable_root.pub.der
+    assert ca_data["ocsp_response_validity"] == usable_root.ocsp_response_validity
+    assert ca_data["certificates"]["revoked"] == {
+        root_cert.serial: [
+            root_cert.revoked_date.isoformat(),  # type: ignore[union-attr]
+            "unspecified",
+            TIMESTAMPS["everything_valid"].isoformat(),
+        ]
+    }
+    assert root_cert.serial not in ca_data["certificates"]["good"]
+    assert ca_data["children"] == {"good": [], "revoked": {}}
+    assert sorted(ca_data["issuer_hashes"]) == ["sha1", "sha256"]
+    assert sorted(ca_data["crls"]) == ["ca", "user"]
+    assert sorted(ca_data["crls"]["user"]) == ["DER", "PEM"]
+
+    responder_cert = base64.b64decode(ca_data["responder"]["certificate"])
+    assert responder_cert == usable_root.ocsp_responder_certificate.public_bytes(Encoding.DER)
+
+
+def test_create_snapshot_without_responder_key(
+    caplog: pytest.LogCaptureFixture, tmpcadir: Path, root: CertificateAuthority
+) -> None:
+    """Test creating a snapshot for a CA without an OCSP responder key and CRLs."""
+    cache.clear()
+    snapshot = create_snapshot([root])
+    assert snapshot["cas"][root.serial]["responder"] is None
+    assert snapshot["cas"][root.serial]["crls"] == {}
+    assert Snapshot(snapshot).cas[root.serial].responder is None
+    assert caplog.messages == [f"{root.serial}: CA has no OCSP responder key, OCSP is not available."]
+
+
+def test_load_snapshot_with_unsupported_version() -> None:
+    """Test loading a snapshot with an unsupported version."""
+    with pytest.raises(ValueError, match=r"^2: Unsupported snapshot version\.$"):
+        Snapshot({"version": 2, "cas": {}})
+
+
+@pytest.mark.parametrize("algorithm", (hashes.SHA1, hashes.SHA256, hashes.SHA512))
+def test_ocsp_get(
+    snapshot_path: Path,
+    usable_root: CertificateAuthority,
+    root_cert: Certificate,
+    algorithm: Type[hashes.HashAlgorithm],
+) -> None:
+    """Test OCSP GET requests to the unified and the CA-specific responder."""
+    responder = SnapshotResponder(str(snapshot_path))
+    data = base64.b64encode(_ocsp_request(root_cert.pub.loaded, usable_root.pub.loaded, algorithm)).decode()
+
+    for path in (f"/ocsp/cert/{data}", f"/ocsp/{usable_root.serial}/cert/{data}"):
+        status, headers, content = _call(responder, path)
+        assert status == "200 OK"
+        assert headers["Content-Type"] == "application/ocsp-response"
+        assert "max-age" in headers["Cache-Control"]
+
+        response = ocsp.load_der_ocsp_response(content)
+        assert response.response_status == ocsp.OCSPResponseStatus.SUCCESSFUL
+        assert response.certificate_status == ocsp.OCSPCertStatus.REVOKED
+        assert response.serial_number == root_cert.pub.loaded.serial_number
+        assert isinstance(response.hash_algorithm, algorithm)
+        assert response.certificates == [usable_root.ocsp_responder_certificate]
+
+        # Test a conditional request
+        status, _headers, content = _call(responder, path, HTTP_IF_NONE_MATCH=headers["ETag"])
+        assert status == "304 Not Modified"
+        assert content == b""
+
+
+def test_ocsp_post(
+    snapshot_path: Path, usable_root: CertificateAuthority, child: CertificateAuthority
+) -> None:
+    """Test an OCSP POST request for a child CA."""
+    responder = SnapshotResponder(str(snapshot_path), prefix="/django_ca/")
+    request = _ocsp_request(child.pub.loaded, usable_root.pub.loaded)
+    status, headers, content = _call(responder, "/django_ca/ocsp/ca/", "POST", request)
+    assert status == "200 OK"
+    assert "Cache-Control" not in headers
+    response = ocsp.load_der_ocsp_response(content)
+    assert response.response_status == ocsp.OCSPResponseStatus.SUCCESSFUL
+    assert response.certificate_status == ocsp.OCSPCertStatus.GOOD
+    assert response.serial_number == child.pub.loaded.serial_number
+
+
+def test_ocsp_with_multiple_cas(
+    caplog: pytest.LogCaptureFixture,
+    tmp_path: Path,
+    usable_root: CertificateAuthority,
+    root_cert: Certificate,
+    child: CertificateAuthority,
+    child_cert: Certificate,
+) -> None:
+    """Test the unified responder with multiple CAs, one of them without an OCSP responder key."""
+    usable_root.generate_ocsp_key(key_backend_options)
+    path = tmp_path / "snapshot.json"
+    with open(path, "w", encoding="utf-8") as stream:
+        json.dump(create_snapshot([child, usable_root]), stream)
+    responder = SnapshotResponder(str(path))
+
+    request = _ocsp_request(root_cert.pub.loaded, usable_root.pub.loaded)
+    status, _headers, content = _call(responder, "/ocsp/cert/", "POST", request)
+    response = ocsp.load_der_ocsp_response(content)
+    assert response.response_status == ocsp.OCSPResponseStatus.SUCCESSFUL
+    assert response.certificate_status == ocsp.OCSPCertStatus.GOOD
+
+    request = _ocsp_request(child_cert.pub.loaded, child.pub.loaded)
+    status, _headers, content = _call(responder, "/ocsp/cert/", "POST", request)
+    assert ocsp.load_der_ocsp_response(content).response_status == ocsp.OCSPResponseStatus.INTERNAL_ERROR
+    key_hash = ocsp.load_der_ocsp_request(request).issuer_key_hash.hex()
+    assert f"{key_hash}: Certificate Authority could not be found." in caplog.messages
+
+
+def test_ocsp_with_unknown_issuer(
+    snapshot_path: Path, child: CertificateAuthority, child_cert: Certificate
+) -> None:
+    """Test the unified responder with a certificate authority that is not in the snapshot."""
+    responder = SnapshotResponder(str(snapshot_path))
+    request = _ocsp_request(child_cert.pub.loaded, child.pub.loaded)
+    status, _headers, content = _call(responder, "/ocsp/cert/", "POST", request)
+    assert status == "200 OK"
+    assert ocsp.load_der_ocsp_response(content).response_status == ocsp.OCSPResponseStatus.INTERNAL_ERROR
+
+
+def test_ocsp_with_unknown_certificate(
+    snapshot_path: Path, usable_root: CertificateAuthority, root_cert: Certificate
+) -> None:
+    """Test OCSP requests for a certificate that is not in the snapshot."""
+    responder = SnapshotResponder(str(snapshot_path))
+    request = _ocsp_request(root_cert.pub.loaded, usable_root.pub.loaded)
+    status, _headers, content = _call(responder, "/ocsp/ca/", "POST", request)  # cert is not a CA
+    assert status == "200 OK"
+    response = ocsp.load_der_ocsp_response(content)
+    assert response.response_status == ocsp.OCSPResponseStatus.SUCCESSFUL
+    assert response.certificate_status == ocsp.OCSPCertStatus.UNKNOWN
+    assert response.serial_number == root_cert.pub.loaded.serial_number
+
+
+def test_ocsp_with_unknown_ca(
+    caplog: pytest.LogCaptureFixture,
+    snapshot_path: Path,
+    usable_root: CertificateAuthority,
+    root_cert: Certificate,
+) -> None:
+    """Test OCSP requests for a certificate authority that is not in the snapshot."""
+    responder = SnapshotResponder(str(snapshot_path))
+    request = _ocsp_request(root_cert.pub.loaded, usable_root.pub.loaded)
+    status, _headers, content = _call(responder, "/ocsp/ABC/cert/", "POST", request)
+    assert status == "200 OK"
+    assert ocsp.load_der_ocsp_response(content).response_status == ocsp.OCSPResponseStatus.INTERNAL_ERROR
+    assert "ABC: Certificate Authority could not be found." in caplog.text
+
+
+@pytest.mark.parametrize("max_age", (None, 600))
+def test_ocsp_with_outdated_snapshot(
+    caplog: pytest.LogCaptureFixture,
+    snapshot_path: Path,
+    usable_root: CertificateAuthority,
+    root_cert: Certificate,
+    max_age: Optional[int],
+) -> None:
+    """Test that responses are valid from the creation of the snapshot and outdated snapshots are unused."""
+    responder = SnapshotResponder(str(snapshot_path), max_age=max_age)
+    data = base64.b64encode(_ocsp_request(root_cert.pub.loaded, usable_root.pub.loaded)).decode()
+    with open(snapshot_path, encoding="utf-8") as stream:
+        created = datetime.fromisoformat(json.load(stream)["created"])
+    validity = timedelta(seconds=usable_root.ocsp_response_validity)
+    if max_age is None:
+        max_age = usable_root.ocsp_response_validity
+
+    with freeze_time(created + timedelta(seconds=max_age - 1)):
+        content = _call(responder, f"/ocsp/cert/{data}")[2]
+    assert ocsp.load_der_ocsp_response(content).response_status == ocsp.OCSPResponseStatus.SUCCESSFUL
+    this_update = created.replace(microsecond=0)
+    assert get_ocsp_response_validity(content) == (this_update, this_update + validity)
+
+    with freeze_time(created + timedelta(seconds=max_age)):
+        status, headers, content = _call(responder, f"/ocsp/cert/{data}")
+    assert status == "200 OK"
+    assert "Cache-Control" not in headers
+    assert ocsp.load_der_ocsp_response(content).response_status == ocsp.OCSPResponseStatus.TRY_LATER
+    expected = f"{created.isoformat()}: Snapshot is outdated, cannot create OCSP responses."
+    assert caplog.messages[-1] == expected
+
+
+def test_ocsp_with_malformed_request(snapshot_path: Path) -> None:
+    """Test malformed OCSP requests."""
+    responder = SnapshotResponder(str(snapshot_path))
+    for path, method in (("/ocsp/cert/", "POST"), ("/ocsp/cert/Zm9v", "GET"), ("/ocsp/cert/Zm9vY", "GET")):
+        status, _headers, content = _call(responder, path, method, b"foo")
+        assert status == "200 OK"
+        response = ocsp.load_der_ocsp_response(content)
+        assert response.response_status == ocsp.OCSPResponseStatus.MALFORMED_REQUEST
+
+
+@pytest.mark.parametrize("scope,path", (("user", "crl"), ("ca", "crl/ca")))
+@pytest.mark.parametrize("encoding", (None, Encoding.DER, Encoding.PEM))
+def test_crl(
+    snapshot_path: Path,
+    usable_root: CertificateAuthority,
+    scope: str,
+    path: str,
+    encoding: Optional[Encoding],
+) -> None:
+    """Test retrieving CRLs."""
+    responder = SnapshotResponder(str(snapshot_path))
+    query_string = "" if encoding is None else f"encoding={encoding.name}"
+    status, headers, content = _call(responder, f"/{path}/{usable_root.serial}/", QUERY_STRING=query_string)
+    assert status == "200 OK"
+    if encoding == Encoding.PEM:
+        assert headers["Content-Type"] == "text/plain"
+        crl = x509.load_pem_x509_crl(content)
+    else:
+        assert headers["Content-Type"] == "application/pkix-crl"
+        crl = x509.load_der_x509_crl(content)
+    assert crl.is_signature_valid(usable_root.pub.loaded.public_key())  # type: ignore[arg-type]
+    assert "Expires" in headers
+
+
+def test_delta_and_partitioned_crls(
+    settings: SettingsWrapper, tmp_path: Path, usable_root: CertificateAuthority
+) -> None:
+    """Test retrieving delta CRLs and partitioned CRLs."""
+    settings.CA_CRL_PARTITIONS = 2
+    settings.CA_CRL_PROFILES = {"user": {"scope": "user", "delta": {"expires": 1800}}}
+    usable_root.sign_crl_distribution_points = crl_distribution_points(
+        distribution_point([uri("http://example.com/{CRL_PARTITION}/")])
+    )
+    usable_root.save()
+    usable_root.cache_crls(key_backend_options)
+
+    snapshot = create_snapshot([usable_root])
+    assert sorted(snapshot["cas"][usable_root.serial]["crls"]) == ["delta_user", "user", "user_0", "user_1"]
+    path = tmp_path / "snapshot.json"
+    with open(path, "w", encoding="utf-8") as stream:
+        json.dump(snapshot, stream)
+
+    responder = SnapshotResponder(str(path))
+    status, _headers, content = _call(responder, f"/crl/{usable_root.serial}/delta/")
+    assert status == "200 OK"
+    assert x509.load_der_x509_crl(content).extensions.get_extension_for_class(x509.DeltaCRLIndicator)
+
+    status, _headers, content = _call(responder, f"/crl/{usable_root.serial}/partition/1/")
+    assert status == "200 OK"
+    assert x509.load_der_x509_crl(content).is_signature_valid(
+        usable_root.pub.loaded.public_key()  # type: ignore[arg-type]
+    )
+
+    assert _call(responder, f"/crl/{usable_root.serial}/partition/2/")[0] == "404 Not Found"
+    assert _call(responder, f"/crl/ca/{usable_root.serial}/delta/")[0] == "404 Not Found"
+
+
+def test_crl_not_found(snapshot_path: Path, usable_root: CertificateAuthority) -> None:
+    """Test retrieving CRLs that are not in the snapshot."""
+    responder = SnapshotResponder(str(snapshot_path))
+    assert _call(responder, "/crl/ABC/")[0] == "404 Not Found"
+    assert _call(responder, f"/crl/{usable_root.serial}/", QUERY_STRING="encoding=foo")[0] == "404 Not Found"
+    assert _call(responder, f"/crl/{usable_root.serial}/", "POST")[0] == "405 Method Not Allowed"
+
+
+def test_not_found(snapshot_path: Path) -> None:
+    """Test requests for unknown paths."""
+    assert _call(SnapshotResponder(str(snapshot_path)), "/foo/")[0] == "404 Not Found"
+    assert _call(SnapshotResponder(str(snapshot_path), prefix="django_ca"), "/crl/ABC/")[0] == "404 Not Found"
+
+
+def test_method_not_allowed(snapshot_path: Path) -> None:
+    """Test HTTP methods that are not allowed."""
+    responder = SnapshotResponder(str(snapshot_path))
+    assert _call(responder, "/ocsp/cert/")[0] == "405 Method Not Allowed"
+    assert _call(responder, "/ocsp/cert/", "PUT")[0] == "405 Method Not Allowed"
+    assert _call(responder, "/ocsp/cert/Zm9v", "POST")[0] == "405 Method Not Allowed"
+    assert _call(responder, "/ocsp/cert/", "POST", CONTENT_LENGTH="foo")[0] == "200 OK"  # invalid length
+
+
+def test_reload(
+    snapshot_path: Path,
+    usable_root: CertificateAuthority,
+    root_cert: Certificate,
+    child: CertificateAuthority,
+) -> None:
+    """Test that the snapshot is reloaded if the file changes."""
+    responder = SnapshotResponder(str(snapshot_path))
+    data = base64.b64encode(_ocsp_request(root_cert.pub.loaded, usable_root.pub.loaded)).decode()
+    content = _call(responder, f"/ocsp/cert/{data}")[2]
+    assert ocsp.load_der_ocsp_response(content).certificate_status == ocsp.OCSPCertStatus.REVOKED
+
+    with open(snapshot_path, encoding="utf-8") as stream:
+        snapshot_data = json.load(stream)
+    records = snapshot_data["cas"][usable_root.serial]["certificates"]
+    records["good"].append(records["revoked"].pop(root_cert.serial))
+    records["good"][-1] = root_cert.serial
+    with open(snapshot_path, "w", encoding="utf-8") as stream:
+        json.dump(snapshot_data, stream)
+    stat = os.stat(snapshot_path)
+    os.utime(snapshot_path, (stat.st_atime, stat.st_mtime + 10))
+
+    content = _call(responder, f"/ocsp/cert/{data}")[2]
+    assert ocsp.load_der_ocsp_response(content).certificate_status == ocsp.OCSPCertStatus.GOOD
+
+
+def test_asgi(snapshot_path: Path, usable_root: CertificateAuthority, root_cert: Certificate) -> None:
+    """Test the ASGI application."""
+    responder = SnapshotResponder(str(snapshot_path))
+    request = _ocsp_request(root_cert.pub.loaded, usable_root.pub.loaded)
+    messages: List[Dict[str, Any]] = []
+    scope = {"type": "http", "method": "POST", "path": "/ocsp/cert/", "query_string": b"", "headers": []}
+    body = [
+        {"type": "http.request", "body": request[:10], "more_body": True},
+        {"type": "http.request", "body": request[10:]},
+    ]
+
+    async def receive() -> Dict[str, Any]:
+        return body.pop(0)
+
+    async def send(message: Dict[str, Any]) -> None:
+        messages.append(message)
+
+    asyncio.run(responder.asgi(scope, receive, send))
+    assert messages[0]["status"] == HTTPStatus.OK
+    assert (b"content-type", b"application/ocsp-response") in messages[0]["headers"]
+    response = ocsp.load_der_ocsp_response(messages[1]["body"])
+    assert response.certificate_status == ocsp.OCSPCertStatus.REVOKED
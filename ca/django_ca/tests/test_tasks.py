@@ -21,7 +21,7 @@ import types
 from contextlib import contextmanager
 from datetime import timedelta
 from http import HTTPStatus
-from typing import Iterator, Optional, Union
+from typing import Any, Iterator, Optional, Union
 from unittest import mock
 
 import dns.resolver
@@ -30,10 +30,15 @@ from dns.rdtypes.txtbase import TXTBase
 from requests.packages.urllib3.response import HTTPResponse
 
 from cryptography import x509
+from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.serialization import Encoding
+from cryptography.x509 import ocsp
 from cryptography.x509.oid import ExtensionOID
 
+from django.conf import settings
 from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import storages
 from django.test import TestCase, override_settings
 from django.utils import timezone
 
@@ -50,11 +55,20 @@ from django_ca.models import (
     AcmeChallenge,
     AcmeOrder,
     Certificate,
+    X509CertMixin,
 )
+from django_ca.ocsp import sign_ocsp_response
 from django_ca.tests.base.constants import CERT_DATA, TIMESTAMPS
 from django_ca.tests.base.mixins import AcmeValuesMixin, TestCaseMixin
 from django_ca.tests.base.utils import override_tmpcadir, subject_alternative_name
-from django_ca.utils import get_crl_cache_key, get_storage
+from django_ca.utils import (
+    get_crl_cache_key,
+    get_crl_published_cache_key,
+    get_crl_regeneration_cache_key,
+    get_crl_storage_path,
+    get_ocsp_response_cache_key,
+    get_storage,
+)
 
 key_backend_options = UsePrivateKeyOptions(password=None)
 
@@ -149,6 +163,43 @@ class TestCacheCRLs(TestCaseMixin, TestCase):
             key = get_crl_cache_key(ca.serial, Encoding.DER, "ca")
             self.assertIsNone(cache.get(key))
 
+    @override_tmpcadir(CA_PASSWORDS={})
+    @freeze_time(TIMESTAMPS["everything_valid"])
+    def test_cache_all_crls_with_error(self) -> None:
+        """Test that an error for one CA does not affect other CAs."""
+        with self.assertLogs("django_ca.tasks", "ERROR") as logcm:
+            errors = tasks.cache_crls()
+
+        pwd_serial = self.cas["pwd"].serial
+        self.assertEqual(errors, [pwd_serial])
+        self.assertEqual(
+            logcm.output,
+            [
+                f"ERROR:django_ca.tasks:{pwd_serial}: Could not cache CRLs: "
+                "Backend cannot be used for signing by this process."
+            ],
+        )
+        self.assertIsNone(cache.get(get_crl_cache_key(pwd_serial, Encoding.DER, "user")))
+        for name, ca in self.cas.items():
+            if name != "pwd":
+                self.assertIsNotNone(cache.get(get_crl_cache_key(ca.serial, Encoding.DER, "user")), name)
+
+    @override_tmpcadir()
+    @freeze_time(TIMESTAMPS["everything_valid"])
+    def test_cache_all_crls_in_threads(self) -> None:
+        """Test that CRLs are generated in a thread pool if jobs > 1."""
+        serials = [ca.serial for ca in self.cas.values()]
+        with mock.patch("django_ca.tasks._cache_crl_in_thread", autospec=True) as thread_mock:
+            self.assertEqual(tasks.cache_crls(serials, jobs=2), [])
+        thread_mock.assert_has_calls([mock.call(serial, False) for serial in serials], any_order=True)
+
+    @override_settings(CA_USE_CELERY=True)
+    def test_cache_all_crls_with_celery(self) -> None:
+        """Test that one task per CA is scheduled if Celery is used."""
+        ca = self.cas["root"]
+        with self.mute_celery((((ca.serial, {"password": None}), {"force": True}), {})):
+            self.assertEqual(tasks.cache_crls([ca.serial], force=True), [])
+
     @override_tmpcadir()
     def test_no_password(self) -> None:
         """Test creating a CRL for a CA where we have no password."""
@@ -162,6 +213,76 @@ class TestCacheCRLs(TestCaseMixin, TestCase):
             tasks.cache_crl(self.cas["pwd"].serial, {"password": None})
 
 
+class RegenerateCRLsOnRevokeTestCase(TestCaseMixin, TestCase):
+    """Test regeneration of CRLs after a certificate was revoked."""
+
+    load_cas = ("root", "child")
+    load_certs = ("child-cert",)
+
+    @override_tmpcadir()
+    def test_scopes(self) -> None:
+        """Test that cache_crl() only caches CRLs with the given scopes."""
+        ca = self.cas["child"]
+        cache.set(get_crl_regeneration_cache_key(ca.serial, "user"), True)
+        tasks.cache_crl(ca.serial, {"password": None}, scopes=["user"])
+        self.assertIsNotNone(cache.get(get_crl_cache_key(ca.serial, Encoding.DER, "user")))
+        self.assertIsNone(cache.get(get_crl_cache_key(ca.serial, Encoding.DER, "ca")))
+        self.assertIsNone(cache.get(get_crl_regeneration_cache_key(ca.serial, "user")))
+
+    @override_settings(CA_CRL_REGENERATE_ON_REVOKE=300, CA_USE_CELERY=True)
+    def test_debounce(self) -> None:
+        """Test that regeneration is scheduled only once for multiple revocations."""
+        ca = self.cas["child"]
+        expected = (((ca.serial, {"password": None}), {"scopes": ["user", None]}), {"countdown": 300})
+        with self.mute_celery(expected), self.captureOnCommitCallbacks(execute=True):
+            self.cert.revoke()
+            self.cert.revoke()
+
+    @override_settings(CA_CRL_REGENERATE_ON_REVOKE=300, CA_USE_CELERY=True)
+    def test_revoke_ca(self) -> None:
+        """Test that revoking an intermediate CA schedules regeneration of the CRLs of the parent."""
+        ca = self.cas["root"]
+        expected = (((ca.serial, {"password": None}), {"scopes": ["ca", None]}), {"countdown": 300})
+        with self.mute_celery(expected), self.captureOnCommitCallbacks(execute=True):
+            self.cas["child"].revoke()
+
+    @override_settings(CA_CRL_REGENERATE_ON_REVOKE=300, CA_USE_CELERY=False)
+    def test_without_celery(self) -> None:
+        """Test that cached CRLs are removed if Celery is not used."""
+        ca = self.cas["child"]
+        keys = [get_crl_cache_key(ca.serial, Encoding.PEM, scope) for scope in ("user", "ca", None)]
+        cache.set_many(dict.fromkeys(keys, b"foo"))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cert.revoke()
+        self.assertEqual(cache.get_many(keys), {keys[1]: b"foo"})
+
+    @override_settings(CA_CRL_REGENERATE_ON_REVOKE=300, CA_USE_CELERY=False)
+    def test_without_celery_with_storage(self) -> None:
+        """Test that published CRLs are removed if Celery is not used."""
+        ca = self.cas["child"]
+        cache_key = get_crl_cache_key(ca.serial, Encoding.DER, "user")
+        crl_storages = {**settings.STORAGES, "crl": {"BACKEND": "django.core.files.storage.InMemoryStorage"}}
+        with self.settings(STORAGES=crl_storages, CA_CRL_STORAGE_ALIAS="crl"):
+            storage = storages["crl"]
+            paths = [get_crl_storage_path(ca.serial, Encoding.DER, scope) for scope in ("user", "ca")]
+            for path in paths:
+                storage.save(path, ContentFile(b"foo"))
+            cache.set(get_crl_published_cache_key(cache_key), timezone.now())
+
+            with self.captureOnCommitCallbacks(execute=True):
+                self.cert.revoke()
+
+            self.assertFalse(storage.exists(paths[0]))
+            self.assertTrue(storage.exists(paths[1]))
+            self.assertIsNone(cache.get(get_crl_published_cache_key(cache_key)))
+
+    @override_settings(CA_USE_CELERY=True)
+    def test_disabled(self) -> None:
+        """Test that nothing is scheduled by default."""
+        with self.mute_celery(), self.captureOnCommitCallbacks(execute=True):
+            self.cert.revoke()
+
+
 @freeze_time(TIMESTAMPS["everything_valid"])
 class GenerateOCSPKeysTestCase(TestCaseMixin, TestCase):
     """Test the generate_ocsp_key task."""
@@ -211,6 +332,92 @@ class GenerateOCSPKeysTestCase(TestCaseMixin, TestCase):
         assert tasks.generate_ocsp_key(self.ca.serial, {"password": None}) is None
 
 
+@freeze_time(TIMESTAMPS["everything_valid"])
+class GenerateOCSPResponsesTestCase(TestCaseMixin, TestCase):
+    """Test the generate_ocsp_responses task."""
+
+    load_cas = ("root", "child")
+    load_certs = ("root-cert", "child-cert")
+
+    def assertCachedResponse(  # pylint: disable=invalid-name
+        self, cert: X509CertMixin, algorithm: hashes.HashAlgorithm, scope: str = "cert"
+    ) -> ocsp.OCSPResponse:
+        """Assert that the cache holds a valid response for the given certificate."""
+        ca = self.cas["root"]
+        cache_key = get_ocsp_response_cache_key(ca.serial, cert.serial, algorithm, scope)
+        responder_serial, encoded_response = cache.get(cache_key)
+        assert responder_serial == ca.ocsp_responder_certificate.serial_number
+
+        response = ocsp.load_der_ocsp_response(encoded_response)
+        assert response.response_status == ocsp.OCSPResponseStatus.SUCCESSFUL
+        assert response.serial_number == cert.pub.loaded.serial_number
+        assert isinstance(response.hash_algorithm, type(algorithm))
+        return response
+
+    @override_tmpcadir()
+    def test_basic(self) -> None:
+        """Test generating responses for all certificates."""
+        ca = self.cas["root"]
+        tasks.generate_ocsp_key(ca.serial, {"password": None})
+
+        # Two responses each for the child CA and the certificate (the OCSP responder certificate is not yet
+        # valid, as it was created at the current timestamp)
+        assert tasks.generate_ocsp_responses(ca.serial) == 4
+        for algorithm in (hashes.SHA1(), hashes.SHA256()):
+            response = self.assertCachedResponse(self.certs["root-cert"], algorithm)
+            assert response.certificate_status == ocsp.OCSPCertStatus.GOOD
+            response = self.assertCachedResponse(self.cas["child"], algorithm, "ca")
+            assert response.certificate_status == ocsp.OCSPCertStatus.GOOD
+
+        # Certificates of other CAs are not included
+        cache_key = get_ocsp_response_cache_key(ca.serial, self.certs["child-cert"].serial, hashes.SHA256())
+        assert cache.get(cache_key) is None
+
+    @override_tmpcadir()
+    def test_revoked(self) -> None:
+        """Test generating a response for a revoked certificate."""
+        ca = self.cas["root"]
+        tasks.generate_ocsp_key(ca.serial, {"password": None})
+        self.certs["root-cert"].revoke()
+
+        tasks.generate_ocsp_responses(ca.serial, algorithms=["sha512"], chunk_size=1)
+        response = self.assertCachedResponse(self.certs["root-cert"], hashes.SHA512())
+        assert response.certificate_status == ocsp.OCSPCertStatus.REVOKED
+
+    @override_tmpcadir()
+    def test_revoked_while_generating(self) -> None:
+        """Test that no "good" response is stored for a certificate that is revoked during the task."""
+        ca = self.cas["root"]
+        cert = self.certs["root-cert"]
+        tasks.generate_ocsp_key(ca.serial, {"password": None})
+
+        def sign(*args: Any, **kwargs: Any) -> bytes:
+            if cert.revoked is False:
+                cert.revoke()
+            return sign_ocsp_response(*args, **kwargs)
+
+        with mock.patch("django_ca.tasks.sign_ocsp_response", autospec=True, side_effect=sign):
+            assert tasks.generate_ocsp_responses(ca.serial) == 2
+        for algorithm in (hashes.SHA1(), hashes.SHA256()):
+            assert cache.get(get_ocsp_response_cache_key(ca.serial, cert.serial, algorithm)) is None
+            response = self.assertCachedResponse(self.cas["child"], algorithm, "ca")
+            assert response.certificate_status == ocsp.OCSPCertStatus.GOOD
+
+    @override_tmpcadir()
+    def test_expired(self) -> None:
+        """Test that no responses are generated for expired certificates."""
+        ca = self.cas["root"]
+        tasks.generate_ocsp_key(ca.serial, {"password": None})
+        with freeze_time(TIMESTAMPS["everything_expired"]):
+            assert tasks.generate_ocsp_responses(ca.serial) == 0
+
+    @override_tmpcadir()
+    def test_no_responder_key(self) -> None:
+        """Test generating responses when no responder key was generated."""
+        with pytest.raises(FileNotFoundError):
+            tasks.generate_ocsp_responses(self.cas["root"].serial)
+
+
 class AcmeValidateChallengeTestCaseMixin(TestCaseMixin, AcmeValuesMixin):
     """Test :py:func:`~django_ca.tasks.acme_validate_challenge`."""
 
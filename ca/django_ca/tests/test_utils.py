@@ -13,6 +13,7 @@
 
 """Test utility functions."""
 
+import functools
 import ipaddress
 import itertools
 import os
@@ -20,15 +21,19 @@ import typing
 import unittest
 from datetime import datetime, timedelta, timezone as tz
 from pathlib import Path
-from typing import Iterable, List, Tuple, Type
+from typing import Iterable, List, Optional, Tuple, Type
+from unittest import mock
 
 from cryptography import x509
 from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.asymmetric import dsa, ec, ed448
+from cryptography.hazmat.primitives.asymmetric import dsa, ec, ed448, rsa
+from cryptography.hazmat.primitives.asymmetric.types import CertificateIssuerPrivateKeyTypes
 from cryptography.hazmat.primitives.serialization import Encoding
 from cryptography.x509.name import _ASN1Type
 from cryptography.x509.oid import NameOID, ObjectIdentifier
 
+from django.core.cache import cache
+from django.core.files.storage import FileSystemStorage, InMemoryStorage
 from django.test import TestCase, override_settings
 
 import pytest
@@ -37,6 +42,7 @@ from pytest_django.fixtures import SettingsWrapper
 
 from django_ca import ca_settings, constants, utils
 from django_ca.deprecation import RemovedInDjangoCA129Warning
+from django_ca.key_backends.signer import sign_data
 from django_ca.tests.base.assertions import assert_removed_in_200
 from django_ca.tests.base.constants import CRYPTOGRAPHY_VERSION
 from django_ca.tests.base.utils import dns, doctest_module, uri
@@ -47,6 +53,12 @@ from django_ca.utils import (
     format_name,
     generate_private_key,
     get_cert_builder,
+    get_crl_cache_key,
+    get_crl_cache_lock_key,
+    get_crl_chunk_cache_key,
+    get_crl_from_cache,
+    get_crl_partition,
+    get_crl_storage_path,
     get_storage,
     is_power2,
     merge_x509_names,
@@ -58,7 +70,11 @@ from django_ca.utils import (
     parse_name_x509,
     parse_serialized_name_attributes,
     read_file,
+    replace_file,
     serialize_name,
+    set_crl_in_cache,
+    sign_certificate_builder,
+    sign_certificate_revocation_list_builder,
     split_str,
     validate_email,
     validate_hostname,
@@ -88,6 +104,112 @@ def test_read_file(tmpcadir: Path) -> None:
     assert read_file(path) == data
 
 
+def test_get_crl_partition(settings: SettingsWrapper) -> None:
+    """Test :py:func:`django_ca.utils.get_crl_partition`."""
+    assert get_crl_partition(123) is None
+    settings.CA_CRL_PARTITIONS = 4
+    assert get_crl_partition(123) == 3
+    assert get_crl_partition(124) == 0
+
+
+def test_get_crl_cache_key() -> None:
+    """Test :py:func:`django_ca.utils.get_crl_cache_key`."""
+    assert get_crl_cache_key("AB", Encoding.PEM, "user") == "crl_AB_PEM_user"
+    assert get_crl_cache_key("AB", scope="user", delta=True) == "delta_crl_AB_DER_user"
+    assert get_crl_cache_key("AB", scope="user", partition=2) == "crl_AB_DER_user_2"
+
+
+def test_get_crl_cache_lock_key() -> None:
+    """Test :py:func:`django_ca.utils.get_crl_cache_lock_key`."""
+    assert get_crl_cache_lock_key("crl_AB_DER_user") == "crl_AB_DER_user_lock"
+
+
+def test_set_crl_in_cache(settings: SettingsWrapper) -> None:
+    """Test :py:func:`django_ca.utils.set_crl_in_cache` with a CRL that is stored as a single item."""
+    settings.CA_CRL_CACHE_CHUNK_SIZE = 3
+    set_crl_in_cache("crl_test_single", b"foo", 60)
+    assert cache.get("crl_test_single") == b"foo"
+    assert get_crl_from_cache("crl_test_single") == b"foo"
+    assert get_crl_from_cache("crl_test_missing") is None
+
+
+def test_set_crl_in_cache_with_chunks(settings: SettingsWrapper) -> None:
+    """Test :py:func:`django_ca.utils.set_crl_in_cache` with a CRL that is split into chunks."""
+    settings.CA_CRL_CACHE_CHUNK_SIZE = 3
+    set_crl_in_cache("crl_test_chunked", b"foobarbaz!", 60)
+    manifest = cache.get("crl_test_chunked")
+    assert manifest["chunks"] == 4
+    assert manifest["size"] == 10
+    assert get_crl_from_cache("crl_test_chunked") == b"foobarbaz!"
+
+    # Chunking can be disabled
+    settings.CA_CRL_CACHE_CHUNK_SIZE = None
+    set_crl_in_cache("crl_test_chunked", b"foobarbaz!", 60)
+    assert cache.get("crl_test_chunked") == b"foobarbaz!"
+
+
+def test_get_crl_from_cache_with_missing_chunk(settings: SettingsWrapper) -> None:
+    """Test that a CRL with a missing chunk is treated as not cached."""
+    settings.CA_CRL_CACHE_CHUNK_SIZE = 3
+    set_crl_in_cache("crl_test_missing_chunk", b"foobarbaz!", 60)
+    digest = cache.get("crl_test_missing_chunk")["sha256"]
+    cache.delete(get_crl_chunk_cache_key("crl_test_missing_chunk", digest, 1))
+    assert get_crl_from_cache("crl_test_missing_chunk") is None
+
+
+def test_get_crl_from_cache_with_corrupted_chunk(settings: SettingsWrapper) -> None:
+    """Test that a CRL that does not match the digest in the manifest is treated as not cached."""
+    settings.CA_CRL_CACHE_CHUNK_SIZE = 3
+    set_crl_in_cache("crl_test_corrupted", b"foobarbaz!", 60)
+    digest = cache.get("crl_test_corrupted")["sha256"]
+    cache.set(get_crl_chunk_cache_key("crl_test_corrupted", digest, 1), b"xxx")
+    assert get_crl_from_cache("crl_test_corrupted") is None
+
+
+def test_set_crl_in_cache_with_failed_chunk(settings: SettingsWrapper) -> None:
+    """Test that no manifest is stored if a chunk cannot be stored."""
+    settings.CA_CRL_CACHE_CHUNK_SIZE = 3
+    with mock.patch.object(cache, "set_many", return_value=["failed"]):
+        set_crl_in_cache("crl_test_failed", b"foobarbaz!", 60)
+    assert cache.get("crl_test_failed") is None
+
+
+def test_get_crl_storage_path() -> None:
+    """Test :py:func:`django_ca.utils.get_crl_storage_path`."""
+    assert get_crl_storage_path("AB") == "crl/AB/all.crl"
+    assert get_crl_storage_path("AB", Encoding.PEM, scope="ca") == "crl/AB/ca.pem"
+    assert get_crl_storage_path("AB", scope="user", delta=True) == "crl/AB/delta_user.crl"
+    assert get_crl_storage_path("AB", scope="user", partition=2) == "crl/AB/user_2.crl"
+
+
+def test_replace_file(tmp_path: Path) -> None:
+    """Test :py:func:`django_ca.utils.replace_file` with a storage on the local file system."""
+    storage = FileSystemStorage(location=tmp_path, file_permissions_mode=0o640)
+    replace_file(storage, "crl/AB/user.crl", b"foo")
+    replace_file(storage, "crl/AB/user.crl", b"bar")
+    assert (tmp_path / "crl" / "AB" / "user.crl").read_bytes() == b"bar"
+    assert (tmp_path / "crl" / "AB" / "user.crl").stat().st_mode & 0o777 == 0o640
+    assert os.listdir(tmp_path / "crl" / "AB") == ["user.crl"]  # no temporary files are left behind
+
+
+def test_replace_file_with_error(tmp_path: Path) -> None:
+    """Test that no temporary files are left behind if writing the file fails."""
+    storage = FileSystemStorage(location=tmp_path)
+    with mock.patch("os.replace", side_effect=OSError("foo")), pytest.raises(OSError, match="^foo$"):
+        replace_file(storage, "user.crl", b"foo")
+    assert os.listdir(tmp_path) == []
+
+
+def test_replace_file_with_remote_storage() -> None:
+    """Test :py:func:`django_ca.utils.replace_file` with a storage that has no local path."""
+    storage = InMemoryStorage()
+    replace_file(storage, "crl/AB/user.crl", b"foo")
+    replace_file(storage, "crl/AB/user.crl", b"bar")
+    with storage.open("crl/AB/user.crl") as stream:
+        assert stream.read() == b"bar"
+    assert storage.listdir("crl/AB") == ([], ["user.crl"])
+
+
 def test_deprecated_storage_configuration(settings: SettingsWrapper) -> None:
     """Test that using a deprecated storage configuration emits a warning."""
     settings.STORAGES = {
@@ -1131,6 +1253,35 @@ class GetCertBuilderTestCase(TestCase):
             get_cert_builder(datetime.now())
 
 
+@pytest.mark.parametrize(
+    "private_key,algorithm",
+    (
+        (rsa.generate_private_key(public_exponent=65537, key_size=2048), hashes.SHA256()),
+        (ec.generate_private_key(ec.SECP384R1()), hashes.SHA384()),
+        (ed448.Ed448PrivateKey.generate(), None),
+    ),
+)
+def test_sign_certificate_builder(
+    private_key: CertificateIssuerPrivateKeyTypes, algorithm: Optional[hashes.HashAlgorithm]
+) -> None:
+    """Test :py:func:`django_ca.utils.sign_certificate_builder` and CRLs."""
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "example.com")])
+    public_key = private_key.public_key()
+    sign = functools.partial(sign_data, private_key, algorithm=algorithm)
+    builder = get_cert_builder(datetime.now(tz=tz.utc) + timedelta(days=1)).public_key(public_key)
+    builder = builder.issuer_name(name).subject_name(name)
+    certificate = sign_certificate_builder(builder, public_key, algorithm, sign)  # type: ignore[arg-type]
+    certificate.verify_directly_issued_by(certificate)
+
+    now = datetime.now(tz=tz.utc)
+    crl_builder = x509.CertificateRevocationListBuilder().issuer_name(name)
+    crl_builder = crl_builder.last_update(now).next_update(now + timedelta(days=1))
+    crl = sign_certificate_revocation_list_builder(
+        crl_builder, public_key, algorithm, sign  # type: ignore[arg-type]
+    )
+    assert crl.is_signature_valid(public_key)
+
+
 class ValidatePrivateKeyParametersTest(TestCase):
     """Test :py:func:`django_ca.utils.validate_private_key_parameters`."""
 
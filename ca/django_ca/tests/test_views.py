@@ -14,12 +14,20 @@
 """Test basic views."""
 
 import copy
+import hashlib
+from datetime import datetime, timedelta, timezone as tz
 from http import HTTPStatus
+from unittest import mock
 
+from cryptography import x509
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.serialization import Encoding
 
+from django.conf import settings
 from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import storages
+from django.http import HttpResponse
 from django.test import TestCase
 from django.test.utils import override_settings
 from django.urls import include, path, re_path, reverse
@@ -28,9 +36,23 @@ import pytest
 from freezegun import freeze_time
 
 from django_ca import ca_settings
+from django_ca.key_backends.storages import UsePrivateKeyOptions
 from django_ca.tests.base.constants import CERT_DATA
 from django_ca.tests.base.mixins import TestCaseMixin
-from django_ca.tests.base.utils import get_idp, idp_full_name, override_tmpcadir, uri
+from django_ca.tests.base.utils import (
+    crl_distribution_points,
+    distribution_point,
+    get_idp,
+    idp_full_name,
+    override_tmpcadir,
+    uri,
+)
+from django_ca.utils import (
+    get_crl_cache_key,
+    get_crl_cache_lock_key,
+    get_crl_published_cache_key,
+    get_crl_storage_path,
+)
 from django_ca.views import CertificateRevocationListView
 
 app_name = "django_ca"
@@ -64,6 +86,11 @@ urlpatterns = [
         CertificateRevocationListView.as_view(scope=None, include_issuing_distribution_point=False),
         name="exclude_idp",
     ),
+    re_path(
+        r"^sendfile/(?P<serial>[0-9A-F:]+)/$",
+        CertificateRevocationListView.as_view(sendfile_prefix="/crl-files/"),
+        name="sendfile",
+    ),
 ]
 
 
@@ -79,6 +106,7 @@ class GenericCRLViewTestsMixin(TestCaseMixin):
         "pwd",
     )
     load_certs = ("child-cert",)
+    sleep_path = "django_ca.views.time.sleep"
 
     @override_tmpcadir()
     def test_basic(self) -> None:
@@ -126,6 +154,76 @@ class GenericCRLViewTestsMixin(TestCaseMixin):
             algorithm=self.ca.algorithm,
         )
 
+    @override_tmpcadir()
+    def test_delta_crl(self) -> None:
+        """Test fetching a delta CRL."""
+        url = reverse("django_ca:delta-crl", kwargs={"serial": self.ca.serial})
+
+        # No complete CRL was published yet, so there cannot be a delta CRL
+        response = self.client.get(url)
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+        # Complete CRLs generated on demand are not used as base for delta CRLs
+        self.client.get(reverse("django_ca:crl", kwargs={"serial": self.ca.serial}))
+        assert self.client.get(url).status_code == HTTPStatus.NOT_FOUND
+
+        self.ca.cache_crls(UsePrivateKeyOptions(password=None))
+        self.cert.revoke()
+
+        response = self.client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response["Content-Type"] == "application/pkix-crl"
+        crl = x509.load_der_x509_crl(response.content)
+        assert [entry.serial_number for entry in crl] == [self.cert.pub.loaded.serial_number]
+        assert crl.extensions.get_extension_for_class(x509.DeltaCRLIndicator).value.crl_number == 1
+        assert crl.extensions.get_extension_for_class(x509.CRLNumber).value.crl_number == 2
+
+    @override_tmpcadir(CA_CRL_PARTITIONS=2)
+    def test_partition(self) -> None:
+        """Test fetching the CRL for a CRL partition."""
+        self.cert.crl_partition = 1
+        self.cert.save()
+        self.cert.revoke()
+
+        def get_crl(partition: int) -> HttpResponse:
+            kwargs = {"serial": self.ca.serial, "partition": partition}
+            return self.client.get(reverse("django_ca:crl-partition", kwargs=kwargs))
+
+        # The CA does not use partitions in its CRL URLs
+        assert get_crl(0).status_code == HTTPStatus.NOT_FOUND
+
+        self.ca.sign_crl_distribution_points = crl_distribution_points(
+            distribution_point([uri("http://example.com/{CRL_PARTITION}/")])
+        )
+        self.ca.save()
+
+        response = get_crl(1)
+        assert response.status_code == HTTPStatus.OK
+        assert response["Content-Type"] == "application/pkix-crl"
+        self.assertCRL(
+            response.content,
+            expected=[self.cert],
+            encoding=Encoding.DER,
+            expires=600,
+            idp=get_idp(full_name=[uri("http://example.com/1/")], only_contains_user_certs=True),
+            algorithm=self.ca.algorithm,
+        )
+        response = get_crl(0)
+        assert response.status_code == HTTPStatus.OK
+        assert list(x509.load_der_x509_crl(response.content)) == []
+
+        # Partition does not exist
+        assert get_crl(2).status_code == HTTPStatus.NOT_FOUND
+
+        # Partitions of certificates are still served if the number of partitions was reduced
+        cache.clear()
+        with self.settings(CA_CRL_PARTITIONS=1):
+            response = get_crl(1)
+        assert response.status_code == HTTPStatus.OK
+        assert [entry.serial_number for entry in x509.load_der_x509_crl(response.content)] == [
+            self.cert.pub.loaded.serial_number
+        ]
+
     @override_tmpcadir()
     def test_full_scope(self) -> None:
         """Test getting CRL with full scope."""
@@ -283,6 +381,164 @@ class GenericCRLViewTestsMixin(TestCaseMixin):
             response.content, encoding=Encoding.DER, expires=600, idp=None, algorithm=self.ca.algorithm
         )
 
+    @override_tmpcadir()
+    def test_refresh_ahead(self) -> None:
+        """Test that the CRL is regenerated shortly before the cached CRL expires."""
+        url = reverse("default", kwargs={"serial": self.ca.serial})
+        lock_key = get_crl_cache_lock_key(get_crl_cache_key(self.ca.serial, scope="user"))
+        cached = self.client.get(url).content
+        self.cert.revoke()
+
+        # The cached CRL is served as long as it does not expire soon
+        with freeze_time("2019-04-14 12:34:59"):
+            assert self.client.get(url).content == cached
+
+        with freeze_time("2019-04-14 12:35:10"):
+            response = self.client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        crl = x509.load_der_x509_crl(response.content)
+        assert crl.extensions.get_extension_for_class(x509.CRLNumber).value.crl_number == 1
+        assert len(crl) == 1
+        assert cache.get(lock_key) is None  # lock was released
+
+    @override_tmpcadir()
+    def test_refresh_ahead_while_locked(self) -> None:
+        """Test that the cached CRL is served while another request regenerates it."""
+        url = reverse("default", kwargs={"serial": self.ca.serial})
+        cache.set(get_crl_cache_lock_key(get_crl_cache_key(self.ca.serial, scope="user")), True)
+        cached = self.client.get(url).content  # generated despite the lock, as no CRL is cached yet
+        self.cert.revoke()
+
+        with freeze_time("2019-04-14 12:35:10"):
+            response = self.client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.content == cached
+
+    @override_tmpcadir()
+    def test_wait_for_crl(self) -> None:
+        """Test waiting for a CRL that is generated by another request."""
+        url = reverse("default", kwargs={"serial": self.ca.serial})
+        cache_key = get_crl_cache_key(self.ca.serial, scope="user")
+        crl = self.client.get(url).content
+        cache.delete(cache_key)
+        cache.set(get_crl_cache_lock_key(cache_key), True)
+
+        with mock.patch(self.sleep_path, side_effect=lambda _: cache.set(cache_key, crl)) as sleep_mock:
+            response = self.client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.content == crl
+        sleep_mock.assert_called_once_with(0.1)
+
+    @override_tmpcadir()
+    def test_wait_for_crl_timeout(self) -> None:
+        """Test generating the CRL if another request does not generate it in time."""
+        url = reverse("default", kwargs={"serial": self.ca.serial})
+        cache_key = get_crl_cache_key(self.ca.serial, scope="user")
+        lock_key = get_crl_cache_lock_key(cache_key)
+        cache.set(lock_key, True)
+
+        with mock.patch.object(CertificateRevocationListView, "lock_wait", 0.2), mock.patch(
+            self.sleep_path
+        ) as sleep_mock, self.assertLogs("django_ca.views", "WARNING") as logcm:
+            response = self.client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert cache.get(cache_key) == response.content
+        assert sleep_mock.call_count == 2
+        assert logcm.output == [
+            f"WARNING:django_ca.views:{cache_key}: Timed out waiting for CRL, generating it."
+        ]
+        assert cache.get(lock_key) is True  # lock of the other request is not released
+
+    @override_tmpcadir()
+    def test_sendfile(self) -> None:
+        """Test letting the web server send published CRLs."""
+        url = reverse("sendfile", kwargs={"serial": self.ca.serial})
+        crl_storages = {**settings.STORAGES, "crl": {"BACKEND": "django.core.files.storage.InMemoryStorage"}}
+
+        # Without a storage, the CRL is always served by the view
+        response = self.client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert "X-Accel-Redirect" not in response
+
+        with self.settings(STORAGES=crl_storages, CA_CRL_STORAGE_ALIAS="crl"):
+            # CRL was not yet published, so it is served by the view
+            response = self.client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            assert "X-Accel-Redirect" not in response
+
+            storage_path = get_crl_storage_path(self.ca.serial, Encoding.DER, scope="user")
+            storages["crl"].save(storage_path, ContentFile(b"foo"))
+            published_key = get_crl_published_cache_key(
+                get_crl_cache_key(self.ca.serial, Encoding.DER, scope="user")
+            )
+
+            # The published CRL is not known to be up to date, so it is served by the view
+            response = self.client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            assert "X-Accel-Redirect" not in response
+
+            # The published CRL is about to expire, so it is served by the view
+            cache.set(published_key, datetime.now(tz=tz.utc) + timedelta(seconds=30))
+            response = self.client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            assert "X-Accel-Redirect" not in response
+
+            cache.set(published_key, datetime.now(tz=tz.utc) + timedelta(seconds=3600))
+            response = self.client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            assert response["X-Accel-Redirect"] == f"/crl-files/{storage_path}"
+            assert response["Content-Type"] == "application/pkix-crl"
+            assert response.content == b""
+
+            # Views without a prefix never let the web server send the CRL
+            response = self.client.get(reverse("default", kwargs={"serial": self.ca.serial}))
+            assert response.status_code == HTTPStatus.OK
+            assert "X-Accel-Redirect" not in response
+
+    @override_tmpcadir(CA_CRL_CACHE_CHUNK_SIZE=100)
+    def test_chunked_cache(self) -> None:
+        """Test serving a CRL that is larger than the chunk size from the cache."""
+        url = reverse("default", kwargs={"serial": self.ca.serial})
+        cache_key = get_crl_cache_key(self.ca.serial, Encoding.DER, scope="user")
+
+        response = self.client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert isinstance(cache.get(cache_key), dict)  # CRL is stored in chunks
+
+        # fetch again - the CRL is served from the cache
+        with mock.patch.object(CertificateRevocationListView, "generate_crl", autospec=True) as generate_mock:
+            cached_response = self.client.get(url)
+        assert cached_response.status_code == HTTPStatus.OK
+        assert cached_response.content == response.content
+        generate_mock.assert_not_called()
+
+    @override_tmpcadir()
+    def test_caching_headers(self) -> None:
+        """Test HTTP caching headers and conditional requests."""
+        url = reverse("advanced", kwargs={"serial": self.ca.serial})
+        response = self.client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        etag = f'"{hashlib.sha256(response.content).hexdigest()}"'
+        assert response["ETag"] == etag
+        assert response["Last-Modified"] == "Sun, 14 Apr 2019 12:26:00 GMT"
+        assert response["Expires"] == "Sun, 14 Apr 2019 12:31:21 GMT"
+        assert response["Cache-Control"] == "public, max-age=321, no-transform, must-revalidate"
+
+        # Conditional requests return 304 Not Modified
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        assert response.content == b""
+        assert response["ETag"] == etag
+        assert response["Cache-Control"] == "public, max-age=321, no-transform, must-revalidate"
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE="Sun, 14 Apr 2019 12:26:00 GMT")
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+        # Outdated client-side copies are returned in full
+        response = self.client.get(url, HTTP_IF_NONE_MATCH='"foo"')
+        assert response.status_code == HTTPStatus.OK
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE="Sun, 14 Apr 2019 12:25:59 GMT")
+        assert response.status_code == HTTPStatus.OK
+
 
 @override_settings(ROOT_URLCONF=__name__)
 @freeze_time("2019-04-14 12:26:00")
@@ -0,0 +1,129 @@
+# This file is part of django-ca (https://github.com/mathiasertl/django-ca).
+#
+# django-ca is free software: you can redistribute it and/or modify it under the terms of the GNU General
+# Public License as published by the Free Software Foundation, either version 3 of the License, or (at your
+# option) any later version.
+#
+# django-ca is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the
+# implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License
+# for more details.
+#
+# You should have received a copy of the GNU General Public License along with django-ca. If not, see
+# <http://www.gnu.org/licenses/>.
+
+"""Test the asynchronous views by running the test cases for the synchronous views against them."""
+
+from http import HTTPStatus
+from importlib import reload
+from typing import List, Union
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.urls import URLPattern, URLResolver, include, path, resolve, reverse
+
+from freezegun import freeze_time
+
+from django_ca import urls, views
+from django_ca.tests import test_views, test_views_ocsp
+from django_ca.tests.base.constants import TIMESTAMPS
+from django_ca.tests.base.utils import override_tmpcadir
+
+ASYNC_VIEWS = {
+    views.CertificateRevocationListView: views.AsyncCertificateRevocationListView,
+    views.OCSPView: views.AsyncOCSPView,
+    views.GenericOCSPView: views.AsyncGenericOCSPView,
+    views.UnifiedOCSPView: views.AsyncUnifiedOCSPView,
+    views.GenericCAIssuersView: views.AsyncGenericCAIssuersView,
+}
+
+
+def _async_urlpatterns(
+    patterns: List[Union[URLResolver, URLPattern]],
+) -> List[Union[URLResolver, URLPattern]]:
+    """Get a copy of `patterns` where synchronous views are replaced with their asynchronous variant."""
+    async_patterns: List[Union[URLResolver, URLPattern]] = []
+    for pattern in patterns:
+        view_class = getattr(getattr(pattern, "callback", None), "view_class", None)
+        if isinstance(pattern, URLPattern) and view_class in ASYNC_VIEWS:
+            initkwargs = pattern.callback.view_initkwargs  # type: ignore[attr-defined]
+            view = ASYNC_VIEWS[view_class].as_view(**initkwargs)
+            pattern = URLPattern(pattern.pattern, view, name=pattern.name)
+        async_patterns.append(pattern)
+    return async_patterns
+
+
+urlpatterns = [
+    path("django_ca/", include((_async_urlpatterns(urls.urlpatterns), "django_ca"))),
+    *_async_urlpatterns(test_views.urlpatterns[1:]),
+    *_async_urlpatterns(test_views_ocsp.urlpatterns),
+]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+@freeze_time("2019-04-14 12:26:00")
+class AsyncCRLViewTests(test_views.GenericCRLViewTestsMixin, TestCase):
+    """Test AsyncCertificateRevocationListView."""
+
+    sleep_path = "django_ca.views.asyncio.sleep"
+
+    @override_tmpcadir()
+    def test_cached_crl_does_not_query_database(self) -> None:
+        """Test that a cached CRL is returned without any database queries."""
+        url = reverse("default", kwargs={"serial": self.ca.serial})
+        cache.clear()
+        self.client.get(url)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        assert response.status_code == HTTPStatus.OK
+
+    def test_unknown_ca(self) -> None:
+        """Test requesting a CRL for an unknown certificate authority."""
+        response = self.client.get(reverse("default", kwargs={"serial": "AB:CD"}))
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class AsyncCAIssuersViewTests(test_views.GenericCAIssuersViewTests):
+    """Test AsyncGenericCAIssuersView."""
+
+
+@override_settings(ROOT_URLCONF=__name__)
+@freeze_time(TIMESTAMPS["everything_valid"])
+class AsyncOCSPViewTestCase(test_views_ocsp.OCSPManualViewTestCaseMixin, TestCase):
+    """Test AsyncOCSPView."""
+
+    process_ocsp_request_path = "django_ca.views.AsyncOCSPView.aprocess_ocsp_request"
+
+
+@override_settings(ROOT_URLCONF=__name__)
+@freeze_time(TIMESTAMPS["everything_valid"])
+class AsyncGenericOCSPViewTestCase(test_views_ocsp.GenericOCSPViewTestCaseMixin, TestCase):
+    """Test AsyncGenericOCSPView."""
+
+
+@override_settings(ROOT_URLCONF=__name__)
+@freeze_time(TIMESTAMPS["everything_valid"])
+class AsyncUnifiedOCSPViewTestCase(test_views_ocsp.UnifiedOCSPViewTestCaseMixin, TestCase):
+    """Test AsyncUnifiedOCSPView."""
+
+
+class URLPatternTestCase(TestCase):
+    """Test that asynchronous views are used when CA_USE_ASYNC_VIEWS is set."""
+
+    @override_settings(CA_ENABLE_REST_API=False)
+    def test_async_views(self) -> None:
+        """Test URL configuration with CA_USE_ASYNC_VIEWS=True."""
+        try:
+            with self.settings(CA_USE_ASYNC_VIEWS=True):
+                reload(urls)
+                for path_info, view_class in [
+                    ("/issuer/AB.der", views.AsyncGenericCAIssuersView),
+                    ("/ocsp/cert/", views.AsyncUnifiedOCSPView),
+                    ("/ocsp/AB/cert/", views.AsyncGenericOCSPView),
+                    ("/crl/AB/", views.AsyncCertificateRevocationListView),
+                ]:
+                    assert resolve(path_info, urlconf=urls).func.view_class is view_class  # type: ignore
+        finally:
+            reload(urls)
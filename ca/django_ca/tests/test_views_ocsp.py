@@ -14,12 +14,14 @@
 """Test OCSP related views."""
 
 import base64
+import hashlib
 import typing
 from datetime import datetime, timedelta
 from http import HTTPStatus
-from typing import Optional, Tuple, Type, Union
+from typing import List, Optional, Tuple, Type, Union
 from unittest import mock
 
+from asn1crypto import ocsp as asn1_ocsp
 from cryptography import x509
 from cryptography.hazmat.primitives import hashes, serialization
 from cryptography.hazmat.primitives.asymmetric import dsa, ec, ed448, ed25519, padding, rsa
@@ -31,21 +33,27 @@ from cryptography.hazmat.primitives.serialization import Encoding, PrivateFormat
 from cryptography.x509 import ocsp
 from cryptography.x509.oid import OCSPExtensionOID, SignatureAlgorithmOID
 
+from django.core.cache import cache
 from django.core.files.storage import storages
+from django.db import connection
 from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import path, re_path, reverse
+from django.utils.http import http_date
 
 from freezegun import freeze_time
 
+from django_ca import tasks
 from django_ca.constants import ReasonFlags
 from django_ca.key_backends.storages import UsePrivateKeyOptions
 from django_ca.modelfields import LazyCertificate
 from django_ca.models import Certificate, CertificateAuthority
+from django_ca.ocsp import get_issuer_hashes
 from django_ca.tests.base.constants import CERT_DATA, FIXTURES_DATA, FIXTURES_DIR, TIMESTAMPS
 from django_ca.tests.base.mixins import TestCaseMixin
 from django_ca.tests.base.typehints import HttpResponse
 from django_ca.tests.base.utils import override_tmpcadir
-from django_ca.utils import get_storage, hex_to_bytes
+from django_ca.utils import get_ocsp_response_cache_key, get_storage, hex_to_bytes
 from django_ca.views import OCSPView
 
 
@@ -290,11 +298,13 @@ class OCSPViewTestMixin(TestCaseMixin):
         self.assertOCSPSignature(public_key, response)
 
     def generate_ocsp_key(
-        self, ca: CertificateAuthority
+        self, ca: CertificateAuthority, force: bool = False
     ) -> Tuple[CertificateIssuerPrivateKeyTypes, Certificate]:
         """Generate an OCSP key for the given CA and return private kay and public key model instance."""
         key_backend_options = UsePrivateKeyOptions(password=CERT_DATA[ca.name].get("password"))
-        priv_path, _cert_path, ocsp_cert = ca.generate_ocsp_key(key_backend_options)  # type: ignore[misc]
+        priv_path, _cert_path, ocsp_cert = ca.generate_ocsp_key(  # type: ignore[misc]
+            key_backend_options, force=force
+        )
         with storages["django-ca"].open(priv_path, "rb") as stream:
             private_key = typing.cast(
                 CertificateIssuerPrivateKeyTypes, load_der_private_key(stream.read(), None)
@@ -336,6 +346,7 @@ class OCSPManualViewTestCaseMixin(OCSPViewTestMixin):
 
     load_cas = "__usable__"
     load_certs = "__usable__"
+    process_ocsp_request_path = "django_ca.views.OCSPView.process_ocsp_request"
 
     @override_tmpcadir()
     def test_get(self) -> None:
@@ -364,7 +375,7 @@ class OCSPManualViewTestCaseMixin(OCSPViewTestMixin):
         ex = Exception(exception_str)
 
         data = base64.b64encode(req1).decode("utf-8")
-        view_path = "django_ca.views.OCSPView.process_ocsp_request"
+        view_path = self.process_ocsp_request_path
         with mock.patch(view_path, side_effect=ex), self.assertLogs() as logcm:
             response = self.client.get(reverse("get", kwargs={"data": data}))
 
@@ -498,34 +509,49 @@ class OCSPManualViewTestCaseMixin(OCSPViewTestMixin):
         ocsp_response = ocsp.load_der_ocsp_response(response.content)
         self.assertEqual(ocsp_response.response_status, ocsp.OCSPResponseStatus.INTERNAL_ERROR)
 
+    @override_tmpcadir()
     def test_unknown(self) -> None:
         """Test fetching data for an unknown certificate."""
         data = base64.b64encode(unknown_req).decode("utf-8")
-        with self.assertLogs() as logcm:
+        with self.assertNumQueries(2):  # get the CA, build the filter of known serials
             response = self.client.get(reverse("get", kwargs={"data": data}))
-        self.assertEqual(
-            logcm.output,
-            [
-                "WARNING:django_ca.views:7B: OCSP request for unknown cert received.",
-            ],
-        )
         self.assertEqual(response.status_code, HTTPStatus.OK)
         ocsp_response = ocsp.load_der_ocsp_response(response.content)
-        self.assertEqual(ocsp_response.response_status, ocsp.OCSPResponseStatus.INTERNAL_ERROR)
+        self.assertEqual(ocsp_response.response_status, ocsp.OCSPResponseStatus.SUCCESSFUL)
+        self.assertEqual(ocsp_response.certificate_status, ocsp.OCSPCertStatus.UNKNOWN)
+        self.assertEqual(ocsp_response.serial_number, 123)
+
+        # The second request does not query the status of the certificate again
+        with self.assertNumQueries(1):  # get the CA
+            response = self.client.get(reverse("get", kwargs={"data": data}))
+        ocsp_response = ocsp.load_der_ocsp_response(response.content)
+        self.assertEqual(ocsp_response.certificate_status, ocsp.OCSPCertStatus.UNKNOWN)
+
+        # Other unknown serials are also answered without querying the database
+        issuer_name_hash, issuer_key_hash = get_issuer_hashes(self.ca, hashes.SHA1())
+        for serial in range(1000, 1010):
+            request = (
+                ocsp.OCSPRequestBuilder()
+                .add_certificate_by_hash(issuer_name_hash, issuer_key_hash, serial, hashes.SHA1())
+                .build()
+                .public_bytes(Encoding.DER)
+            )
+            data = base64.b64encode(request).decode("utf-8")
+            with self.assertNumQueries(1):  # get the CA
+                response = self.client.get(reverse("get", kwargs={"data": data}))
+            ocsp_response = ocsp.load_der_ocsp_response(response.content)
+            self.assertEqual(ocsp_response.certificate_status, ocsp.OCSPCertStatus.UNKNOWN)
 
     @override_tmpcadir()
     def test_unknown_ca(self) -> None:
         """Try requesting an unknown CA in a CA OCSP view."""
         data = base64.b64encode(req1).decode("utf-8")
-        with self.assertLogs() as logcm:
-            response = self.client.get(reverse("get-ca", kwargs={"data": data}))
-        serial = self.certs["child-cert"].serial
-        self.assertEqual(
-            logcm.output, [f"WARNING:django_ca.views:{serial}: OCSP request for unknown CA received."]
-        )
+        response = self.client.get(reverse("get-ca", kwargs={"data": data}))
         self.assertEqual(response.status_code, HTTPStatus.OK)
         ocsp_response = ocsp.load_der_ocsp_response(response.content)
-        self.assertEqual(ocsp_response.response_status, ocsp.OCSPResponseStatus.INTERNAL_ERROR)
+        self.assertEqual(ocsp_response.response_status, ocsp.OCSPResponseStatus.SUCCESSFUL)
+        self.assertEqual(ocsp_response.certificate_status, ocsp.OCSPCertStatus.UNKNOWN)
+        self.assertEqual(ocsp_response.serial_number, self.certs["child-cert"].pub.loaded.serial_number)
 
     @override_tmpcadir()
     def test_bad_private_key_type(self) -> None:
@@ -543,7 +569,7 @@ class OCSPManualViewTestCaseMixin(OCSPViewTestMixin):
         self.assertEqual(
             logcm.output,
             [
-                "ERROR:django_ca.views:<class 'str'>: Unsupported private key type.",
+                "ERROR:django_ca.ocsp:<class 'str'>: Unsupported private key type.",
                 "ERROR:django_ca.views:Could not read responder key/cert.",
             ],
         )
@@ -573,16 +599,102 @@ class OCSPManualViewTestCaseMixin(OCSPViewTestMixin):
         self.assertEqual(len(logcm.output), 1)
         self.assertIn("ValueError: error parsing asn1 value", logcm.output[0], logcm.output[0])
 
+    @override_tmpcadir()
     def test_multiple(self) -> None:
-        """Try making multiple OCSP requests (not currently supported)."""
+        """Test making a request for multiple certificates."""
+        certs = [self.certs["child-cert"], self.certs["profile-server"], self.certs["no-extensions"]]
+        self.certs["profile-server"].revoke()
+        request = asn1_ocsp.OCSPRequest(
+            {
+                "tbs_request": {
+                    "request_list": [
+                        asn1_ocsp.OCSPRequest.load(
+                            ocsp.OCSPRequestBuilder()
+                            .add_certificate(cert.pub.loaded, self.ca.pub.loaded, hashes.SHA1())
+                            .build()
+                            .public_bytes(Encoding.DER)
+                        )["tbs_request"]["request_list"][0]
+                        for cert in certs
+                    ]
+                }
+            }
+        )
+
+        # Queries: get the CA, build the filter of known serials, get the status of all certificates
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                reverse("post"), request.dump(), content_type="application/ocsp-request"
+            )
+        self.assertEqual(len(queries), 3)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        ocsp_response = ocsp.load_der_ocsp_response(response.content)
+        self.assertEqual(ocsp_response.response_status, ocsp.OCSPResponseStatus.SUCCESSFUL)
+        self.assertOCSPSignature(
+            typing.cast(CertificateIssuerPublicKeyTypes, self.certs["profile-ocsp"].pub.loaded.public_key()),
+            ocsp_response,
+        )
+
+        single_responses = list(ocsp_response.responses)
+        self.assertEqual(len(single_responses), 3)
+        for cert, single_response in zip(certs, single_responses):
+            self.assertOCSPSingleResponse(cert, single_response, hashes.SHA1)
+
+    @override_tmpcadir()
+    def test_multiple_with_unknown_certificates(self) -> None:
+        """Try making a request for multiple unknown certificates."""
         data = base64.b64encode(multiple_req).decode("utf-8")
-        with self.assertLogs() as logcm:
-            response = self.client.get(reverse("get", kwargs={"data": data}))
+        response = self.client.get(reverse("get", kwargs={"data": data}))
         self.assertEqual(response.status_code, HTTPStatus.OK)
         ocsp_response = ocsp.load_der_ocsp_response(response.content)
-        self.assertEqual(ocsp_response.response_status, ocsp.OCSPResponseStatus.MALFORMED_REQUEST)
-        self.assertEqual(len(logcm.output), 1)
-        self.assertIn("OCSP request contains more than one request", logcm.output[0])
+        self.assertEqual(ocsp_response.response_status, ocsp.OCSPResponseStatus.SUCCESSFUL)
+        single_responses = list(ocsp_response.responses)
+        self.assertEqual([single_response.serial_number for single_response in single_responses], [123, 345])
+        for single_response in single_responses:
+            self.assertEqual(single_response.certificate_status, ocsp.OCSPCertStatus.UNKNOWN)
+
+    @override_tmpcadir()
+    def test_unknown_certificate_is_issued(self) -> None:
+        """Test that a certificate is no longer unknown once it is issued."""
+        cert = self.certs["child-cert"]
+        data = base64.b64encode(req1).decode("utf-8")
+        cert.delete()
+        response = self.client.get(reverse("get", kwargs={"data": data}))
+        ocsp_response = ocsp.load_der_ocsp_response(response.content)
+        self.assertEqual(ocsp_response.certificate_status, ocsp.OCSPCertStatus.UNKNOWN)
+
+        cert.save(force_insert=True)
+        response = self.client.get(reverse("get", kwargs={"data": data}))
+        ocsp_response = ocsp.load_der_ocsp_response(response.content)
+        self.assertEqual(ocsp_response.certificate_status, ocsp.OCSPCertStatus.GOOD)
+
+    @override_tmpcadir()
+    def test_known_serials_filter_disabled(self) -> None:
+        """Test that the status of unknown serials is always retrieved if the filter is disabled."""
+        data = base64.b64encode(unknown_req).decode("utf-8")
+        with mock.patch.object(OCSPView, "known_serials_filter", False):
+            for _i in range(0, 2):
+                with self.assertNumQueries(2):  # get the CA, get the status of the certificate
+                    response = self.client.get(reverse("get", kwargs={"data": data}))
+                ocsp_response = ocsp.load_der_ocsp_response(response.content)
+                self.assertEqual(ocsp_response.certificate_status, ocsp.OCSPCertStatus.UNKNOWN)
+
+    @override_tmpcadir()
+    def test_response_cache(self) -> None:
+        """Test that cached responses are returned without loading the private key of the responder."""
+        request = (
+            ocsp.OCSPRequestBuilder()
+            .add_certificate(self.cert.pub.loaded, self.ca.pub.loaded, hashes.SHA1())
+            .build()
+            .public_bytes(Encoding.DER)
+        )
+        response = self.client.post(reverse("post"), request, content_type="application/ocsp-request")
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+        with mock.patch.object(OCSPView, "get_responder_key", autospec=True, side_effect=Exception("x")):
+            cached_response = self.client.post(
+                reverse("post"), request, content_type="application/ocsp-request"
+            )
+        self.assertEqual(cached_response.content, response.content)
 
     @override_tmpcadir()
     def test_bad_ca_cert(self) -> None:
@@ -638,9 +750,8 @@ class OCSPTestView(OCSPManualViewTestCaseMixin, TestCase):
     """Test manually configured OCSPView."""
 
 
-@freeze_time(TIMESTAMPS["everything_valid"])
-class GenericOCSPViewTestCase(OCSPViewTestMixin, TestCase):
-    """Test generic OCSP view."""
+class GenericOCSPViewTestCaseMixin(OCSPViewTestMixin):
+    """Mixin defining test cases for GenericOCSPView."""
 
     load_cas = ("root", "child")
     load_certs = ("child-cert",)
@@ -808,6 +919,200 @@ class GenericOCSPViewTestCase(OCSPViewTestMixin, TestCase):
             signature_algorithm_oid=SignatureAlgorithmOID.ED25519,
         )
 
+    @override_tmpcadir()
+    def test_responder_cache(self) -> None:
+        """Test that the responder key and certificate are only loaded once."""
+        private_key, ocsp_cert = self.generate_ocsp_key(self.ca)
+
+        with mock.patch(
+            "cryptography.hazmat.primitives.serialization.load_der_private_key",
+            autospec=True,
+            side_effect=load_der_private_key,
+        ) as load_mock:
+            # Pass a nonce so that responses are not cached
+            for _ in range(2):
+                response = self.ocsp_get(self.cert, nonce=b"foo")
+                self.assertOCSPResponse(
+                    response, requested_certificate=self.cert, nonce=b"foo", responder_certificate=ocsp_cert
+                )
+        self.assertEqual(load_mock.call_count, 1)
+
+        # Regenerate the key, the new key is loaded automatically
+        private_key, ocsp_cert = self.generate_ocsp_key(self.ca, force=True)
+        response = self.ocsp_get(self.cert)
+        self.assertOCSPResponse(response, requested_certificate=self.cert, responder_certificate=ocsp_cert)
+
+    @override_tmpcadir()
+    def test_responder_cache_without_modified_time(self) -> None:
+        """Test the responder cache with a storage backend that does not support modification times."""
+        private_key, ocsp_cert = self.generate_ocsp_key(self.ca)
+
+        with mock.patch(
+            "django.core.files.storage.FileSystemStorage.get_modified_time",
+            autospec=True,
+            side_effect=NotImplementedError,
+        ), freeze_time(TIMESTAMPS["everything_valid"]) as frozen_time:
+            response = self.ocsp_get(self.cert)
+            self.assertOCSPResponse(
+                response, requested_certificate=self.cert, responder_certificate=ocsp_cert
+            )
+
+            # Files are not read again for subsequent requests
+            with mock.patch("django_ca.views.read_file", autospec=True, side_effect=Exception("x")):
+                response = self.ocsp_get(self.cert)
+            self.assertOCSPResponse(
+                response, requested_certificate=self.cert, responder_certificate=ocsp_cert
+            )
+
+            # Regenerate the key, the new key is loaded once the reload interval has passed
+            private_key, ocsp_cert = self.generate_ocsp_key(self.ca, force=True)
+            frozen_time.tick(timedelta(seconds=60))
+            response = self.ocsp_get(self.cert)
+            self.assertOCSPResponse(
+                response, requested_certificate=self.cert, responder_certificate=ocsp_cert
+            )
+
+    @override_tmpcadir()
+    def test_response_cache(self) -> None:
+        """Test that responses to requests without a nonce are cached."""
+        private_key, ocsp_cert = self.generate_ocsp_key(self.ca)
+        cache_key = get_ocsp_response_cache_key(self.ca.serial, self.cert.serial, hashes.SHA256())
+
+        response = self.ocsp_get(self.cert)
+        self.assertOCSPResponse(response, requested_certificate=self.cert, responder_certificate=ocsp_cert)
+        self.assertEqual(cache.get(cache_key), (ocsp_cert.pub.loaded.serial_number, response.content))
+
+        # Second request does not sign a new response
+        with mock.patch(
+            "cryptography.x509.ocsp.OCSPResponseBuilder.sign", autospec=True, side_effect=Exception("x")
+        ):
+            cached_response = self.ocsp_get(self.cert)
+        self.assertEqual(cached_response.content, response.content)
+
+        # Requests with a different hash algorithm are cached separately
+        response = self.ocsp_get(self.cert, hash_algorithm=hashes.SHA512)
+        self.assertOCSPResponse(
+            response,
+            requested_certificate=self.cert,
+            responder_certificate=ocsp_cert,
+            single_response_hash_algorithm=hashes.SHA512,
+        )
+
+        # Revoking the certificate invalidates the cache
+        self.cert.revoke()
+        self.assertIsNone(cache.get(cache_key))
+        response = self.ocsp_get(self.cert)
+        self.assertOCSPResponse(response, requested_certificate=self.cert, responder_certificate=ocsp_cert)
+
+    @override_tmpcadir()
+    def test_response_cache_with_nonce(self) -> None:
+        """Test that responses to requests with a nonce are not cached."""
+        private_key, ocsp_cert = self.generate_ocsp_key(self.ca)
+        cache_key = get_ocsp_response_cache_key(self.ca.serial, self.cert.serial, hashes.SHA256())
+
+        response = self.ocsp_get(self.cert, nonce=b"foo")
+        self.assertOCSPResponse(
+            response, requested_certificate=self.cert, nonce=b"foo", responder_certificate=ocsp_cert
+        )
+        self.assertIsNone(cache.get(cache_key))
+
+    @override_tmpcadir()
+    def test_response_cache_with_new_responder_certificate(self) -> None:
+        """Test that cached responses are not used after the responder certificate was renewed."""
+        private_key, ocsp_cert = self.generate_ocsp_key(self.ca)
+        response = self.ocsp_get(self.cert)
+        self.assertOCSPResponse(response, requested_certificate=self.cert, responder_certificate=ocsp_cert)
+
+        private_key, ocsp_cert = self.generate_ocsp_key(self.ca, force=True)
+        response = self.ocsp_get(self.cert)
+        self.assertOCSPResponse(response, requested_certificate=self.cert, responder_certificate=ocsp_cert)
+
+        # Cached response is not used if the responder cannot be loaded
+        storage = get_storage()
+        storage.delete(f"ocsp/{self.ca.serial.replace(':', '')}.key")
+        with self.assertLogs() as logcm:
+            response = self.ocsp_get(self.cert)
+        self.assertEqual(logcm.output, ["ERROR:django_ca.views:Could not read responder key/cert."])
+        ocsp_response = ocsp.load_der_ocsp_response(response.content)
+        self.assertEqual(ocsp_response.response_status, ocsp.OCSPResponseStatus.INTERNAL_ERROR)
+
+    @override_tmpcadir()
+    def test_response_cache_for_ca(self) -> None:
+        """Test that cached responses for certificate authorities are invalidated upon revocation."""
+        child = self.cas["child"]
+        cache_key = get_ocsp_response_cache_key(self.cas["root"].serial, child.serial, hashes.SHA256(), "ca")
+        cache.set(cache_key, (1, b"foo"))
+        child.revoke()
+        self.assertIsNone(cache.get(cache_key))
+
+        # Revoking a root CA does not do anything
+        self.cas["root"].revoke()
+
+    @override_tmpcadir()
+    def test_pregenerated_response(self) -> None:
+        """Test that responses generated by the generate_ocsp_responses task are served directly."""
+        private_key, ocsp_cert = self.generate_ocsp_key(self.ca)
+        tasks.generate_ocsp_responses(self.ca.serial)
+
+        with mock.patch(
+            "cryptography.x509.ocsp.OCSPResponseBuilder.sign", autospec=True, side_effect=Exception("x")
+        ):
+            response = self.ocsp_get(self.cert)
+        self.assertOCSPResponse(response, requested_certificate=self.cert, responder_certificate=ocsp_cert)
+
+    @override_tmpcadir()
+    def test_caching_headers(self) -> None:
+        """Test HTTP caching headers and conditional requests."""
+        self.generate_ocsp_key(self.ca)
+        now = TIMESTAMPS["everything_valid"]
+        expires = now + timedelta(seconds=self.ca.ocsp_response_validity)
+        response = self.ocsp_get(self.cert)
+        etag = f'"{hashlib.sha256(response.content).hexdigest()}"'
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(response["Last-Modified"], http_date(now.timestamp()))
+        self.assertEqual(response["Expires"], http_date(expires.timestamp()))
+        self.assertEqual(
+            response["Cache-Control"],
+            f"public, max-age={self.ca.ocsp_response_validity}, no-transform, must-revalidate",
+        )
+
+        # Send a conditional request for the same (cached) response
+        url = response.wsgi_request.get_full_path()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=http_date(now.timestamp()))
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    @override_tmpcadir()
+    def test_caching_headers_with_nonce(self) -> None:
+        """Test that responses with a nonce or to POST requests do not include caching headers."""
+        self.generate_ocsp_key(self.ca)
+        response = self.ocsp_get(self.cert, nonce=b"foo")
+        self.assertNotIn("ETag", response)
+        self.assertNotIn("Cache-Control", response)
+
+        builder = ocsp.OCSPRequestBuilder()
+        builder = builder.add_certificate(self.cert.pub.loaded, self.ca.pub.loaded, hashes.SHA256())
+        response = self.client.post(
+            reverse("django_ca:ocsp-cert-post", kwargs={"serial": self.ca.serial}),
+            builder.build().public_bytes(Encoding.DER),
+            content_type="application/ocsp-request",
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertNotIn("ETag", response)
+        self.assertNotIn("Cache-Control", response)
+
+    @override_tmpcadir()
+    def test_caching_headers_with_unsuccessful_response(self) -> None:
+        """Test that unsuccessful responses do not include caching headers."""
+        with self.assertLogs() as logcm:
+            response = self.ocsp_get(self.cert)  # no responder key was generated
+        self.assertEqual(logcm.output, ["ERROR:django_ca.views:Could not read responder key/cert."])
+        ocsp_response = ocsp.load_der_ocsp_response(response.content)
+        self.assertEqual(ocsp_response.response_status, ocsp.OCSPResponseStatus.INTERNAL_ERROR)
+        self.assertNotIn("ETag", response)
+
     @override_tmpcadir()
     def test_cert_method_not_allowed(self) -> None:
         """Try HTTP methods that are not allowed."""
@@ -818,3 +1123,140 @@ class GenericOCSPViewTestCase(OCSPViewTestMixin, TestCase):
         url = reverse("django_ca:ocsp-cert-get", kwargs={"serial": "00AA", "data": "irrelevant"})
         response = self.client.post(url, req1, content_type="application/ocsp-request")
         self.assertEqual(response.status_code, 405)
+
+
+@freeze_time(TIMESTAMPS["everything_valid"])
+class GenericOCSPViewTestCase(GenericOCSPViewTestCaseMixin, TestCase):
+    """Test generic OCSP view."""
+
+
+class UnifiedOCSPViewTestCaseMixin(OCSPViewTestMixin):
+    """Mixin defining test cases for UnifiedOCSPView."""
+
+    load_cas = ("root", "child")
+    load_certs = ("child-cert",)
+
+    def ocsp_request(
+        self,
+        certificate: Union[Certificate, CertificateAuthority],
+        hash_algorithm: Type[hashes.HashAlgorithm] = hashes.SHA256,
+    ) -> bytes:
+        """Get an OCSP request for the given certificate."""
+        if isinstance(certificate, CertificateAuthority):
+            issuer = typing.cast(CertificateAuthority, certificate.parent)
+        else:
+            issuer = certificate.ca
+        builder = ocsp.OCSPRequestBuilder()
+        builder = builder.add_certificate(certificate.pub.loaded, issuer.pub.loaded, hash_algorithm())
+        return builder.build().public_bytes(Encoding.DER)
+
+    @override_tmpcadir()
+    def test_get(self) -> None:
+        """Test a GET request."""
+        private_key, ocsp_cert = self.generate_ocsp_key(self.ca)
+        data = base64.b64encode(self.ocsp_request(self.cert)).decode("utf-8")
+        url = reverse("django_ca:unified-ocsp-cert-get", kwargs={"data": data})
+
+        self.client.get(url)  # first request builds the index
+        cache.clear()  # clear response cache, but this also invalidates the index
+        self.client.get(url)
+
+        # Only the certificate status has to be retrieved from the database
+        cache.delete(get_ocsp_response_cache_key(self.ca.serial, self.cert.serial, hashes.SHA256()))
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertOCSPResponse(response, requested_certificate=self.cert, responder_certificate=ocsp_cert)
+
+    @override_tmpcadir()
+    def test_post(self) -> None:
+        """Test a POST request with a hash algorithm that is not precomputed."""
+        private_key, ocsp_cert = self.generate_ocsp_key(self.ca)
+        response = self.client.post(
+            reverse("django_ca:unified-ocsp-cert-post"),
+            self.ocsp_request(self.cert, hashes.SHA512),
+            content_type="application/ocsp-request",
+        )
+        self.assertOCSPResponse(
+            response,
+            requested_certificate=self.cert,
+            responder_certificate=ocsp_cert,
+            single_response_hash_algorithm=hashes.SHA512,
+        )
+
+    @override_tmpcadir()
+    def test_ca(self) -> None:
+        """Test a request for a child CA."""
+        private_key, ocsp_cert = self.generate_ocsp_key(self.cas["root"])
+        child = self.cas["child"]
+        data = base64.b64encode(self.ocsp_request(child)).decode("utf-8")
+        response = self.client.get(reverse("django_ca:unified-ocsp-ca-get", kwargs={"data": data}))
+        self.assertOCSPResponse(response, requested_certificate=child, responder_certificate=ocsp_cert)
+
+    @override_tmpcadir()
+    @override_tmpcadir()
+    def test_updated_ca(self) -> None:
+        """Test that the index is rebuilt when a certificate authority is updated."""
+        private_key, ocsp_cert = self.generate_ocsp_key(self.ca)
+        data = base64.b64encode(self.ocsp_request(self.cert)).decode("utf-8")
+        url = reverse("django_ca:unified-ocsp-cert-get", kwargs={"data": data})
+        response = self.client.get(url)
+        self.assertOCSPResponse(response, requested_certificate=self.cert, responder_certificate=ocsp_cert)
+
+        # Replace the certificate, the CA can no longer be found
+        pub = self.ca.pub
+        self.ca.pub = self.cas["root"].pub
+        self.ca.save()
+        with self.assertLogs() as logcm:
+            response = self.client.get(url)
+        ocsp_response = ocsp.load_der_ocsp_response(response.content)
+        self.assertEqual(ocsp_response.response_status, ocsp.OCSPResponseStatus.INTERNAL_ERROR)
+        key_hash = ocsp.load_der_ocsp_request(base64.b64decode(data)).issuer_key_hash.hex()
+        self.assertEqual(
+            logcm.output, [f"ERROR:django_ca.views:{key_hash}: Certificate Authority could not be found."]
+        )
+
+        # Restore the original certificate
+        self.ca.pub = pub
+        self.ca.save()
+        response = self.client.get(url)
+        self.assertOCSPResponse(response, requested_certificate=self.cert, responder_certificate=ocsp_cert)
+
+    @override_tmpcadir()
+    def test_multiple_issuers(self) -> None:
+        certs: List[Union[Certificate, CertificateAuthority]] = [self.cert, self.cas["child"]]
+        certs = [self.cert, self.cas["child"]]
+        request = asn1_ocsp.OCSPRequest(
+            {
+                "tbs_request": {
+                    "request_list": [
+                        asn1_ocsp.OCSPRequest.load(self.ocsp_request(cert))["tbs_request"]["request_list"][0]
+                        for cert in certs
+                    ]
+                }
+            }
+        )
+
+        with self.assertLogs() as logcm:
+            response = self.client.post(
+                reverse("django_ca:unified-ocsp-cert-post"),
+                request.dump(),
+                content_type="application/ocsp-request",
+            )
+        ocsp_response = ocsp.load_der_ocsp_response(response.content)
+        self.assertEqual(ocsp_response.response_status, ocsp.OCSPResponseStatus.INTERNAL_ERROR)
+        self.assertEqual(len(logcm.output), 1)
+        self.assertIn("Certificate Authority could not be found.", logcm.output[0])
+
+    def test_method_not_allowed(self) -> None:
+        """Try HTTP methods that are not allowed."""
+        response = self.client.get(reverse("django_ca:unified-ocsp-cert-post"))
+        self.assertEqual(response.status_code, 405)
+
+        url = reverse("django_ca:unified-ocsp-cert-get", kwargs={"data": "irrelevant"})
+        response = self.client.post(url, req1, content_type="application/ocsp-request")
+        self.assertEqual(response.status_code, 405)
+
+
+@freeze_time(TIMESTAMPS["everything_valid"])
+class UnifiedOCSPViewTestCase(UnifiedOCSPViewTestCaseMixin, TestCase):
+    """Test the unified OCSP view."""
@@ -13,7 +13,7 @@
 
 """URL configuration for this project."""
 
-from typing import List, Union
+from typing import List, Type, Union
 
 from django.conf import settings
 from django.urls import URLPattern, URLResolver, path, register_converter
@@ -27,16 +27,39 @@ register_converter(converters.Base64Converter, "base64")
 register_converter(converters.HexConverter, "hex")
 register_converter(converters.SerialConverter, "serial")
 
+ca_issuers_view: Type[views.GenericCAIssuersView]
+unified_ocsp_view: Type[views.UnifiedOCSPView]
+ocsp_view: Type[views.GenericOCSPView]
+manual_ocsp_view: Type[views.OCSPView]
+crl_view: Type[views.CertificateRevocationListView]
+if ca_settings.CA_USE_ASYNC_VIEWS is True:
+    ca_issuers_view = views.AsyncGenericCAIssuersView
+    unified_ocsp_view = views.AsyncUnifiedOCSPView
+    ocsp_view = views.AsyncGenericOCSPView
+    manual_ocsp_view = views.AsyncOCSPView
+    crl_view = views.AsyncCertificateRevocationListView
+else:
+    ca_issuers_view = views.GenericCAIssuersView
+    unified_ocsp_view = views.UnifiedOCSPView
+    ocsp_view = views.GenericOCSPView
+    manual_ocsp_view = views.OCSPView
+    crl_view = views.CertificateRevocationListView
+
 urlpatterns: List[Union[URLResolver, URLPattern]] = [
-    path("issuer/<hex:serial>.der", views.GenericCAIssuersView.as_view(), name="issuer"),
-    path("ocsp/<hex:serial>/cert/", views.GenericOCSPView.as_view(), name="ocsp-cert-post"),
-    path("ocsp/<hex:serial>/cert/<base64:data>", views.GenericOCSPView.as_view(), name="ocsp-cert-get"),
-    path("ocsp/<hex:serial>/ca/", views.GenericOCSPView.as_view(ca_ocsp=True), name="ocsp-ca-post"),
-    path(
-        "ocsp/<hex:serial>/ca/<base64:data>", views.GenericOCSPView.as_view(ca_ocsp=True), name="ocsp-ca-get"
-    ),
-    path("crl/<hex:serial>/", views.CertificateRevocationListView.as_view(), name="crl"),
-    path("crl/ca/<hex:serial>/", views.CertificateRevocationListView.as_view(scope="ca"), name="ca-crl"),
+    path("issuer/<hex:serial>.der", ca_issuers_view.as_view(), name="issuer"),
+    path("ocsp/cert/", unified_ocsp_view.as_view(), name="unified-ocsp-cert-post"),
+    path("ocsp/cert/<base64:data>", unified_ocsp_view.as_view(), name="unified-ocsp-cert-get"),
+    path("ocsp/ca/", unified_ocsp_view.as_view(ca_ocsp=True), name="unified-ocsp-ca-post"),
+    path("ocsp/ca/<base64:data>", unified_ocsp_view.as_view(ca_ocsp=True), name="unified-ocsp-ca-get"),
+    path("ocsp/<hex:serial>/cert/", ocsp_view.as_view(), name="ocsp-cert-post"),
+    path("ocsp/<hex:serial>/cert/<base64:data>", ocsp_view.as_view(), name="ocsp-cert-get"),
+    path("ocsp/<hex:serial>/ca/", ocsp_view.as_view(ca_ocsp=True), name="ocsp-ca-post"),
+    path("ocsp/<hex:serial>/ca/<base64:data>", ocsp_view.as_view(ca_ocsp=True), name="ocsp-ca-get"),
+    path("crl/<hex:serial>/", crl_view.as_view(), name="crl"),
+    path("crl/ca/<hex:serial>/", crl_view.as_view(scope="ca"), name="ca-crl"),
+    path("crl/<hex:serial>/delta/", crl_view.as_view(delta=True), name="delta-crl"),
+    path("crl/<hex:serial>/partition/<int:partition>/", crl_view.as_view(), name="crl-partition"),
+    path("crl/ca/<hex:serial>/delta/", crl_view.as_view(scope="ca", delta=True), name="ca-delta-crl"),
 ]
 
 if ca_settings.CA_ENABLE_REST_API is True:
@@ -103,6 +126,6 @@ if ca_settings.CA_ENABLE_ACME:
 for name, kwargs in getattr(settings, "CA_OCSP_URLS", {}).items():
     kwargs.setdefault("ca", name)
     urlpatterns += [
-        path(f"ocsp/{name}/", views.OCSPView.as_view(**kwargs), name=f"ocsp-post-{name}"),
-        path(f"ocsp/{name}/<base64:data>", views.OCSPView.as_view(**kwargs), name=f"ocsp-get-{name}"),
+        path(f"ocsp/{name}/", manual_ocsp_view.as_view(**kwargs), name=f"ocsp-post-{name}"),
+        path(f"ocsp/{name}/<base64:data>", manual_ocsp_view.as_view(**kwargs), name=f"ocsp-get-{name}"),
     ]
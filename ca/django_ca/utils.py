@@ -14,26 +14,39 @@
 """Reusable utility functions used throughout django-ca."""
 
 import binascii
+import functools
+import hashlib
+import logging
+import os
 import re
 import shlex
+import tempfile
 import typing
 import warnings
 from datetime import datetime, timedelta, timezone as tz
 from ipaddress import ip_address, ip_network
-from typing import Iterator, List, Optional, Tuple, Type, Union
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple, Type, Union
 from urllib.parse import urlparse
 
 import idna
 
 import asn1crypto.core
+import asn1crypto.crl
+import asn1crypto.pem
+import asn1crypto.x509
 from cryptography import x509
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.asymmetric import dsa, ec, ed448, ed25519, rsa
-from cryptography.hazmat.primitives.asymmetric.types import CertificateIssuerPrivateKeyTypes
+from cryptography.hazmat.primitives.asymmetric.types import (
+    CertificateIssuerPrivateKeyTypes,
+    CertificateIssuerPublicKeyTypes,
+)
 from cryptography.hazmat.primitives.serialization import Encoding
 from cryptography.x509.name import _ASN1Type
 from cryptography.x509.oid import NameOID
 
+from django.core.cache import cache
+from django.core.files.base import ContentFile
 from django.core.files.storage import InvalidStorageError, Storage, get_storage_class, storages
 from django.utils import timezone
 
@@ -50,6 +63,8 @@ from django_ca.typehints import (
     SerializedName,
 )
 
+log = logging.getLogger(__name__)
+
 #: Regular expression to match general names.
 GENERAL_NAME_RE = re.compile("^(email|URI|IP|DNS|RID|dirName|otherName):(.*)", flags=re.I)
 
@@ -1113,6 +1128,96 @@ def parse_key_curve(value: str) -> ec.EllipticCurve:
         raise ValueError(f"{value}: Not a known Elliptic Curve") from ex
 
 
+@functools.lru_cache
+def _get_presign_key(key_type: ParsableKeyType) -> CertificateIssuerPrivateKeyTypes:
+    # NOTE: Key parameters are not validated, as these keys are never used for real signatures.
+    if key_type == "RSA":
+        return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    if key_type == "DSA":
+        return dsa.generate_private_key(key_size=2048)
+    if key_type == "EC":
+        return ec.generate_private_key(ec.SECP256R1())
+    if key_type == "Ed25519":
+        return ed25519.Ed25519PrivateKey.generate()
+    return ed448.Ed448PrivateKey.generate()
+
+
+def get_presign_key(public_key: CertificateIssuerPublicKeyTypes) -> CertificateIssuerPrivateKeyTypes:
+    """Get a throwaway private key of the same type as `public_key`.
+
+    Key backends that cannot pass a private key to cryptography (e.g. because the key is stored in an HSM)
+    sign data with this key first. The signature algorithm only depends on the key type, so the data to be
+    signed is identical to the data that would be signed by the real key. Keys are only generated once per
+    process.
+    """
+    if isinstance(public_key, rsa.RSAPublicKey):
+        return _get_presign_key("RSA")
+    if isinstance(public_key, dsa.DSAPublicKey):
+        return _get_presign_key("DSA")
+    if isinstance(public_key, ec.EllipticCurvePublicKey):
+        return _get_presign_key("EC")
+    if isinstance(public_key, ed25519.Ed25519PublicKey):
+        return _get_presign_key("Ed25519")
+    if isinstance(public_key, ed448.Ed448PublicKey):
+        return _get_presign_key("Ed448")
+    raise ValueError(f"{public_key}: Unsupported public key type.")  # pragma: no cover
+
+
+def sign_certificate_builders(
+    builders: Sequence[x509.CertificateBuilder],
+    signer_public_key: CertificateIssuerPublicKeyTypes,
+    algorithm: Optional[AllowedHashTypes],
+    sign: Callable[[List[bytes]], List[bytes]],
+) -> List[x509.Certificate]:
+    """Sign multiple certificates using a function that signs the encoded TBSCertificate structures.
+
+    This function works like :py:func:`~django_ca.utils.sign_certificate_builder`, except that `sign`
+    receives a list of data to be signed and must return a list of signatures in the same order.
+    """
+    presign_key = get_presign_key(signer_public_key)
+    presigned = [builder.sign(private_key=presign_key, algorithm=algorithm) for builder in builders]
+    signatures = sign([certificate.tbs_certificate_bytes for certificate in presigned])
+
+    signed = []
+    for certificate, signature in zip(presigned, signatures):
+        asn1_certificate = asn1crypto.x509.Certificate.load(certificate.public_bytes(Encoding.DER))
+        asn1_certificate["signature_value"] = signature
+        signed.append(x509.load_der_x509_certificate(asn1_certificate.dump()))
+    return signed
+
+
+def sign_certificate_builder(
+    builder: x509.CertificateBuilder,
+    signer_public_key: CertificateIssuerPublicKeyTypes,
+    algorithm: Optional[AllowedHashTypes],
+    sign: Callable[[bytes], bytes],
+) -> x509.Certificate:
+    """Sign a certificate using a function that signs the encoded TBSCertificate structure.
+
+    `signer_public_key` is the public key of the private key used by `sign`. The function receives the DER
+    encoded data to be signed and must return the encoded signature.
+    """
+    return sign_certificate_builders(
+        [builder], signer_public_key, algorithm, lambda data: [sign(value) for value in data]
+    )[0]
+
+
+def sign_certificate_revocation_list_builder(
+    builder: x509.CertificateRevocationListBuilder,
+    signer_public_key: CertificateIssuerPublicKeyTypes,
+    algorithm: Optional[AllowedHashTypes],
+    sign: Callable[[bytes], bytes],
+) -> x509.CertificateRevocationList:
+    """Sign a CRL using a function that signs the encoded TBSCertList structure.
+
+    This function works like :py:func:`~django_ca.utils.sign_certificate_builder`.
+    """
+    presigned = builder.sign(private_key=get_presign_key(signer_public_key), algorithm=algorithm)
+    crl = asn1crypto.crl.CertificateList.load(presigned.public_bytes(Encoding.DER))
+    crl["signature"] = sign(presigned.tbs_certlist_bytes)
+    return x509.load_der_x509_crl(crl.dump())
+
+
 def get_cert_builder(expires: datetime, serial: Optional[int] = None) -> x509.CertificateBuilder:
     """Get a basic X.509 certificate builder object.
 
@@ -1182,6 +1287,34 @@ def read_file(path: str) -> bytes:
         stream.close()
 
 
+def replace_file(storage: Storage, path: str, data: bytes) -> None:
+    """Atomically replace the file at `path` in `storage` with `data`.
+
+    For storages on the local file system, the data is written to a temporary file in the same directory that
+    is then renamed, so that readers (e.g. a web server) never see a partially written file. Other storages
+    (e.g. object storages) are expected to replace files atomically when saving a file with the same name.
+    """
+    try:
+        full_path = storage.path(path)
+    except NotImplementedError:
+        if storage.exists(path) and storage.get_available_name(path) != path:
+            storage.delete(path)  # storage would otherwise save the file under a different name
+        storage.save(path, ContentFile(data))
+        return
+
+    directory = os.path.dirname(full_path)
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as stream:
+            stream.write(data)
+        os.chmod(temp_path, getattr(storage, "file_permissions_mode", None) or 0o644)
+        os.replace(temp_path, full_path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
 def split_str(val: str, sep: str) -> Iterator[str]:
     """Split a character on the given set of characters.
 
@@ -1219,6 +1352,155 @@ def split_str(val: str, sep: str) -> Iterator[str]:
     yield from lex
 
 
-def get_crl_cache_key(serial: str, encoding: Encoding = Encoding.DER, scope: Optional[str] = None) -> str:
+def get_crl_cache_key(
+    serial: str,
+    encoding: Encoding = Encoding.DER,
+    scope: Optional[str] = None,
+    delta: bool = False,
+    partition: Optional[int] = None,
+) -> str:
     """Get the cache key for a CRL with the given parameters."""
+    if partition is not None:
+        scope = f"{scope}_{partition}"
+    if delta is True:
+        return f"delta_crl_{serial}_{encoding.name}_{scope}"
     return f"crl_{serial}_{encoding.name}_{scope}"
+
+
+def get_crl_chunk_cache_key(cache_key: str, digest: str, index: int) -> str:
+    """Get the cache key for a chunk of a CRL that is too large to be cached as a single item.
+
+    The key includes (a prefix of) the digest of the complete CRL, so that chunks of a newer CRL never
+    overwrite chunks of a CRL that is still referenced by the cache.
+    """
+    return f"{cache_key}_chunk_{digest[:16]}_{index}"
+
+
+def set_crl_in_cache(cache_key: str, crl: bytes, timeout: Optional[int]) -> None:
+    """Store an encoded CRL in the cache.
+
+    CRLs larger than :ref:`CA_CRL_CACHE_CHUNK_SIZE <settings-ca-crl-cache-chunk-size>` are split into chunks
+    that are stored individually. `cache_key` then holds a manifest listing the number of chunks, the size
+    and the SHA-256 digest of the complete CRL. Use :py:func:`~django_ca.utils.get_crl_from_cache` to
+    retrieve the CRL.
+    """
+    chunk_size = ca_settings.CA_CRL_CACHE_CHUNK_SIZE
+    if chunk_size is None or len(crl) <= chunk_size:
+        cache.set(cache_key, crl, timeout)
+        return
+
+    digest = hashlib.sha256(crl).hexdigest()
+    chunks = {
+        get_crl_chunk_cache_key(cache_key, digest, index): crl[offset : offset + chunk_size]
+        for index, offset in enumerate(range(0, len(crl), chunk_size))
+    }
+
+    # Chunks are stored before the manifest, so that readers never see a manifest with missing chunks.
+    failed_keys = cache.set_many(chunks, timeout)
+    if failed_keys:
+        log.warning("%s: Could not store %s chunks of CRL in the cache.", cache_key, len(failed_keys))
+        return
+    cache.set(cache_key, {"chunks": len(chunks), "size": len(crl), "sha256": digest}, timeout)
+
+
+def get_crl_from_cache(cache_key: str) -> Optional[bytes]:
+    """Get an encoded CRL stored with :py:func:`~django_ca.utils.set_crl_in_cache`.
+
+    Returns ``None`` if the CRL is not cached or if the CRL was stored in chunks and a chunk is missing or
+    the reassembled CRL does not match the digest stored in the manifest.
+    """
+    cached = cache.get(cache_key)
+    if cached is None or isinstance(cached, bytes):
+        return cached
+
+    digest = cached["sha256"]
+    chunk_keys = [get_crl_chunk_cache_key(cache_key, digest, index) for index in range(cached["chunks"])]
+    chunks = cache.get_many(chunk_keys)
+    if len(chunks) != len(chunk_keys):
+        log.warning("%s: Chunks of CRL are missing in the cache.", cache_key)
+        return None
+
+    crl = b"".join(chunks[key] for key in chunk_keys)
+    if len(crl) != cached["size"] or hashlib.sha256(crl).hexdigest() != digest:
+        log.warning("%s: Chunked CRL in the cache does not match its digest.", cache_key)
+        return None
+    return crl
+
+
+def get_crl_storage_path(
+    serial: str,
+    encoding: Encoding = Encoding.DER,
+    scope: Optional[str] = None,
+    delta: bool = False,
+    partition: Optional[int] = None,
+) -> str:
+    """Get the path of a CRL with the given parameters in the storage used for publishing CRLs."""
+    name = scope or "all"
+    if partition is not None:
+        name = f"{name}_{partition}"
+    if delta is True:
+        name = f"delta_{name}"
+    extension = "pem" if encoding == Encoding.PEM else "crl"
+    return f"crl/{serial}/{name}.{extension}"
+
+
+def get_crl_fingerprint_cache_key(
+    serial: str, scope: Optional[str] = None, delta: bool = False, partition: Optional[int] = None
+) -> str:
+    """Get the cache key for the fingerprint of the CRL cached with the given parameters."""
+    if partition is not None:
+        scope = f"{scope}_{partition}"
+    if delta is True:
+        return f"delta_crl_fingerprint_{serial}_{scope}"
+    return f"crl_fingerprint_{serial}_{scope}"
+
+
+def get_crl_regeneration_cache_key(serial: str, scope: Optional[str]) -> str:
+    """Get the cache key marking that regeneration of CRLs with the given scope is already scheduled."""
+    return f"crl_regenerate_{serial}_{scope}"
+
+
+def get_crl_cache_lock_key(cache_key: str) -> str:
+    """Get the cache key used to lock regeneration of the CRL cached with `cache_key`."""
+    return f"{cache_key}_lock"
+
+
+def get_crl_published_cache_key(cache_key: str) -> str:
+    """Get the cache key for the ``nextUpdate`` of the published version of the CRL cached with `cache_key`.
+
+    The key is removed whenever the published CRL is no longer up to date.
+    """
+    return f"{cache_key}_published"
+
+
+def get_crl_partition(serial: int) -> Optional[int]:
+    """Get the CRL partition for a certificate with the given serial.
+
+    Returns ``None`` if :ref:`CA_CRL_PARTITIONS <settings-ca-crl-partitions>` is not set.
+    """
+    if not ca_settings.CA_CRL_PARTITIONS:
+        return None
+    return serial % ca_settings.CA_CRL_PARTITIONS
+
+
+def get_crl_validity(data: bytes) -> Tuple[datetime, Optional[datetime]]:
+    """Get the ``thisUpdate`` and ``nextUpdate`` fields of a DER or PEM encoded CRL.
+
+    Unlike loading the CRL with :py:func:`~cg:cryptography.x509.load_der_x509_crl`, this function does not
+    parse the list of revoked certificates, so it is cheap even for very large CRLs.
+    """
+    if asn1crypto.pem.detect(data):
+        _type_name, _headers, data = asn1crypto.pem.unarmor(data)
+    tbs_cert_list = asn1crypto.crl.CertificateList.load(data)["tbs_cert_list"]
+    return tbs_cert_list["this_update"].native, tbs_cert_list["next_update"].native
+
+
+def get_ocsp_response_cache_key(
+    ca_serial: str, serial: str, algorithm: hashes.HashAlgorithm, scope: str = "cert"
+) -> str:
+    """Get the cache key for a signed OCSP response with the given parameters.
+
+    `scope` is ``"cert"`` for responses for certificates and ``"ca"`` for responses for certificate
+    authorities.
+    """
+    return f"ocsp_{ca_serial}_{scope}_{serial}_{algorithm.name}"
@@ -19,23 +19,24 @@
    * https://django-ca.readthedocs.io/en/latest/python/views.html
 """
 
+import asyncio
 import base64
 import binascii
+import hashlib
 import logging
+import time
 import typing
 from datetime import datetime, timedelta, timezone as tz
 from http import HTTPStatus
-from typing import Any, Optional, Union
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 
+from asgiref.sync import sync_to_async
 from pydantic import BaseModel
 
 from cryptography import x509
-from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric.types import CertificateIssuerPrivateKeyTypes
 from cryptography.hazmat.primitives.serialization import Encoding
 from cryptography.x509 import (
-    ExtensionNotFound,
-    OCSPNonce,
     load_der_x509_certificate,
     load_pem_x509_certificate,
     ocsp,
@@ -43,19 +44,56 @@ from cryptography.x509 import (
 
 from django.core.cache import cache
 from django.core.exceptions import ImproperlyConfigured
-from django.http import HttpRequest, HttpResponse, HttpResponseServerError
+from django.core.files.storage import Storage, storages
+from django.http import Http404, HttpRequest, HttpResponse, HttpResponseServerError
+from django.utils.cache import get_conditional_response, patch_cache_control
 from django.utils.decorators import method_decorator
+from django.utils.http import http_date, quote_etag
 from django.views.decorators.csrf import csrf_exempt
 from django.views.generic.base import View
 from django.views.generic.detail import SingleObjectMixin
 
-from django_ca import constants
+from django_ca import ca_settings
 from django_ca.models import Certificate, CertificateAuthority
-from django_ca.utils import SERIAL_RE, get_crl_cache_key, int_to_hex, parse_encoding, read_file
+from django_ca.ocsp import (
+    CERTIFICATE_STATUS_FIELDS,
+    CertificateID,
+    get_ocsp_response_validity,
+    get_single_response,
+    issuer_index,
+    known_serials,
+    load_ocsp_request,
+    load_responder_key,
+    sign_ocsp_response,
+)
+from django_ca.utils import (
+    SERIAL_RE,
+    get_crl_cache_key,
+    get_crl_cache_lock_key,
+    get_crl_from_cache,
+    get_crl_published_cache_key,
+    get_crl_storage_path,
+    get_crl_validity,
+    get_ocsp_response_cache_key,
+    get_storage,
+    int_to_hex,
+    parse_encoding,
+    read_file,
+    set_crl_in_cache,
+)
 
 log = logging.getLogger(__name__)
 
+#: Interval (in seconds) in which requests check if a CRL generated by another request is available.
+_CRL_LOCK_POLL_INTERVAL = 0.1
+
+#: Per-process cache of responder keys and certificates used by :py:class:`GenericOCSPView`. The key is the
+#: serial of the certificate authority, the value is a tuple of a version string identifying the files in the
+#: storage backend, the loaded private key and the loaded certificate.
+_responder_cache: Dict[str, Tuple[str, CertificateIssuerPrivateKeyTypes, x509.Certificate]] = {}
+
 if typing.TYPE_CHECKING:
+    from django.db.models import QuerySet
     from django.http.response import HttpResponseBase
 
     SingleObjectMixinBase = SingleObjectMixin[CertificateAuthority]
@@ -63,6 +101,38 @@ else:
     SingleObjectMixinBase = SingleObjectMixin
 
 
+def _add_caching_headers(
+    request: HttpRequest, response: HttpResponse, last_modified: datetime, expires: Optional[datetime]
+) -> HttpResponse:
+    """Add HTTP caching headers to `response` and return a "304 Not Modified" response if appropriate.
+
+    Headers are set as recommended in `RFC 5019`_, section 6.2, so that HTTP proxies and CDNs can cache
+    OCSP responses and CRLs until they expire.
+    """
+    etag = quote_etag(hashlib.sha256(response.content).hexdigest())
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified.timestamp())
+    if expires is not None:  # pragma: no branch  # CRLs created by django-ca always have a nextUpdate
+        max_age = max(int((expires - datetime.now(tz=tz.utc)).total_seconds()), 0)
+        response["Expires"] = http_date(expires.timestamp())
+        patch_cache_control(response, public=True, max_age=max_age, no_transform=True, must_revalidate=True)
+
+    conditional_response = get_conditional_response(
+        request, etag=etag, last_modified=int(last_modified.timestamp()), response=response
+    )
+    return typing.cast(HttpResponse, conditional_response)  # never None if response is passed
+
+
+def _ocsp_method_not_allowed(request: HttpRequest, kwargs: Dict[str, Any]) -> bool:
+    """Check if the request method does not match the URL of an OCSP view.
+
+    OCSP views with ``data`` in the URL handle GET requests, OCSP views without it handle POST requests.
+    """
+    if request.method == "GET" and "data" not in kwargs:
+        return True
+    return request.method == "POST" and "data" in kwargs
+
+
 class CertificateRevocationListView(View, SingleObjectMixinBase):
     """Generic view that provides Certificate Revocation Lists (CRLs)."""
 
@@ -92,6 +162,36 @@ class CertificateRevocationListView(View, SingleObjectMixinBase):
     include_issuing_distribution_point: Optional[bool] = None
     """Boolean flag to force inclusion/exclusion of IssuingDistributionPoint extension."""
 
+    delta = False
+    """Set to ``True`` to provide delta CRLs (see RFC 5280, 5.2.4). Delta CRLs can only be generated after a
+    complete CRL was published for the certificate authority with :command:`manage.py cache_crls`."""
+
+    refresh_ahead = 60
+    """Regenerate the CRL this many seconds before the cached CRL expires. Until the new CRL is available,
+    other requests continue to receive the cached CRL. Set to ``0`` to only regenerate expired CRLs."""
+
+    lock_timeout = 30
+    """Maximum time in seconds that a request holds the lock for regenerating a CRL.
+
+    Only one request at a time regenerates a CRL. Other requests receive the cached CRL while it is being
+    regenerated. The lock expires after this many seconds, e.g. if the request holding it was killed."""
+
+    lock_wait = 1.0
+    """Maximum time in seconds that a request waits for a CRL that is being generated by another request.
+
+    If no CRL is cached at all, other requests wait for the new CRL and generate it themselves if it is not
+    available after this many seconds, so that workers are not blocked for a long time."""
+
+    sendfile_prefix: Optional[str] = None
+    """Set to let the web server send CRLs published by :command:`manage.py cache_crls` (see
+    :ref:`CA_CRL_STORAGE_ALIAS <settings-ca-crl-storage-alias>`).
+
+    The response contains no body, but the header named by ``sendfile_header`` with this prefix followed by
+    the path of the CRL in the storage. CRLs that were not published are served by the view as usual."""
+
+    sendfile_header = "X-Accel-Redirect"
+    """Header used to let the web server send a published CRL. Use ``"X-Sendfile"`` for Apache or lighttpd."""
+
     def get_key_backend_options(self, ca: CertificateAuthority) -> BaseModel:
         """Method to get the key backend options to access the private key.
 
@@ -100,44 +200,127 @@ class CertificateRevocationListView(View, SingleObjectMixinBase):
         """
         return ca.key_backend.get_use_private_key_options(ca, {"password": self.password})
 
-    def get(self, request: HttpRequest, serial: str) -> HttpResponse:
+    def get(self, request: HttpRequest, serial: str, partition: Optional[int] = None) -> HttpResponse:
         # pylint: disable=missing-function-docstring; standard Django view function
         encoding = parse_encoding(request.GET.get("encoding", self.type))
 
-        ca = self.get_object()
+        cache_key = get_crl_cache_key(
+            serial, encoding=encoding, scope=self.scope, delta=self.delta, partition=partition
+        )
 
-        cache_key = get_crl_cache_key(serial, encoding=encoding, scope=self.scope)
+        published_crl = self.get_published_crl(serial, encoding, partition)
+        if published_crl is not None:
+            storage, path = published_crl
+            next_update = cache.get(get_crl_published_cache_key(cache_key))
+            if self.published_crl_is_current(next_update) and storage.exists(path):
+                return self.sendfile_response(path)
 
-        crl = cache.get(cache_key)
-        if crl is None:
-            # Catch this case early so that we can give a better error message
-            if self.include_issuing_distribution_point is True and ca.parent is None and self.scope is None:
-                raise ValueError(
-                    "Cannot add IssuingDistributionPoint extension to CRLs with no scope for root CAs."
-                )
+        ca = self.get_object()
 
-            encoding = parse_encoding(self.type)
-            key_backend_options = self.get_key_backend_options(ca)
-            crl = ca.get_crl(
-                key_backend_options,
-                expires=self.expires,
-                scope=self.scope,
-                include_issuing_distribution_point=self.include_issuing_distribution_point,
+        crl = get_crl_from_cache(cache_key)
+        if crl is None or self.refresh_due(crl):
+            lock_key = get_crl_cache_lock_key(cache_key)
+            if cache.add(lock_key, True, self.lock_timeout):
+                try:
+                    crl = self.generate_crl(ca, partition=partition)
+                    set_crl_in_cache(cache_key, crl, self.expires)
+                finally:
+                    cache.delete(lock_key)
+            elif crl is None:
+                # Another request is generating the CRL, wait for it to become available.
+                for _attempt in range(int(self.lock_wait / _CRL_LOCK_POLL_INTERVAL)):
+                    time.sleep(_CRL_LOCK_POLL_INTERVAL)
+                    crl = get_crl_from_cache(cache_key)
+                    if crl is not None:
+                        break
+                else:
+                    log.warning("%s: Timed out waiting for CRL, generating it.", cache_key)
+                    crl = self.generate_crl(ca, partition=partition)
+                    set_crl_in_cache(cache_key, crl, self.expires)
+
+        return self.crl_response(request, crl)
+
+    def refresh_due(self, crl: bytes) -> bool:
+        """Check if the (cached) encoded CRL should be regenerated, because it (almost) expired."""
+        _last_update, next_update = get_crl_validity(crl)
+        if next_update is None:  # pragma: no cover  # CRLs created by django-ca always have a nextUpdate
+            return False
+        return next_update - datetime.now(tz=tz.utc) < timedelta(seconds=self.refresh_ahead)
+
+    def generate_crl(self, ca: CertificateAuthority, partition: Optional[int] = None) -> bytes:
+        """Generate the encoded CRL for the given certificate authority (and CRL partition, if given)."""
+        # Catch this case early so that we can give a better error message
+        if self.include_issuing_distribution_point is True and ca.parent is None and self.scope is None:
+            raise ValueError(
+                "Cannot add IssuingDistributionPoint extension to CRLs with no scope for root CAs."
             )
-            crl = crl.public_bytes(encoding)
-            cache.set(cache_key, crl, self.expires)
 
-        content_type = self.content_type
-        if content_type is None:
-            if self.type == Encoding.DER:
-                content_type = "application/pkix-crl"
-            elif self.type == Encoding.PEM:
-                content_type = "text/plain"
-            else:  # pragma: no cover
-                # DER/PEM are all known encoding types, so this shouldn't happen
-                return HttpResponseServerError()
-
-        return HttpResponse(crl, content_type=content_type)
+        counter = self.scope or "all"
+        if partition is not None:
+            if ca.get_crl_partition_full_name() is None or partition not in ca.get_crl_partitions():
+                raise Http404("CRL partition does not exist.")
+            counter = f"{counter}_{partition}"
+
+        if self.delta is True and ca.get_last_complete_crl(counter) is None:
+            raise Http404("No complete CRL was generated yet.")
+
+        encoding = parse_encoding(self.type)
+        key_backend_options = self.get_key_backend_options(ca)
+        crl = ca.get_crl(
+            key_backend_options,
+            expires=self.expires,
+            scope=self.scope,
+            include_issuing_distribution_point=self.include_issuing_distribution_point,
+            delta=self.delta,
+            partition=partition,
+        )
+        return crl.public_bytes(encoding)
+
+    def get_published_crl(
+        self, serial: str, encoding: Encoding, partition: Optional[int]
+    ) -> Optional[Tuple[Storage, str]]:
+        """Get the storage and path of a published CRL, or ``None`` if the web server should not send it."""
+        if self.sendfile_prefix is None or ca_settings.CA_CRL_STORAGE_ALIAS is None:
+            return None
+        path = get_crl_storage_path(serial, encoding, scope=self.scope, delta=self.delta, partition=partition)
+        return storages[ca_settings.CA_CRL_STORAGE_ALIAS], path
+
+    def published_crl_is_current(self, next_update: Optional[datetime]) -> bool:
+        """Check if the published CRL with the given ``nextUpdate`` may be sent by the web server.
+
+        `next_update` is ``None`` if the CRL was not published or is no longer up to date, e.g. because a
+        certificate was revoked since it was published.
+        """
+        if next_update is None:
+            return False
+        return next_update - datetime.now(tz=tz.utc) >= timedelta(seconds=self.refresh_ahead)
+
+    def get_content_type(self) -> Optional[str]:
+        """Get the value of the Content-Type header for CRLs."""
+        if self.content_type is not None:
+            return self.content_type
+        if self.type == Encoding.DER:
+            return "application/pkix-crl"
+        if self.type == Encoding.PEM:
+            return "text/plain"
+        return None  # pragma: no cover  # DER/PEM are all known encoding types, so this shouldn't happen
+
+    def sendfile_response(self, path: str) -> HttpResponse:
+        """Get an HTTP response that lets the web server send the CRL published at `path`."""
+        response = HttpResponse(content_type=self.get_content_type())
+        response[self.sendfile_header] = f"{self.sendfile_prefix}{path}"
+        return response
+
+    def crl_response(self, request: HttpRequest, crl: bytes) -> HttpResponse:
+        """Get the HTTP response for the given encoded CRL."""
+        content_type = self.get_content_type()
+        if content_type is None:  # pragma: no cover
+            return HttpResponseServerError()
+
+        last_update, next_update = get_crl_validity(crl)
+        return _add_caching_headers(
+            request, HttpResponse(crl, content_type=content_type), last_update, next_update
+        )
 
 
 @method_decorator(csrf_exempt, name="dispatch")
@@ -168,6 +351,12 @@ class OCSPView(View):
     ca_ocsp = False
     """If set to ``True``, validate child CAs instead."""
 
+    known_serials_filter = True
+    """Set to ``False`` to disable the in-memory filter of serials issued by the certificate authority.
+
+    Requests for serials that are not in the filter (see :py:class:`~django_ca.ocsp.KnownSerials`) are
+    answered with the status "unknown" without querying the database."""
+
     def get(self, request: HttpRequest, data: str) -> HttpResponse:
         # pylint: disable=missing-function-docstring; standard Django view function
         try:
@@ -176,11 +365,13 @@ class OCSPView(View):
             return self.malformed_request()
 
         try:
-            return self.process_ocsp_request(decoded_data)
+            response = self.process_ocsp_request(decoded_data)
         except Exception as e:  # pylint: disable=broad-except; we really need to catch everything here
             log.exception(e)
             return self.fail()
 
+        return self.add_caching_headers(request, response)
+
     def post(self, request: HttpRequest) -> HttpResponse:
         # pylint: disable=missing-function-docstring; standard Django view function
         try:
@@ -189,6 +380,16 @@ class OCSPView(View):
             log.exception(e)
             return self.fail()
 
+    def add_caching_headers(self, request: HttpRequest, response: HttpResponse) -> HttpResponse:
+        """Add HTTP caching headers to the response to a GET request.
+
+        Only responses to GET requests may be cached by HTTP caches (RFC 5019, section 5).
+        """
+        validity = get_ocsp_response_validity(response.content)
+        if validity is None:
+            return response
+        return _add_caching_headers(request, response, *validity)
+
     def fail(self, status: ocsp.OCSPResponseStatus = ocsp.OCSPResponseStatus.INTERNAL_ERROR) -> HttpResponse:
         """Generic method to return a failure response."""
         return self.http_response(
@@ -197,27 +398,16 @@ class OCSPView(View):
 
     def get_responder_key(self) -> CertificateIssuerPrivateKeyTypes:
         """Get the private key used to sign OCSP responses."""
-        key = self.get_responder_key_data()
-
-        try:
-            loaded_key = serialization.load_der_private_key(key, None)
-        except ValueError:
-            try:
-                loaded_key = serialization.load_pem_private_key(key, None)
-            except ValueError as ex:
-                raise ValueError("Could not decrypt private key.") from ex
-
-        # Check that the private key is of a supported type
-        if not isinstance(loaded_key, constants.PRIVATE_KEY_TYPES):
-            log.error("%s: Unsupported private key type.", type(loaded_key))
-            raise ValueError(f"{type(loaded_key)}: Unsupported private key type.")
-
-        return loaded_key  # type: ignore[return-value]  # mypy not smart enough for above isinstance() check
+        return load_responder_key(self.get_responder_key_data())
 
     def get_responder_key_data(self) -> bytes:
         """Read the file containing the private key used to sign OCSP responses."""
         return read_file(self.responder_key)
 
+    def get_responder(self) -> Tuple[CertificateIssuerPrivateKeyTypes, x509.Certificate]:
+        """Get the private key and certificate used to sign OCSP responses."""
+        return self.get_responder_key(), self.get_responder_cert()
+
     def get_responder_cert(self) -> x509.Certificate:
         """Get the public key used to sign OCSP responses."""
         # User configured a loaded certificate
@@ -241,12 +431,54 @@ class OCSPView(View):
         """Get the certificate authority for the request."""
         return CertificateAuthority.objects.get_by_serial_or_cn(self.ca)
 
-    def get_cert(self, ca: CertificateAuthority, serial: str) -> Union[Certificate, CertificateAuthority]:
-        """Get the certificate that was requested in the OCSP request."""
+    def get_issuer(self, cert_ids: List[CertificateID]) -> CertificateAuthority:
+        """Get the certificate authority that issued the certificates in the OCSP request.
+
+        The default implementation ignores the request and returns the certificate authority configured for
+        this view.
+        """
+        return self.get_ca()
+
+    def get_cert_statuses(
+        self, ca: CertificateAuthority, serials: Iterable[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """Get the revocation status of the certificates that were requested in the OCSP request.
+
+        The returned dictionary maps the serial of each certificate found to a dictionary with the fields
+        named in :py:attr:`~django_ca.ocsp.CERTIFICATE_STATUS_FIELDS`. All certificates are retrieved with a
+        single query and only these fields are retrieved, so certificates never have to be loaded.
+
+        Serials that were never issued by the certificate authority are filtered out using
+        :py:func:`~django_ca.views.OCSPView.filter_known_serials` first, so that they never reach the
+        database.
+        """
+        if self.known_serials_filter is True:
+            serials = self.filter_known_serials(ca, serials)
+            if not serials:
+                return {}
+
+        statuses = self.get_status_queryset(ca, serials)
+        return {status["serial"]: status for status in statuses}
+
+    def filter_known_serials(self, ca: CertificateAuthority, serials: Iterable[str]) -> List[str]:
+        """Get the serials from `serials` that are (probably) issued by the certificate authority."""
+        scope = "ca" if self.ca_ocsp is True else "cert"
+        return known_serials.filter(ca.serial, scope, self.get_issued_queryset(ca), list(serials))
+
+    def get_issued_queryset(
+        self, ca: CertificateAuthority
+    ) -> "QuerySet[Union[Certificate, CertificateAuthority]]":
+        """Get a queryset of all certificates (or child certificate authorities) issued by `ca`."""
         if self.ca_ocsp is True:
-            return CertificateAuthority.objects.filter(parent=ca).get(serial=serial)
+            return CertificateAuthority.objects.filter(parent=ca)
+        return Certificate.objects.filter(ca=ca)
 
-        return Certificate.objects.filter(ca=ca).get(serial=serial)
+    def get_status_queryset(
+        self, ca: CertificateAuthority, serials: Iterable[str]
+    ) -> "QuerySet[Dict[str, Any]]":
+        """Get a queryset retrieving the revocation status for the given serials (but no other fields)."""
+        queryset = self.get_issued_queryset(ca).filter(serial__in=serials)
+        return queryset.values("serial", *CERTIFICATE_STATUS_FIELDS)
 
     def get_expires(self, now: datetime) -> datetime:
         """Get the timestamp when the OCSP response expires."""
@@ -256,6 +488,47 @@ class OCSPView(View):
         """Get an HTTP OCSP response with given status and data."""
         return HttpResponse(data, status=status, content_type="application/ocsp-response")
 
+    def get_cached_response(self, cache_key: str) -> Optional[bytes]:
+        """Get a previously signed OCSP response from the cache, or ``None`` if no response was cached.
+
+        Cached responses are only used if they were signed by the current responder certificate.
+        """
+        cached = cache.get(cache_key)
+        if cached is None:
+            return None
+        return self.check_cached_response(cached)
+
+    def check_cached_response(self, cached: Tuple[int, bytes]) -> Optional[bytes]:
+        """Get the signed OCSP response from a cache entry if it was signed by the current responder."""
+        responder_serial, encoded_response = cached
+        try:
+            responder_cert = self.get_responder_cert()
+        except Exception:  # pylint: disable=broad-except; caller will handle error when loading it again
+            return None
+        if responder_cert.serial_number != responder_serial:
+            return None
+        return encoded_response
+
+    def set_cached_response(
+        self,
+        cache_key: str,
+        responder_cert: x509.Certificate,
+        encoded_response: bytes,
+        now: datetime,
+        expires: datetime,
+    ) -> None:
+        """Cache a signed OCSP response.
+
+        Responses are cached for half of their validity period, so that clients always receive a response that
+        is valid for a reasonable amount of time. The cache is invalidated when a certificate is revoked.
+        """
+        timeout = self.get_cached_response_timeout(now, expires)
+        cache.set(cache_key, (responder_cert.serial_number, encoded_response), timeout)
+
+    def get_cached_response_timeout(self, now: datetime, expires: datetime) -> int:
+        """Get the time in seconds that a signed OCSP response is cached."""
+        return int((expires - now).total_seconds() / 2)
+
     def malformed_request(self) -> HttpResponse:
         """Get a response for a malformed request."""
         return self.fail(ocsp.OCSPResponseStatus.MALFORMED_REQUEST)
@@ -263,84 +536,90 @@ class OCSPView(View):
     def process_ocsp_request(self, data: bytes) -> HttpResponse:
         """Process OCSP request data."""
         try:
-            ocsp_req = ocsp.load_der_ocsp_request(data)
+            cert_ids, nonce = load_ocsp_request(data)
         except Exception as e:  # pylint: disable=broad-except; we really need to catch everything here
             log.exception(e)
             return self.malformed_request()
 
-        # Fail if there are any critical extensions that we do not understand
-        for ext in ocsp_req.extensions:
-            if ext.critical and not isinstance(ext.value, OCSPNonce):  # pragma: no cover
-                # It seems impossible to get cryptography to create such a request, so it's not tested
-                return self.malformed_request()
-
         # Get CA and certificate
         try:
-            ca = self.get_ca()
+            ca = self.get_issuer(cert_ids)
         except CertificateAuthority.DoesNotExist:
             log.error("%s: Certificate Authority could not be found.", self.ca)
             return self.fail()
 
-        cert_serial = int_to_hex(ocsp_req.serial_number)
+        serials = [int_to_hex(cert_id.serial_number) for cert_id in cert_ids]
 
-        # NOINSPECTION NOTE: PyCharm wrongly things that second except is already covered by the first.
-        # noinspection PyExceptClausesOrder
-        try:
-            cert = self.get_cert(ca, cert_serial)
-        except CertificateAuthority.DoesNotExist:
-            log.warning("%s: OCSP request for unknown CA received.", cert_serial)
-            return self.fail()
-        except Certificate.DoesNotExist:
-            log.warning("%s: OCSP request for unknown cert received.", cert_serial)
-            return self.fail()
+        cache_key = self.get_response_cache_key(ca, cert_ids, serials, nonce)
+        if cache_key is not None:
+            cached_response = self.get_cached_response(cache_key)
+            if cached_response is not None:
+                return self.http_response(cached_response)
+
+        statuses = self.get_cert_statuses(ca, serials)
 
         # get key/cert for OCSP responder
         try:
-            responder_key = self.get_responder_key()
-            responder_cert = self.get_responder_cert()
+            responder_key, responder_cert = self.get_responder()
         except Exception:  # pylint: disable=broad-except; we really need to catch everything here
             log.error("Could not read responder key/cert.")
             return self.fail()
 
-        # get the certificate status
-        if cert.revoked:
-            status = ocsp.OCSPCertStatus.REVOKED
-        else:
-            status = ocsp.OCSPCertStatus.GOOD
+        encoded_response, now, expires = self.sign_responses(
+            ca, cert_ids, serials, statuses, responder_key, responder_cert, nonce
+        )
 
-        now = datetime.now(tz=tz.utc)
-        builder = ocsp.OCSPResponseBuilder()
-        expires = self.get_expires(now)
-        builder = builder.add_response(
-            cert=cert.pub.loaded,
-            issuer=ca.pub.loaded,
-            # The algorithm used must be the same as in the request, or "openssl ocsp" won't be able to
-            # determine the status (verified: NOT the hash algorithm of the requested certificate).
-            algorithm=ocsp_req.hash_algorithm,
-            cert_status=status,
-            this_update=now.replace(tzinfo=None),
-            next_update=expires,
-            revocation_time=cert.get_revocation_time(),
-            revocation_reason=cert.get_revocation_reason(),
-        ).responder_id(ocsp.OCSPResponderEncoding.HASH, responder_cert)
-
-        # Add the responder/delegate certificate to the response
-        builder = builder.certificates([responder_cert])
-
-        # Add OCSP nonce if present
-        try:
-            nonce = ocsp_req.extensions.get_extension_for_class(OCSPNonce)
-            builder = builder.add_extension(nonce.value, critical=nonce.critical)
-        except ExtensionNotFound:
-            pass
+        if cache_key is not None:
+            self.set_cached_response(cache_key, responder_cert, encoded_response, now, expires)
 
-        # The hash algorithm may be different from the signature hash algorithm of the responder certificate,
-        # but must be None for Ed448/Ed25519 certificates. Since delegate certificates are ephemeral anyway,
-        # configuring the hash algorithm is not supported, instead the user is expected to generate new keys
-        # with a different private key type or hash algorithm if desired.
-        response = builder.sign(responder_key, responder_cert.signature_hash_algorithm)
+        return self.http_response(encoded_response)
 
-        return self.http_response(response.public_bytes(Encoding.DER))
+    def get_response_cache_key(
+        self,
+        ca: CertificateAuthority,
+        cert_ids: List[CertificateID],
+        serials: List[str],
+        nonce: Optional[bytes],
+    ) -> Optional[str]:
+        """Get the cache key for the signed OCSP response, or ``None`` if the response cannot be cached.
+
+        Requests for a single certificate without a nonce can be answered with a previously signed response
+        (see RFC 5019).
+        """
+        if nonce is not None or len(cert_ids) != 1:
+            return None
+        scope = "ca" if self.ca_ocsp is True else "cert"
+        return get_ocsp_response_cache_key(ca.serial, serials[0], cert_ids[0].algorithm, scope)
+
+    def sign_responses(
+        self,
+        ca: CertificateAuthority,
+        cert_ids: List[CertificateID],
+        serials: List[str],
+        statuses: Dict[str, Dict[str, Any]],
+        responder_key: CertificateIssuerPrivateKeyTypes,
+        responder_cert: x509.Certificate,
+        nonce: Optional[bytes],
+    ) -> Tuple[bytes, datetime, datetime]:
+        """Sign the OCSP response for the requested certificates.
+
+        Returns the DER-encoded response as well as the timestamps when the response was created and when it
+        expires. This method does not access the database.
+        """
+        now = datetime.now(tz=tz.utc)
+        expires = self.get_expires(now)
+        responses = []
+        for cert_id, cert_serial in zip(cert_ids, serials):
+            status = statuses.get(cert_serial)
+            if status is None:
+                log.debug(
+                    "%s: OCSP request for unknown %s received.", cert_serial, "CA" if self.ca_ocsp else "cert"
+                )
+            responses.append(
+                get_single_response(ca, cert_id.serial_number, cert_id.algorithm, status, now, expires)
+            )
+        encoded_response = sign_ocsp_response(responses, responder_key, responder_cert, now, nonce=nonce)
+        return encoded_response, now, expires
 
 
 @method_decorator(csrf_exempt, name="dispatch")
@@ -354,12 +633,14 @@ class GenericOCSPView(OCSPView):
 
     auto_ca: CertificateAuthority
 
+    responder_reload_interval = 60
+    """If the storage backend does not support modification times, the responder key and certificate are
+    reloaded every this many seconds."""
+
     # NOINSPECTION NOTE: It's okay to be more specific here
     # noinspection PyMethodOverriding
     def dispatch(self, request: HttpRequest, serial: str, **kwargs: Any) -> "HttpResponseBase":
-        if request.method == "GET" and "data" not in kwargs:
-            return self.http_method_not_allowed(request, serial, **kwargs)
-        if request.method == "POST" and "data" in kwargs:
+        if _ocsp_method_not_allowed(request, kwargs):
             return self.http_method_not_allowed(request, serial, **kwargs)
 
         # COVERAGE NOTE: Checking just for safety here.
@@ -380,8 +661,74 @@ class GenericOCSPView(OCSPView):
         return read_file(f"ocsp/{serial}.key")
 
     def get_responder_cert(self) -> x509.Certificate:
+        cached = _responder_cache.get(self.auto_ca.serial)
+        if cached is not None and cached[0] == self.get_responder_version():
+            return cached[2]
         return self.auto_ca.ocsp_responder_certificate
 
+    def get_responder_version(self) -> str:
+        """Get a string identifying the current responder key and certificate files.
+
+        The string is based on the modification time of both files, so it changes whenever
+        :py:func:`~django_ca.models.CertificateAuthority.generate_ocsp_key` writes new files. For storage
+        backends that do not support modification times, the string changes every
+        :py:attr:`~django_ca.views.GenericOCSPView.responder_reload_interval` seconds instead, so that files
+        do not have to be read for every request.
+        """
+        serial = self.auto_ca.serial.replace(":", "")
+        storage = get_storage()
+        versions = []
+        for path in (f"ocsp/{serial}.key", f"ocsp/{serial}.pem"):
+            try:
+                versions.append(storage.get_modified_time(path).isoformat())
+            except NotImplementedError:
+                versions.append(f"{path}@{int(time.monotonic() // self.responder_reload_interval)}")
+        return ",".join(versions)
+
+    def get_responder(self) -> Tuple[CertificateIssuerPrivateKeyTypes, x509.Certificate]:
+        """Get the private key and certificate used to sign OCSP responses.
+
+        Loaded keys and certificates are cached in memory until the files in the storage backend change, so
+        for most requests, this method does not have to read or parse any files.
+        """
+        version = self.get_responder_version()
+        cached = _responder_cache.get(self.auto_ca.serial)
+        if cached is not None and cached[0] == version:
+            return cached[1], cached[2]
+
+        responder_key, responder_cert = super().get_responder()
+        _responder_cache[self.auto_ca.serial] = (version, responder_key, responder_cert)
+        return responder_key, responder_cert
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class UnifiedOCSPView(GenericOCSPView):
+    """View providing a single OCSP responder for all certificate authorities.
+
+    Unlike :py:class:`~django_ca.views.GenericOCSPView`, this view does not require the serial of the
+    certificate authority in the URL. Instead, the certificate authority is determined using the issuer name
+    and key hashes included in the request, using the in-memory :py:class:`~django_ca.ocsp.IssuerIndex`. All
+    certificates in a request must be issued by the same certificate authority.
+    """
+
+    # NOINSPECTION NOTE: This view does not receive a serial, so it has to skip GenericOCSPView.dispatch()
+    # noinspection PyMethodOverriding
+    def dispatch(  # type: ignore[override]
+        self, request: HttpRequest, **kwargs: Any
+    ) -> "HttpResponseBase":
+        if _ocsp_method_not_allowed(request, kwargs):
+            return self.http_method_not_allowed(request, **kwargs)
+        return View.dispatch(self, request, **kwargs)
+
+    def get_issuer(self, cert_ids: List[CertificateID]) -> CertificateAuthority:
+        cas = {issuer_index.get(cert_id) for cert_id in cert_ids}
+        if len(cas) != 1 or None in cas:
+            self.ca = ", ".join(sorted({cert_id.issuer_key_hash.hex() for cert_id in cert_ids}))
+            raise CertificateAuthority.DoesNotExist()
+
+        self.auto_ca = typing.cast(CertificateAuthority, cas.pop())
+        return self.auto_ca
+
 
 class GenericCAIssuersView(View):
     """Generic view that returns a CA public key in DER format.
@@ -394,3 +741,180 @@ class GenericCAIssuersView(View):
         # pylint: disable=missing-function-docstring; standard Django view function
         ca = CertificateAuthority.objects.get(serial=serial)
         return HttpResponse(ca.pub.der, content_type="application/pkix-cert")
+
+
+class AsyncCertificateRevocationListView(CertificateRevocationListView):
+    """Asynchronous variant of :py:class:`~django_ca.views.CertificateRevocationListView`.
+
+    CRLs are retrieved from the cache without accessing the database. If a CRL has to be generated, the
+    certificate authority is loaded and the CRL is signed in a worker thread.
+    """
+
+    async def get(  # type: ignore[override]
+        self, request: HttpRequest, serial: str, partition: Optional[int] = None
+    ) -> HttpResponse:
+        # pylint: disable=missing-function-docstring; standard Django view function
+        encoding = parse_encoding(request.GET.get("encoding", self.type))
+
+        cache_key = get_crl_cache_key(
+            serial, encoding=encoding, scope=self.scope, delta=self.delta, partition=partition
+        )
+
+        published_crl = self.get_published_crl(serial, encoding, partition)
+        if published_crl is not None:
+            storage, path = published_crl
+            next_update = await cache.aget(get_crl_published_cache_key(cache_key))
+            if self.published_crl_is_current(next_update) and await sync_to_async(storage.exists)(path):
+                return self.sendfile_response(path)
+
+        crl = await sync_to_async(get_crl_from_cache)(cache_key)
+        if crl is None or self.refresh_due(crl):
+            lock_key = get_crl_cache_lock_key(cache_key)
+            if await cache.aadd(lock_key, True, self.lock_timeout):
+                try:
+                    crl = await self.agenerate_crl(cache_key, partition)
+                finally:
+                    await cache.adelete(lock_key)
+            elif crl is None:
+                # Another request is generating the CRL, wait for it to become available.
+                for _attempt in range(int(self.lock_wait / _CRL_LOCK_POLL_INTERVAL)):
+                    await asyncio.sleep(_CRL_LOCK_POLL_INTERVAL)
+                    crl = await sync_to_async(get_crl_from_cache)(cache_key)
+                    if crl is not None:
+                        break
+                else:
+                    log.warning("%s: Timed out waiting for CRL, generating it.", cache_key)
+                    crl = await self.agenerate_crl(cache_key, partition)
+
+        return self.crl_response(request, crl)
+
+    async def agenerate_crl(self, cache_key: str, partition: Optional[int]) -> bytes:
+        """Load the certificate authority, generate the CRL and store it in the cache."""
+        ca = await sync_to_async(self.get_object)()
+        crl = await sync_to_async(self.generate_crl)(ca, partition=partition)
+        await sync_to_async(set_crl_in_cache)(cache_key, crl, self.expires)
+        return crl
+
+
+class AsyncOCSPView(OCSPView):
+    """Asynchronous variant of :py:class:`~django_ca.views.OCSPView`.
+
+    The cache and the database are accessed asynchronously. Loading the responder key and signing the
+    response is done in a thread pool, so that the event loop is never blocked.
+    """
+
+    async def get(self, request: HttpRequest, data: str) -> HttpResponse:  # type: ignore[override]
+        # pylint: disable=missing-function-docstring; standard Django view function
+        try:
+            decoded_data = base64.b64decode(data)
+        except binascii.Error:
+            return self.malformed_request()
+
+        try:
+            response = await self.aprocess_ocsp_request(decoded_data)
+        except Exception as e:  # pylint: disable=broad-except; we really need to catch everything here
+            log.exception(e)
+            return self.fail()
+
+        return self.add_caching_headers(request, response)
+
+    async def post(self, request: HttpRequest) -> HttpResponse:  # type: ignore[override]
+        # pylint: disable=missing-function-docstring; standard Django view function
+        try:
+            return await self.aprocess_ocsp_request(request.body)
+        except Exception as e:  # pylint: disable=broad-except; we really need to catch everything here
+            log.exception(e)
+            return self.fail()
+
+    async def aget_issuer(self, cert_ids: List[CertificateID]) -> CertificateAuthority:
+        """Async version of :py:func:`~django_ca.views.OCSPView.get_issuer`."""
+        return await sync_to_async(self.get_issuer)(cert_ids)
+
+    async def aget_cert_statuses(
+        self, ca: CertificateAuthority, serials: Iterable[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """Async version of :py:func:`~django_ca.views.OCSPView.get_cert_statuses`."""
+        if self.known_serials_filter is True:
+            serials = await sync_to_async(self.filter_known_serials)(ca, serials)
+            if not serials:
+                return {}
+
+        statuses = self.get_status_queryset(ca, serials)
+        return {status["serial"]: status async for status in statuses}
+
+    async def aprocess_ocsp_request(self, data: bytes) -> HttpResponse:
+        """Async version of :py:func:`~django_ca.views.OCSPView.process_ocsp_request`."""
+        try:
+            cert_ids, nonce = load_ocsp_request(data)
+        except Exception as e:  # pylint: disable=broad-except; we really need to catch everything here
+            log.exception(e)
+            return self.malformed_request()
+
+        # Get CA and certificate
+        try:
+            ca = await self.aget_issuer(cert_ids)
+        except CertificateAuthority.DoesNotExist:
+            log.error("%s: Certificate Authority could not be found.", self.ca)
+            return self.fail()
+
+        serials = [int_to_hex(cert_id.serial_number) for cert_id in cert_ids]
+
+        cache_key = self.get_response_cache_key(ca, cert_ids, serials, nonce)
+        if cache_key is not None:
+            cached = await cache.aget(cache_key)
+            if cached is not None:
+                cached_response = await sync_to_async(self.check_cached_response)(cached)
+                if cached_response is not None:
+                    return self.http_response(cached_response)
+
+        statuses = await self.aget_cert_statuses(ca, serials)
+
+        # get key/cert for OCSP responder
+        try:
+            responder_key, responder_cert = await sync_to_async(self.get_responder)()
+        except Exception:  # pylint: disable=broad-except; we really need to catch everything here
+            log.error("Could not read responder key/cert.")
+            return self.fail()
+
+        # Signing does not access the database, so it can run in parallel in any thread.
+        encoded_response, now, expires = await sync_to_async(self.sign_responses, thread_sensitive=False)(
+            ca, cert_ids, serials, statuses, responder_key, responder_cert, nonce
+        )
+
+        if cache_key is not None:
+            timeout = self.get_cached_response_timeout(now, expires)
+            await cache.aset(cache_key, (responder_cert.serial_number, encoded_response), timeout)
+
+        return self.http_response(encoded_response)
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class AsyncGenericOCSPView(AsyncOCSPView, GenericOCSPView):
+    """Asynchronous variant of :py:class:`~django_ca.views.GenericOCSPView`."""
+
+    # NOINSPECTION NOTE: It's okay to be more specific here
+    # noinspection PyMethodOverriding
+    async def dispatch(  # type: ignore[override]
+        self, request: HttpRequest, serial: str, **kwargs: Any
+    ) -> "HttpResponseBase":
+        if _ocsp_method_not_allowed(request, kwargs):
+            return await self.http_method_not_allowed(request, serial, **kwargs)  # type: ignore[misc]
+
+        self.auto_ca = await CertificateAuthority.objects.aget(serial=serial)
+        return await View.dispatch(self, request, **kwargs)  # type: ignore[no-any-return,misc]
+
+    async def aget_issuer(self, cert_ids: List[CertificateID]) -> CertificateAuthority:
+        return self.auto_ca
+
+
+class AsyncUnifiedOCSPView(AsyncOCSPView, UnifiedOCSPView):
+    """Asynchronous variant of :py:class:`~django_ca.views.UnifiedOCSPView`."""
+
+
+class AsyncGenericCAIssuersView(GenericCAIssuersView):
+    """Asynchronous variant of :py:class:`~django_ca.views.GenericCAIssuersView`."""
+
+    async def get(self, request: HttpRequest, serial: str) -> HttpResponse:  # type: ignore[override]
+        # pylint: disable=missing-function-docstring; standard Django view function
+        ca = await CertificateAuthority.objects.aget(serial=serial)
+        return HttpResponse(ca.pub.der, content_type="application/pkix-cert")
@@ -379,6 +379,7 @@ rst_epilog = f"""
 .. |ExtensionType| replace:: :py:class:`~cg:cryptography.x509.ExtensionType`
 .. |Name| replace:: :py:class:`~cg:cryptography.x509.Name`
 .. |RelativeDistinguishedName| replace:: :py:class:`~cg:cryptography.x509.RelativeDistinguishedName`
+.. _RFC 5019: https://datatracker.ietf.org/doc/html/rfc5019
 .. _RFC 5280: https://datatracker.ietf.org/doc/html/rfc5280
 """
 